@@ -2,25 +2,34 @@
 Faturalama ve ödeme işlemleri için özel agent
 """
 
-from langchain_ollama import OllamaLLM
 from langchain_core.prompts import ChatPromptTemplate
-from typing import List
+from typing import Any, Dict, List, Optional
+
+from ..billing_data import BillingDataService, format_account_summary
+from ..ollama_pool import OllamaPool
+from .generation import TokenCallback, create_llm, format_history, generate
 
 
 class FaturaAgent:
     """Faturalama ve ödeme işlemleri için özel agent sınıfı"""
     
-    def __init__(self, model_name: str = "gemma3:latest"):
+    def __init__(
+        self,
+        model_name: Optional[str] = None,
+        billing_data: Optional[BillingDataService] = None,
+        ollama_pool: Optional[OllamaPool] = None
+    ):
         """
         Fatura Agent'i başlatır
         
         Args:
-            model_name: Ollama'da kullanılacak model adı
+            model_name: Ollama'da kullanılacak model adı (None ise config'deki model)
+            billing_data: Müşteri hesap özetleri için veri katmanı (isteğe bağlı)
+            ollama_pool: Birden fazla Ollama sunucusu için backend havuzu (isteğe bağlı)
         """
-        self.llm = OllamaLLM(
-            model=model_name,
-            base_url="http://localhost:11434"
-        )
+        self.llm = create_llm(model_name, ollama_pool)
+        
+        self.billing_data = billing_data
         
         # Faturalama konularına özel prompt
         self.prompt = ChatPromptTemplate.from_template(
@@ -43,13 +52,21 @@ class FaturaAgent:
             Faturalama Uzmanı Yanıtı:"""
         )
     
-    def handle_billing_request(self, user_input: str, history: List[str] = None) -> str:
+    def handle_billing_request(
+        self,
+        user_input: str,
+        history: List[str] = None,
+        on_token: Optional[TokenCallback] = None,
+        customer_info: Optional[Dict[str, Any]] = None
+    ) -> str:
         """
         Fatura ile ilgili müşteri taleplerini işler
 
         Args:
             user_input: Müşterinin fatura talebi
             history: Önceki konuşma geçmişi
+            on_token: Token stream callback'i (isteğe bağlı)
+            customer_info: Session'ın müşteri bilgileri (hesap özeti için)
 
         Returns:
             Fatura uzmanının yanıtı
@@ -57,10 +74,17 @@ class FaturaAgent:
         print(f"💳 Fatura Agent: '{user_input}' talebi işleniyor...")
 
         # Konuşma geçmişini formatla
-        conversation_context = ""
-        if history:
-            conversation_context = "\n".join([f"- {msg}" for msg in history[-5:]])  # Son 5 mesaj
-            conversation_context = f"\n\nÖnceki konuşma:\n{conversation_context}\n"
+        conversation_context = format_history(history)
+
+        # Session açılışında ön yüklenen hesap özeti (genellikle önbellekte hazırdır)
+        account_context = ""
+        if self.billing_data is not None and customer_info:
+            summary = self.billing_data.get_account_summary(customer_info)
+            if summary:
+                account_context = (
+                    f"\n\nMüşterinin hesap bilgileri:\n{format_account_summary(summary)}\n"
+                    "Tutar ve tarihleri sadece bu bilgilere dayanarak söyle, tahmin yürütme.\n"
+                )
 
         # Prompt'u güncelle
         updated_prompt = ChatPromptTemplate.from_template(
@@ -79,7 +103,7 @@ class FaturaAgent:
             1. Müşterinin fatura sorununu anlayıp çöz
             2. Gerekirse ödeme seçenekleri sun
             3. Net ve anlaşılır bilgi ver
-            4. Müşteriyi memnun et{conversation_context}
+            4. Müşteriyi memnun et{account_context}{conversation_context}
             
             Müşteri talebi: {user_input}
             
@@ -88,9 +112,10 @@ class FaturaAgent:
         
         formatted_prompt = updated_prompt.format(
             user_input=user_input,
+            account_context=account_context,
             conversation_context=conversation_context
         )
-        response = self.llm.invoke(formatted_prompt)
+        response = generate(self.llm, formatted_prompt, on_token, agent_type="fatura", category="faturalama")
         
         print(f"💳 Fatura Agent yanıtı: {response[:100]}...")
         return response
@@ -0,0 +1,106 @@
+"""
+Agent'ların ortak LLM generation yardımcıları
+"""
+
+import time
+from typing import Callable, List, Optional
+
+from ..config import OLLAMA_CONFIG, SESSION_CONFIG
+from ..ollama_pool import OllamaPool
+from ..tracing import tracer
+from .generation_budget import generation_budgets
+
+# Üretilen her token parçası için çağrılan callback tipi
+TokenCallback = Callable[[str], None]
+
+
+def create_llm(model_name: Optional[str] = None, ollama_pool: Optional[OllamaPool] = None):
+    """
+    Ayarlardaki bağlantı ve örnekleme parametreleriyle Ollama LLM'i oluşturur
+
+    Args:
+        model_name: Model adı (None ise OLLAMA_CONFIG'deki model)
+        ollama_pool: Verilirse istekler bu backend havuzu üzerinden yönlendirilir
+
+    Returns:
+        Havuz üzerinden çalışan PooledLLM (havuz verilmezse tek backend'li havuz)
+    """
+    if ollama_pool is None:
+        ollama_pool = OllamaPool([OLLAMA_CONFIG["base_url"]])
+    return ollama_pool.llm(model_name or OLLAMA_CONFIG["model_name"])
+
+
+def format_history(history: Optional[List[str]]) -> str:
+    """
+    Konuşma geçmişinin son mesajlarını prompt bölümü olarak biçimlendirir
+
+    Mesaj sayısı her çağrıda SESSION_CONFIG'den okunur (çalışırken değiştirilebilir).
+    """
+    limit = SESSION_CONFIG["prompt_history_messages"]
+    if not history or limit <= 0:
+        return ""
+    lines = "\n".join(f"- {msg}" for msg in history[-limit:])
+    return f"\n\nÖnceki konuşma:\n{lines}\n"
+
+
+def generate(
+    llm,
+    prompt: str,
+    on_token: Optional[TokenCallback] = None,
+    agent_type: str = "router",
+    category: Optional[str] = None
+) -> str:
+    """
+    LLM'den yanıt üretir, callback verilmişse token'ları stream eder
+
+    Yanıt uzunluğu agent / kategori bütçesiyle (num_predict ve stop
+    dizileri) sınırlanır; süre ve kesilme bilgisi bütçe kontrolcüsüne
+    bildirilir. complete() desteklemeyen LLM'lerde (ör. testlerdeki sahte
+    LLM'ler) bütçe uygulanmaz.
+
+    Args:
+        llm: create_llm ile oluşturulan LLM
+        prompt: Formatlanmış prompt
+        on_token: Her token parçası için çağrılacak fonksiyon
+        agent_type: Yanıtı üreten agent (fatura, tarife, router)
+        category: Talebin kategorisi (kategori bütçesi için)
+
+    Returns:
+        Tam yanıt metni
+    """
+    num_predict, stop = generation_budgets.budget_for(agent_type, category)
+    with tracer.span(
+        "llm.generate",
+        model=getattr(llm, "model", "unknown"),
+        agent=agent_type,
+        prompt_chars=len(prompt),
+        stream=on_token is not None,
+        num_predict=num_predict
+    ) as span:
+        started = time.perf_counter()
+        first_token = []
+
+        def forward(chunk: str):
+            if not first_token and span is not None:
+                span.set_attribute("time_to_first_token_ms", round((time.perf_counter() - started) * 1000, 1))
+            first_token.append(True)
+            on_token(chunk)
+
+        truncated = False
+        if hasattr(llm, "complete"):
+            completion = llm.complete(prompt, forward if on_token else None, num_predict, stop)
+            response, truncated = completion.text, completion.truncated
+        elif on_token is None:
+            response = llm.invoke(prompt)
+        else:
+            chunks = []
+            for chunk in llm.stream(prompt):
+                chunks.append(chunk)
+                forward(chunk)
+            response = "".join(chunks)
+
+        generation_budgets.record(agent_type, category, time.perf_counter() - started, truncated)
+        if span is not None:
+            span.set_attribute("response_chars", len(response))
+            span.set_attribute("truncated", truncated)
+        return response
@@ -0,0 +1,182 @@
+"""
+Yanıt uzunluğu bütçeleri
+Agent ve kategori bazlı num_predict / stop dizileri belirler; gözlenen p95
+üretim süresi SLO'yu aşınca bütçeleri daraltır, pay olunca gevşetir
+"""
+
+import math
+import threading
+from collections import deque
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..config import GENERATION_CONFIG
+
+
+class _BudgetState:
+    """Tek bir bütçe anahtarının (kategori veya agent) uyarlamalı durumu"""
+
+    __slots__ = ("scale", "latencies", "since_adjust", "generations", "truncated", "tightened", "relaxed")
+
+    def __init__(self, latency_window: int):
+        self.scale = 1.0
+        self.latencies: deque = deque(maxlen=latency_window)
+        self.since_adjust = 0
+        self.generations = 0
+        self.truncated = 0
+        self.tightened = 0
+        self.relaxed = 0
+
+    def p95(self) -> Optional[float]:
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[max(0, math.ceil(0.95 * len(ordered)) - 1)]
+
+
+class GenerationBudgets:
+    """Agent / kategori bazlı token bütçeleri ve uyarlamalı kontrol"""
+
+    def __init__(
+        self,
+        agent_budgets: Dict[str, int],
+        category_budgets: Optional[Dict[str, int]] = None,
+        stop_sequences: Optional[Dict[str, List[str]]] = None,
+        adaptive: bool = True,
+        slo_ms: float = 8000,
+        min_budget_ratio: float = 0.4,
+        adjust_step: float = 0.1,
+        headroom_ratio: float = 0.6,
+        adjust_every: int = 20,
+        latency_window: int = 200
+    ):
+        """
+        Bütçeleri başlatır
+
+        Args:
+            agent_budgets: Agent tipi -> azami token ("default" diğer agent'lar için)
+            category_budgets: Kategori -> azami token (agent bütçesinin yerine geçer)
+            stop_sequences: Agent tipi -> stop dizileri ("default" hepsine eklenir)
+            adaptive: p95 süresine göre bütçe ayarlaması yapılsın mı
+            slo_ms: Üretim süresi için p95 hedefi (ms)
+            min_budget_ratio: Bütçenin inebileceği alt sınır (temel bütçeye oran)
+            adjust_step: Her ayarlamada ölçeğin değişim miktarı
+            headroom_ratio: p95 < slo_ms * headroom_ratio ise bütçe gevşetilir
+            adjust_every: Kaç generation'da bir p95 değerlendirilir
+            latency_window: p95 hesabı için tutulan son süre sayısı
+        """
+        self.agent_budgets = agent_budgets
+        self.category_budgets = category_budgets or {}
+        self.stop_sequences = stop_sequences or {}
+        self.adaptive = adaptive
+        self.slo_ms = slo_ms
+        self.min_budget_ratio = min_budget_ratio
+        self.adjust_step = adjust_step
+        self.headroom_ratio = headroom_ratio
+        self.adjust_every = adjust_every
+        self.latency_window = latency_window
+        self._states: Dict[str, _BudgetState] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls) -> "GenerationBudgets":
+        """config.py ayarlarından bütçe kontrolcüsü oluşturur"""
+        return cls(
+            agent_budgets=GENERATION_CONFIG["agent_budgets"],
+            category_budgets=GENERATION_CONFIG["category_budgets"],
+            stop_sequences=GENERATION_CONFIG["stop_sequences"],
+            adaptive=GENERATION_CONFIG["adaptive"],
+            slo_ms=GENERATION_CONFIG["slo_ms"],
+            min_budget_ratio=GENERATION_CONFIG["min_budget_ratio"],
+            adjust_step=GENERATION_CONFIG["adjust_step"],
+            headroom_ratio=GENERATION_CONFIG["headroom_ratio"],
+            adjust_every=GENERATION_CONFIG["adjust_every"],
+            latency_window=GENERATION_CONFIG["latency_window"]
+        )
+
+    def key_for(self, agent_type: str, category: Optional[str] = None) -> str:
+        """Bütçe anahtarı: kategori bütçesi tanımlıysa kategori, yoksa agent tipi"""
+        if category and category in self.category_budgets:
+            return category
+        return agent_type
+
+    def budget_for(self, agent_type: str, category: Optional[str] = None) -> Tuple[Optional[int], List[str]]:
+        """
+        Generation için token bütçesi ve stop dizilerini döndürür
+
+        Args:
+            agent_type: Yanıtı üretecek agent (fatura, tarife, router)
+            category: Talebin kategorisi (isteğe bağlı)
+
+        Returns:
+            (num_predict veya bütçe tanımlı değilse None, stop dizileri)
+        """
+        key = self.key_for(agent_type, category)
+        base = self.category_budgets.get(key) or self.agent_budgets.get(key) or self.agent_budgets.get("default")
+        stop = list(self.stop_sequences.get("default", [])) + list(self.stop_sequences.get(agent_type, []))
+        if base is None:
+            return None, stop
+        state = self._states.get(key)
+        scale = state.scale if state is not None and self.adaptive else 1.0
+        return max(16, int(base * scale)), stop
+
+    def record(self, agent_type: str, category: Optional[str], elapsed_seconds: float, truncated: bool):
+        """
+        Tamamlanan generation'ı kaydeder, gerekirse bütçeyi ayarlar
+
+        Args:
+            agent_type: Yanıtı üreten agent
+            category: Talebin kategorisi
+            elapsed_seconds: Generation süresi
+            truncated: Yanıt token bütçesine takılıp kesildi mi
+        """
+        key = self.key_for(agent_type, category)
+        with self._lock:
+            state = self._states.get(key)
+            if state is None:
+                state = self._states[key] = _BudgetState(self.latency_window)
+            state.generations += 1
+            state.truncated += truncated
+            state.latencies.append(elapsed_seconds * 1000)
+            state.since_adjust += 1
+            if self.adaptive and state.since_adjust >= self.adjust_every:
+                state.since_adjust = 0
+                self._adjust(key, state)
+
+    def _adjust(self, key: str, state: _BudgetState):
+        """p95'i SLO ile karşılaştırıp ölçeği bir adım değiştirir (lock altında çağrılır)"""
+        p95 = state.p95()
+        if p95 > self.slo_ms and state.scale > self.min_budget_ratio:
+            state.scale = max(self.min_budget_ratio, round(state.scale - self.adjust_step, 4))
+            state.tightened += 1
+            print(f"✂️ {key} yanıt bütçesi daraltıldı: ölçek {state.scale:.2f} (p95 {p95:.0f} ms > SLO {self.slo_ms:.0f} ms)")
+        elif p95 < self.slo_ms * self.headroom_ratio and state.scale < 1.0:
+            state.scale = min(1.0, round(state.scale + self.adjust_step, 4))
+            state.relaxed += 1
+            print(f"📏 {key} yanıt bütçesi gevşetildi: ölçek {state.scale:.2f} (p95 {p95:.0f} ms)")
+        else:
+            return
+        # Yeni bütçenin etkisi eski ölçekteki sürelerle karışmasın
+        state.latencies.clear()
+
+    def get_status(self) -> Dict[str, Any]:
+        """Anahtar bazlı bütçe, p95 ve kesilme oranlarını döndürür"""
+        with self._lock:
+            states = dict(self._states)
+        budgets = {}
+        for key, state in states.items():
+            p95 = state.p95()
+            budgets[key] = {
+                "num_predict": self.budget_for(key, key)[0],
+                "scale": state.scale,
+                "p95_ms": round(p95, 1) if p95 is not None else None,
+                "generations": state.generations,
+                "truncated": state.truncated,
+                "truncation_rate": round(state.truncated / state.generations, 4) if state.generations else 0.0,
+                "tightened": state.tightened,
+                "relaxed": state.relaxed
+            }
+        return {"adaptive": self.adaptive, "slo_ms": self.slo_ms, "budgets": budgets}
+
+
+# Tüm agent'ların paylaştığı bütçe kontrolcüsü
+generation_budgets = GenerationBudgets.from_config()
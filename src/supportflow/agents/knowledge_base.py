@@ -0,0 +1,230 @@
+"""
+Genel bilgi soruları için yerel bilgi tabanı (knowledge base)
+Şirket bilgileri, mağaza adresleri, çalışma saatleri gibi sabit sorular
+LLM'e gitmeden şablon yanıtlarla cevaplanır
+"""
+
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from ..config import KNOWLEDGE_BASE_CONFIG
+from ..text_utils import tokenize
+from ..tracing import traced
+
+# Bu uzunluktan kısa anahtar kelime token'ları sadece birebir eşleşir;
+# daha uzunları Türkçe ekleri tolere etmek için önek olarak eşleşir
+# ("saatleri" -> "saatleriniz")
+MIN_PREFIX_LENGTH = 3
+
+
+class _Index:
+    """Yüklenmiş bilgi tabanının değişmez indeksi"""
+
+    __slots__ = ("entry_ids", "answers", "phrases", "postings", "loaded_at", "mtime")
+
+    def __init__(self, entries: List[Dict[str, Any]], company: Dict[str, Any], mtime: float):
+        self.entry_ids: List[str] = []
+        self.answers: List[str] = []
+        # Her entry için anahtar ifadelerin token listeleri
+        self.phrases: List[List[Tuple[str, ...]]] = []
+        # token -> [(entry_no, phrase_no, token_no)]
+        self.postings: Dict[str, List[Tuple[int, int, int]]] = {}
+        self.loaded_at = datetime.now()
+        self.mtime = mtime
+
+        for entry_no, entry in enumerate(entries):
+            try:
+                # Şablonlar yükleme sırasında bir kez doldurulur, lookup sadece metin döndürür
+                answer = entry["answer"].format(**company, **entry.get("data", {}))
+            except (KeyError, IndexError) as e:
+                raise ValueError(f"'{entry.get('id')}' yanıt şablonu doldurulamadı: {e}")
+
+            phrases = [tuple(tokenize(keyword)) for keyword in entry.get("keywords", [])]
+            phrases = [phrase for phrase in phrases if phrase]
+            if not phrases:
+                raise ValueError(f"'{entry.get('id')}' için anahtar kelime tanımlanmamış")
+
+            self.entry_ids.append(entry["id"])
+            self.answers.append(answer)
+            self.phrases.append(phrases)
+            for phrase_no, phrase in enumerate(phrases):
+                for token_no, token in enumerate(phrase):
+                    self.postings.setdefault(token, []).append((entry_no, phrase_no, token_no))
+
+    def __len__(self) -> int:
+        return len(self.entry_ids)
+
+    def score(self, query: str) -> List[int]:
+        """
+        Sorgu için entry skorlarını hesaplar
+
+        Bir ifadenin tüm token'ları sorguda geçiyorsa (sıra önemsiz) ifade
+        eşleşmiş sayılır ve entry skoruna token sayısı kadar katkı yapar.
+        """
+        matched: Dict[Tuple[int, int], Set[int]] = {}
+        for token in set(tokenize(query)):
+            candidates = [token]
+            candidates.extend(token[:length] for length in range(MIN_PREFIX_LENGTH, len(token)))
+            for candidate in candidates:
+                for entry_no, phrase_no, token_no in self.postings.get(candidate, ()):
+                    matched.setdefault((entry_no, phrase_no), set()).add(token_no)
+
+        scores = [0] * len(self.entry_ids)
+        for (entry_no, phrase_no), token_nos in matched.items():
+            phrase_length = len(self.phrases[entry_no][phrase_no])
+            if len(token_nos) == phrase_length:
+                scores[entry_no] += phrase_length
+        return scores
+
+
+class KnowledgeBase:
+    """
+    Anahtar ifade indeksli bilgi tabanı
+
+    Veri dosyası değiştiğinde (mtime) indeks yeniden oluşturulup atomik
+    olarak değiştirilir; okuyucular kilit beklemez.
+    """
+
+    def __init__(self, path: str, min_score: int = 2, reload_check_seconds: float = 5):
+        """
+        Bilgi tabanını başlatır ve veri dosyasını yükler
+
+        Args:
+            path: JSON veri dosyasının yolu
+            min_score: Yanıt döndürmek için gereken en düşük eşleşme skoru
+            reload_check_seconds: Dosya değişikliği kontrol aralığı (0 = kapalı)
+        """
+        self.path = path
+        self.min_score = min_score
+        self.reload_check_seconds = reload_check_seconds
+        self._next_check = time.monotonic() + reload_check_seconds
+        self._reload_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.reloads = 0
+        self._entry_hits: Dict[str, int] = {}
+        self._index = self._load()
+
+    @classmethod
+    def from_config(cls) -> "KnowledgeBase":
+        """config.py ayarlarından bilgi tabanı oluşturur"""
+        return cls(
+            path=KNOWLEDGE_BASE_CONFIG["path"],
+            min_score=KNOWLEDGE_BASE_CONFIG["min_score"],
+            reload_check_seconds=KNOWLEDGE_BASE_CONFIG["reload_check_seconds"]
+        )
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    @traced("knowledge_base.lookup")
+    def lookup(self, question: str) -> Optional[str]:
+        """
+        Soruya güvenilir bir eşleşme varsa şablon yanıtı döndürür
+
+        En yüksek skor min_score'un altındaysa veya birden fazla entry aynı
+        skoru aldıysa eşleşme belirsiz sayılır ve None döner.
+
+        Args:
+            question: Müşteri sorusu
+
+        Returns:
+            Yanıt metni veya None (LLM'e düşülmeli)
+        """
+        self.maybe_reload()
+        index = self._index
+
+        scores = index.score(question)
+        best_no, best, runner_up = -1, 0, 0
+        for entry_no, score in enumerate(scores):
+            if score > best:
+                best_no, best, runner_up = entry_no, score, best
+            elif score > runner_up:
+                runner_up = score
+
+        confident = best >= self.min_score and best > runner_up
+        with self._stats_lock:
+            if not confident:
+                self.misses += 1
+                return None
+            self.hits += 1
+            entry_id = index.entry_ids[best_no]
+            self._entry_hits[entry_id] = self._entry_hits.get(entry_id, 0) + 1
+        return index.answers[best_no]
+
+    def maybe_reload(self) -> bool:
+        """
+        Kontrol aralığı dolduysa ve dosya değiştiyse bilgi tabanını yeniden yükler
+
+        Hatalı dosya mevcut indeksi bozmaz; hata loglanır ve eski veri kullanılmaya devam eder.
+
+        Returns:
+            Yeniden yükleme yapıldıysa True
+        """
+        if self.reload_check_seconds <= 0:
+            return False
+        now = time.monotonic()
+        if now < self._next_check:
+            return False
+        self._next_check = now + self.reload_check_seconds
+
+        try:
+            if os.path.getmtime(self.path) == self._index.mtime:
+                return False
+            self.reload()
+            return True
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Bilgi tabanı yeniden yüklenemedi: {e}")
+            return False
+
+    def reload(self) -> int:
+        """
+        Veri dosyasını yeniden okur ve indeksi değiştirir
+
+        Returns:
+            Yüklenen entry sayısı
+
+        Raises:
+            ValueError: Dosya okunamazsa veya geçersizse
+        """
+        with self._reload_lock:
+            self._index = self._load()
+            self.reloads += 1
+        print(f"📚 Bilgi tabanı yeniden yüklendi: {len(self._index)} kayıt")
+        return len(self._index)
+
+    def get_status(self) -> Dict[str, Any]:
+        """Kayıt sayısı ve isabet oranı istatistiklerini döndürür"""
+        with self._stats_lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._index),
+                "loaded_at": self._index.loaded_at.isoformat(),
+                "reloads": self.reloads,
+                "lookups": lookups,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+                "entry_hits": dict(self._entry_hits)
+            }
+
+    def _load(self) -> _Index:
+        """Veri dosyasını okuyup yeni indeks oluşturur"""
+        try:
+            mtime = os.path.getmtime(self.path)
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            raise ValueError(f"Bilgi tabanı dosyası okunamadı ({self.path}): {e}")
+
+        if not isinstance(data, dict) or not isinstance(data.get("entries"), list):
+            raise ValueError("Bilgi tabanı dosyasında 'entries' listesi bulunamadı")
+        try:
+            return _Index(data["entries"], data.get("company", {}), mtime)
+        except (KeyError, TypeError, AttributeError) as e:
+            raise ValueError(f"Bilgi tabanı kaydı geçersiz: {e}")
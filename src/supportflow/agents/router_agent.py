@@ -3,16 +3,29 @@ Ana router agent - müşteri taleplerini doğru departmanlara yönlendirir
 """
 
 import operator
-from typing import Annotated, Any, Dict, List, TypedDict
+from typing import Annotated, Any, Dict, List, Optional, TypedDict
 
 from langchain_core.prompts import ChatPromptTemplate
-from langchain_ollama import OllamaLLM
+from langchain_core.runnables import RunnableConfig
 from langgraph.graph import END, StateGraph
 
+from ..billing_data import BillingDataService
+from ..config import AGENT_CONFIG, ESCALATION_CONFIG, KNOWLEDGE_BASE_CONFIG
+from ..ollama_pool import OllamaPool
+from ..profiling import profile_branch
+from ..text_utils import turkish_lower
+from ..tracing import traced
 from .fatura_agent import FaturaAgent
+from .generation import TokenCallback, create_llm, generate
+from .knowledge_base import KnowledgeBase
 from .tarife_agent import TarifeAgent
 
 
+def merge_responses(current: Dict[str, str], update: Dict[str, str]) -> Dict[str, str]:
+    """Paralel çalışan uzman agent'ların yanıtlarını birleştirir (state reducer)"""
+    return {**(current or {}), **(update or {})}
+
+
 class AgentState(TypedDict):
     """Agent state'ini tanımlayan sınıf"""
 
@@ -20,30 +33,54 @@ class AgentState(TypedDict):
     user_input: str
     response: str
     step_count: int
-    category: str  # Tespit edilen kategori
+    category: str  # Tespit edilen (birincil) kategori
+    categories: List[str]  # Mesajda eşleşen tüm kategoriler
+    specialist_responses: Annotated[Dict[str, str], merge_responses]  # Paralel uzman yanıtları
+    requires_human: bool  # LLM'e gitmeden human agent'a aktarıldı mı
+    escalation_reason: str
+    agent_type: str  # Yanıtı üreten agent (fatura, tarife, knowledge_base, ...)
 
 
 class RouterAgent:
     """Telekomünikasyon şirketi müşteri hizmetleri router agent sınıfı"""
 
-    def __init__(self, model_name: str = "gemma3:latest"):
+    def __init__(
+        self,
+        model_name: Optional[str] = None,
+        escalation_keywords: List[str] = None,
+        knowledge_base: Optional[KnowledgeBase] = None,
+        billing_data: Optional[BillingDataService] = None,
+        ollama_pool: Optional[OllamaPool] = None,
+    ):
         """
         Agent'i başlatır
 
         Args:
-            model_name: Ollama'da kullanılacak model adı
+            model_name: Ollama'da kullanılacak model adı (None ise config'deki model)
+            escalation_keywords: LLM'e gitmeden human agent'a aktarılacak ifadeler
+            knowledge_base: Genel bilgi soruları için bilgi tabanı (None ise config'den yüklenir)
+            billing_data: FaturaAgent için müşteri hesap verisi katmanı (isteğe bağlı)
+            ollama_pool: Birden fazla Ollama sunucusu için backend havuzu (isteğe bağlı)
         """
-        self.llm = OllamaLLM(model=model_name, base_url="http://localhost:11434")
+        self.llm = create_llm(model_name, ollama_pool)
 
         # Fatura Agent'ini başlat
-        self.fatura_agent = FaturaAgent(model_name)
+        self.fatura_agent = FaturaAgent(model_name, billing_data, ollama_pool)
 
         # Tarife Agent'ini başlat
-        self.tarife_agent = TarifeAgent(model_name)
+        self.tarife_agent = TarifeAgent(model_name, ollama_pool=ollama_pool)
         
         # Son tespit edilen kategoriyi saklamak için
         self.last_category = None
 
+        # Generation öncesi escalation kontrolü için ifadeler
+        self.escalation_keywords = escalation_keywords or ESCALATION_CONFIG["keywords"]
+
+        # Genel bilgi soruları için LLM'siz hızlı yol
+        if knowledge_base is None and KNOWLEDGE_BASE_CONFIG["enabled"]:
+            knowledge_base = KnowledgeBase.from_config()
+        self.knowledge_base = knowledge_base
+
         # Telekomünikasyon müşteri hizmetleri kategorileri
         self.categories = {
             "faturalama": ["fatura", "borç", "ödeme", "tahsilat", "bakiye", "hesap"],
@@ -108,25 +145,65 @@ class RouterAgent:
         # Graph'i oluştur
         self.graph = self._create_graph()
 
+    def detect_categories(self, user_input: str) -> List[str]:
+        """
+        Mesajın anahtar kelimeleriyle eşleşen kategorileri döndürür
+
+        Args:
+            user_input: Müşterinin talebi
+
+        Returns:
+            Eşleşen kategoriler (tanım sırasıyla)
+        """
+        user_input_lower = user_input.lower()
+        # Kategori tespiti, burası vektörel olmalı.
+        return [
+            category for category, keywords in self.categories.items()
+            if any(keyword in user_input_lower for keyword in keywords)
+        ]
+
     def _create_graph(self) -> StateGraph:
         """Langgraph state graph'ini oluşturur"""
 
+        def check_escalation(state: AgentState) -> AgentState:
+            """Escalation talebini LLM çağrısından önce tespit eder"""
+            message_lower = turkish_lower(state["user_input"])
+            if any(keyword in message_lower for keyword in self.escalation_keywords):
+                print(f"🚨 Adım {state['step_count']}: Escalation talebi tespit edildi, LLM atlanıyor")
+                state["requires_human"] = True
+                state["escalation_reason"] = ESCALATION_CONFIG["reason"]
+            return state
+
+        def handoff_to_human(state: AgentState, config: RunnableConfig) -> AgentState:
+            """Müşteriye anında devir mesajı verir, generation yapılmaz"""
+            response = ESCALATION_CONFIG["handoff_message"]
+            on_token = config.get("configurable", {}).get("on_token")
+            if on_token:
+                on_token(response)
+
+            # Escalation ayrı bir bayraktır (requires_human); kategori istatistikleri
+            # ve bütçeler için mesajın gerçek kategorisi korunur
+            matched = self.detect_categories(state["user_input"])
+            state["category"] = matched[0] if matched else "genel_bilgi"
+            state["categories"] = matched
+            state["agent_type"] = "human_handoff"
+            state["response"] = response
+            state["messages"].append(f"Müşteri: {state['user_input']}")
+            state["messages"].append(f"Müşteri Temsilcisi: {response}")
+            state["step_count"] += 1
+            return state
+
         def analyze_request(state: AgentState) -> AgentState:
             """Müşteri talebini analiz eder ve kategorize eder"""
             print(f"🔄 Adım {state['step_count']}: Müşteri talebi analiz ediliyor...")
 
-            user_input_lower = state["user_input"].lower()
-            detected_category = "genel_bilgi"  # varsayılan kategori
-
-            # Kategori tespiti, burası vektörel olmalı.
-            for category, keywords in self.categories.items():
-                if any(keyword in user_input_lower for keyword in keywords):
-                    detected_category = category
-                    break
+            matched = self.detect_categories(state["user_input"])
+            detected_category = matched[0] if matched else "genel_bilgi"  # varsayılan kategori
 
             state["messages"].append(f"Müşteri: {state['user_input']}")
             state["messages"].append(f"Tespit edilen kategori: {detected_category}")
             state["category"] = detected_category
+            state["categories"] = matched
             state["step_count"] += 1
             
             # RouterAgent instance'ında kategoriyi sakla
@@ -135,25 +212,97 @@ class RouterAgent:
             
             return state
 
-        def route_customer(state: AgentState) -> AgentState:
+        def lookup_knowledge_base(state: AgentState, config: RunnableConfig) -> AgentState:
+            """Genel bilgi sorusunu bilgi tabanından yanıtlamayı dener"""
+            answer = self.knowledge_base.lookup(state["user_input"])
+            if answer is None:
+                print(f"📚 Adım {state['step_count']}: Bilgi tabanında eşleşme yok, LLM'e yönlendiriliyor")
+                return state
+
+            print(f"📚 Adım {state['step_count']}: Bilgi tabanından yanıtlandı, LLM atlanıyor")
+            on_token = config.get("configurable", {}).get("on_token")
+            if on_token:
+                on_token(answer)
+
+            state["agent_type"] = "knowledge_base"
+            state["response"] = answer
+            state["messages"].append(f"Müşteri Temsilcisi: {answer}")
+            state["step_count"] += 1
+            return state
+
+        def after_analysis(state: AgentState):
+            """
+            Genel bilgi sorularını önce bilgi tabanına yönlendirir; hem fatura hem
+            tarife konusu içeren mesajları iki uzmana paralel olarak dağıtır
+            """
+            if AGENT_CONFIG["parallel_specialists"] and {"faturalama", "paket_tarife"} <= set(state["categories"]):
+                print(f"🔀 Adım {state['step_count']}: Fatura ve tarife uzmanlarına paralel yönlendiriliyor...")
+                return ["consult_fatura", "consult_tarife"]
+            if state["category"] == "genel_bilgi" and self.knowledge_base is not None:
+                return "lookup_knowledge_base"
+            return "route_customer"
+
+        def consult_fatura(state: AgentState, config: RunnableConfig) -> Dict[str, Any]:
+            """Paralel dalda fatura uzmanına danışır; yanıtı canlı stream edilir"""
+            configurable = config.get("configurable", {})
+            response = self.fatura_agent.handle_billing_request(
+                state["user_input"], state["messages"], configurable.get("on_token"), configurable.get("customer_info")
+            )
+            return {"specialist_responses": {"fatura": response}}
+
+        def consult_tarife(state: AgentState) -> Dict[str, Any]:
+            """
+            Paralel dalda tarife uzmanına danışır
+
+            İki yanıtın token'ları birbirine karışmasın diye bu yanıt stream
+            edilmez; birleştirme adımında fatura yanıtının ardından gönderilir.
+            """
+            response = self.tarife_agent.handle_tarife_request(state["user_input"], state["messages"])
+            return {"specialist_responses": {"tarife": response}}
+
+        def merge_specialists(state: AgentState, config: RunnableConfig) -> AgentState:
+            """Paralel uzman yanıtlarını tek yanıtta birleştirir (join)"""
+            responses = state["specialist_responses"]
+            separator = "\n\n"
+            on_token = config.get("configurable", {}).get("on_token")
+            if on_token:
+                on_token(separator + responses["tarife"])
+
+            state["agent_type"] = "fatura+tarife"
+            state["response"] = responses["fatura"] + separator + responses["tarife"]
+            state["messages"].append(f"Faturalama Uzmanı: {responses['fatura']}")
+            state["messages"].append(f"Tarife Uzmanı: {responses['tarife']}")
+            state["step_count"] += 1
+            return state
+
+        def route_customer(state: AgentState, config: RunnableConfig) -> AgentState:
             """Müşteriyi doğru departmana yönlendirir"""
             print(f"🎯 Adım {state['step_count']}: Müşteri yönlendiriliyor...")
+            on_token = config.get("configurable", {}).get("on_token")
+            customer_info = config.get("configurable", {}).get("customer_info")
 
             # Kategori kontrolü - İlgili agent'lara yönlendir
             if state["category"] == "faturalama":
                 print("💳 Faturalama departmanına yönlendiriliyor...")
-                response = self.fatura_agent.handle_billing_request(state["user_input"], state["messages"])
+                response = self.fatura_agent.handle_billing_request(
+                    state["user_input"], state["messages"], on_token, customer_info
+                )
+                state["agent_type"] = "fatura"
                 state["response"] = response
                 state["messages"].append(f"Faturalama Uzmanı: {response}")
             elif state["category"] == "paket_tarife":
                 print("📦 Tarife ve Paket departmanına yönlendiriliyor...")
-                response = self.tarife_agent.handle_tarife_request(state["user_input"], state["messages"])
+                response = self.tarife_agent.handle_tarife_request(
+                    state["user_input"], state["messages"], on_token
+                )
+                state["agent_type"] = "tarife"
                 state["response"] = response
                 state["messages"].append(f"Tarife Uzmanı: {response}")
             else:
                 # Diğer kategoriler için genel router yanıtı
                 formatted_prompt = self.prompt.format(user_input=state["user_input"])
-                response = self.llm.invoke(formatted_prompt)
+                response = generate(self.llm, formatted_prompt, on_token, category=state["category"])
+                state["agent_type"] = "router"
                 state["response"] = response
                 state["messages"].append(f"Müşteri Temsilcisi: {response}")
 
@@ -169,15 +318,37 @@ class RouterAgent:
         # Graph'i oluştur
         workflow = StateGraph(AgentState)
 
-        # Node'ları ekle
-        workflow.add_node("analyze_request", analyze_request)
-        workflow.add_node("route_customer", route_customer)
-        workflow.add_node("provide_service", provide_service)
+        # Node'ları ekle (her node çağrısı isteğin trace'inde span olarak görünür;
+        # executor thread'lerinde çalışan dallar tek istek profiline dahil edilir)
+        nodes = [
+            check_escalation, handoff_to_human, analyze_request, lookup_knowledge_base,
+            route_customer, consult_fatura, consult_tarife, merge_specialists, provide_service,
+        ]
+        for node in nodes:
+            workflow.add_node(node.__name__, traced(f"graph.{node.__name__}")(profile_branch(node)))
 
         # Edge'leri ekle
-        workflow.set_entry_point("analyze_request")
-        workflow.add_edge("analyze_request", "route_customer")
+        workflow.set_entry_point("check_escalation")
+        workflow.add_conditional_edges(
+            "check_escalation",
+            lambda state: "handoff_to_human" if state["requires_human"] else "analyze_request",
+            ["handoff_to_human", "analyze_request"],
+        )
+        workflow.add_edge("handoff_to_human", END)
+        workflow.add_conditional_edges(
+            "analyze_request",
+            after_analysis,
+            ["lookup_knowledge_base", "route_customer", "consult_fatura", "consult_tarife"],
+        )
+        workflow.add_conditional_edges(
+            "lookup_knowledge_base",
+            lambda state: "provide_service" if state["response"] else "route_customer",
+            ["provide_service", "route_customer"],
+        )
         workflow.add_edge("route_customer", "provide_service")
+        # Join: iki paralel dal da bitince birleştirme bir kez çalışır
+        workflow.add_edge(["consult_fatura", "consult_tarife"], "merge_specialists")
+        workflow.add_edge("merge_specialists", "provide_service")
         workflow.add_edge("provide_service", END)
 
         return workflow.compile()
@@ -193,6 +364,35 @@ class RouterAgent:
         Returns:
             Müşteri temsilcisinin yanıtı
         """
+        result = self.run(user_input, history)
+
+        # Son kategoriyi sakla
+        self.last_category = result["category"]
+
+        return result["response"]
+
+    def run(
+        self,
+        user_input: str,
+        history: List[str] = None,
+        on_token: Optional[TokenCallback] = None,
+        customer_info: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Graph'i çalıştırır ve yanıtı kategori bilgisiyle birlikte döndürür
+
+        Eşzamanlı çağrılarda paylaşılan last_category alanına bağımlı
+        kalmamak için API tarafı bu metodu kullanır.
+
+        Args:
+            user_input: Müşterinin talebi
+            history: Önceki mesajlar (isteğe bağlı)
+            on_token: Yanıt token'larını stream etmek için callback
+            customer_info: Session'ın müşteri bilgileri (hesap verisi için)
+
+        Returns:
+            response, category, agent_type ve escalation bilgilerini içeren sözlük
+        """
         print(f"\n📞 Yeni müşteri araması...")
         print(f"👤 Müşteri: {user_input}")
         print("-" * 50)
@@ -213,13 +413,27 @@ class RouterAgent:
             "response": "",
             "step_count": 1,
             "category": "",
+            "categories": [],
+            "specialist_responses": {},
+            "requires_human": False,
+            "escalation_reason": "",
+            "agent_type": "",
             "_router_agent_ref": self  # Self reference for category storage
         }
 
         # Graph'i çalıştır
-        result = self.graph.invoke(initial_state)
-        
-        # Son kategoriyi sakla
-        self.last_category = result.get("category", None)
+        result = self.graph.invoke(
+            initial_state,
+            config={
+                "configurable": {"on_token": on_token, "customer_info": customer_info},
+                "recursion_limit": AGENT_CONFIG["max_steps"],
+            },
+        )
 
-        return result["response"]
+        return {
+            "response": result["response"],
+            "category": result.get("category", None),
+            "requires_human": result.get("requires_human", False),
+            "escalation_reason": result.get("escalation_reason") or None,
+            "agent_type": result.get("agent_type") or None,
+        }
@@ -2,26 +2,42 @@
 Tarife, kontör ve paket işlemleri için özel agent
 """
 
-from langchain_ollama import OllamaLLM
 from langchain_core.prompts import ChatPromptTemplate
-from typing import List
+from typing import List, Optional
+
+from ..config import TARIFF_INDEX_CONFIG
+from ..ollama_pool import OllamaPool
+from .generation import TokenCallback, create_llm, format_history, generate
+from .tariff_index import TariffCatalogIndex
 
 
 class TarifeAgent:
     """Tarife, kontör ve paket işlemleri için özel agent sınıfı"""
     
-    def __init__(self, model_name: str = "gemma3:latest"):
+    def __init__(
+        self,
+        model_name: Optional[str] = None,
+        catalog_index: Optional[TariffCatalogIndex] = None,
+        ollama_pool: Optional[OllamaPool] = None
+    ):
         """
         Tarife Agent'i başlatır
         
         Args:
-            model_name: Ollama'da kullanılacak model adı 
+            model_name: Ollama'da kullanılacak model adı (None ise config'deki model) 
+            catalog_index: Paket kataloğu indeksi (None ise config'den yüklenir)
+            ollama_pool: Birden fazla Ollama sunucusu için backend havuzu (isteğe bağlı)
         """
-        self.llm = OllamaLLM(
-            model=model_name,
-            base_url="http://localhost:11434"
-        )
+        self.llm = create_llm(model_name, ollama_pool)
         
+        # Prompt'a sadece talebe en yakın katalog paketleri eklenir
+        if catalog_index is None and TARIFF_INDEX_CONFIG["enabled"]:
+            try:
+                catalog_index = TariffCatalogIndex.from_config()
+            except (OSError, ValueError, KeyError) as e:
+                print(f"⚠️ Tarife kataloğu yüklenemedi, katalogsuz devam ediliyor: {e}")
+        self.catalog_index = catalog_index
+
         # Tarife ve paket konularına özel prompt
         self.prompt = ChatPromptTemplate.from_template(
             """Sen ABCX'ün tarife ve paket departmanından bir uzmansın. 
@@ -45,13 +61,19 @@ class TarifeAgent:
             Tarife Uzmanı Yanıtı:"""
         )
     
-    def handle_tarife_request(self, user_input: str, history: List[str] = None) -> str:
+    def handle_tarife_request(
+        self,
+        user_input: str,
+        history: List[str] = None,
+        on_token: Optional[TokenCallback] = None
+    ) -> str:
         """
         Tarife ve paket ile ilgili müşteri taleplerini işler
 
         Args:
             user_input: Müşterinin tarife talebi
             history: Önceki konuşma geçmişi
+            on_token: Token stream callback'i (isteğe bağlı)
 
         Returns:
             Tarife uzmanının yanıtı
@@ -59,10 +81,17 @@ class TarifeAgent:
         print(f"📦 Tarife Agent: '{user_input}' talebi işleniyor...")
 
         # Konuşma geçmişini formatla
-        conversation_context = ""
-        if history:
-            conversation_context = "\n".join([f"- {msg}" for msg in history[-5:]])  # Son 5 mesaj
-            conversation_context = f"\n\nÖnceki konuşma:\n{conversation_context}\n"
+        conversation_context = format_history(history)
+
+        # Katalogdan talebe en uygun paketleri getir
+        catalog_context = ""
+        if self.catalog_index is not None:
+            packages = self.catalog_index.context_for(user_input)
+            if packages:
+                catalog_context = (
+                    f"\n\nTalebe en uygun güncel paketler:\n{packages}\n"
+                    "Sadece bu paketleri öner, fiyat ve özellikleri değiştirme. Kısa ve net yanıt ver.\n"
+                )
 
         # Prompt'u güncelle
         updated_prompt = ChatPromptTemplate.from_template(
@@ -82,7 +111,7 @@ class TarifeAgent:
             1. Müşterinin ihtiyacını anlayıp en uygun paketi öner
             2. Mevcut paket bilgilerini net bir şekilde açıkla
             3. Kampanya ve avantajları detaylı anlat
-            4. Müşteriyi tatmin edici çözümler sun{conversation_context}
+            4. Müşteriyi tatmin edici çözümler sun{catalog_context}{conversation_context}
             
             Müşteri talebi: {user_input}
             
@@ -91,9 +120,10 @@ class TarifeAgent:
         
         formatted_prompt = updated_prompt.format(
             user_input=user_input,
+            catalog_context=catalog_context,
             conversation_context=conversation_context
         )
-        response = self.llm.invoke(formatted_prompt)
+        response = generate(self.llm, formatted_prompt, on_token, agent_type="tarife", category="paket_tarife")
         
         print(f"📦 Tarife Agent yanıtı: {response[:100]}...")
         return response
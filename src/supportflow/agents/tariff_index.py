@@ -0,0 +1,233 @@
+"""
+Tarife/paket kataloğu için vektör indeksi
+Katalog çevrimdışı olarak gömülür (embedding) ve .npy matrisi olarak
+diske yazılır; çalışma zamanında matris memory-map ile salt okunur açılır,
+böylece worker process'ler aynı sayfaları paylaşır
+
+İndeksi önceden oluşturmak için:
+    python main.py --build-tariff-index
+"""
+
+import hashlib
+import json
+import os
+import zlib
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from ..config import TARIFF_INDEX_CONFIG
+from ..text_utils import tokenize
+from ..tracing import traced
+
+# Kelime token'ları ve kelime içi karakter n-gram'larının ağırlıkları;
+# n-gram'lar Türkçe ekleri tolere eder ("paketleri" ~ "paket")
+_WORD_WEIGHT = 1.0
+_NGRAM_WEIGHT = 0.5
+_NGRAM_SIZE = 3
+
+
+def embed(text: str, dim: int) -> np.ndarray:
+    """
+    Metni feature hashing ile L2-normalize edilmiş vektöre dönüştürür
+
+    Harici bir embedding modeli gerektirmez ve deterministiktir; aynı
+    metin her process'te aynı vektörü üretir (crc32, Python hash() değil).
+
+    Args:
+        text: Ham metin
+        dim: Vektör boyutu
+
+    Returns:
+        float32 vektör
+    """
+    buckets: List[int] = []
+    weights: List[float] = []
+    for token in tokenize(text):
+        features = [("w:" + token, _WORD_WEIGHT)]
+        padded = f"#{token}#"
+        features.extend(
+            (padded[i:i + _NGRAM_SIZE], _NGRAM_WEIGHT)
+            for i in range(len(padded) - _NGRAM_SIZE + 1)
+        )
+        for feature, weight in features:
+            digest = zlib.crc32(feature.encode("utf-8"))
+            buckets.append(digest % dim)
+            # İşaret biti çakışmaların birbirini sistematik olarak büyütmesini engeller
+            weights.append(weight if digest & 0x80000000 else -weight)
+
+    vector = np.bincount(buckets, weights=weights, minlength=dim).astype(np.float32)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+def describe_package(package: Dict[str, Any], currency: str = "TL") -> str:
+    """Paketi prompt'a eklenecek tek satırlık özet haline getirir"""
+    summary = f"{package['name']} ({package['type']}) - {package['price']} {currency}/ay"
+    if package.get("features"):
+        summary += ": " + ", ".join(package["features"])
+    if package.get("campaign"):
+        summary += f". Kampanya: {package['campaign']}"
+    return summary
+
+
+def _document_text(package: Dict[str, Any]) -> str:
+    """Paketin gömülecek metni"""
+    return " ".join([
+        package["name"], package["type"], " ".join(package.get("features", [])),
+        package.get("description", ""), package.get("campaign", "")
+    ])
+
+
+def _meta_path(index_path: str) -> str:
+    return os.path.splitext(index_path)[0] + ".meta.json"
+
+
+def _read_catalog(catalog_path: str) -> Tuple[Dict[str, Any], str]:
+    """Kataloğu ve içerik özetini döndürür"""
+    with open(catalog_path, "rb") as f:
+        raw = f.read()
+    return json.loads(raw.decode("utf-8")), hashlib.sha256(raw).hexdigest()
+
+
+def build_index(catalog_path: str, index_path: str, dim: int) -> int:
+    """
+    Kataloğu gömer ve matrisi .npy olarak yazar
+
+    Dosyalar geçici isimle yazılıp os.replace ile değiştirilir; okuyan
+    process'ler yarım yazılmış bir matris görmez.
+
+    Args:
+        catalog_path: Katalog JSON dosyası
+        index_path: Yazılacak .npy dosyası
+        dim: Vektör boyutu
+
+    Returns:
+        İndekslenen paket sayısı
+    """
+    catalog, catalog_hash = _read_catalog(catalog_path)
+    packages = catalog["packages"]
+    matrix = np.vstack([embed(_document_text(p), dim) for p in packages]) if packages \
+        else np.zeros((0, dim), dtype=np.float32)
+
+    meta = {
+        "catalog_sha256": catalog_hash,
+        "dim": dim,
+        "ids": [p["id"] for p in packages]
+    }
+
+    tmp_index = f"{index_path}.{os.getpid()}.tmp"
+    with open(tmp_index, "wb") as f:
+        np.save(f, matrix)
+    tmp_meta = f"{_meta_path(index_path)}.{os.getpid()}.tmp"
+    with open(tmp_meta, "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+    os.replace(tmp_index, index_path)
+    os.replace(tmp_meta, _meta_path(index_path))
+    return len(packages)
+
+
+class TariffCatalogIndex:
+    """
+    Memory-mapped paket vektörleri üzerinde top-k benzerlik araması
+
+    Matris salt okunur memory-map olarak açılır; sorgu başına tek bir
+    matris-vektör çarpımı ve argpartition yapılır.
+    """
+
+    def __init__(
+        self,
+        catalog_path: str,
+        index_path: str,
+        dim: int = 512,
+        top_k: int = 3,
+        min_similarity: float = 0.1
+    ):
+        """
+        İndeksi yükler, yoksa veya katalog değiştiyse yeniden oluşturur
+
+        Args:
+            catalog_path: Katalog JSON dosyası
+            index_path: .npy matris dosyası
+            dim: Vektör boyutu
+            top_k: Varsayılan döndürülecek paket sayısı
+            min_similarity: Bu benzerliğin altındaki paketler döndürülmez
+        """
+        self.catalog_path = catalog_path
+        self.index_path = index_path
+        self.dim = dim
+        self.top_k = top_k
+        self.min_similarity = min_similarity
+
+        catalog, catalog_hash = _read_catalog(catalog_path)
+        if not self._index_is_current(catalog_hash):
+            print(f"🧮 Tarife indeksi oluşturuluyor: {index_path}")
+            build_index(catalog_path, index_path, dim)
+
+        self.currency = catalog.get("currency", "TL")
+        self.packages: List[Dict[str, Any]] = catalog["packages"]
+        self.matrix = np.load(index_path, mmap_mode="r")
+
+    @classmethod
+    def from_config(cls) -> "TariffCatalogIndex":
+        """config.py ayarlarından indeks oluşturur"""
+        return cls(
+            catalog_path=TARIFF_INDEX_CONFIG["catalog_path"],
+            index_path=TARIFF_INDEX_CONFIG["index_path"],
+            dim=TARIFF_INDEX_CONFIG["dim"],
+            top_k=TARIFF_INDEX_CONFIG["top_k"],
+            min_similarity=TARIFF_INDEX_CONFIG["min_similarity"]
+        )
+
+    def __len__(self) -> int:
+        return len(self.packages)
+
+    @traced("tariff_index.search")
+    def search(self, query: str, k: Optional[int] = None) -> List[Tuple[Dict[str, Any], float]]:
+        """
+        Sorguya en benzer paketleri döndürür
+
+        Args:
+            query: Müşteri talebi
+            k: Döndürülecek paket sayısı (None ise top_k)
+
+        Returns:
+            Benzerliğe göre azalan (paket, skor) listesi
+        """
+        k = min(k or self.top_k, len(self.packages))
+        if k <= 0:
+            return []
+
+        scores = self.matrix @ embed(query, self.dim)
+        if k < len(scores):
+            candidates = np.argpartition(-scores, k - 1)[:k]
+        else:
+            candidates = np.arange(len(scores))
+        ranked = candidates[np.argsort(-scores[candidates])]
+
+        return [
+            (self.packages[i], float(scores[i]))
+            for i in ranked
+            if scores[i] >= self.min_similarity
+        ]
+
+    def context_for(self, query: str, k: Optional[int] = None) -> str:
+        """Prompt'a eklenecek paket listesini döndürür (eşleşme yoksa boş)"""
+        return "\n".join(
+            f"- {describe_package(package, self.currency)}"
+            for package, _ in self.search(query, k)
+        )
+
+    def _index_is_current(self, catalog_hash: str) -> bool:
+        """Diskteki indeks bu katalog ve boyut için mi oluşturulmuş"""
+        try:
+            with open(_meta_path(self.index_path), encoding="utf-8") as f:
+                meta = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return False
+        return (
+            os.path.exists(self.index_path)
+            and meta.get("catalog_sha256") == catalog_hash
+            and meta.get("dim") == self.dim
+        )
+
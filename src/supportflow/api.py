@@ -4,19 +4,43 @@ ABCX Müşteri Hizmetleri FastAPI Uygulaması
 Router Agent'i kullanarak REST API hizmeti sağlar
 """
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, Header, HTTPException, Query, Request, Response, WebSocket, WebSocketDisconnect
+from fastapi.encoders import jsonable_encoder
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from pydantic import BaseModel
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
+import asyncio
+import hmac
+import json
 import logging
+import threading
+import time
 import requests
 import os
 from pathlib import Path
+from datetime import datetime, timedelta
 
 from .agents import RouterAgent
+from .agents.generation_budget import generation_budgets
+from .billing_data import BillingDataService
+from .config import (
+    ARCHIVE_CONFIG, BILLING_DATA_CONFIG, IDEMPOTENCY_CONFIG, MAILBOX_CONFIG, OLLAMA_CONFIG,
+    PROFILING_CONFIG, RATE_LIMIT_CONFIG, SERVER_CONFIG, SESSION_CONFIG,
+    STATIC_ASSETS_CONFIG, WARMUP_CONFIG, settings
+)
+from .idempotency import IdempotencyConflict, IdempotencyStore, request_fingerprint
+from .model_warmup import ModelWarmer
+from .ollama_pool import OllamaPool
+from .profiling import StackSampler, format_collapsed, profile_call
+from .rate_limiter import ChatRateLimiter, customer_identity, retry_after_header
+from .session_mailbox import SessionMailboxes
 from .session_manager import session_manager
+from .settings import SettingsError
+from .static_assets import StaticAssetCache
+from .tracing import SPAN_KIND_SERVER, bind_context, tracer
+from .transcript_archive import TranscriptArchiver
 
 # Logging konfigürasyonu
 logging.basicConfig(level=logging.INFO)
@@ -39,6 +63,28 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.middleware("http")
+async def trace_requests(request: Request, call_next):
+    """
+    Her HTTP isteği için kök span açar
+    
+    Gelen W3C traceparent başlığı varsa trace ona bağlanır; yanıtta
+    X-Trace-Id ve traceparent başlıkları döner.
+    """
+    with tracer.span(
+        f"{request.method} {request.url.path}",
+        traceparent=request.headers.get("traceparent"),
+        kind=SPAN_KIND_SERVER,
+        **{"http.method": request.method, "http.target": request.url.path}
+    ) as span:
+        response = await call_next(request)
+        if span is not None:
+            span.set_attribute("http.status_code", response.status_code)
+            response.headers["X-Trace-Id"] = span.trace_id
+            response.headers["traceparent"] = span.traceparent()
+        return response
+
+
 # Static files için agentpanel klasörünü mount et
 current_dir = Path(__file__).parent.parent.parent  # supportflow root
 agentpanel_dir = current_dir / "src/agentpanel"
@@ -50,16 +96,152 @@ if agentpanel_dir.exists():
 else:
     logger.warning(f"⚠️ AgentPanel directory not found: {agentpanel_dir}")
 
+# Agent paneli dosyaları bellekte, önceden sıkıştırılmış olarak tutulur
+static_assets: Optional[StaticAssetCache] = (
+    StaticAssetCache.from_config()
+    if STATIC_ASSETS_CONFIG["enabled"] and os.path.isdir(STATIC_ASSETS_CONFIG["directory"])
+    else None
+)
+
 # Global agent instance
 agent: Optional[RouterAgent] = None
 
+# Müşteri hesap verisi önbelleği (FaturaAgent için)
+billing_data: Optional[BillingDataService] = None
+
+# Ollama backend havuzu (tek sunucuda da sağlık kontrolü ve failover sağlar)
+ollama_pool: Optional[OllamaPool] = None
+
+# Model ısındırma ve keep-alive yöneticisi
+model_warmer: Optional[ModelWarmer] = None
+
+# Sona eren session'ların transkript arşivi
+transcript_archiver: Optional[TranscriptArchiver] = None
+
+# Session / müşteri / global rate limiter
+rate_limiter: Optional[ChatRateLimiter] = (
+    ChatRateLimiter.from_config() if RATE_LIMIT_CONFIG["enabled"] else None
+)
+
+# /chat tekrar denemeleri için idempotency deposu
+idempotency_store = IdempotencyStore(
+    ttl_seconds=IDEMPOTENCY_CONFIG["ttl_seconds"],
+    max_entries=IDEMPOTENCY_CONFIG["max_entries"]
+)
+
+# Aynı session'ın mesajlarını sırayla işleyen mailbox'lar
+session_mailboxes = SessionMailboxes(idle_seconds=MAILBOX_CONFIG["idle_seconds"])
+
+# Aynı anda tek bir sampling profili çalışır
+profile_lock = asyncio.Lock()
+
+
+def enforce_rate_limit(session_id: Optional[str], customer_info: Optional[Dict[str, Any]]):
+    """
+    Rate limit aşıldıysa Retry-After başlığıyla 429 fırlatır
+    
+    Args:
+        session_id: Session ID
+        customer_info: Müşteri bilgileri
+    """
+    if not rate_limiter:
+        return
+    rejection = rate_limiter.check(session_id, customer_info)
+    if rejection:
+        scope, wait = rejection
+        retry_after = retry_after_header(wait)
+        raise HTTPException(
+            status_code=429,
+            detail=f"Çok fazla istek ({scope} limiti). {retry_after} saniye sonra tekrar deneyin.",
+            headers={"Retry-After": retry_after, "X-RateLimit-Scope": scope}
+        )
+
+
+def idempotency_scope(
+    session_id: Optional[str],
+    customer_info: Optional[Dict[str, Any]],
+    client_host: Optional[str]
+) -> str:
+    """
+    Idempotency anahtarının geçerli olduğu kapsamı belirler
+    
+    Mevcut session'larda kapsam session'dır. Yeni session isteklerinde
+    anahtar arayanın kimliğiyle (customer_info, yoksa istemci adresi)
+    sınırlanır; aynı anahtarı ve ilk mesajı gönderen iki müşteri
+    birbirinin session'ını almaz.
+    
+    Raises:
+        HTTPException: Yeni session isteğinde arayan tanımlanamıyorsa 400
+    """
+    if session_id:
+        return f"session:{session_id}"
+    identity = customer_identity(customer_info) or (f"client:{client_host}" if client_host else None)
+    if not identity:
+        raise HTTPException(
+            status_code=400,
+            detail="Yeni session isteğinde Idempotency-Key için customer_info kimliği gerekli"
+        )
+    return f"new:{identity}"
+
+
+def require_admin_token(admin_token: Optional[str], required: bool = False):
+    """
+    Admin token tanımlıysa istekteki değerle karşılaştırır
+    
+    Args:
+        admin_token: İstekteki X-Admin-Token değeri
+        required: True ise admin token tanımlı değilken de istek reddedilir
+    
+    Raises:
+        HTTPException: Admin token uyuşmazsa veya zorunlu olup tanımlı değilse 403
+    """
+    expected = SERVER_CONFIG["admin_token"]
+    if not expected:
+        if required:
+            raise HTTPException(
+                status_code=403,
+                detail="Bu endpoint için SUPPORTFLOW_ADMIN_TOKEN tanımlanmalı"
+            )
+        return
+    if not hmac.compare_digest(admin_token or "", expected):
+        raise HTTPException(status_code=403, detail="Geçersiz admin token")
+
+
+def require_profiling_access(admin_token: Optional[str]):
+    """
+    Profil isteklerinin yetkisini kontrol eder
+    
+    Profil kaynak kodu ve istek içeriğini açığa çıkarır ve sunucuya yük
+    bindirir; admin token tanımlı değilse istekler reddedilir.
+    
+    Raises:
+        HTTPException: Profil kapalıysa 404, admin token tanımlı değil veya uyuşmazsa 403
+    """
+    if not PROFILING_CONFIG["enabled"]:
+        raise HTTPException(status_code=404, detail="Profil özelliği kapalı")
+    require_admin_token(admin_token, required=True)
+
 
 class ChatRequest(BaseModel):
     """Chat isteği için model"""
     message: str
     session_id: Optional[str] = None  # Mevcut session devam etmek için
-    model: Optional[str] = "gemma3:latest"
+    model: Optional[str] = None  # Varsayılan: OLLAMA_CONFIG model_name
     customer_info: Optional[Dict[str, Any]] = None  # Yeni session için müşteri bilgileri
+    client_message_id: Optional[str] = None  # Idempotency-Key başlığı yerine kullanılabilir
+
+
+class BatchChatItem(BaseModel):
+    """Toplu chat isteğindeki tek mesaj"""
+    message: str
+    session_id: Optional[str] = None  # Verilmezse yeni session açılır
+    customer_info: Optional[Dict[str, Any]] = None
+    client_message_id: Optional[str] = None  # Tekrar gönderimlerde idempotency anahtarı
+
+
+class BatchChatRequest(BaseModel):
+    """Toplu chat isteği için model"""
+    items: List[BatchChatItem]
 
 
 class ChatResponse(BaseModel):
@@ -71,6 +253,7 @@ class ChatResponse(BaseModel):
     escalation_reason: Optional[str] = None
     turn_count: int = 0
     status: str = "success"
+    profile: Optional[Dict[str, Any]] = None  # Sadece X-Profile başlığıyla doldurulur
 
 
 class SessionStatusResponse(BaseModel):
@@ -96,34 +279,185 @@ class HealthResponse(BaseModel):
     status: str
     message: str
     ollama_available: bool
+    models_ready: bool = False
+
+
+def bind_runtime_settings():
+    """
+    Çalışırken değiştirilebilen ayarları, değerlerini oluşturulurken
+    kopyalayan nesnelere bağlar (her kullanımda config'i okuyanlar için gerekmez)
+    """
+    def apply_session_settings(changed: Dict[str, Any]):
+        if "timeout_minutes" in changed:
+            session_manager.session_timeout = timedelta(minutes=changed["timeout_minutes"])
+        if "low_confidence_threshold" in changed:
+            session_manager.low_confidence_threshold = changed["low_confidence_threshold"]
+        if "spill_target_ratio" in changed:
+            session_manager.spill_target_ratio = changed["spill_target_ratio"]
+        if "max_resident_bytes" in changed:
+            session_manager.max_resident_bytes = changed["max_resident_bytes"]
+            session_manager.enforce_memory_limit()
+        if "cleanup_interval_seconds" in changed:
+            session_manager.set_cleanup_interval(changed["cleanup_interval_seconds"])
+    
+    def apply_rate_limits(changed: Dict[str, Any]):
+        if rate_limiter and "limits" in changed:
+            rate_limiter.configure(changed["limits"])
+    
+    settings.subscribe("session_manager", "session", apply_session_settings)
+    settings.subscribe("rate_limiter", "rate_limit", apply_rate_limits)
+    settings.bind("idempotency_store", "idempotency", idempotency_store, {
+        "ttl_seconds": "ttl", "max_entries": "max_entries"
+    })
+    settings.bind("generation_budgets", "generation", generation_budgets, {
+        key: key for key in (
+            "agent_budgets", "category_budgets", "stop_sequences", "adaptive", "slo_ms",
+            "min_budget_ratio", "adjust_step", "headroom_ratio", "adjust_every"
+        )
+    })
+    settings.bind("session_mailboxes", "mailbox", session_mailboxes, {"idle_seconds": "idle_seconds"})
+    settings.bind("tracer", "tracing", tracer, {
+        "sample_rate": "sample_rate", "slow_trace_ms": "slow_trace_ms"
+    })
+    if static_assets is not None:
+        settings.bind("static_assets", "static_assets", static_assets, {
+            "reload_check_seconds": "reload_check_seconds"
+        })
+    if billing_data is not None:
+        settings.bind("billing_data", "billing_data", billing_data, {
+            "cache_ttl_seconds": "ttl",
+            "cache_max_entries": "max_entries",
+            "wait_timeout_seconds": "wait_timeout"
+        })
+    if agent and agent.knowledge_base is not None:
+        settings.bind("knowledge_base", "knowledge_base", agent.knowledge_base, {
+            "min_score": "min_score", "reload_check_seconds": "reload_check_seconds"
+        })
+    if agent and agent.tarife_agent.catalog_index is not None:
+        settings.bind("tariff_index", "tariff_index", agent.tarife_agent.catalog_index, {
+            "top_k": "top_k", "min_similarity": "min_similarity"
+        })
+    if ollama_pool is not None:
+        settings.bind("ollama_pool", "ollama_pool", ollama_pool, {
+            "health_check_interval_seconds": "health_check_interval",
+            "health_check_timeout": "health_check_timeout",
+            "max_consecutive_failures": "max_consecutive_failures",
+            "eject_seconds": "eject_seconds",
+            "latency_eject_ms": "latency_eject_ms",
+            "max_failovers": "max_failovers",
+            "hedge_enabled": "hedge_enabled",
+            "hedge_percentile": "hedge_percentile",
+            "hedge_min_samples": "hedge_min_samples"
+        })
+    if model_warmer:
+        settings.bind("model_warmer", "warmup", model_warmer, {
+            "timeout": "timeout",
+            "keeper_interval_seconds": "keeper_interval",
+            "retry_backoff_seconds": "retry_backoff",
+            "business_hours": "business_hours"
+        })
 
 
 @app.on_event("startup")
 async def startup_event():
     """Uygulama başlatılırken çalışır"""
-    global agent
+    global agent, model_warmer, billing_data, ollama_pool, transcript_archiver
     try:
         logger.info("🚀 ABCX Müşteri Hizmetleri API başlatılıyor...")
-        agent = RouterAgent("gemma3:latest")
+        if ARCHIVE_CONFIG["enabled"]:
+            transcript_archiver = TranscriptArchiver.from_config()
+            transcript_archiver.start()
+            session_manager.archiver = transcript_archiver
+        session_manager.start()
+        if BILLING_DATA_CONFIG["enabled"]:
+            billing_data = BillingDataService.from_config()
+        ollama_pool = OllamaPool.from_config()
+        ollama_pool.start()
+        logger.info(f"🖧 Ollama backend havuzu: {', '.join(b.base_url for b in ollama_pool.backends)}")
+        agent = RouterAgent(
+            OLLAMA_CONFIG["model_name"],
+            escalation_keywords=session_manager.escalation_keywords,
+            billing_data=billing_data,
+            ollama_pool=ollama_pool
+        )
         logger.info("✅ Router Agent başarıyla başlatıldı")
     except Exception as e:
         logger.error(f"❌ Agent başlatma hatası: {e}")
         raise
 
+    # Modelleri arka planda ısındır, hazır olana kadar /ready 503 döner
+    if WARMUP_CONFIG["enabled"]:
+        model_warmer = ModelWarmer.from_config(pool=ollama_pool)
+        model_warmer.start()
+        logger.info(f"🔥 Model ısındırma başlatıldı: {', '.join(model_warmer.models)}")
+    
+    bind_runtime_settings()
+
 
 @app.on_event("shutdown")
 async def shutdown_event():
-    """Uygulama kapatılırken çalışır"""
+    """
+    Uygulama kapatılırken çalışır
+    
+    Uvicorn yeni bağlantı almayı bırakıp açık istekleri bekledikten sonra
+    çağrılır. İstemcisi kopmuş olsa da session kuyruklarında çalışan ve
+    bekleyen generation'ların turn'leri kaydedilene kadar beklenir.
+    """
     logger.info("👋 ABCX Müşteri Hizmetleri API kapatılıyor...")
+    pending = session_mailboxes.in_flight()
+    if pending:
+        logger.info(f"⏳ {pending} devam eden generation bekleniyor...")
+        if not await session_mailboxes.drain(SERVER_CONFIG["graceful_shutdown_seconds"]):
+            logger.warning(f"⚠️ {session_mailboxes.in_flight()} generation süre dolduğu için yarıda kesildi")
+    if model_warmer:
+        await model_warmer.stop()
+    if ollama_pool is not None:
+        await ollama_pool.stop()
+    await session_mailboxes.close()
+    await session_manager.stop()
+    memory = session_manager.get_memory_status()
+    session_manager.close()
+    logger.info(
+        f"💾 Session'lar kapatıldı - Bellekte: {memory['resident_sessions']}, Diskte: {memory['spilled_sessions']}"
+    )
+    if transcript_archiver is not None:
+        transcript_archiver.close()
+        logger.info(f"🗄️ Transkript arşivi yazıldı: {transcript_archiver.get_status()['archived_sessions']} session")
+    if billing_data is not None:
+        billing_data.close()
+
+
+def models_ready() -> bool:
+    """Isındırma kapalıysa veya tamamlandıysa True döner"""
+    return model_warmer is None or model_warmer.ready
 
 
 @app.post("/chat", response_model=ChatResponse)
-async def chat_endpoint(request: ChatRequest):
+async def chat_endpoint(
+    request: ChatRequest,
+    response: Response,
+    http_request: Request,
+    idempotency_key: Optional[str] = Header(None),
+    x_profile: Optional[str] = Header(None),
+    x_admin_token: Optional[str] = Header(None)
+):
     """
     Müşteri chat endpoint'i - Session tabanlı konuşma yönetimi
     
+    Idempotency-Key başlığı (veya client_message_id alanı) verilirse aynı
+    anahtarla gelen tekrar istekler devam eden üretime katılır ya da
+    saklanan sonucu alır; ikinci bir LLM çağrısı ve tekrar turn oluşmaz.
+    Yeni session isteklerinde anahtar müşteri kimliği (customer_info) veya
+    istemci adresiyle sınırlanır.
+    
+    X-Profile: 1 başlığı verilirse agent çağrısı cProfile altında çalışır
+    ve yanıtın profile alanında en pahalı fonksiyonlar döner.
+    
     Args:
         request: Chat isteği (mesaj, session_id, model)
+        idempotency_key: İsteğe bağlı idempotency anahtarı
+        x_profile: Tek istek profili için "1" / "true"
+        x_admin_token: Profil için admin token (zorunlu)
     
     Returns:
         Chat yanıtı ve session bilgileri
@@ -142,35 +476,168 @@ async def chat_endpoint(request: ChatRequest):
             detail="Mesaj boş olamaz."
         )
     
+    profile = (x_profile or "").strip().lower() in ("1", "true", "yes")
+    if profile:
+        require_profiling_access(x_admin_token)
+    
+    key = idempotency_key or request.client_message_id
+    if not key:
+        return await dispatch_chat(request, profile)
+    
+    scope = idempotency_scope(
+        request.session_id,
+        request.customer_info,
+        http_request.client.host if http_request.client else None
+    )
+    try:
+        result, replayed = await idempotency_store.run(
+            f"{scope}:{key}",
+            request_fingerprint(scope, request.message),
+            lambda: dispatch_chat(request, profile)
+        )
+    except IdempotencyConflict as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    
+    if replayed:
+        logger.info(f"♻️ Idempotent tekrar istek - Key: {key}")
+        response.headers["Idempotent-Replayed"] = "true"
+    return result
+
+
+def record_agent_turn(
+    session_id: str,
+    user_message: str,
+    result: Dict[str, Any],
+    latency_ms: float
+) -> str:
+    """
+    Agent sonucunu session'a turn olarak kaydeder
+    
+    Agent generation öncesi escalation tespit ettiyse session turn
+    eklenmeden önce human intervention için işaretlenir.
+    
+    Args:
+        session_id: Session ID
+        user_message: Müşteri mesajı
+        result: RouterAgent.run sonucu
+        latency_ms: Yanıt üretim süresi (ms)
+    
+    Returns:
+        Turn ID
+    """
+    if result.get("requires_human"):
+        session_manager.mark_for_human_intervention(
+            session_id=session_id,
+            reason=result.get("escalation_reason") or "Müşteri escalation talep etti"
+        )
+    
+    return session_manager.add_conversation_turn(
+        session_id=session_id,
+        user_message=user_message,
+        agent_response=result["response"],
+        category=result["category"],  # Agent'ten kategori bilgisi
+        agent_type=result.get("agent_type"),
+        latency_ms=latency_ms
+    )
+
+
+async def dispatch_chat(request: ChatRequest, profile: bool = False) -> ChatResponse:
+    """
+    Mevcut session'ların mesajlarını session mailbox'ı üzerinden sıraya koyar
+    
+    Aynı session'a art arda gelen mesajlar geliş sırasıyla işlenir ve her
+    mesaj bir öncekinin turn'ünü içeren context'i görür. Farklı session'lar
+    paralel işlenir. Yeni session istekleri doğrudan işlenir.
+    
+    Session kontrolü ve rate limit kuyruğa eklemeden önce yapılır;
+    reddedilecek istekler mailbox'ta birikmez.
+    """
+    admit_chat(request.session_id, request.customer_info)
+    if not request.session_id:
+        return await process_chat(request, profile)
+    return await session_mailboxes.submit(request.session_id, lambda: process_chat(request, profile))
+
+
+def admit_chat(session_id: Optional[str], customer_info: Optional[Dict[str, Any]]):
+    """
+    Mesajı kuyruğa almadan önce session'ı ve rate limit'i kontrol eder
+    
+    Args:
+        session_id: Session ID (yeni session için None)
+        customer_info: Yeni session için müşteri bilgileri
+    
+    Raises:
+        HTTPException: Session bulunamazsa 404, rate limit aşıldıysa 429
+    """
+    session = None
+    if session_id:
+        session = session_manager.get_session(session_id)
+        if not session:
+            raise HTTPException(
+                status_code=404,
+                detail=f"Session bulunamadı: {session_id}"
+            )
+    enforce_rate_limit(session_id, session.customer_info if session else customer_info)
+
+
+async def process_chat(request: ChatRequest, profile: bool = False) -> ChatResponse:
+    """
+    Chat mesajını işler: session çözümleme, agent çağrısı, turn kaydı
+    
+    Rate limit admit_chat() ile kuyruğa eklenmeden önce uygulanır.
+    
+    Args:
+        request: Chat isteği
+        profile: Agent çağrısı cProfile altında çalıştırılsın mı
+    
+    Returns:
+        Chat yanıtı
+    """
+    # Mailbox'ta beklerken süresi dolmuş olabilir
+    if request.session_id and not session_manager.get_session(request.session_id):
+        raise HTTPException(
+            status_code=404,
+            detail=f"Session bulunamadı: {request.session_id}"
+        )
+    
     try:
         session_id = request.session_id
         
         if not session_id:
             session_id = session_manager.create_session(request.customer_info)
             logger.info(f"🆕 Yeni session oluşturuldu: {session_id}")
-        else:
-            session = session_manager.get_session(session_id)
-            if not session:
-                raise HTTPException(
-                    status_code=404,
-                    detail=f"Session bulunamadı: {session_id}"
-                )
+            # Hesap özetini arka planda yükle; ilk fatura sorusunda önbellekte hazır olur
+            if billing_data is not None:
+                billing_data.prefetch(request.customer_info)
         
         logger.info(f"📞 Session {session_id} - Yeni mesaj: {request.message}")
         
         # Context hazırla
         context = session_manager.get_context_for_agent(session_id)
         
-        # Agent'ten yanıt al (conversation history dahil)
-        response = agent.chat(request.message, history=context.get("conversation_history", []))
+        # Agent'ten yanıt al (conversation history dahil); LLM çağrısı
+        # event loop'u bloklamasın diye thread pool'da çalışır
+        def run_agent():
+            return agent.run(
+                request.message,
+                history=context.get("conversation_history", []),
+                customer_info=context.get("customer_info")
+            )
+        
+        started = time.perf_counter()
+        profile_report = None
+        if profile:
+            # cProfile thread bazlıdır; agent'i çalıştıran executor thread'inde başlatılır
+            result, profile_report = await asyncio.get_running_loop().run_in_executor(
+                None, bind_context(lambda: profile_call(run_agent, PROFILING_CONFIG["top_functions"]))
+            )
+        else:
+            result = await asyncio.get_running_loop().run_in_executor(None, bind_context(run_agent))
+        latency_ms = (time.perf_counter() - started) * 1000
+        response = result["response"]
         
         # Session'a turn ekle
-        turn_id = session_manager.add_conversation_turn(
-            session_id=session_id,
-            user_message=request.message,
-            agent_response=response,
-            category=getattr(agent, 'last_category', None)  # Agent'ten kategori bilgisi
-        )
+        turn_id = record_agent_turn(session_id, request.message, result, latency_ms)
         
         # Güncellenmiş context al
         updated_context = session_manager.get_context_for_agent(session_id)
@@ -184,7 +651,8 @@ async def chat_endpoint(request: ChatRequest):
             requires_human=updated_context.get("requires_human", False),
             escalation_reason=updated_context.get("escalation_reason"),
             turn_count=updated_context.get("turn_count", 0),
-            status="success"
+            status="success",
+            profile=profile_report
         )
         
     except Exception as e:
@@ -195,6 +663,263 @@ async def chat_endpoint(request: ChatRequest):
         )
 
 
+@app.post("/chat/batch")
+async def chat_batch_endpoint(request: BatchChatRequest, http_request: Request):
+    """
+    Birden fazla session'ın mesajlarını tek istekte eşzamanlı işler
+    
+    Session'lar tek lock alımında çözülür / oluşturulur. Mesajlar session
+    mailbox'ları üzerinden çalışır: aynı session'a ait mesajlar batch
+    içindeki sırasıyla, farklı session'lar en fazla batch_concurrency
+    eşzamanlı agent çağrısıyla paralel işlenir. Sonuçlar tamamlandıkça
+    NDJSON satırları olarak döner; hatalı mesajlar batch'i durdurmaz.
+    
+    client_message_id taşıyan yeni session mesajlarının session'ı toplu
+    çözümlemede değil, idempotency kontrolünden sonra açılır; tekrar
+    gönderimler boş session oluşturmaz.
+    
+    Args:
+        request: Mesaj listesi
+        http_request: İstemci adresi (idempotency kapsamı için)
+    
+    Returns:
+        Her satırı bir mesajın sonucu (index, session_id, status ve result / error) olan NDJSON stream
+    """
+    if not agent:
+        raise HTTPException(
+            status_code=503,
+            detail="Agent henüz başlatılmadı. Lütfen daha sonra tekrar deneyin."
+        )
+    if not request.items:
+        raise HTTPException(status_code=400, detail="Batch boş olamaz.")
+    max_items = MAILBOX_CONFIG["batch_max_items"]
+    if len(request.items) > max_items:
+        raise HTTPException(status_code=413, detail=f"Batch en fazla {max_items} mesaj içerebilir.")
+    
+    deferred = [bool(item.client_message_id and not item.session_id) for item in request.items]
+    resolved = iter(session_manager.resolve_sessions([
+        (item.session_id, item.customer_info)
+        for item, defer in zip(request.items, deferred) if not defer
+    ]))
+    session_ids = []
+    for item, defer in zip(request.items, deferred):
+        session_id, created = (None, False) if defer else next(resolved)
+        if created and billing_data is not None:
+            billing_data.prefetch(item.customer_info)
+        session_ids.append(session_id)
+    logger.info(f"📦 Batch alındı - {len(request.items)} mesaj")
+    
+    client_host = http_request.client.host if http_request.client else None
+    slots = asyncio.Semaphore(MAILBOX_CONFIG["batch_concurrency"])
+    tasks = [
+        asyncio.ensure_future(process_batch_item(index, item, session_id, slots, client_host))
+        for index, (item, session_id) in enumerate(zip(request.items, session_ids))
+    ]
+    
+    async def generate():
+        for next_done in asyncio.as_completed(tasks):
+            yield json.dumps(await next_done, ensure_ascii=False) + "\n"
+    
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
+
+
+async def process_batch_item(
+    index: int,
+    item: BatchChatItem,
+    session_id: Optional[str],
+    slots: asyncio.Semaphore,
+    client_host: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Batch içindeki tek mesajı işler; hataları sonuç satırına çevirir
+    
+    Args:
+        index: Mesajın batch içindeki sırası
+        item: Mesaj
+        session_id: Çözülmüş session ID (bulunamadıysa veya açılması
+            idempotency kontrolüne bırakıldıysa None)
+        slots: Batch'in eşzamanlı agent çağrısı sınırı
+        client_host: İstemci adresi (idempotency kapsamı için)
+    
+    Returns:
+        NDJSON satırı olarak gönderilecek sonuç sözlüğü
+    """
+    def error(status_code: int, detail: str) -> Dict[str, Any]:
+        return {
+            "index": index,
+            "session_id": session_id or item.session_id,
+            "status": "error",
+            "status_code": status_code,
+            "error": detail
+        }
+    
+    if item.session_id and session_id is None:
+        return error(404, f"Session bulunamadı: {item.session_id}")
+    if not item.message.strip():
+        return error(400, "Mesaj boş olamaz.")
+    
+    async def submit() -> ChatResponse:
+        nonlocal session_id
+        if session_id is None:
+            # Yeni session sadece ilk gönderimde, rate limit kontrolünden sonra açılır
+            admit_chat(None, item.customer_info)
+            session_id = session_manager.create_session(item.customer_info)
+            if billing_data is not None:
+                billing_data.prefetch(item.customer_info)
+        else:
+            admit_chat(session_id, None)
+        chat_request = ChatRequest(message=item.message, session_id=session_id)
+        
+        async def run_limited() -> ChatResponse:
+            # Slot mailbox sırası geldiğinde alınır; aynı session'da bekleyen mesajlar slot tutmaz
+            async with slots:
+                return await process_chat(chat_request)
+        
+        return await session_mailboxes.submit(session_id, run_limited)
+    
+    try:
+        if item.client_message_id:
+            scope = idempotency_scope(item.session_id, item.customer_info, client_host)
+            result, _ = await idempotency_store.run(
+                f"{scope}:{item.client_message_id}",
+                request_fingerprint(scope, item.message),
+                submit
+            )
+        else:
+            result = await submit()
+    except HTTPException as e:
+        return error(e.status_code, str(e.detail))
+    except IdempotencyConflict as e:
+        return error(422, str(e))
+    except Exception as e:
+        logger.error(f"❌ Batch mesaj hatası - Session: {session_id}, Hata: {e}")
+        return error(500, f"Sistem hatası oluştu: {str(e)}")
+    
+    return {"index": index, "session_id": result.session_id, "status": "success", "result": jsonable_encoder(result)}
+
+
+@app.websocket("/ws/session/{session_id}")
+async def session_websocket(websocket: WebSocket, session_id: str):
+    """
+    Session'a bağlı kalıcı chat kanalı
+    
+    Session bağlantı boyunca bir kez çözülür ve konuşma geçmişi bellekte
+    güncel tutulur. Sunucudan gönderilen mesaj tipleri:
+    - token: Üretilen yanıt parçası
+    - response: Tamamlanan turn bilgisi
+    - event: Escalation, human agent katılımı gibi server-side event'ler
+    - error: Mesaj işleme hatası
+    
+    Args:
+        websocket: WebSocket bağlantısı
+        session_id: Session ID
+    """
+    session = session_manager.get_session(session_id)
+    if not session:
+        await websocket.close(code=4404, reason="Session bulunamadı")
+        return
+    
+    await websocket.accept()
+    loop = asyncio.get_running_loop()
+    outbox: asyncio.Queue = asyncio.Queue()
+    history = session_manager.get_conversation_history(session_id, SESSION_CONFIG["ws_history_turns"])
+    
+    def push(payload: Dict[str, Any]):
+        """Herhangi bir thread'den istemciye mesaj kuyruğa ekler"""
+        loop.call_soon_threadsafe(outbox.put_nowait, payload)
+    
+    def on_session_event(event: Dict[str, Any]):
+        push({"type": "event", **event})
+    
+    async def sender():
+        while True:
+            payload = await outbox.get()
+            if payload is None:
+                # Session sona erdi, kuyruktaki mesajlardan sonra bağlantıyı kapat
+                await websocket.close(code=4410, reason="Session sona erdi")
+                return
+            await websocket.send_json(payload)
+    
+    session_manager.add_session_listener(session_id, on_session_event)
+    sender_task = asyncio.create_task(sender())
+    logger.info(f"🔌 WebSocket bağlandı - Session: {session_id}")
+    
+    try:
+        while True:
+            raw = await websocket.receive_text()
+            message = raw
+            if raw.startswith("{"):
+                try:
+                    payload = json.loads(raw)
+                except json.JSONDecodeError:
+                    payload = None
+                if isinstance(payload, dict):
+                    message = payload.get("message", "")
+                if not isinstance(message, str):
+                    push({"type": "error", "detail": "'message' alanı metin olmalı."})
+                    continue
+            
+            if not message.strip():
+                push({"type": "error", "detail": "Mesaj boş olamaz."})
+                continue
+            if not agent:
+                push({"type": "error", "detail": "Agent henüz başlatılmadı."})
+                continue
+            try:
+                enforce_rate_limit(session_id, session.customer_info)
+            except HTTPException as e:
+                push({"type": "error", "detail": e.detail, "retry_after": int(e.headers["Retry-After"])})
+                continue
+            
+            def on_token(chunk: str):
+                push({"type": "token", "data": chunk})
+            
+            async def process_message():
+                started = time.perf_counter()
+                result = await loop.run_in_executor(
+                    None,
+                    bind_context(lambda: agent.run(
+                        message, history=history, on_token=on_token,
+                        customer_info=session.customer_info
+                    ))
+                )
+                record_agent_turn(
+                    session_id, message, result, (time.perf_counter() - started) * 1000
+                )
+                return result
+            
+            try:
+                # HTTP /chat istekleriyle aynı session sırasını paylaş; her mesaj ayrı trace
+                with tracer.span("ws.message", kind=SPAN_KIND_SERVER, session_id=session_id):
+                    result = await session_mailboxes.submit(session_id, process_message)
+            except Exception as e:
+                logger.error(f"❌ WebSocket chat hatası - Session: {session_id}: {e}")
+                push({"type": "error", "detail": f"Sistem hatası oluştu: {str(e)}"})
+                if not session.is_active:
+                    push(None)
+                    await sender_task
+                    break
+                continue
+            
+            history.extend([f"Müşteri: {message}", f"Sistem: {result['response']}"])
+            del history[:len(history) - SESSION_CONFIG["ws_history_turns"] * 2]
+            
+            push({
+                "type": "response",
+                "response": result["response"],
+                "session_id": session_id,
+                "category": result["category"],
+                "requires_human": session.requires_human_intervention,
+                "escalation_reason": session.escalation_reason,
+                "turn_count": len(session.turns)
+            })
+    except WebSocketDisconnect:
+        logger.info(f"🔌 WebSocket ayrıldı - Session: {session_id}")
+    finally:
+        session_manager.remove_session_listener(session_id, on_session_event)
+        sender_task.cancel()
+
+
 @app.get("/session/{session_id}/status", response_model=SessionStatusResponse)
 async def get_session_status(session_id: str):
     """
@@ -254,28 +979,185 @@ async def escalate_to_human(session_id: str, request: HumanInterventionRequest):
     return {"status": "success", "message": "Session human intervention için işaretlendi"}
 
 
+# Admin listelerinde projeksiyon ile seçilebilecek alanlar
+SESSION_SUMMARY_FIELDS = {
+    "session_id": lambda s: s.session_id,
+    "created_at": lambda s: s.created_at.isoformat(),
+    "last_activity": lambda s: s.last_activity.isoformat(),
+    "turn_count": lambda s: len(s.turns),
+    "escalation_reason": lambda s: s.escalation_reason,
+    "human_agent_id": lambda s: s.human_agent_id,
+    "category": lambda s: s.turns[-1].category if s.turns else None,
+    "customer_info": lambda s: s.customer_info,
+    "last_message": lambda s: s.turns[-1].user_message if s.turns else None,
+}
+DEFAULT_SESSION_FIELDS = [
+    "session_id", "created_at", "turn_count", "escalation_reason", "customer_info", "last_message"
+]
+EXPORT_PAGE_SIZE = 200
+
+
+def _parse_fields(fields: Optional[str]) -> List[str]:
+    """Virgülle ayrılmış alan listesini doğrular"""
+    if not fields:
+        return DEFAULT_SESSION_FIELDS
+    selected = [f.strip() for f in fields.split(",") if f.strip()]
+    unknown = [f for f in selected if f not in SESSION_SUMMARY_FIELDS]
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Bilinmeyen alan(lar): {', '.join(unknown)}"
+        )
+    return selected
+
+
+def _session_summary(session, fields: List[str]) -> Dict[str, Any]:
+    """Session'ın sadece istenen alanlarını içeren özetini oluşturur"""
+    return {name: SESSION_SUMMARY_FIELDS[name](session) for name in fields}
+
+
+def _list_requiring_human(limit: int, cursor: Optional[str], **filters):
+    """Session manager sayfalama hatalarını HTTP 400'e çevirir"""
+    try:
+        return session_manager.list_sessions_requiring_human(limit=limit, cursor=cursor, **filters)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
 @app.get("/admin/sessions/requiring-human")
-async def get_sessions_requiring_human():
+async def get_sessions_requiring_human(
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = None,
+    category: Optional[str] = None,
+    min_age_minutes: Optional[float] = None,
+    max_age_minutes: Optional[float] = None,
+    human_agent_id: Optional[str] = None,
+    fields: Optional[str] = None,
+    x_admin_token: Optional[str] = Header(None)
+):
     """
-    Human intervention gerektiren session'ları listeler
+    Human intervention gerektiren session'ları cursor ile sayfalı listeler
+    
+    Admin token tanımlıysa X-Admin-Token başlığı gerekir.
+    
+    Args:
+        limit: Sayfa boyutu
+        cursor: Önceki yanıttaki next_cursor değeri
+        category: Son turn kategorisine göre filtre
+        min_age_minutes: Minimum session yaşı (dakika)
+        max_age_minutes: Maksimum session yaşı (dakika)
+        human_agent_id: Atanmış human agent'a göre filtre
+        fields: Döndürülecek alanlar (virgülle ayrılmış)
+        x_admin_token: Admin token başlığı
     
     Returns:
-        Human intervention gerektiren session listesi
-    """
-    sessions = session_manager.get_sessions_requiring_human()
-    
-    result = []
-    for session in sessions:
-        result.append({
-            "session_id": session.session_id,
-            "created_at": session.created_at.isoformat(),
-            "turn_count": len(session.turns),
-            "escalation_reason": session.escalation_reason,
-            "customer_info": session.customer_info,
-            "last_message": session.turns[-1].user_message if session.turns else None
-        })
+        Human intervention gerektiren session sayfası
+    """
+    require_admin_token(x_admin_token)
+    selected_fields = _parse_fields(fields)
+    sessions, next_cursor = _list_requiring_human(
+        limit, cursor,
+        category=category,
+        min_age_minutes=min_age_minutes,
+        max_age_minutes=max_age_minutes,
+        human_agent_id=human_agent_id
+    )
+    
+    result = [_session_summary(session, selected_fields) for session in sessions]
+    
+    return {"sessions": result, "count": len(result), "next_cursor": next_cursor}
+
+
+@app.get("/admin/sessions/requiring-human/export")
+async def export_sessions_requiring_human(
+    category: Optional[str] = None,
+    min_age_minutes: Optional[float] = None,
+    max_age_minutes: Optional[float] = None,
+    human_agent_id: Optional[str] = None,
+    fields: Optional[str] = None,
+    x_admin_token: Optional[str] = Header(None)
+):
+    """
+    Human intervention gerektiren session'ları NDJSON olarak stream eder
+    
+    Session'lar sayfa sayfa okunur, her sayfa arasında event loop'a
+    kontrol bırakılır; bellek kullanımı sayfa boyutuyla sınırlıdır.
+    Toplu müşteri bilgisi döndürdüğü için admin token tanımlı değilse
+    istek reddedilir.
+    
+    Returns:
+        Her satırı bir session olan NDJSON stream
+    """
+    require_admin_token(x_admin_token, required=True)
+    selected_fields = _parse_fields(fields)
+    filters = {
+        "category": category,
+        "min_age_minutes": min_age_minutes,
+        "max_age_minutes": max_age_minutes,
+        "human_agent_id": human_agent_id
+    }
+    
+    async def generate():
+        cursor = None
+        while True:
+            sessions, cursor = session_manager.list_sessions_requiring_human(
+                limit=EXPORT_PAGE_SIZE, cursor=cursor, **filters
+            )
+            for session in sessions:
+                yield json.dumps(_session_summary(session, selected_fields), ensure_ascii=False) + "\n"
+            if not cursor:
+                break
+            await asyncio.sleep(0)
+    
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
+
+
+# SSE bağlantılarını canlı tutmak için heartbeat aralığı (saniye)
+SSE_HEARTBEAT_SECONDS = 15
+
+
+@app.get("/admin/events/escalations")
+async def stream_escalation_events(
+    request: Request,
+    offset: Optional[int] = Query(None, ge=0),
+    last_event_id: Optional[str] = Header(None)
+):
+    """
+    Escalation event'lerini Server-Sent Events olarak stream eder
+    
+    Human agent konsolları polling yerine bu feed'e abone olur. Bağlantı
+    koptuğunda tarayıcının gönderdiği Last-Event-ID ya da offset parametresi
+    ile kalınan yerden devam edilir. offset verilmezse sadece yeni event'ler
+    gönderilir; tampondan düşmüş event'ler için "gap" event'i gönderilir.
+    
+    Args:
+        offset: Son görülen event offset'i
+        last_event_id: SSE yeniden bağlanma başlığı
     
-    return {"sessions": result, "count": len(result)}
+    Returns:
+        text/event-stream yanıtı
+    """
+    if offset is None and last_event_id and last_event_id.isdigit():
+        offset = int(last_event_id)
+    if offset is None:
+        offset = session_manager.event_bus.last_offset
+    
+    async def generate():
+        yield "retry: 3000\n\n"
+        async for event in session_manager.event_bus.subscribe(offset, SSE_HEARTBEAT_SECONDS):
+            if await request.is_disconnected():
+                break
+            if event is None:
+                yield ": keep-alive\n\n"
+                continue
+            data = json.dumps(event, ensure_ascii=False)
+            yield f"id: {event['offset']}\nevent: {event['type']}\ndata: {data}\n\n"
+    
+    return StreamingResponse(
+        generate(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 
 @app.get("/health", response_model=HealthResponse)
@@ -286,26 +1168,326 @@ async def health_check():
     Returns:
         Sistem durumu ve Ollama bağlantı bilgisi
     """
-    try:
-        # Ollama bağlantı testi
-        import requests
-        response = requests.get("http://localhost:11434/api/tags", timeout=5)
-        ollama_available = response.status_code == 200
-    except Exception:
-        ollama_available = False
+    if ollama_pool is not None:
+        # Havuzun periyodik sağlık kontrolü sonucu: en az bir backend devrede mi
+        ollama_available = any(backend["available"] for backend in ollama_pool.get_status()["backends"])
+    else:
+        try:
+            # Ollama bağlantı testi
+            import requests
+            response = requests.get(f"{OLLAMA_CONFIG['base_url']}/api/tags", timeout=5)
+            ollama_available = response.status_code == 200
+        except Exception:
+            ollama_available = False
     
     global agent
     agent_ready = agent is not None
+    warm = models_ready()
     
-    status = "healthy" if agent_ready and ollama_available else "unhealthy"
+    if agent_ready and ollama_available:
+        status = "healthy" if warm else "warming"
+    else:
+        status = "unhealthy"
     
     return HealthResponse(
         status=status,
-        message=f"API: {'Ready' if agent_ready else 'Not Ready'}, Ollama: {'Connected' if ollama_available else 'Disconnected'}",
-        ollama_available=ollama_available
+        message=f"API: {'Ready' if agent_ready else 'Not Ready'}, Ollama: {'Connected' if ollama_available else 'Disconnected'}, Model: {'Ready' if warm else 'Warming'}",
+        ollama_available=ollama_available,
+        models_ready=warm
+    )
+
+
+@app.get("/ready")
+async def readiness_check():
+    """
+    Readiness kontrolü - modeller ısınana kadar 503 döner
+    
+    Returns:
+        Model ısındırma durumu
+    """
+    status = model_warmer.get_status() if model_warmer else {"ready": True, "models": {}}
+    if agent is None or not models_ready():
+        raise HTTPException(status_code=503, detail=status)
+    return status
+
+
+@app.get("/admin/stats")
+async def get_operational_stats(x_admin_token: Optional[str] = Header(None)):
+    """
+    Operasyonel istatistikleri döndürür
+    
+    Sayaçlar turn eklendikçe ve session'lar sona erdikçe artımlı olarak
+    güncellenir; yanıt süresi session sayısından bağımsızdır. Admin token
+    tanımlıysa X-Admin-Token başlığı gerekir.
+    
+    Args:
+        x_admin_token: Admin token başlığı
+    
+    Returns:
+        Toplam ve 5 dk / 1 saat / 24 saat pencereli istatistikler
+    """
+    require_admin_token(x_admin_token)
+    stats = session_manager.stats.snapshot()
+    stats["active_mailboxes"] = len(session_mailboxes)
+    stats["session_memory"] = session_manager.get_memory_status()
+    stats["generation_budgets"] = generation_budgets.get_status()
+    if rate_limiter:
+        stats["rate_limits"] = rate_limiter.get_status()
+    if agent and agent.knowledge_base is not None:
+        stats["knowledge_base"] = agent.knowledge_base.get_status()
+    if billing_data is not None:
+        stats["billing_cache"] = billing_data.get_status()
+    if static_assets is not None:
+        stats["static_assets"] = static_assets.get_status()
+    if ollama_pool is not None:
+        stats["ollama_pool"] = ollama_pool.get_status()
+    if transcript_archiver is not None:
+        stats["transcript_archive"] = transcript_archiver.get_status()
+    return stats
+
+
+@app.post("/admin/knowledge-base/reload")
+async def reload_knowledge_base(x_admin_token: Optional[str] = Header(None)):
+    """
+    Bilgi tabanı veri dosyasını yeniden yükler
+    
+    Dosya değişiklikleri zaten periyodik olarak algılanır; bu endpoint
+    değişikliğin hemen devreye girmesi için kullanılır. Admin token
+    tanımlıysa X-Admin-Token başlığı gerekir.
+    
+    Args:
+        x_admin_token: Admin token başlığı
+    
+    Returns:
+        Yüklenen kayıt sayısı
+    """
+    require_admin_token(x_admin_token)
+    if not agent or agent.knowledge_base is None:
+        raise HTTPException(status_code=503, detail="Bilgi tabanı etkin değil")
+    try:
+        entries = agent.knowledge_base.reload()
+    except ValueError as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    return {"entries": entries, "message": f"Bilgi tabanı yeniden yüklendi ({entries} kayıt)"}
+
+
+@app.get("/admin/profile")
+async def profile_process(
+    seconds: float = Query(10, gt=0),
+    interval_ms: Optional[float] = Query(None, ge=1, le=1000),
+    x_admin_token: Optional[str] = Header(None)
+):
+    """
+    Çalışan process'in tüm thread'lerindeki Python stack'lerini örnekler
+    
+    Örnekleme ayrı bir thread'de yapılır, sunucu istek almaya devam eder.
+    Çıktı collapsed stack formatındadır (flamegraph.pl, speedscope).
+    
+    Args:
+        seconds: Örnekleme süresi
+        interval_ms: Örnekleme aralığı (varsayılan config'den)
+        x_admin_token: Admin token (zorunlu)
+    
+    Returns:
+        Satır başına "kök;...;yaprak örnek_sayısı"
+    """
+    require_profiling_access(x_admin_token)
+    if seconds > PROFILING_CONFIG["max_seconds"]:
+        raise HTTPException(
+            status_code=400,
+            detail=f"seconds en fazla {PROFILING_CONFIG['max_seconds']} olabilir"
+        )
+    if profile_lock.locked():
+        raise HTTPException(status_code=409, detail="Başka bir profil zaten çalışıyor")
+    
+    async with profile_lock:
+        loop = asyncio.get_running_loop()
+        sampler = StackSampler(
+            (interval_ms or PROFILING_CONFIG["sample_interval_ms"]) / 1000,
+            loop_thread_id=threading.get_ident()
+        )
+        done = loop.create_future()
+        
+        def sample():
+            # Executor doluyken de çalışabilmesi için kendi thread'inde örnekler
+            try:
+                stacks = sampler.run(seconds)
+            except Exception as e:
+                loop.call_soon_threadsafe(done.set_exception, e)
+            else:
+                loop.call_soon_threadsafe(done.set_result, stacks)
+        
+        threading.Thread(target=sample, name="stack-sampler", daemon=True).start()
+        stacks = await done
+    
+    logger.info(f"🔬 {seconds} sn profil alındı ({sampler.samples} örnek)")
+    return PlainTextResponse(
+        format_collapsed(stacks),
+        headers={
+            "X-Profile-Samples": str(sampler.samples),
+            "X-Profile-Interval-Ms": str(sampler.interval * 1000)
+        }
     )
 
 
+@app.get("/admin/traces/{trace_id}")
+async def get_trace(trace_id: str, x_admin_token: Optional[str] = Header(None)):
+    """
+    Yazılmış bir trace'in span'lerini döndürür
+    
+    Sadece örneklenen veya slow_trace_ms'i aşan trace'ler yazılır.
+    
+    Args:
+        trace_id: X-Trace-Id yanıt başlığındaki 32 haneli trace ID
+        x_admin_token: Admin token (tanımlıysa)
+    
+    Returns:
+        Başlangıç zamanına göre sıralı OTLP span'leri
+    """
+    require_admin_token(x_admin_token)
+    spans = await asyncio.get_running_loop().run_in_executor(None, tracer.find_trace, trace_id)
+    if not spans:
+        raise HTTPException(status_code=404, detail=f"Trace bulunamadı: {trace_id}")
+    return {"trace_id": trace_id.lower(), "span_count": len(spans), "spans": spans}
+
+
+@app.get("/admin/settings")
+async def get_settings(x_admin_token: Optional[str] = Header(None)):
+    """
+    Tüm ayarların güncel değerlerini döndürür
+    
+    Returns:
+        Bölüm -> ayar -> {value, reloadable}; gizli değerler maskelenir
+    """
+    require_admin_token(x_admin_token)
+    return settings.snapshot()
+
+
+@app.patch("/admin/settings")
+async def update_settings(
+    changes: Dict[str, Dict[str, Any]],
+    x_admin_token: Optional[str] = Header(None)
+):
+    """
+    Çalışırken değiştirilebilen ayarları günceller
+    
+    Tüm değerler önce doğrulanır; biri bile geçersizse veya yeniden
+    başlatma gerektiriyorsa hiçbiri uygulanmaz.
+    
+    Args:
+        changes: Bölüm -> {ayar: yeni değer}, ör. {"billing_data": {"cache_ttl_seconds": 60}}
+        x_admin_token: Admin token (tanımlıysa)
+    
+    Returns:
+        Gerçekten değişen ayarlar
+    """
+    require_admin_token(x_admin_token)
+    try:
+        changed = settings.update(changes)
+    except SettingsError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    if changed:
+        logger.info(f"⚙️ Ayarlar güncellendi: {changed}")
+    return {"changed": changed}
+
+
+@app.post("/admin/settings/reload")
+async def reload_settings(x_admin_token: Optional[str] = Header(None)):
+    """
+    Ayar dosyasını ve ortam değişkenlerini yeniden okur
+    
+    Sadece çalışırken değiştirilebilen ayarlar uygulanır; diğer
+    farklılıklar requires_restart listesinde döner.
+    
+    Returns:
+        Değişen ayarlar ve yeniden başlatma gerektirenler
+    """
+    require_admin_token(x_admin_token)
+    try:
+        result = settings.reload()
+    except SettingsError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    logger.info(f"⚙️ Ayarlar yeniden yüklendi: {result}")
+    return result
+
+
+@app.get("/admin/search")
+async def search_transcripts(
+    q: str,
+    category: Optional[str] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=200),
+    x_admin_token: Optional[str] = Header(None)
+):
+    """
+    Konuşma transkriptlerinde tam metin arama yapar
+    
+    Türkçe karakterler katlanarak eşleşir ("sikayet" -> "şikayet").
+    Desteklenen sorgular: kelime, "ifade", önek*, AND/OR/NOT, -kelime, parantez.
+    Sadece henüz sona ermemiş session'lar aranır; sona eren (süresi dolmuş
+    veya kapatılmış) session'lar indeksten çıkarılır ve arşivden
+    /admin/transcripts/export ile okunur.
+    
+    Args:
+        q: Sorgu metni
+        category: Kategori filtresi
+        start: Başlangıç zamanı (ISO 8601)
+        end: Bitiş zamanı (ISO 8601)
+        offset: Atlanacak sonuç sayısı
+        limit: Sayfa boyutu
+        x_admin_token: Admin token (tanımlıysa)
+    
+    Returns:
+        Toplam eşleşme sayısı ve en yeniden eskiye sıralı sonuçlar
+    """
+    require_admin_token(x_admin_token)
+    try:
+        return session_manager.search_index.search(
+            q, category=category, start=start, end=end, offset=offset, limit=limit
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.get("/admin/transcripts/export")
+async def export_transcripts(
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    category: Optional[str] = None,
+    unit: str = Query("session", pattern="^(session|turn)$"),
+    x_admin_token: Optional[str] = Header(None)
+):
+    """
+    Arşivlenmiş konuşmaları NDJSON olarak stream eder
+    
+    Sadece aralığa düşen bölüm dosyaları satır satır okunur; bellek
+    kullanımı arşiv boyutundan bağımsızdır. Henüz arşiv kuyruğunda
+    bekleyen session'lar yazıldıktan sonra görünür. Kayıtlar müşteri
+    bilgilerini içerdiği için admin token tanımlı değilse istek reddedilir.
+    
+    Args:
+        start: Bu andan (dahil) sonra sona eren session'lar (ISO 8601)
+        end: Bu andan (hariç) önce sona eren session'lar (ISO 8601)
+        category: En az bir turn'ü bu kategoride olan session'lar
+        unit: session (turn'ler iç içe) veya turn (turn başına düz satır)
+        x_admin_token: Admin token (zorunlu)
+    
+    Returns:
+        NDJSON stream
+    """
+    require_admin_token(x_admin_token, required=True)
+    archive = transcript_archiver or TranscriptArchiver.from_config()
+    
+    # Senkron generator; Starlette dosya okumalarını thread pool'da çalıştırır
+    def generate():
+        for record in archive.iter_records(start, end, category=category, unit=unit):
+            yield json.dumps(record, ensure_ascii=False) + "\n"
+    
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
+
+
 @app.post("/admin/cleanup-sessions")
 async def cleanup_expired_sessions():
     """
@@ -318,51 +1500,62 @@ async def cleanup_expired_sessions():
     return {"cleaned_sessions": cleaned_count, "message": f"{cleaned_count} session temizlendi"}
 
 
+def serve_asset(name: str, request: Request) -> Optional[Response]:
+    """Bellekteki agent paneli dosyasını servis eder; dosya yoksa None"""
+    if static_assets is None:
+        return None
+    return static_assets.response(name, request)
+
+
 @app.get("/")
-async def serve_index():
+async def serve_index(request: Request):
     """
     Ana sayfa - Web arayüzünü serve eder
     """
-    agentpanel_index = current_dir / "src/agentpanel" / "index.html"
-    if agentpanel_index.exists():
-        return FileResponse(str(agentpanel_index))
-    else:
-        return {
-            "message": "ABCX Müşteri Hizmetleri API",
-            "status": "running",
-            "web_interface": "Web arayüzü bulunamadı. agentpanel/index.html dosyasını kontrol edin.",
-            "api_docs": "/docs",
-            "health": "/health"
-        }
+    response = serve_asset("index.html", request)
+    if response is not None:
+        return response
+    return {
+        "message": "ABCX Müşteri Hizmetleri API",
+        "status": "running",
+        "web_interface": "Web arayüzü bulunamadı. agentpanel/index.html dosyasını kontrol edin.",
+        "api_docs": "/docs",
+        "health": "/health"
+    }
 
 
 @app.get("/styles.css")
-async def serve_styles():
+async def serve_styles(request: Request):
     """CSS dosyasını serve eder"""
-    css_file = current_dir / "src/agentpanel" / "styles.css"
-    if css_file.exists():
-        return FileResponse(str(css_file), media_type="text/css")
-    else:
+    response = serve_asset("styles.css", request)
+    if response is None:
         raise HTTPException(status_code=404, detail="CSS file not found")
+    return response
 
 
 @app.get("/script.js")
-async def serve_script():
+async def serve_script(request: Request):
     """JavaScript dosyasını serve eder"""
-    js_file = current_dir / "src/agentpanel" / "script.js"
-    if js_file.exists():
-        return FileResponse(str(js_file), media_type="application/javascript")
-    else:
+    response = serve_asset("script.js", request)
+    if response is None:
         raise HTTPException(status_code=404, detail="JS file not found")
+    return response
+
 
+@app.get("/static/{asset_name}")
+async def serve_static_asset(asset_name: str, request: Request):
+    """
+    Agent paneli dosyalarını içerik hash'li adlarıyla serve eder
+    
+    index.html bu adlara referans verir; hash'li adlar uzun süreli
+    önbelleğe alınabilir (Cache-Control: immutable).
+    """
+    response = serve_asset(asset_name, request)
+    if response is None:
+        raise HTTPException(status_code=404, detail="File not found")
+    return response
 
 if __name__ == "__main__":
-    import uvicorn
-    logger.info("🚀 FastAPI sunucusu başlatılıyor...")
-    uvicorn.run(
-        "api:app",
-        host="0.0.0.0",
-        port=8000,
-        reload=True,
-        log_level="info"
-    )
\ No newline at end of file
+    # python -m supportflow.api; main.py ile aynı sunucu ayarları kullanılır
+    from .main import run_api
+    run_api()
\ No newline at end of file
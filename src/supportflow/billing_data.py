@@ -0,0 +1,320 @@
+"""
+Müşteri fatura verisi erişim katmanı
+Faturalama sisteminin yerine geçen yerel SQLite veritabanı, müşteri bazlı
+LRU/TTL önbellek ve session açılışında arka planda ön yükleme (prefetch)
+"""
+
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from contextlib import closing
+from typing import Any, Dict, List, Optional, Tuple
+
+from .config import BILLING_DATA_CONFIG
+from .rate_limiter import customer_identity
+from .tracing import bind_context, traced, tracer
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS customers (
+    customer_id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    phone TEXT UNIQUE,
+    email TEXT UNIQUE,
+    tariff TEXT,
+    balance REAL NOT NULL DEFAULT 0,
+    autopay INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS invoices (
+    customer_id TEXT NOT NULL REFERENCES customers(customer_id),
+    period TEXT NOT NULL,
+    amount REAL NOT NULL,
+    due_date TEXT NOT NULL,
+    status TEXT NOT NULL,
+    PRIMARY KEY (customer_id, period)
+);
+"""
+
+# Boş veritabanına yüklenen örnek müşteriler (faturalama sistemi yerine)
+_DEMO_CUSTOMERS = [
+    ("C1001", "Ahmet Yılmaz", "5321234567", "ahmet@example.com", "Mobil Standart", 289.0, 1),
+    ("C1002", "Ayşe Demir", "5339876543", "ayse@example.com", "Fiber 100", 858.0, 0),
+    ("C1003", "Mehmet Kaya", "5425550011", "mehmet@example.com", "Mobil Max", 0.0, 1),
+]
+_DEMO_INVOICES = [
+    ("C1001", "2026-09", 289.0, "2026-10-20", "ödenmedi"),
+    ("C1001", "2026-08", 289.0, "2026-09-20", "ödendi"),
+    ("C1001", "2026-07", 312.5, "2026-08-20", "ödendi"),
+    ("C1002", "2026-09", 429.0, "2026-10-15", "gecikmiş"),
+    ("C1002", "2026-08", 429.0, "2026-09-15", "gecikmiş"),
+    ("C1002", "2026-07", 429.0, "2026-08-15", "ödendi"),
+    ("C1003", "2026-09", 449.0, "2026-10-18", "ödendi"),
+    ("C1003", "2026-08", 359.2, "2026-09-18", "ödendi"),
+]
+
+AccountSummary = Dict[str, Any]
+
+
+class BillingRepository:
+    """
+    Faturalama sistemi yerine kullanılan SQLite deposu
+
+    Her sorgu kendi bağlantısını açar; thread pool'dan güvenle çağrılabilir.
+    """
+
+    def __init__(self, db_path: str, invoice_limit: int = 3, seed_demo_data: bool = True):
+        """
+        Depoyu başlatır, şemayı oluşturur
+
+        Args:
+            db_path: SQLite dosya yolu
+            invoice_limit: Özete eklenecek son fatura sayısı
+            seed_demo_data: Veritabanı boşsa örnek müşterileri ekle
+        """
+        self.db_path = db_path
+        self.invoice_limit = invoice_limit
+        with closing(self._connect()) as connection, connection:
+            connection.executescript(_SCHEMA)
+            empty = connection.execute("SELECT COUNT(*) FROM customers").fetchone()[0] == 0
+            if seed_demo_data and empty:
+                connection.executemany("INSERT INTO customers VALUES (?, ?, ?, ?, ?, ?, ?)", _DEMO_CUSTOMERS)
+                connection.executemany("INSERT INTO invoices VALUES (?, ?, ?, ?, ?)", _DEMO_INVOICES)
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.db_path, timeout=5)
+        connection.row_factory = sqlite3.Row
+        return connection
+
+    def fetch_account_summary(self, identity: str) -> Optional[AccountSummary]:
+        """
+        Müşteri kimliğine göre hesap özetini getirir
+
+        Args:
+            identity: customer_identity() anahtarı (id:..., phone:..., email:...)
+
+        Returns:
+            Hesap özeti veya müşteri bulunamazsa None
+        """
+        kind, _, value = identity.partition(":")
+        column = {"id": "customer_id", "phone": "phone", "email": "email"}.get(kind)
+        if column is None:
+            return None
+
+        with closing(self._connect()) as connection:
+            customer = connection.execute(
+                f"SELECT * FROM customers WHERE {column} = ?", (value,)
+            ).fetchone()
+            if customer is None:
+                return None
+            invoices = connection.execute(
+                "SELECT period, amount, due_date, status FROM invoices "
+                "WHERE customer_id = ? ORDER BY period DESC LIMIT ?",
+                (customer["customer_id"], self.invoice_limit)
+            ).fetchall()
+
+        return {
+            "customer_id": customer["customer_id"],
+            "name": customer["name"],
+            "tariff": customer["tariff"],
+            "balance": customer["balance"],
+            "autopay": bool(customer["autopay"]),
+            "invoices": [dict(invoice) for invoice in invoices]
+        }
+
+
+class BillingDataService:
+    """
+    Hesap özetleri için müşteri bazlı LRU/TTL önbellek
+
+    prefetch() veritabanı sorgusunu arka plan thread'inde başlatır; aynı
+    müşteri için devam eden yükleme varsa get_account_summary() yeni sorgu
+    açmak yerine onu bekler. Bulunamayan müşteriler de (None) önbelleğe
+    alınır, böylece her mesajda veritabanına gidilmez.
+    """
+
+    def __init__(
+        self,
+        repository: BillingRepository,
+        ttl_seconds: float = 300,
+        max_entries: int = 10000,
+        prefetch_workers: int = 4,
+        wait_timeout_seconds: float = 2,
+        clock=time.monotonic
+    ):
+        """
+        Servisi başlatır
+
+        Args:
+            repository: Veri kaynağı
+            ttl_seconds: Önbellek kaydının geçerlilik süresi
+            max_entries: Önbellekteki azami müşteri sayısı
+            prefetch_workers: Ön yükleme thread sayısı
+            wait_timeout_seconds: Devam eden yüklemeyi bekleme süresi
+            clock: Saniye döndüren monoton saat (test için)
+        """
+        self.repository = repository
+        self.ttl = ttl_seconds
+        self.max_entries = max_entries
+        self.wait_timeout = wait_timeout_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        # identity -> (son geçerlilik zamanı, özet); en son kullanılan sonda
+        self._cache: "OrderedDict[str, Tuple[float, Optional[AccountSummary]]]" = OrderedDict()
+        self._inflight: Dict[str, Future] = {}
+        self._executor = ThreadPoolExecutor(
+            max_workers=prefetch_workers, thread_name_prefix="billing-prefetch"
+        )
+        self.hits = 0
+        self.misses = 0
+        self.prefetches = 0
+        self.errors = 0
+
+    @classmethod
+    def from_config(cls) -> "BillingDataService":
+        """config.py ayarlarından servis oluşturur"""
+        return cls(
+            BillingRepository(
+                BILLING_DATA_CONFIG["db_path"],
+                invoice_limit=BILLING_DATA_CONFIG["invoice_limit"],
+                seed_demo_data=BILLING_DATA_CONFIG["seed_demo_data"]
+            ),
+            ttl_seconds=BILLING_DATA_CONFIG["cache_ttl_seconds"],
+            max_entries=BILLING_DATA_CONFIG["cache_max_entries"],
+            prefetch_workers=BILLING_DATA_CONFIG["prefetch_workers"],
+            wait_timeout_seconds=BILLING_DATA_CONFIG["wait_timeout_seconds"]
+        )
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+    def prefetch(self, customer_info: Optional[Dict[str, Any]]) -> Optional[Future]:
+        """
+        Müşterinin hesap özetini arka planda yükler, çağıranı bloklamaz
+
+        Args:
+            customer_info: Session'ın müşteri bilgileri
+
+        Returns:
+            Yükleme Future'ı; müşteri tanımlanamazsa veya özet önbellekteyse None
+        """
+        identity = customer_identity(customer_info)
+        if identity is None:
+            return None
+        with self._lock:
+            if self._fresh(identity) is not None:
+                return None
+            self.prefetches += 1
+            return self._start_load(identity)
+
+    @traced("billing.get_account_summary")
+    def get_account_summary(self, customer_info: Optional[Dict[str, Any]]) -> Optional[AccountSummary]:
+        """
+        Müşterinin hesap özetini döndürür (önbellek -> devam eden yükleme -> veritabanı)
+
+        Args:
+            customer_info: Session'ın müşteri bilgileri
+
+        Returns:
+            Hesap özeti veya None (müşteri tanımlanamadı / bulunamadı / hata)
+        """
+        identity = customer_identity(customer_info)
+        if identity is None:
+            return None
+
+        with self._lock:
+            cached = self._fresh(identity)
+            if cached is not None:
+                self.hits += 1
+                return cached[1]
+            self.misses += 1
+            future = self._start_load(identity)
+
+        try:
+            return future.result(timeout=self.wait_timeout)
+        except FutureTimeoutError:
+            print(f"⚠️ Hesap özeti {self.wait_timeout} sn içinde yüklenemedi: {identity}")
+        except Exception as e:
+            print(f"⚠️ Hesap özeti yüklenemedi: {e}")
+        return None
+
+    def invalidate(self, customer_info: Optional[Dict[str, Any]]):
+        """Müşterinin önbellek kaydını siler (ör. ödeme sonrası)"""
+        identity = customer_identity(customer_info)
+        if identity is not None:
+            with self._lock:
+                self._cache.pop(identity, None)
+
+    def get_status(self) -> Dict[str, Any]:
+        """Önbellek boyutu ve isabet istatistiklerini döndürür"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._cache),
+                "inflight": len(self._inflight),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+                "prefetches": self.prefetches,
+                "errors": self.errors
+            }
+
+    def close(self):
+        """Ön yükleme thread'lerini durdurur"""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _fresh(self, identity: str) -> Optional[Tuple[float, Optional[AccountSummary]]]:
+        """Geçerli önbellek kaydını döndürür (kilit altında çağrılır)"""
+        entry = self._cache.get(identity)
+        if entry is None:
+            return None
+        if entry[0] <= self._clock():
+            del self._cache[identity]
+            return None
+        self._cache.move_to_end(identity)
+        return entry
+
+    def _start_load(self, identity: str) -> Future:
+        """Devam eden yüklemeyi döndürür veya yenisini başlatır (kilit altında çağrılır)"""
+        future = self._inflight.get(identity)
+        if future is None:
+            # Yükleme span'i, yüklemeyi başlatan isteğin trace'ine bağlanır
+            load = bind_context(lambda: self._load(identity))
+            future = self._inflight[identity] = self._executor.submit(load)
+        return future
+
+    def _load(self, identity: str) -> Optional[AccountSummary]:
+        """Özeti veritabanından okuyup önbelleğe yazar"""
+        try:
+            with tracer.span("billing.fetch_account_summary"):
+                summary = self.repository.fetch_account_summary(identity)
+        except Exception:
+            with self._lock:
+                self.errors += 1
+                self._inflight.pop(identity, None)
+            raise
+
+        with self._lock:
+            self._cache[identity] = (self._clock() + self.ttl, summary)
+            self._cache.move_to_end(identity)
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+            self._inflight.pop(identity, None)
+        return summary
+
+
+def format_account_summary(summary: AccountSummary) -> str:
+    """Hesap özetini prompt'a eklenecek metne dönüştürür"""
+    lines: List[str] = [
+        f"- Müşteri: {summary['name']} ({summary['customer_id']})",
+        f"- Tarife: {summary['tariff'] or 'bilinmiyor'}",
+        f"- Güncel borç: {summary['balance']:.2f} TL",
+        f"- Otomatik ödeme: {'açık' if summary['autopay'] else 'kapalı'}",
+    ]
+    for invoice in summary["invoices"]:
+        lines.append(
+            f"- {invoice['period']} faturası: {invoice['amount']:.2f} TL, "
+            f"son ödeme {invoice['due_date']}, durum: {invoice['status']}"
+        )
+    return "\n".join(lines)
@@ -1,20 +1,372 @@
 """
 Langgraph Agent konfigürasyon dosyası
+
+Ayarlar tipli bölümler olarak tanımlanır (bkz. settings.py). Her ayar
+SUPPORTFLOW_<BÖLÜM>_<AYAR> ortam değişkeni veya SUPPORTFLOW_SETTINGS_FILE
+ile verilen JSON dosyası ile ezilebilir. reloadable=True olan ayarlar
+çalışırken /admin/settings üzerinden değiştirilebilir.
 """
 
+import os
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from .settings import Settings, SettingsError, SettingsSection, setting
+
+PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.join(PACKAGE_DIR, "data")
+
+
 # Ollama ayarları
-OLLAMA_CONFIG = {
-    "base_url": "http://localhost:11434",
-    "model_name": "gemma3:latest",
-    "timeout": 30
-}
+@dataclass
+class OllamaSettings(SettingsSection):
+    section_name = "ollama"
+    base_url: str = setting("http://localhost:11434")
+    model_name: str = setting("gemma3:latest")
+    # HTTP istemci zaman aşımı (saniye); LLM istemcileri başlangıçta oluşturulur
+    timeout: float = setting(30, minimum=1)
+    # Ollama'nın modeli bellekte tutma süresi (ör. "30m", "-1" = süresiz)
+    keep_alive: str = setting("30m")
+    # Birden fazla Ollama sunucusu (boşsa sadece base_url kullanılır)
+    backends: List[str] = setting(default_factory=list, env="SUPPORTFLOW_OLLAMA_BACKENDS")
+
+
+# Ollama backend havuzu: yönlendirme, sağlık kontrolü ve hedged istekler
+@dataclass
+class OllamaPoolSettings(SettingsSection):
+    section_name = "ollama_pool"
+    # /api/ps ile sağlık ve yüklü model kontrolü aralığı (saniye)
+    health_check_interval_seconds: float = setting(10, minimum=1, reloadable=True)
+    health_check_timeout: float = setting(2, minimum=0.1, reloadable=True)
+    # Art arda bu kadar hata alan backend geçici olarak devreden çıkarılır
+    max_consecutive_failures: int = setting(3, minimum=1, reloadable=True)
+    eject_seconds: float = setting(30, minimum=1, reloadable=True)
+    # Son isteklerin medyan süresi bunu aşarsa backend devreden çıkarılır (ms, None = kapalı)
+    latency_eject_ms: Optional[float] = setting(None, minimum=1, reloadable=True)
+    # Gecikme istatistikleri için backend başına tutulan son istek sayısı
+    latency_window: int = setting(100, minimum=10)
+    # Hata alan istek başka backend'de en fazla kaç kez tekrarlanır
+    max_failovers: int = setting(1, minimum=0, reloadable=True)
+    # Hedged istek: yanıt bu yüzdelik süreyi aşarsa ikinci backend'e de gönderilir
+    hedge_enabled: bool = setting(False, reloadable=True)
+    hedge_percentile: float = setting(95, minimum=50, maximum=99.9, reloadable=True)
+    # Hedge gecikmesi hesaplanmadan önce gereken örnek sayısı
+    hedge_min_samples: int = setting(20, minimum=1, reloadable=True)
+
 
 # Agent ayarları
-AGENT_CONFIG = {
-    "max_steps": 10,
-    "verbose": True,
-    "temperature": 0.7
-}
+@dataclass
+class AgentSettings(SettingsSection):
+    section_name = "agent"
+    # Graph'in tek istekte çalıştırabileceği azami adım (LangGraph recursion_limit)
+    max_steps: int = setting(10, minimum=1, reloadable=True)
+    # Hem fatura hem tarife konusu içeren mesajlarda iki uzman paralel çalışır
+    parallel_specialists: bool = setting(True, reloadable=True)
+    temperature: float = setting(0.7, minimum=0, maximum=2)
+
+
+# Yanıt uzunluğu bütçeleri (num_predict) ve uyarlamalı kontrol
+@dataclass
+class GenerationSettings(SettingsSection):
+    section_name = "generation"
+    # Agent bazlı azami token sayısı (fatura, tarife, router); "default" diğerleri için
+    agent_budgets: Dict[str, int] = setting(
+        default_factory=lambda: {"fatura": 320, "tarife": 320, "router": 200, "default": 256},
+        minimum=16, reloadable=True
+    )
+    # Kategori bazlı bütçe (agent bütçesinin yerine geçer)
+    category_budgets: Dict[str, int] = setting(
+        default_factory=lambda: {"teknik_destek": 256, "genel_bilgi": 160}, minimum=16, reloadable=True
+    )
+    # Üretimi durduran diziler; "default" tüm agent'lara, diğerleri ilgili agent'a eklenir
+    stop_sequences: Dict[str, List[str]] = setting(
+        default_factory=lambda: {
+            "default": ["\nMüşteri:", "\nMüşteri talebi:"],
+            "fatura": ["\nFaturalama Uzmanı:"],
+            "tarife": ["\nTarife Uzmanı:"],
+        },
+        reloadable=True
+    )
+    # p95 üretim süresi SLO'yu aşınca bütçeler daraltılır, pay olunca gevşetilir
+    adaptive: bool = setting(True, reloadable=True)
+    slo_ms: float = setting(8000, minimum=100, reloadable=True)
+    # Bütçenin daraltılabileceği alt sınır (temel bütçeye oran)
+    min_budget_ratio: float = setting(0.4, minimum=0.05, maximum=1, reloadable=True)
+    adjust_step: float = setting(0.1, minimum=0.01, maximum=0.5, reloadable=True)
+    # p95 bu oranın altındaysa (slo_ms * headroom_ratio) bütçe gevşetilir
+    headroom_ratio: float = setting(0.6, minimum=0.1, maximum=1, reloadable=True)
+    # Kaç yeni generation'da bir p95 değerlendirilir
+    adjust_every: int = setting(20, minimum=1, reloadable=True)
+    # p95 hesabında kullanılan son generation sayısı
+    latency_window: int = setting(200, minimum=10)
+
+
+# Session ve konuşma geçmişi ayarları
+@dataclass
+class SessionSettings(SettingsSection):
+    section_name = "session"
+    timeout_minutes: float = setting(30, minimum=1, reloadable=True)
+    # Agent context'ine eklenen son turn sayısı
+    context_turns: int = setting(5, minimum=0, reloadable=True)
+    # Uzman agent prompt'una eklenen son mesaj sayısı
+    prompt_history_messages: int = setting(5, minimum=0, reloadable=True)
+    # WebSocket bağlantısında bellekte tutulan turn sayısı
+    ws_history_turns: int = setting(5, minimum=0, reloadable=True)
+    # Bu güvenin altındaki yanıtlar human intervention için işaretlenir
+    low_confidence_threshold: float = setting(0.3, minimum=0, maximum=1, reloadable=True)
+    # Bellekte tutulan session'ların yaklaşık toplam boyutu için üst sınır (0: sınırsız);
+    # aşılınca en uzun süredir işlem görmeyen session'lar diske yazılır
+    max_resident_bytes: int = setting(
+        256 * 1024 * 1024, minimum=0, reloadable=True, env="SUPPORTFLOW_SESSION_MAX_RESIDENT_BYTES"
+    )
+    # Sınır aşıldığında bellekteki boyut bu orana inene kadar session yazılır
+    spill_target_ratio: float = setting(0.9, minimum=0.1, maximum=1, reloadable=True)
+    # Diske yazılan session'ların dizini (process başlarken eski dosyalar silinir)
+    spill_dir: str = setting(os.path.join(DATA_DIR, "session_spill"), env="SUPPORTFLOW_SESSION_SPILL_DIR")
+    # Süresi dolan session'ların arka planda temizlenip arşive gönderilme aralığı (saniye, 0: kapalı)
+    cleanup_interval_seconds: float = setting(60, minimum=0, reloadable=True)
+
+
+# API sunucusu ayarları
+@dataclass
+class ServerSettings(SettingsSection):
+    section_name = "server"
+    host: str = setting("0.0.0.0")
+    port: int = setting(8000, minimum=1, maximum=65535)
+    # Kod değişikliğinde otomatik yeniden başlatma (geliştirme; üretim modunda kapalı)
+    reload: bool = setting(True)
+    log_level: str = setting("info")
+    # Üretim modu (main.py --api --production) ayarları
+    workers: int = setting(1, minimum=1)
+    # Kuruluysa uvloop / httptools kullanılır, değilse asyncio / h11'e düşülür
+    loop: str = setting("uvloop")
+    http: str = setting("httptools")
+    timeout_keep_alive: int = setting(15, minimum=1)
+    backlog: int = setting(2048, minimum=1)
+    access_log: bool = setting(False)
+    # Kapatılırken devam eden isteklerin ve generation'ların tamamlanması için beklenen süre
+    graceful_shutdown_seconds: float = setting(30, minimum=0)
+    # Tanımlıysa admin istekleri (profil, ayarlar) X-Admin-Token başlığında bu değeri göndermeli
+    admin_token: Optional[str] = setting(None, env="SUPPORTFLOW_ADMIN_TOKEN", secret=True)
+
+
+# Model ısındırma (warm-up) ve keep_alive ayarları
+@dataclass
+class WarmupSettings(SettingsSection):
+    section_name = "warmup"
+    enabled: bool = setting(True)
+    # Boş bırakılırsa OLLAMA_CONFIG["model_name"] ısındırılır
+    models: List[str] = setting(default_factory=list)
+    prompt: str = setting("Merhaba")
+    num_predict: int = setting(1, minimum=1)
+    timeout: float = setting(300, minimum=1, reloadable=True)
+    # Mesai saatlerinde modelin boşta kalıp unload edilmesini engelle
+    keeper_interval_seconds: float = setting(240, minimum=1, reloadable=True)
+    # Başarısız ısındırma bu süreden başlayıp ikiye katlanarak tekrar denenir
+    retry_backoff_seconds: float = setting(5, minimum=0.1, reloadable=True)
+    business_hours: Tuple[int, int] = setting((8, 22), minimum=0, maximum=24, reloadable=True)
+
+
+def _check_rate_limits(limits: Dict[str, Dict[str, float]]):
+    """Üç kapsamın da rate ve burst değeri tanımlı olmalı"""
+    for scope in ("session", "customer", "global"):
+        limit = limits.get(scope)
+        if limit is None or set(limit) != {"rate", "burst"}:
+            raise SettingsError(f"'{scope}' için rate ve burst tanımlanmalı")
+
+
+def _check_choice(value: str, choices: Tuple[str, ...]):
+    if value not in choices:
+        raise SettingsError(f"{value!r} geçersiz; seçenekler: {', '.join(choices)}")
+
+
+# Rate limit ayarları (token bucket: rate = saniyede token, burst = kapasite)
+@dataclass
+class RateLimitSettings(SettingsSection):
+    section_name = "rate_limit"
+    enabled: bool = setting(True)
+    limits: Dict[str, Dict[str, float]] = setting(
+        default_factory=lambda: {
+            "session": {"rate": 0.5, "burst": 5},      # Session başına ~30 mesaj/dk
+            "customer": {"rate": 1.0, "burst": 10},    # Müşteri başına ~60 mesaj/dk
+            "global": {"rate": 20.0, "burst": 40},     # Tüm sunucu için
+        },
+        minimum=0,
+        reloadable=True,
+        check=_check_rate_limits
+    )
+    sweep_interval_seconds: float = setting(60, minimum=1)
+
+
+# /chat idempotency ayarları
+@dataclass
+class IdempotencySettings(SettingsSection):
+    section_name = "idempotency"
+    ttl_seconds: float = setting(600, minimum=1, reloadable=True)
+    max_entries: int = setting(10000, minimum=1, reloadable=True)
+
+
+# Session mailbox ayarları
+@dataclass
+class MailboxSettings(SettingsSection):
+    section_name = "mailbox"
+    # Boş kalan session kuyruğunun kaldırılma süresi (saniye)
+    idle_seconds: float = setting(120, minimum=1, reloadable=True)
+    # /chat/batch isteğindeki azami mesaj sayısı
+    batch_max_items: int = setting(200, minimum=1, reloadable=True)
+    # Bir batch içinde aynı anda çalışan agent çağrısı sayısı
+    batch_concurrency: int = setting(8, minimum=1, reloadable=True)
+
+
+# Transkript arşivi ayarları
+@dataclass
+class ArchiveSettings(SettingsSection):
+    section_name = "archive"
+    enabled: bool = setting(True)
+    directory: str = setting(os.path.join(PACKAGE_DIR, "archive"), env="SUPPORTFLOW_ARCHIVE_DIR")
+    # Dosya bölümleme birimi: "hour" veya "day"
+    partition: str = setting("hour", check=lambda value: _check_choice(value, ("hour", "day")))
+    # Yazılmayı bekleyen azami session sayısı; dolunca yeni kayıtlar düşürülür
+    queue_size: int = setting(10000, minimum=1)
+    batch_size: int = setting(500, minimum=1)
+    flush_interval_seconds: float = setting(5, minimum=0.1)
+    compress_level: int = setting(6, minimum=1, maximum=9)
+
+
+# Human intervention (escalation) ayarları
+@dataclass
+class EscalationSettings(SettingsSection):
+    section_name = "escalation"
+    # Bu ifadeleri içeren mesajlar LLM'e gitmeden human agent'a aktarılır
+    keywords: List[str] = setting(default_factory=lambda: [
+        "şikayet", "çok kötü", "müdür", "hukuki", "mahkeme",
+        "iptal", "kapatmak istiyorum", "berbat", "rezalet",
+        "memnun değilim", "insan", "temsilci",
+        # Tek başına "operatör" numara taşıma sorularını ("operatör değiştirmek") da yakalar
+        "operatöre bağla", "operatörle görüş", "operatöre aktar"
+    ])
+    handoff_message: str = setting(
+        "Talebinizi bir müşteri temsilcimize aktarıyorum. "
+        "En kısa sürede sizinle ilgilenecek, lütfen ayrılmayın."
+    )
+    reason: str = setting("Müşteri escalation talep etti")
+
+
+# Genel bilgi soruları için yerel bilgi tabanı
+@dataclass
+class KnowledgeBaseSettings(SettingsSection):
+    section_name = "knowledge_base"
+    enabled: bool = setting(True)
+    path: str = setting(os.path.join(DATA_DIR, "knowledge_base.json"))
+    # Yanıt için gereken en düşük skor (eşleşen anahtar ifade token sayısı)
+    min_score: int = setting(2, minimum=1, reloadable=True)
+    # Veri dosyası değişikliklerinin kontrol aralığı (saniye, 0 = kapalı)
+    reload_check_seconds: float = setting(5, minimum=0, reloadable=True)
+
+
+# TarifeAgent için paket kataloğu vektör indeksi
+@dataclass
+class TariffIndexSettings(SettingsSection):
+    section_name = "tariff_index"
+    enabled: bool = setting(True)
+    catalog_path: str = setting(os.path.join(DATA_DIR, "tariff_catalog.json"))
+    # Çevrimdışı oluşturulan matris (python main.py --build-tariff-index)
+    index_path: str = setting(os.path.join(DATA_DIR, "tariff_index.npy"))
+    dim: int = setting(512, minimum=16)
+    # Prompt'a eklenecek paket sayısı
+    top_k: int = setting(3, minimum=1, reloadable=True)
+    min_similarity: float = setting(0.1, minimum=-1, maximum=1, reloadable=True)
+
+
+# FaturaAgent için müşteri fatura verisi (faturalama sistemi yerine yerel SQLite)
+@dataclass
+class BillingDataSettings(SettingsSection):
+    section_name = "billing_data"
+    enabled: bool = setting(True)
+    db_path: str = setting(os.path.join(DATA_DIR, "billing.db"))
+    # Veritabanı boşsa örnek müşterileri yükle
+    seed_demo_data: bool = setting(True)
+    # Özete eklenecek son fatura sayısı
+    invoice_limit: int = setting(3, minimum=1)
+    cache_ttl_seconds: float = setting(300, minimum=0, reloadable=True)
+    cache_max_entries: int = setting(10000, minimum=1, reloadable=True)
+    prefetch_workers: int = setting(4, minimum=1)
+    # İstek sırasında devam eden ön yüklemeyi bekleme süresi
+    wait_timeout_seconds: float = setting(2, minimum=0, reloadable=True)
+
+
+# Canlı sunucu profil ayarları (/admin/profile ve X-Profile başlığı)
+@dataclass
+class ProfilingSettings(SettingsSection):
+    section_name = "profiling"
+    enabled: bool = setting(True, reloadable=True)
+    max_seconds: float = setting(60, minimum=1, reloadable=True)
+    sample_interval_ms: float = setting(5, minimum=1, maximum=1000, reloadable=True)
+    # Tek istek profilinde döndürülecek fonksiyon sayısı
+    top_functions: int = setting(25, minimum=1, reloadable=True)
+
+
+# İstek bazlı tracing (OTLP/JSON, dönen dosya)
+@dataclass
+class TracingSettings(SettingsSection):
+    section_name = "tracing"
+    enabled: bool = setting(True)
+    service_name: str = setting("supportflow")
+    path: str = setting(os.path.join(PACKAGE_DIR, "logs", "traces.jsonl"), env="SUPPORTFLOW_TRACE_FILE")
+    max_bytes: int = setting(10_000_000, minimum=1024)
+    backup_count: int = setting(5, minimum=0)
+    # Head sampling: yeni trace'lerin yazılma olasılığı
+    sample_rate: float = setting(0.1, minimum=0, maximum=1, reloadable=True)
+    # Bu süreyi aşan istekler örneklenmese de yazılır (ms, None = kapalı)
+    slow_trace_ms: Optional[float] = setting(5000, minimum=0, reloadable=True)
+
+
+# Agent paneli statik dosyaları (bellekte, önceden sıkıştırılmış)
+@dataclass
+class StaticAssetsSettings(SettingsSection):
+    section_name = "static_assets"
+    enabled: bool = setting(True)
+    directory: str = setting(os.path.join(os.path.dirname(PACKAGE_DIR), "agentpanel"))
+    # Geliştirmede dosya değişikliklerinin kontrol aralığı (saniye, 0 = kapalı)
+    reload_check_seconds: float = setting(
+        0, minimum=0, reloadable=True, env="SUPPORTFLOW_STATIC_RELOAD_SECONDS"
+    )
+    # Bu boyutun altındaki dosyalar sıkıştırılmaz (byte)
+    min_compress_bytes: int = setting(512, minimum=0)
+    # Hash'li dosya adları için Cache-Control max-age (saniye)
+    immutable_max_age: int = setting(31536000, minimum=0)
+
+
+OLLAMA_CONFIG = OllamaSettings()
+OLLAMA_POOL_CONFIG = OllamaPoolSettings()
+AGENT_CONFIG = AgentSettings()
+GENERATION_CONFIG = GenerationSettings()
+SESSION_CONFIG = SessionSettings()
+SERVER_CONFIG = ServerSettings()
+WARMUP_CONFIG = WarmupSettings()
+RATE_LIMIT_CONFIG = RateLimitSettings()
+IDEMPOTENCY_CONFIG = IdempotencySettings()
+MAILBOX_CONFIG = MailboxSettings()
+ESCALATION_CONFIG = EscalationSettings()
+KNOWLEDGE_BASE_CONFIG = KnowledgeBaseSettings()
+TARIFF_INDEX_CONFIG = TariffIndexSettings()
+BILLING_DATA_CONFIG = BillingDataSettings()
+PROFILING_CONFIG = ProfilingSettings()
+TRACING_CONFIG = TracingSettings()
+STATIC_ASSETS_CONFIG = StaticAssetsSettings()
+ARCHIVE_CONFIG = ArchiveSettings()
+
+# Tüm bölümlerin kaydı; dosya / ortam değişkeni değerleri import sırasında uygulanır
+settings = Settings({
+    section.section_name: section
+    for section in (
+        OLLAMA_CONFIG, OLLAMA_POOL_CONFIG, AGENT_CONFIG, GENERATION_CONFIG, SESSION_CONFIG,
+        SERVER_CONFIG, WARMUP_CONFIG, RATE_LIMIT_CONFIG, IDEMPOTENCY_CONFIG, MAILBOX_CONFIG,
+        ESCALATION_CONFIG, KNOWLEDGE_BASE_CONFIG, TARIFF_INDEX_CONFIG, BILLING_DATA_CONFIG,
+        PROFILING_CONFIG, TRACING_CONFIG, STATIC_ASSETS_CONFIG, ARCHIVE_CONFIG
+    )
+})
+settings.load_overrides()
 
 # Prompt şablonları
 PROMPTS = {
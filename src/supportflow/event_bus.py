@@ -0,0 +1,129 @@
+"""
+In-process Event Bus
+Session event'lerini (escalation, human agent ataması) offset'li bir
+halka tampon üzerinde yayınlar; abonelikler kaldıkları offset'ten devam edebilir
+"""
+
+import asyncio
+import itertools
+import threading
+from collections import deque
+from datetime import datetime
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional, Set, Tuple
+
+
+class EventBus:
+    """Thread-safe, offset tabanlı in-process pub/sub"""
+
+    def __init__(self, max_events: int = 10000):
+        """
+        Event Bus'ı başlatır
+
+        Args:
+            max_events: Tamponda tutulacak azami event sayısı
+        """
+        self._events: Deque[Dict[str, Any]] = deque(maxlen=max_events)
+        self._offsets = itertools.count(1)
+        self._lock = threading.Lock()
+        self._waiters: Set[Tuple[asyncio.AbstractEventLoop, asyncio.Event]] = set()
+
+    @property
+    def last_offset(self) -> int:
+        """Yayınlanan son event'in offset'i (hiç yoksa 0)"""
+        with self._lock:
+            return self._events[-1]["offset"] if self._events else 0
+
+    def publish(self, event_type: str, payload: Dict[str, Any]) -> int:
+        """
+        Event yayınlar ve bekleyen abonelikleri uyandırır
+
+        Herhangi bir thread'den çağrılabilir.
+
+        Args:
+            event_type: Event tipi (ör. "escalation")
+            payload: Event verisi
+
+        Returns:
+            Event offset'i
+        """
+        with self._lock:
+            offset = next(self._offsets)
+            self._events.append({
+                "offset": offset,
+                "type": event_type,
+                "timestamp": datetime.now().isoformat(),
+                **payload
+            })
+            waiters = list(self._waiters)
+
+        for loop, waiter in waiters:
+            try:
+                loop.call_soon_threadsafe(waiter.set)
+            except RuntimeError:
+                # Event loop kapanmış, abonelik zaten sonlanıyor
+                pass
+        return offset
+
+    def read_since(self, offset: int, limit: int = 500) -> Tuple[List[Dict[str, Any]], bool]:
+        """
+        Verilen offset'ten sonraki event'leri döndürür
+
+        Args:
+            offset: Son görülen offset
+            limit: Döndürülecek azami event sayısı
+
+        Returns:
+            (Event listesi, tampondan düşen event'ler nedeniyle boşluk var mı)
+        """
+        with self._lock:
+            if not self._events:
+                return [], False
+            oldest = self._events[0]["offset"]
+            gap = offset + 1 < oldest
+            start = max(0, offset + 1 - oldest)
+            events = list(itertools.islice(self._events, start, start + limit))
+        return events, gap
+
+    async def subscribe(
+        self,
+        offset: int = 0,
+        heartbeat_seconds: Optional[float] = None
+    ) -> AsyncIterator[Optional[Dict[str, Any]]]:
+        """
+        Offset'ten itibaren event'leri sırayla üretir
+
+        Tampondan düşmüş event'ler istenirse önce {"type": "gap"} üretilir.
+        heartbeat_seconds verilmişse bu süre boyunca event gelmediğinde
+        None üretilir (bağlantıyı canlı tutmak için).
+
+        Args:
+            offset: Son görülen offset (0 = baştan)
+            heartbeat_seconds: Heartbeat aralığı
+
+        Yields:
+            Event sözlüğü veya heartbeat için None
+        """
+        waiter = (asyncio.get_running_loop(), asyncio.Event())
+        with self._lock:
+            self._waiters.add(waiter)
+
+        try:
+            while True:
+                waiter[1].clear()
+                events, gap = self.read_since(offset)
+                if gap:
+                    oldest = events[0]["offset"] if events else self.last_offset
+                    yield {"offset": oldest - 1, "type": "gap", "requested_offset": offset}
+                for event in events:
+                    offset = event["offset"]
+                    yield event
+                if events:
+                    continue
+
+                try:
+                    await asyncio.wait_for(waiter[1].wait(), timeout=heartbeat_seconds)
+                except asyncio.TimeoutError:
+                    yield None
+        finally:
+            with self._lock:
+                self._waiters.discard(waiter)
@@ -0,0 +1,118 @@
+"""
+Idempotency key desteği
+Aynı anahtarla tekrarlanan istekler devam eden hesaplamaya katılır veya
+tamamlanmış sonucu TTL süresince tekrar alır
+"""
+
+import asyncio
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Optional, Tuple
+
+
+class IdempotencyConflict(ValueError):
+    """Aynı anahtar farklı bir istek içeriğiyle kullanıldığında fırlatılır"""
+
+
+class _Entry:
+    """Bir idempotency anahtarına ait kayıt"""
+
+    __slots__ = ("fingerprint", "task", "expires_at")
+
+    def __init__(self, fingerprint: str, task: asyncio.Task):
+        self.fingerprint = fingerprint
+        self.task = task
+        self.expires_at: Optional[float] = None
+
+
+class IdempotencyStore:
+    """
+    Event loop içinde kullanılan, TTL ve boyut sınırlı idempotency deposu
+
+    Hesaplama ayrı bir task olarak çalışır; ilk istemci bağlantıyı koparsa
+    bile sonuç tamamlanıp saklanır. Hata ile biten hesaplamalar saklanmaz,
+    böylece istemci aynı anahtarla tekrar deneyebilir.
+    """
+
+    def __init__(self, ttl_seconds: float = 600, max_entries: int = 10000, clock=time.monotonic):
+        """
+        Idempotency deposunu başlatır
+
+        Args:
+            ttl_seconds: Tamamlanan sonuçların saklanma süresi
+            max_entries: Saklanacak azami kayıt sayısı
+            clock: Saniye döndüren monoton saat (test için)
+        """
+        self.ttl = ttl_seconds
+        self.max_entries = max_entries
+        self._clock = clock
+        # Tamamlanma sırasına göre dizili kayıtlar (en eski başta)
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def run(
+        self,
+        key: str,
+        fingerprint: str,
+        factory: Callable[[], Awaitable[Any]]
+    ) -> Tuple[Any, bool]:
+        """
+        Anahtar için sonucu döndürür, gerekirse hesaplamayı başlatır
+
+        Args:
+            key: Idempotency anahtarı
+            fingerprint: İstek içeriğinin özeti
+            factory: Hesaplamayı yapan coroutine'i üreten fonksiyon
+
+        Returns:
+            (Sonuç, sonuç tekrar mı kullanıldı)
+
+        Raises:
+            IdempotencyConflict: Anahtar farklı içerikle kullanılmışsa
+        """
+        self._purge()
+
+        entry = self._entries.get(key)
+        if entry is not None:
+            if entry.fingerprint != fingerprint:
+                raise IdempotencyConflict(
+                    "Idempotency anahtarı farklı bir istek için kullanılmış"
+                )
+            return await asyncio.shield(entry.task), True
+
+        task = asyncio.ensure_future(factory())
+        entry = _Entry(fingerprint, task)
+        self._entries[key] = entry
+        task.add_done_callback(lambda done: self._on_done(key, entry, done))
+        return await asyncio.shield(task), False
+
+    def _on_done(self, key: str, entry: _Entry, task: asyncio.Task):
+        """Hesaplama bittiğinde sonucu saklar veya kaydı siler"""
+        if self._entries.get(key) is not entry:
+            return
+        if task.cancelled() or task.exception() is not None:
+            del self._entries[key]
+            return
+        entry.expires_at = self._clock() + self.ttl
+        self._entries.move_to_end(key)
+
+    def _purge(self):
+        """Süresi dolan ve sınırı aşan tamamlanmış kayıtları siler"""
+        now = self._clock()
+        while self._entries:
+            key, entry = next(iter(self._entries.items()))
+            if entry.expires_at is None:
+                # En eski kayıt hâlâ çalışıyor
+                break
+            if entry.expires_at > now and len(self._entries) <= self.max_entries:
+                break
+            del self._entries[key]
+
+
+def request_fingerprint(*parts: Any) -> str:
+    """İstek alanlarından kısa bir özet üretir"""
+    digest = hashlib.sha256("\x1f".join(str(part) for part in parts).encode("utf-8"))
+    return digest.hexdigest()[:32]
@@ -0,0 +1,549 @@
+#!/usr/bin/env python3
+"""
+Uçtan uca yük testi aracı
+Çok turlu konuşma senaryolarını belirli eşzamanlılık (kapalı döngü) veya
+varış hızıyla (açık döngü) API'ye karşı oynatır; throughput, p50/p95/p99
+gecikme ve hata oranlarını raporlar. Varsayılan olarak api.app ve sahte
+Ollama sunucusu aynı process içinde başlatılır, GPU gerekmez.
+
+Kullanım:
+    python load_generator.py --concurrency 16 --duration 60
+    python load_generator.py --rate 5 --duration 120 --failure-rate 0.02
+    python load_generator.py --scenarios ../../postman_collection.json
+    python load_generator.py --target http://localhost:8000 --concurrency 8
+    python load_generator.py --stub-count 3 --failure-rate 0.05
+    python load_generator.py --stub-only --stub-port 11435
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import logging
+import math
+import os
+import random
+import sys
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+import uvicorn
+
+# Script olarak çalıştırıldığında paket import'larının çalışması için
+SRC_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(SRC_DIR))
+
+from supportflow.config import DATA_DIR, OLLAMA_CONFIG
+from supportflow.stub_ollama import StubOllamaSettings, create_stub_app
+
+DEFAULT_SCENARIOS = os.path.join(DATA_DIR, "load_scenarios.json")
+
+
+@dataclass
+class ScenarioStep:
+    """Senaryodaki tek istek: mesaj gönderme veya session durumu sorgusu"""
+
+    message: Optional[str] = None
+    status: bool = False
+
+
+@dataclass
+class Scenario:
+    """Tek bir müşterinin çok turlu konuşması"""
+
+    name: str
+    steps: List[ScenarioStep]
+    customer_info: Optional[Dict[str, Any]] = None
+    weight: float = 1.0
+
+
+@dataclass
+class RequestRecord:
+    """Tamamlanan bir isteğin ölçümü"""
+
+    scenario: str
+    step: str
+    latency_ms: float
+    status: Optional[int]
+    error: Optional[str] = None
+
+
+@dataclass
+class LoadResult:
+    """Yük testi boyunca toplanan ham ölçümler"""
+
+    mode: str
+    records: List[RequestRecord] = field(default_factory=list)
+    scenarios_started: int = 0
+    scenarios_completed: int = 0
+    dropped_arrivals: int = 0
+    duration_s: float = 0.0
+
+
+def load_scenarios(path: str) -> List[Scenario]:
+    """
+    Senaryo dosyasını okur
+
+    Kendi formatımız ({"scenarios": [...]}) veya Postman collection
+    (postman_collection.json) desteklenir; Postman collection'daki
+    istekler sırayla tek bir senaryo olarak oynatılır.
+
+    Args:
+        path: JSON dosya yolu
+
+    Returns:
+        Senaryo listesi
+    """
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+
+    if "item" in data:
+        return [_scenario_from_postman(data)]
+
+    scenarios = []
+    for raw in data["scenarios"]:
+        steps = [
+            ScenarioStep(message=step.get("message"), status=bool(step.get("status")))
+            for step in raw["steps"]
+        ]
+        scenarios.append(Scenario(
+            name=raw["name"],
+            steps=steps,
+            customer_info=raw.get("customer_info"),
+            weight=raw.get("weight", 1.0)
+        ))
+    if not scenarios:
+        raise ValueError(f"Senaryo dosyası boş: {path}")
+    return scenarios
+
+
+def _scenario_from_postman(collection: Dict[str, Any]) -> Scenario:
+    """Postman collection'daki /chat ve /status isteklerini senaryoya çevirir"""
+    steps: List[ScenarioStep] = []
+    customer_info = None
+
+    def walk(items):
+        nonlocal customer_info
+        for item in items:
+            if "item" in item:
+                walk(item["item"])
+                continue
+            request = item["request"]
+            url = request["url"]["raw"] if isinstance(request["url"], dict) else request["url"]
+            if request["method"] == "POST" and url.rstrip("/").endswith("/chat"):
+                body = json.loads(request["body"]["raw"])
+                customer_info = customer_info or body.get("customer_info")
+                steps.append(ScenarioStep(message=body["message"]))
+            elif request["method"] == "GET" and url.rstrip("/").endswith("/status"):
+                steps.append(ScenarioStep(status=True))
+
+    walk(collection["item"])
+    if not steps:
+        raise ValueError("Postman collection'da /chat isteği bulunamadı")
+    name = collection.get("info", {}).get("name", "postman")
+    return Scenario(name=name, steps=steps, customer_info=customer_info)
+
+
+def percentile(sorted_values: List[float], p: float) -> float:
+    """Sıralı listede nearest-rank yüzdelik değerini döndürür"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(p / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def _latency_summary(latencies: List[float]) -> Dict[str, float]:
+    values = sorted(latencies)
+    return {
+        "count": len(values),
+        "mean": round(sum(values) / len(values), 1) if values else 0.0,
+        "p50": round(percentile(values, 50), 1),
+        "p95": round(percentile(values, 95), 1),
+        "p99": round(percentile(values, 99), 1),
+        "max": round(values[-1], 1) if values else 0.0
+    }
+
+
+def build_report(result: LoadResult) -> Dict[str, Any]:
+    """
+    Ham ölçümlerden özet rapor üretir
+
+    Gecikme yüzdelikleri sadece başarılı isteklerden hesaplanır; hatalar
+    ayrıca durum koduna veya exception türüne göre sayılır.
+
+    Args:
+        result: Yük testi ölçümleri
+
+    Returns:
+        Rapor sözlüğü
+    """
+    ok = [r for r in result.records if r.error is None]
+    failed = [r for r in result.records if r.error is not None]
+    duration = result.duration_s or 1e-9
+
+    by_step: Dict[str, List[float]] = {}
+    for record in ok:
+        by_step.setdefault(record.step, []).append(record.latency_ms)
+
+    return {
+        "mode": result.mode,
+        "duration_s": round(result.duration_s, 2),
+        "scenarios_started": result.scenarios_started,
+        "scenarios_completed": result.scenarios_completed,
+        "dropped_arrivals": result.dropped_arrivals,
+        "requests": len(result.records),
+        "throughput_rps": round(len(ok) / duration, 2),
+        "latency_ms": _latency_summary([r.latency_ms for r in ok]),
+        "by_step": {step: _latency_summary(values) for step, values in sorted(by_step.items())},
+        "errors": {
+            "total": len(failed),
+            "rate": round(len(failed) / len(result.records), 4) if result.records else 0.0,
+            "by_kind": dict(Counter(r.error for r in failed))
+        }
+    }
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    """Raporu okunabilir metne dönüştürür"""
+    latency = report["latency_ms"]
+    lines = [
+        "📊 Yük Testi Raporu",
+        "=" * 60,
+        f"Mod: {report['mode']}  Süre: {report['duration_s']} sn",
+        f"Senaryo: {report['scenarios_completed']}/{report['scenarios_started']} tamamlandı"
+        + (f", {report['dropped_arrivals']} varış düşürüldü" if report["dropped_arrivals"] else ""),
+        f"İstek: {report['requests']}  Throughput: {report['throughput_rps']} istek/sn",
+        f"Gecikme (ms): p50={latency['p50']} p95={latency['p95']} p99={latency['p99']} max={latency['max']}",
+    ]
+    for step, summary in report["by_step"].items():
+        lines.append(
+            f"  {step:<8} n={summary['count']:<6} p50={summary['p50']} p95={summary['p95']} p99={summary['p99']}"
+        )
+    errors = report["errors"]
+    lines.append(f"Hata: {errors['total']} (oran {errors['rate']:.2%})")
+    for kind, count in sorted(errors["by_kind"].items(), key=lambda item: -item[1]):
+        lines.append(f"  {kind}: {count}")
+    if "stub" in report:
+        stub = report["stub"]
+        lines.append(
+            f"Stub Ollama: {stub['requests']} istek, {stub['failures']} hata, "
+            f"{stub['aborts']} kesinti, azami kuyruk {stub['max_queued']}"
+        )
+    return "\n".join(lines)
+
+
+class LoadGenerator:
+    """Senaryoları hedef API'ye karşı oynatır"""
+
+    def __init__(
+        self,
+        base_url: str,
+        scenarios: List[Scenario],
+        timeout: float = 120,
+        seed: Optional[int] = None
+    ):
+        """
+        Yük üreticiyi başlatır
+
+        Args:
+            base_url: Hedef API adresi
+            scenarios: Oynatılacak senaryolar (ağırlıklarına göre seçilir)
+            timeout: İstek zaman aşımı (saniye)
+            seed: Senaryo seçimi için rastgelelik tohumu
+        """
+        self.base_url = base_url.rstrip("/")
+        self.scenarios = scenarios
+        self.weights = [scenario.weight for scenario in scenarios]
+        self.timeout = timeout
+        self._rng = random.Random(seed)
+
+    async def run_closed(
+        self,
+        concurrency: int,
+        duration_s: float,
+        iterations: Optional[int] = None
+    ) -> LoadResult:
+        """
+        Kapalı döngü: her sanal kullanıcı bir senaryoyu bitirince yenisine başlar
+
+        Args:
+            concurrency: Sanal kullanıcı sayısı
+            duration_s: Test süresi
+            iterations: Toplam senaryo sınırı (isteğe bağlı)
+        """
+        result = LoadResult(mode=f"kapalı döngü, eşzamanlılık={concurrency}")
+        deadline = time.perf_counter() + duration_s
+
+        async with self._client(concurrency) as client:
+            async def user():
+                while time.perf_counter() < deadline:
+                    if iterations is not None and result.scenarios_started >= iterations:
+                        return
+                    await self._play(client, self._pick(), result, deadline)
+
+            started = time.perf_counter()
+            await asyncio.gather(*(user() for _ in range(concurrency)))
+            result.duration_s = time.perf_counter() - started
+        return result
+
+    async def run_open(self, rate: float, duration_s: float, max_in_flight: int = 256) -> LoadResult:
+        """
+        Açık döngü: senaryolar Poisson dağılımlı varışlarla başlar
+
+        Sunucu yavaşlasa da varış hızı düşmez; max_in_flight aşılırsa yeni
+        varışlar düşürülür ve raporda ayrıca sayılır.
+
+        Args:
+            rate: Saniyede başlayan senaryo sayısı
+            duration_s: Varış üretme süresi
+            max_in_flight: Aynı anda devam edebilecek senaryo sınırı
+        """
+        result = LoadResult(mode=f"açık döngü, {rate} senaryo/sn")
+        tasks = set()
+
+        async with self._client(max_in_flight) as client:
+            started = time.perf_counter()
+            deadline = started + duration_s
+            next_arrival = started
+            while True:
+                next_arrival += self._rng.expovariate(rate)
+                if next_arrival >= deadline:
+                    break
+                await asyncio.sleep(max(0.0, next_arrival - time.perf_counter()))
+                if len(tasks) >= max_in_flight:
+                    result.dropped_arrivals += 1
+                    continue
+                task = asyncio.create_task(self._play(client, self._pick(), result))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.gather(*tasks)
+            result.duration_s = time.perf_counter() - started
+        return result
+
+    def _client(self, connections: int) -> httpx.AsyncClient:
+        limits = httpx.Limits(max_connections=connections, max_keepalive_connections=connections)
+        return httpx.AsyncClient(base_url=self.base_url, timeout=self.timeout, limits=limits)
+
+    def _pick(self) -> Scenario:
+        return self._rng.choices(self.scenarios, weights=self.weights)[0]
+
+    async def _play(
+        self,
+        client: httpx.AsyncClient,
+        scenario: Scenario,
+        result: LoadResult,
+        deadline: Optional[float] = None
+    ):
+        """Senaryonun adımlarını sırayla çalıştırır; session açılamazsa senaryo biter"""
+        result.scenarios_started += 1
+        session_id = None
+
+        for step in scenario.steps:
+            if deadline is not None and time.perf_counter() >= deadline:
+                return
+            if step.status:
+                if session_id is None:
+                    continue
+                kind, call = "status", client.get(f"/session/{session_id}/status")
+            else:
+                payload: Dict[str, Any] = {"message": step.message}
+                if session_id:
+                    payload["session_id"] = session_id
+                elif scenario.customer_info:
+                    payload["customer_info"] = scenario.customer_info
+                kind, call = "chat", client.post("/chat", json=payload)
+
+            started = time.perf_counter()
+            status, error, body = None, None, None
+            try:
+                response = await call
+                status = response.status_code
+                if response.is_success:
+                    body = response.json()
+                else:
+                    error = f"HTTP {status}"
+            except Exception as e:
+                error = type(e).__name__
+            latency_ms = (time.perf_counter() - started) * 1000
+            result.records.append(RequestRecord(scenario.name, kind, latency_ms, status, error))
+
+            if kind == "chat" and body:
+                session_id = body.get("session_id", session_id)
+            elif error and session_id is None:
+                # İlk mesaj başarısızsa devam edilecek bir session yok
+                return
+
+        result.scenarios_completed += 1
+
+
+async def serve_in_background(
+    app,
+    host: str = "127.0.0.1",
+    port: int = 0,
+    log_level: str = "warning"
+) -> Tuple[uvicorn.Server, asyncio.Task, str]:
+    """
+    ASGI uygulamasını mevcut event loop'ta uvicorn ile başlatır
+
+    Args:
+        app: ASGI uygulaması
+        host: Dinlenecek adres
+        port: Port (0 = boş bir port seç)
+        log_level: uvicorn log seviyesi
+
+    Returns:
+        (Sunucu, sunucu task'ı, temel URL)
+    """
+    server = uvicorn.Server(uvicorn.Config(app, host=host, port=port, log_level=log_level, lifespan="on"))
+    task = asyncio.create_task(server.serve())
+    while not server.started:
+        if task.done():
+            task.result()
+            raise RuntimeError("Sunucu başlatılamadı")
+        await asyncio.sleep(0.01)
+    bound_port = server.servers[0].sockets[0].getsockname()[1]
+    return server, task, f"http://{host}:{bound_port}"
+
+
+async def stop_server(server: uvicorn.Server, task: asyncio.Task):
+    """serve_in_background ile başlatılan sunucuyu durdurur"""
+    server.should_exit = True
+    await task
+
+
+async def run_load_test(args: argparse.Namespace) -> Dict[str, Any]:
+    """
+    Komut satırı ayarlarıyla yük testini çalıştırır ve raporu döndürür
+
+    --target verilmezse sahte Ollama ve api.app aynı process içinde başlatılır.
+    """
+    scenarios = load_scenarios(args.scenarios)
+    # Enjekte edilen hatalar raporda sayılır; sessiz modda traceback basılmaz
+    log_level = "warning" if args.verbose else "critical"
+    servers = []
+    stub_apps = []
+    try:
+        target = args.target
+        if target is None:
+            stub_urls = []
+            for index in range(args.stub_count):
+                stub_app = create_stub_app(stub_settings_from_args(args, index))
+                stub_server, stub_task, stub_url = await serve_in_background(stub_app, log_level=log_level)
+                servers.append((stub_server, stub_task))
+                stub_apps.append(stub_app)
+                stub_urls.append(stub_url)
+
+            # Agent'lar ve backend havuzu startup sırasında OLLAMA_CONFIG'den oluşturulur
+            OLLAMA_CONFIG["backends"] = stub_urls
+            from supportflow import api
+            if not args.keep_rate_limits:
+                api.rate_limiter = None
+            api_server, api_task, target = await serve_in_background(api.app, log_level=log_level)
+            servers.append((api_server, api_task))
+
+        generator = LoadGenerator(target, scenarios, timeout=args.timeout, seed=args.seed)
+        if args.rate:
+            result = await generator.run_open(args.rate, args.duration, args.max_in_flight)
+        else:
+            result = await generator.run_closed(args.concurrency, args.duration, args.iterations)
+    finally:
+        for server, task in reversed(servers):
+            await stop_server(server, task)
+
+    report = build_report(result)
+    if stub_apps:
+        per_stub = [app.state.stats.to_dict() for app in stub_apps]
+        report["stub"] = {
+            key: max(stats[key] for stats in per_stub) if key.startswith("max_") else sum(stats[key] for stats in per_stub)
+            for key in per_stub[0]
+        }
+        if len(per_stub) > 1:
+            report["stub_backends"] = per_stub
+    return report
+
+
+def stub_settings_from_args(args: argparse.Namespace, index: int = 0) -> StubOllamaSettings:
+    """
+    Komut satırı ayarlarından stub Ollama ayarlarını oluşturur
+
+    --slow-stub-factor verilmişse ilk stub diğerlerinden o kadar yavaş
+    çalışır (havuzun yavaş backend'den kaçınmasını gözlemlemek için).
+    """
+    slowdown = args.slow_stub_factor if index == 0 and args.stub_count > 1 else 1.0
+    return StubOllamaSettings(
+        prompt_eval_ms=args.prompt_eval_ms * slowdown,
+        tokens_per_second=args.tokens_per_second / slowdown,
+        response_tokens=args.response_tokens,
+        parallel=args.parallel,
+        failure_rate=args.failure_rate,
+        stream_abort_rate=args.stream_abort_rate,
+        seed=None if args.seed is None else args.seed + index,
+        models=[OLLAMA_CONFIG["model_name"]]
+    )
+
+
+def parse_args(argv: List[str] = None) -> argparse.Namespace:
+    """Komut satırı argümanlarını parse eder"""
+    parser = argparse.ArgumentParser(description="ABCX Müşteri Hizmetleri API yük testi")
+
+    load = parser.add_argument_group("yük")
+    load.add_argument("--scenarios", default=DEFAULT_SCENARIOS, help="Senaryo veya Postman collection dosyası")
+    load.add_argument("--concurrency", type=int, default=8, help="Kapalı döngü sanal kullanıcı sayısı")
+    load.add_argument("--rate", type=float, help="Açık döngü: saniyede başlayan senaryo sayısı")
+    load.add_argument("--duration", type=float, default=30, help="Test süresi (saniye)")
+    load.add_argument("--iterations", type=int, help="Kapalı döngüde toplam senaryo sınırı")
+    load.add_argument("--max-in-flight", type=int, default=256, help="Açık döngüde eşzamanlı senaryo sınırı")
+    load.add_argument("--timeout", type=float, default=120, help="İstek zaman aşımı (saniye)")
+    load.add_argument("--target", help="Çalışan bir API adresi (verilmezse process içinde başlatılır)")
+    load.add_argument("--keep-rate-limits", action="store_true", help="Process içi API'de rate limit'i kapatma")
+    load.add_argument("--seed", type=int, help="Rastgelelik tohumu")
+    load.add_argument("--json", help="Raporu JSON olarak bu dosyaya yaz")
+    load.add_argument("--verbose", action="store_true", help="Agent loglarını gizleme")
+
+    stub = parser.add_argument_group("stub ollama")
+    stub.add_argument("--stub-only", action="store_true", help="Sadece stub Ollama sunucusunu çalıştır")
+    stub.add_argument("--stub-port", type=int, default=11435, help="--stub-only için port")
+    stub.add_argument("--stub-count", type=int, default=1, help="Backend havuzu için başlatılacak stub sayısı")
+    stub.add_argument("--slow-stub-factor", type=float, default=1.0, help="İlk stub'ın yavaşlık çarpanı (stub-count > 1)")
+    stub.add_argument("--prompt-eval-ms", type=float, default=150, help="İlk token öncesi gecikme (ms)")
+    stub.add_argument("--tokens-per-second", type=float, default=30, help="Token üretim hızı")
+    stub.add_argument("--response-tokens", type=int, default=60, help="Yanıt başına token sayısı")
+    stub.add_argument("--parallel", type=int, default=4, help="Stub'ın eşzamanlı işlediği istek sayısı")
+    stub.add_argument("--failure-rate", type=float, default=0.0, help="500 hatası olasılığı")
+    stub.add_argument("--stream-abort-rate", type=float, default=0.0, help="Akış kesintisi olasılığı")
+    return parser.parse_args(argv)
+
+
+def main(argv: List[str] = None):
+    """Ana fonksiyon"""
+    args = parse_args(argv)
+
+    if args.stub_only:
+        print(f"🧪 Stub Ollama http://127.0.0.1:{args.stub_port} adresinde çalışıyor (CTRL+C ile durdurun)")
+        uvicorn.run(create_stub_app(stub_settings_from_args(args)), host="127.0.0.1", port=args.stub_port)
+        return
+
+    print(f"🚀 Yük testi başlıyor ({args.duration} sn)...")
+    with contextlib.ExitStack() as stack:
+        if not args.verbose:
+            # Agent'ların adım adım print çıktıları raporu boğmasın
+            for name in ("supportflow", "httpx"):
+                logging.getLogger(name).setLevel(logging.CRITICAL)
+            devnull = stack.enter_context(open(os.devnull, "w"))
+            stack.enter_context(contextlib.redirect_stdout(devnull))
+        report = asyncio.run(run_load_test(args))
+
+    print(format_report(report))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"💾 Rapor kaydedildi: {args.json}")
+
+
+if __name__ == "__main__":
+    main()
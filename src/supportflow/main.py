@@ -6,8 +6,19 @@ CLI ve API modlarını destekler
 """
 
 import sys
+import json
 import argparse
-from agents import RouterAgent
+import importlib.util
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+# Paket içi relative import'ların çalışması için src dizinini path'e ekle
+SRC_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(SRC_DIR))
+
+from supportflow.agents import RouterAgent
+from supportflow.config import SERVER_CONFIG
 
 
 def run_cli():
@@ -19,7 +30,7 @@ def run_cli():
 
     try:
         # Router Agent'i başlat
-        agent = RouterAgent("gemma3:latest")
+        agent = RouterAgent()
 
         # Ana döngü
         while True:
@@ -47,25 +58,74 @@ def run_cli():
         print(f"❌ Kritik sistem hatası: {e}")
 
 
-def run_api():
-    """API modunda çalıştır"""
+def _available_impl(name: str, module: str, fallback: str) -> str:
+    """Tercih edilen uvicorn bileşeni (uvloop, httptools) kurulu değilse yedeğini döndürür"""
+    if name != module or importlib.util.find_spec(module) is not None:
+        return name
+    print(f"⚠️ {module} kurulu değil, {fallback} kullanılacak (pip install {module})")
+    return fallback
+
+
+def server_options(port: Optional[int] = None, production: bool = False, workers: Optional[int] = None) -> Dict[str, Any]:
+    """
+    uvicorn.run() parametrelerini hazırlar
+    
+    Args:
+        port: Dinlenecek port (varsayılan: SERVER_CONFIG)
+        production: Üretim modu; reload kapalı, çoklu worker, uvloop/httptools
+        workers: Worker process sayısı (varsayılan: SERVER_CONFIG, sadece üretim modunda)
+    
+    Returns:
+        uvicorn.run() keyword argümanları
+    """
+    options = {
+        "app_dir": str(SRC_DIR),
+        "host": SERVER_CONFIG["host"],
+        "port": port or SERVER_CONFIG["port"],
+        "log_level": SERVER_CONFIG["log_level"],
+        "timeout_graceful_shutdown": SERVER_CONFIG["graceful_shutdown_seconds"]
+    }
+    if not production:
+        options["reload"] = SERVER_CONFIG["reload"]
+        return options
+    
+    options.update(
+        reload=False,
+        workers=workers or SERVER_CONFIG["workers"],
+        loop=_available_impl(SERVER_CONFIG["loop"], "uvloop", "asyncio"),
+        http=_available_impl(SERVER_CONFIG["http"], "httptools", "h11"),
+        timeout_keep_alive=SERVER_CONFIG["timeout_keep_alive"],
+        backlog=SERVER_CONFIG["backlog"],
+        access_log=SERVER_CONFIG["access_log"]
+    )
+    return options
+
+
+def run_api(port: Optional[int] = None, production: bool = False, workers: Optional[int] = None):
+    """
+    API modunda çalıştır
+    
+    Args:
+        port: Dinlenecek port (varsayılan: SERVER_CONFIG)
+        production: Üretim modunda çalıştır
+        workers: Üretim modunda worker process sayısı
+    """
     try:
         import uvicorn
-        from api import app
         
-        print("🚀 ABCX Müşteri Hizmetleri API başlatılıyor...")
-        print("📖 API Dokümantasyonu: http://localhost:8000/docs")
-        print("🔍 ReDoc: http://localhost:8000/redoc")
-        print("⚡ API URL: http://localhost:8000")
+        options = server_options(port, production, workers)
+        mode = f"üretim modu, {options['workers']} worker" if production else "geliştirme modu"
+        print(f"🚀 ABCX Müşteri Hizmetleri API başlatılıyor ({mode})...")
+        base_url = f"http://localhost:{options['port']}"
+        print(f"📖 API Dokümantasyonu: {base_url}/docs")
+        print(f"🔍 ReDoc: {base_url}/redoc")
+        print(f"⚡ API URL: {base_url}")
+        if production and options["workers"] > 1:
+            # Session'lar process belleğinde tutulur; worker'lar arasında paylaşılmaz
+            print("⚠️ Session'lar worker başına tutulur; mevcut session'a gelen mesaj farklı worker'a düşerse bulunamaz")
         print("🛑 CTRL+C ile durdurun\n")
         
-        uvicorn.run(
-            "api:app",
-            host="0.0.0.0",
-            port=8000,
-            reload=True,
-            log_level="info"
-        )
+        uvicorn.run("supportflow.api:app", **options)
     except ImportError:
         print("❌ FastAPI ve Uvicorn kurulu değil!")
         print("💡 Yüklemek için: pip install fastapi uvicorn")
@@ -75,6 +135,49 @@ def run_api():
         sys.exit(1)
 
 
+def build_tariff_index():
+    """Tarife kataloğu vektör indeksini config'deki yollara yazar"""
+    from supportflow.agents.tariff_index import build_index
+    from supportflow.config import TARIFF_INDEX_CONFIG
+
+    count = build_index(
+        TARIFF_INDEX_CONFIG["catalog_path"],
+        TARIFF_INDEX_CONFIG["index_path"],
+        TARIFF_INDEX_CONFIG["dim"]
+    )
+    print(f"✅ {count} paket indekslendi: {TARIFF_INDEX_CONFIG['index_path']}")
+
+
+def export_transcripts(
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    category: Optional[str] = None,
+    unit: str = "session",
+    output: Optional[str] = None
+) -> int:
+    """
+    Transkript arşivini NDJSON olarak dosyaya veya stdout'a yazar
+    
+    Returns:
+        Yazılan satır sayısı
+    """
+    from supportflow.transcript_archive import TranscriptArchiver
+
+    archive = TranscriptArchiver.from_config()
+    count = 0
+    target = open(output, "w", encoding="utf-8") if output else sys.stdout
+    try:
+        for record in archive.iter_records(start, end, category=category, unit=unit):
+            target.write(json.dumps(record, ensure_ascii=False) + "\n")
+            count += 1
+    finally:
+        if output:
+            target.close()
+    if output:
+        print(f"✅ {count} kayıt yazıldı: {output}")
+    return count
+
+
 def main():
     """Ana fonksiyon - CLI argümanlarını parse eder"""
     parser = argparse.ArgumentParser(
@@ -85,6 +188,9 @@ Kullanım Örnekleri:
   python main.py              # CLI modunda çalıştır
   python main.py --cli         # CLI modunda çalıştır (açık)
   python main.py --api         # API sunucusunu başlat
+  python main.py --api --production --workers 2 --port 8080  # Üretim modu
+  python main.py --build-tariff-index  # Tarife kataloğu indeksini oluştur
+  python main.py --export-transcripts --start 2025-01-01 --end 2025-01-02 --output ocak.jsonl
   python main.py --help        # Bu yardım mesajını göster
 
 API Endpoints:
@@ -107,18 +213,58 @@ API Endpoints:
         help="CLI modunda çalıştır (varsayılan)"
     )
     
+    parser.add_argument(
+        "--production",
+        action="store_true",
+        help="API'yi üretim modunda başlat (reload kapalı, uvloop/httptools, graceful shutdown)"
+    )
+    
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help=f"Üretim modunda worker process sayısı (varsayılan: {SERVER_CONFIG['workers']})"
+    )
+    
+    parser.add_argument(
+        "--build-tariff-index",
+        action="store_true",
+        help="Tarife kataloğu vektör indeksini oluştur ve çık"
+    )
+    
+    parser.add_argument(
+        "--export-transcripts",
+        action="store_true",
+        help="Transkript arşivini NDJSON olarak dışa aktar ve çık"
+    )
+    
+    parser.add_argument("--start", type=datetime.fromisoformat, help="Dışa aktarma başlangıcı (ISO 8601, dahil)")
+    parser.add_argument("--end", type=datetime.fromisoformat, help="Dışa aktarma bitişi (ISO 8601, hariç)")
+    parser.add_argument("--category", help="Sadece bu kategoride turn'ü olan session'lar")
+    parser.add_argument(
+        "--unit",
+        choices=["session", "turn"],
+        default="session",
+        help="Satır başına session (turn'ler iç içe) veya turn"
+    )
+    parser.add_argument("--output", help="Çıktı dosyası (varsayılan: stdout)")
+    
     parser.add_argument(
         "--port",
         type=int,
-        default=8000,
-        help="API sunucusu için port numarası (varsayılan: 8000)"
+        default=SERVER_CONFIG["port"],
+        help=f"API sunucusu için port numarası (varsayılan: {SERVER_CONFIG['port']})"
     )
     
     args = parser.parse_args()
     
     # Mod belirleme
-    if args.api:
-        run_api()
+    if args.build_tariff_index:
+        build_tariff_index()
+    elif args.export_transcripts:
+        export_transcripts(args.start, args.end, args.category, args.unit, args.output)
+    elif args.api:
+        run_api(args.port, args.production, args.workers)
     else:
         # Varsayılan olarak CLI modunda çalıştır
         run_cli()
@@ -0,0 +1,253 @@
+"""
+Ollama model ısındırma (warm-up) ve keep_alive yönetimi
+Deploy sonrası veya inaktivite nedeniyle unload edilen modellerin
+ilk müşteri isteğinde yükleme süresi ödetmemesini sağlar
+"""
+
+import asyncio
+import logging
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Any, Tuple
+
+import httpx
+
+from .config import OLLAMA_CONFIG, WARMUP_CONFIG
+
+logger = logging.getLogger(__name__)
+
+
+# Backend bazlı durumlar birleştirilirken tercih sırası (ilk bulunan gösterilir)
+STATE_PRIORITY = ("ready", "warming", "error", "pending")
+
+
+class ModelWarmer:
+    """
+    Modelleri başlangıçta ısındırır ve mesai saatlerinde yüklü tutar
+
+    Her model havuzdaki her backend'de ayrı ısındırılır; tüm modelleri
+    ısınmış ve sağlıklı en az bir backend varsa warmer hazır sayılır.
+    """
+
+    def __init__(
+        self,
+        models: List[str],
+        base_urls: Optional[List[str]] = None,
+        keep_alive: str = "30m",
+        prompt: str = "Merhaba",
+        num_predict: int = 1,
+        timeout: float = 300,
+        keeper_interval_seconds: float = 240,
+        retry_backoff_seconds: float = 5,
+        business_hours: Tuple[int, int] = (8, 22),
+        is_healthy: Optional[Callable[[str], bool]] = None
+    ):
+        """
+        Model Warmer'ı başlatır
+
+        Args:
+            models: Isındırılacak model adları
+            base_urls: Ollama sunucu adresleri (varsayılan: http://localhost:11434)
+            keep_alive: Ollama'ya gönderilecek keep_alive değeri
+            prompt: Isındırma için kullanılacak kısa prompt
+            num_predict: Isındırmada üretilecek token sayısı
+            timeout: Model yükleme için azami bekleme süresi (saniye)
+            keeper_interval_seconds: Keep-alive ping aralığı (saniye)
+            retry_backoff_seconds: Başarısız ısındırmadan sonraki ilk tekrar
+                bekleme süresi; her denemede ikiye katlanır, en fazla keeper aralığı kadar olur
+            business_hours: Ping atılacak saat aralığı (başlangıç, bitiş)
+            is_healthy: Backend adresinin şu an kullanılabilir olup olmadığını
+                döndüren fonksiyon (ör. havuzun sağlık kontrolü)
+        """
+        self.models = list(dict.fromkeys(models))
+        self.base_urls = list(dict.fromkeys(
+            url.rstrip("/") for url in (base_urls or ["http://localhost:11434"])
+        ))
+        self.is_healthy = is_healthy
+        self.keep_alive = keep_alive
+        self.prompt = prompt
+        self.num_predict = num_predict
+        self.timeout = timeout
+        self.keeper_interval = keeper_interval_seconds
+        self.retry_backoff = retry_backoff_seconds
+        self.business_hours = business_hours
+
+        # Backend adresi -> model -> ısındırma durumu
+        self.backend_status: Dict[str, Dict[str, Dict[str, Any]]] = {
+            url: {model: {"state": "pending"} for model in self.models} for url in self.base_urls
+        }
+        self._tasks: List[asyncio.Task] = []
+
+    @classmethod
+    def from_config(cls, models: Optional[List[str]] = None, pool: Any = None) -> "ModelWarmer":
+        """
+        config.py ayarlarından ModelWarmer oluşturur
+
+        Args:
+            models: Isındırılacak modeller (varsayılan WARMUP_CONFIG, o da boşsa ana model)
+            pool: Verilirse havuzdaki tüm backend'ler ısındırılır ve hazır olma
+                durumu havuzun sağlık kontrolünü dikkate alır
+        """
+        if pool is not None:
+            base_urls = [backend.base_url for backend in pool.backends]
+            is_healthy = pool.is_available
+        else:
+            base_urls = OLLAMA_CONFIG["backends"] or [OLLAMA_CONFIG["base_url"]]
+            is_healthy = None
+        return cls(
+            models=models or WARMUP_CONFIG["models"] or [OLLAMA_CONFIG["model_name"]],
+            base_urls=base_urls,
+            keep_alive=OLLAMA_CONFIG["keep_alive"],
+            prompt=WARMUP_CONFIG["prompt"],
+            num_predict=WARMUP_CONFIG["num_predict"],
+            timeout=WARMUP_CONFIG["timeout"],
+            keeper_interval_seconds=WARMUP_CONFIG["keeper_interval_seconds"],
+            retry_backoff_seconds=WARMUP_CONFIG["retry_backoff_seconds"],
+            business_hours=tuple(WARMUP_CONFIG["business_hours"]),
+            is_healthy=is_healthy
+        )
+
+    def _warmed(self, url: str) -> bool:
+        return all(status["state"] == "ready" for status in self.backend_status[url].values())
+
+    @property
+    def ready(self) -> bool:
+        """Tüm modelleri ısınmış ve sağlıklı en az bir backend var mı"""
+        return any(
+            self._warmed(url) and (self.is_healthy is None or self.is_healthy(url))
+            for url in self.base_urls
+        )
+
+    @property
+    def model_status(self) -> Dict[str, Dict[str, Any]]:
+        """Model başına en iyi backend durumu"""
+        merged = {}
+        for model in self.models:
+            statuses = [self.backend_status[url][model] for url in self.base_urls]
+            merged[model] = min(statuses, key=lambda status: STATE_PRIORITY.index(status["state"]))
+        return merged
+
+    def start(self):
+        """Isındırma ve keep-alive döngüsünü arka planda başlatır"""
+        self._tasks = [asyncio.create_task(self._keeper_loop())]
+
+    async def stop(self):
+        """Arka plan görevlerini durdurur"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def warm_up(self) -> bool:
+        """
+        Henüz ısınmamış backend'lerdeki modelleri kısa bir generation ile paralel olarak ısındırır
+
+        Returns:
+            Warmer hazır mı (en az bir sağlıklı backend'de tüm modeller ısındı mı)
+        """
+        pending = [
+            (url, model) for url in self.base_urls for model in self.models
+            if self.backend_status[url][model]["state"] != "ready"
+        ]
+        async with httpx.AsyncClient(timeout=self.timeout) as client:
+            await asyncio.gather(*(self._warm_model(client, url, model) for url, model in pending))
+
+        if self.ready:
+            warmed = [url for url in self.base_urls if self._warmed(url)]
+            logger.info(f"🔥 Modeller hazır: {', '.join(self.models)} ({len(warmed)}/{len(self.base_urls)} backend)")
+        else:
+            logger.warning("⚠️ Hiçbir backend'de modeller ısındırılamadı, keep-alive döngüsünde tekrar denenecek")
+        return self.ready
+
+    async def _warm_model(self, client: httpx.AsyncClient, url: str, model: str) -> bool:
+        """Tek bir backend'de tek bir modeli ısındırır"""
+        self.backend_status[url][model] = {"state": "warming"}
+        started = time.perf_counter()
+        try:
+            response = await client.post(f"{url}/api/generate", json={
+                "model": model,
+                "prompt": self.prompt,
+                "stream": False,
+                "keep_alive": self.keep_alive,
+                "options": {"num_predict": self.num_predict}
+            })
+            response.raise_for_status()
+        except Exception as e:
+            self.backend_status[url][model] = {"state": "error", "error": str(e)}
+            logger.warning(f"⚠️ Model ısındırma hatası ({model} @ {url}): {e}")
+            return False
+
+        elapsed = time.perf_counter() - started
+        self.backend_status[url][model] = {
+            "state": "ready",
+            "warmup_seconds": round(elapsed, 2),
+            "warmed_at": datetime.now().isoformat()
+        }
+        logger.info(f"🔥 Model ısındırıldı: {model} @ {url} ({elapsed:.2f}s)")
+        return True
+
+    async def _keeper_loop(self):
+        """
+        Modelleri ısındırır ve mesai saatlerinde idle unload edilmelerini engeller
+
+        Hazır olmayan warmer mesai saatinden bağımsız olarak artan aralıklarla
+        tekrar ısındırılır; mesai saati sadece keep-alive ping'lerini sınırlar.
+        """
+        await self.warm_up()
+        retry_delay = self.retry_backoff
+        while True:
+            if not self.ready:
+                await asyncio.sleep(retry_delay)
+                retry_delay = min(retry_delay * 2, max(self.keeper_interval, self.retry_backoff))
+                await self.warm_up()
+                continue
+
+            retry_delay = self.retry_backoff
+            await asyncio.sleep(self.keeper_interval)
+            if not self.is_business_hours():
+                continue
+            if not all(self._warmed(url) for url in self.base_urls):
+                # Hazır olmayan veya sonradan düşen backend'ler tekrar ısındırılır
+                await self.warm_up()
+            await self.ping()
+
+    async def ping(self):
+        """
+        Modelleri generation yapmadan yüklü tutar
+
+        Prompt içermeyen bir generate isteği Ollama'da sadece modeli
+        yükler ve keep_alive süresini yeniler. Sadece ısınmış backend'ler
+        pinglenir; ping'e yanıt vermeyen model tekrar ısındırılmak üzere
+        hata durumuna alınır.
+        """
+        async with httpx.AsyncClient(timeout=self.timeout) as client:
+            for url in self.base_urls:
+                for model in self.models:
+                    status = self.backend_status[url][model]
+                    if status["state"] != "ready":
+                        continue
+                    try:
+                        response = await client.post(f"{url}/api/generate", json={
+                            "model": model,
+                            "keep_alive": self.keep_alive
+                        })
+                        response.raise_for_status()
+                        status["last_ping"] = datetime.now().isoformat()
+                    except Exception as e:
+                        self.backend_status[url][model] = {"state": "error", "error": str(e)}
+                        logger.warning(f"⚠️ Keep-alive ping hatası ({model} @ {url}): {e}")
+
+    def is_business_hours(self, now: Optional[datetime] = None) -> bool:
+        """Verilen zamanın mesai saatleri içinde olup olmadığını kontrol eder"""
+        now = now or datetime.now()
+        start_hour, end_hour = self.business_hours
+        return start_hour <= now.hour < end_hour
+
+    def get_status(self) -> Dict[str, Any]:
+        """Isındırma durumunu döndürür"""
+        return {
+            "ready": self.ready,
+            "keep_alive": self.keep_alive,
+            "models": self.model_status,
+            "backends": self.backend_status
+        }
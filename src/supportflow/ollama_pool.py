@@ -0,0 +1,544 @@
+"""
+Birden fazla Ollama sunucusu arasında yük dağıtımı
+İstekler en az bekleyen isteği olan ve modeli zaten yüklü olan backend'e
+yönlendirilir; hata veren veya yavaşlayan backend'ler geçici olarak devreden
+çıkarılır, isteğe bağlı olarak yavaş istekler ikinci bir backend'e de gönderilir
+"""
+
+import asyncio
+import logging
+import statistics
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+import httpx
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_ollama import OllamaLLM
+
+from .config import AGENT_CONFIG, OLLAMA_CONFIG, OLLAMA_POOL_CONFIG
+from .tracing import bind_context, tracer
+
+logger = logging.getLogger(__name__)
+
+
+def create_ollama_client(model_name: str, base_url: str) -> OllamaLLM:
+    """
+    Ayarlardaki bağlantı ve örnekleme parametreleriyle tek sunucuya bağlı Ollama LLM'i oluşturur
+
+    Args:
+        model_name: Model adı
+        base_url: Ollama sunucu adresi
+
+    Returns:
+        OllamaLLM instance'ı
+    """
+    return OllamaLLM(
+        model=model_name,
+        base_url=base_url,
+        keep_alive=OLLAMA_CONFIG["keep_alive"],
+        temperature=AGENT_CONFIG["temperature"],
+        client_kwargs={"timeout": OLLAMA_CONFIG["timeout"]}
+    )
+
+
+def _percentile(samples: List[float], percentile: float) -> float:
+    """Sıralı olmayan örneklerden yüzdelik değeri (en yakın sıra yöntemi)"""
+    ordered = sorted(samples)
+    index = max(0, min(len(ordered) - 1, int(round(percentile / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+@dataclass
+class Completion:
+    """Tek bir generation'ın sonucu"""
+    text: str
+    # Ollama'nın bitiş nedeni: "stop" (doğal bitiş / stop dizisi) veya "length" (num_predict doldu)
+    done_reason: Optional[str] = None
+    eval_count: Optional[int] = None
+
+    @property
+    def truncated(self) -> bool:
+        return self.done_reason == "length"
+
+
+class _TokenForwarder(BaseCallbackHandler):
+    """Generation sırasında gelen token'ları callback'e iletir"""
+
+    def __init__(self, on_token: Callable[[str], None]):
+        self.on_token = on_token
+        self.started = False
+
+    def on_llm_new_token(self, token: str, **kwargs: Any):
+        if token:
+            self.started = True
+            self.on_token(token)
+
+
+class Backend:
+    """Havuzdaki tek bir Ollama sunucusunun durumu"""
+
+    def __init__(self, base_url: str, latency_window: int = 100):
+        self.base_url = base_url.rstrip("/")
+        self.outstanding = 0
+        self.loaded_models: Set[str] = set()
+        self.latencies: deque = deque(maxlen=latency_window)
+        self.consecutive_failures = 0
+        self.ejected_until = 0.0
+        self.eject_reason: Optional[str] = None
+        self.requests = 0
+        self.failures = 0
+        self.ejections = 0
+        self._clients: Dict[Tuple[str, Optional[int]], OllamaLLM] = {}
+
+    def available(self, now: float) -> bool:
+        return now >= self.ejected_until
+
+    def client(self, model: str, num_predict: Optional[int] = None) -> OllamaLLM:
+        """
+        Model ve token bütçesi için bu backend'e bağlı LLM istemcisi (tekrar kullanılır)
+
+        Farklı bütçeler aynı HTTP istemcisini paylaşan kopyalardır.
+        """
+        llm = self._clients.get((model, num_predict))
+        if llm is None:
+            base = self._clients.get((model, None))
+            if base is None:
+                base = self._clients[(model, None)] = create_ollama_client(model, self.base_url)
+            llm = self._clients[(model, num_predict)] = base.model_copy(update={"num_predict": num_predict})
+        return llm
+
+    def median_latency(self) -> Optional[float]:
+        return statistics.median(self.latencies) if self.latencies else None
+
+
+class PooledLLM:
+    """
+    Havuz üzerinden çalışan, tek modele bağlı LLM
+
+    generate() bu nesnenin complete() metodunu kullanır; agent'lar tek
+    sunucu ile havuz arasında fark görmez.
+    """
+
+    def __init__(self, pool: "OllamaPool", model: str):
+        self.pool = pool
+        self.model = model
+
+    def invoke(self, prompt: str) -> str:
+        return self.pool.invoke(self.model, prompt)
+
+    def complete(
+        self,
+        prompt: str,
+        on_token: Optional[Callable[[str], None]] = None,
+        num_predict: Optional[int] = None,
+        stop: Optional[List[str]] = None
+    ) -> Completion:
+        return self.pool.complete(self.model, prompt, on_token, num_predict, stop)
+
+
+def _parse_ps_response(result: Any) -> Tuple[Set[str], Optional[str]]:
+    """
+    /api/ps yanıtından yüklü modelleri çıkarır
+
+    Returns:
+        (Yüklü model adları, hata); hata None değilse backend sağlıksızdır
+    """
+    if isinstance(result, BaseException):
+        return set(), str(result) or type(result).__name__
+    if result.status_code != 200:
+        return set(), str(result.status_code)
+    try:
+        models = result.json().get("models") or []
+        return {model.get("name") or model.get("model") for model in models} - {None}, None
+    except (ValueError, AttributeError, TypeError):
+        return set(), "geçersiz /api/ps yanıtı"
+
+
+class OllamaPool:
+    """Ollama backend havuzu: yönlendirme, devreden çıkarma ve hedged istekler"""
+
+    def __init__(
+        self,
+        base_urls: List[str],
+        health_check_interval_seconds: float = 10,
+        health_check_timeout: float = 2,
+        max_consecutive_failures: int = 3,
+        eject_seconds: float = 30,
+        latency_eject_ms: Optional[float] = None,
+        latency_window: int = 100,
+        max_failovers: int = 1,
+        hedge_enabled: bool = False,
+        hedge_percentile: float = 95,
+        hedge_min_samples: int = 20
+    ):
+        """
+        Havuzu başlatır
+
+        Args:
+            base_urls: Ollama sunucu adresleri
+            health_check_interval_seconds: /api/ps kontrol aralığı (saniye)
+            health_check_timeout: Tek sağlık kontrolü için zaman aşımı (saniye)
+            max_consecutive_failures: Devreden çıkarma için art arda hata sayısı
+            eject_seconds: Devreden çıkarılan backend'in bekleme süresi (saniye)
+            latency_eject_ms: Medyan süre eşiği (ms, None = kapalı)
+            latency_window: Backend başına tutulan son istek süresi sayısı
+            max_failovers: Hata alan isteğin başka backend'de tekrar sayısı
+            hedge_enabled: Yavaş isteklerin ikinci backend'e de gönderilmesi
+            hedge_percentile: Hedge gecikmesi olarak kullanılan yüzdelik
+            hedge_min_samples: Hedge için gereken asgari örnek sayısı
+        """
+        urls = list(dict.fromkeys(url.rstrip("/") for url in base_urls))
+        if not urls:
+            raise ValueError("Havuzda en az bir Ollama backend'i olmalı")
+        self.backends = [Backend(url, latency_window) for url in urls]
+        self.health_check_interval = health_check_interval_seconds
+        self.health_check_timeout = health_check_timeout
+        self.max_consecutive_failures = max_consecutive_failures
+        self.eject_seconds = eject_seconds
+        self.latency_eject_ms = latency_eject_ms
+        self.max_failovers = max_failovers
+        self.hedge_enabled = hedge_enabled
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_samples = hedge_min_samples
+
+        # Hedge gecikmesi tüm havuzdaki son istek sürelerinden hesaplanır
+        self._latencies: deque = deque(maxlen=latency_window * len(urls))
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._health_task: Optional[asyncio.Task] = None
+        self.failovers = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+
+    @classmethod
+    def from_config(cls) -> "OllamaPool":
+        """config.py ayarlarından havuz oluşturur (backends boşsa base_url kullanılır)"""
+        return cls(
+            OLLAMA_CONFIG["backends"] or [OLLAMA_CONFIG["base_url"]],
+            health_check_interval_seconds=OLLAMA_POOL_CONFIG["health_check_interval_seconds"],
+            health_check_timeout=OLLAMA_POOL_CONFIG["health_check_timeout"],
+            max_consecutive_failures=OLLAMA_POOL_CONFIG["max_consecutive_failures"],
+            eject_seconds=OLLAMA_POOL_CONFIG["eject_seconds"],
+            latency_eject_ms=OLLAMA_POOL_CONFIG["latency_eject_ms"],
+            latency_window=OLLAMA_POOL_CONFIG["latency_window"],
+            max_failovers=OLLAMA_POOL_CONFIG["max_failovers"],
+            hedge_enabled=OLLAMA_POOL_CONFIG["hedge_enabled"],
+            hedge_percentile=OLLAMA_POOL_CONFIG["hedge_percentile"],
+            hedge_min_samples=OLLAMA_POOL_CONFIG["hedge_min_samples"]
+        )
+
+    def llm(self, model: str) -> PooledLLM:
+        """Model için havuz üzerinden çalışan LLM döndürür"""
+        return PooledLLM(self, model)
+
+    # --- Yönlendirme ---
+
+    def select(self, model: str, exclude: Tuple[Backend, ...] = ()) -> Optional[Backend]:
+        """
+        İstek için backend seçer ve bekleyen istek sayısını artırır
+
+        Modeli yüklü olanlar önce, sonra en az bekleyen isteği ve en düşük
+        medyan süresi olan seçilir. Tüm backend'ler devre dışıysa en erken
+        dönecek olan denenir (havuz tamamen kapanmaz).
+
+        Args:
+            model: İstenen model
+            exclude: Bu istek için zaten denenmiş backend'ler
+
+        Returns:
+            Seçilen backend veya denenecek backend kalmadıysa None
+        """
+        with self._lock:
+            candidates = [backend for backend in self.backends if backend not in exclude]
+            if not candidates:
+                return None
+            now = time.monotonic()
+            available = [backend for backend in candidates if backend.available(now)]
+            if available:
+                backend = min(available, key=lambda b: (
+                    model not in b.loaded_models, b.outstanding, b.median_latency() or 0.0
+                ))
+            else:
+                backend = min(candidates, key=lambda b: b.ejected_until)
+            backend.outstanding += 1
+            backend.requests += 1
+            return backend
+
+    def record_success(self, backend: Backend, model: str, latency: Optional[float] = None):
+        """
+        Başarılı isteği kaydeder
+
+        Args:
+            backend: İsteği işleyen backend
+            model: Kullanılan model (artık bu backend'de yüklü)
+            latency: Tam yanıt süresi (saniye, stream isteklerinde None)
+        """
+        with self._lock:
+            backend.outstanding -= 1
+            backend.consecutive_failures = 0
+            backend.loaded_models.add(model)
+            if latency is None:
+                return
+            backend.latencies.append(latency)
+            self._latencies.append(latency)
+            if (
+                self.latency_eject_ms is not None
+                and len(backend.latencies) >= 5
+                and backend.median_latency() * 1000 > self.latency_eject_ms
+            ):
+                self._eject(backend, "latency")
+
+    def record_failure(self, backend: Backend, error: BaseException):
+        """Başarısız isteği kaydeder, eşik aşıldıysa backend'i devreden çıkarır"""
+        with self._lock:
+            backend.outstanding -= 1
+            backend.failures += 1
+            backend.consecutive_failures += 1
+            if backend.consecutive_failures >= self.max_consecutive_failures:
+                self._eject(backend, f"failures: {error}")
+
+    def _eject(self, backend: Backend, reason: str):
+        """Backend'i eject_seconds süresince devreden çıkarır (lock altında çağrılır)"""
+        backend.ejected_until = time.monotonic() + self.eject_seconds
+        backend.eject_reason = reason
+        backend.consecutive_failures = 0
+        backend.latencies.clear()
+        backend.ejections += 1
+        logger.warning(f"⚠️ Ollama backend devreden çıkarıldı ({self.eject_seconds:.0f}s): {backend.base_url} - {reason}")
+
+    def is_available(self, base_url: str) -> bool:
+        """Verilen adresteki backend şu an devrede mi"""
+        now = time.monotonic()
+        with self._lock:
+            return any(
+                backend.base_url == base_url.rstrip("/") and backend.available(now)
+                for backend in self.backends
+            )
+
+    def hedge_delay(self) -> Optional[float]:
+        """Hedged istek için bekleme süresi (saniye), koşullar sağlanmıyorsa None"""
+        if not self.hedge_enabled or len(self.backends) < 2:
+            return None
+        with self._lock:
+            samples = list(self._latencies)
+        if len(samples) < self.hedge_min_samples:
+            return None
+        return _percentile(samples, self.hedge_percentile)
+
+    # --- İstekler ---
+
+    def _call(
+        self,
+        backend: Backend,
+        model: str,
+        prompt: str,
+        num_predict: Optional[int] = None,
+        stop: Optional[List[str]] = None,
+        forwarder: Optional["_TokenForwarder"] = None
+    ) -> Completion:
+        """Tek backend'e isteği gönderir ve sonucu kaydeder"""
+        started = time.perf_counter()
+        try:
+            with tracer.span("ollama.request", backend=backend.base_url, model=model, stream=forwarder is not None):
+                result = backend.client(model, num_predict).generate(
+                    [prompt], stop=stop or None, callbacks=[forwarder] if forwarder else None
+                )
+        except Exception as e:
+            self.record_failure(backend, e)
+            raise
+        # Stream isteklerinin süresi yanıt uzunluğuna bağlı olduğu için gecikme istatistiğine girmez
+        self.record_success(backend, model, None if forwarder else time.perf_counter() - started)
+        generation = result.generations[0][0]
+        info = generation.generation_info or {}
+        return Completion(generation.text, info.get("done_reason"), info.get("eval_count"))
+
+    def invoke(self, model: str, prompt: str) -> str:
+        """Stream olmadan, bütçe sınırı olmadan yanıt üretir"""
+        return self.complete(model, prompt).text
+
+    def complete(
+        self,
+        model: str,
+        prompt: str,
+        on_token: Optional[Callable[[str], None]] = None,
+        num_predict: Optional[int] = None,
+        stop: Optional[List[str]] = None
+    ) -> Completion:
+        """
+        Yanıt üretir; hata alırsa başka backend'de tekrar dener
+
+        on_token verildiğinde token'lar geldikçe iletilir. İlk token'dan
+        sonra oluşan hatada müşteriye yarım yanıt gitmiş olacağı için
+        tekrar denenmez; hedged istek sadece stream olmayan çağrılarda
+        kullanılır.
+
+        Args:
+            model: Model adı
+            prompt: Formatlanmış prompt
+            on_token: Her token parçası için çağrılacak fonksiyon (isteğe bağlı)
+            num_predict: Üretilecek azami token sayısı (None = sınırsız)
+            stop: Üretimi durduran diziler
+
+        Returns:
+            Yanıt metni ve bitiş nedeni
+        """
+        tried: Tuple[Backend, ...] = ()
+        while True:
+            backend = self.select(model, tried)
+            tried += (backend,)
+            forwarder = _TokenForwarder(on_token) if on_token else None
+            try:
+                delay = None if forwarder else self.hedge_delay()
+                if delay is None:
+                    return self._call(backend, model, prompt, num_predict, stop, forwarder)
+                return self._hedged_call(backend, model, prompt, num_predict, stop, delay, tried)
+            except Exception as e:
+                started = forwarder is not None and forwarder.started
+                if started or len(tried) > self.max_failovers or len(tried) >= len(self.backends):
+                    raise
+                self.failovers += 1
+                logger.warning(f"⚠️ Ollama isteği başka backend'de tekrarlanıyor ({backend.base_url}): {e}")
+
+    def _hedged_call(
+        self,
+        primary: Backend,
+        model: str,
+        prompt: str,
+        num_predict: Optional[int],
+        stop: Optional[List[str]],
+        delay: float,
+        tried: Tuple[Backend, ...]
+    ) -> Completion:
+        """
+        İsteği gönderir; delay içinde yanıt gelmezse ikinci backend'e de gönderir
+
+        İlk başarılı yanıt döner. Kaybeden istek iptal edilemez (senkron
+        HTTP çağrısı), arka planda tamamlanır ve sonucu yine backend
+        istatistiklerine yazılır.
+        """
+        executor = self._get_executor()
+
+        def submit(backend: Backend) -> Future:
+            return executor.submit(bind_context(partial(self._call, backend, model, prompt, num_predict, stop)))
+
+        futures: Dict[Future, Backend] = {submit(primary): primary}
+        done, _ = wait(futures, timeout=delay)
+        if not done:
+            secondary = self.select(model, tried)
+            if secondary is not None:
+                self.hedges += 1
+                futures[submit(secondary)] = secondary
+
+        pending = set(futures)
+        error: Optional[BaseException] = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is not None:
+                    error = future.exception()
+                    continue
+                if futures[future] is not primary:
+                    self.hedge_wins += 1
+                return future.result()
+        raise error
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=max(4, 4 * len(self.backends)), thread_name_prefix="ollama-hedge"
+                )
+            return self._executor
+
+    # --- Sağlık kontrolü ---
+
+    def start(self):
+        """Periyodik sağlık kontrolünü arka planda başlatır"""
+        self._health_task = asyncio.create_task(self._health_loop())
+
+    async def stop(self):
+        """Sağlık kontrolünü durdurur ve hedge thread'lerini kapatır"""
+        if self._health_task is not None:
+            self._health_task.cancel()
+            await asyncio.gather(self._health_task, return_exceptions=True)
+            self._health_task = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    async def _health_loop(self):
+        while True:
+            try:
+                await self.check_health()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Tek bir başarısız tur periyodik kontrolü durdurmamalı
+                logger.error(f"❌ Ollama sağlık kontrolü başarısız: {e}")
+            await asyncio.sleep(self.health_check_interval)
+
+    async def check_health(self) -> Dict[str, bool]:
+        """
+        Tüm backend'lerde /api/ps çağırarak erişilebilirliği ve yüklü modelleri günceller
+
+        Erişilemeyen backend devreden çıkarılır; sağlık kontrolü nedeniyle
+        çıkarılmış backend tekrar yanıt verince hemen devreye alınır.
+
+        Returns:
+            Backend adresi -> sağlıklı mı
+        """
+        async with httpx.AsyncClient(timeout=self.health_check_timeout) as client:
+            results = await asyncio.gather(
+                *(client.get(f"{backend.base_url}/api/ps") for backend in self.backends),
+                return_exceptions=True
+            )
+
+        health: Dict[str, bool] = {}
+        with self._lock:
+            for backend, result in zip(self.backends, results):
+                models, error = _parse_ps_response(result)
+                health[backend.base_url] = error is None
+                if error is not None:
+                    if backend.available(time.monotonic()):
+                        self._eject(backend, f"health: {error}")
+                    continue
+                backend.loaded_models = models
+                if backend.eject_reason and backend.eject_reason.startswith("health"):
+                    backend.ejected_until = 0.0
+                    backend.eject_reason = None
+                    logger.info(f"✅ Ollama backend tekrar devrede: {backend.base_url}")
+        return health
+
+    def get_status(self) -> Dict[str, Any]:
+        """Backend'lerin yük, sağlık ve gecikme durumunu döndürür"""
+        now = time.monotonic()
+        with self._lock:
+            backends = []
+            for backend in self.backends:
+                latencies = list(backend.latencies)
+                backends.append({
+                    "base_url": backend.base_url,
+                    "available": backend.available(now),
+                    "eject_reason": None if backend.available(now) else backend.eject_reason,
+                    "ejected_for_seconds": round(max(0.0, backend.ejected_until - now), 1),
+                    "outstanding": backend.outstanding,
+                    "loaded_models": sorted(backend.loaded_models),
+                    "requests": backend.requests,
+                    "failures": backend.failures,
+                    "ejections": backend.ejections,
+                    "p50_ms": round(_percentile(latencies, 50) * 1000, 1) if latencies else None,
+                    "p95_ms": round(_percentile(latencies, 95) * 1000, 1) if latencies else None
+                })
+        delay = self.hedge_delay()
+        return {
+            "backends": backends,
+            "failovers": self.failovers,
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins,
+            "hedge_delay_ms": round(delay * 1000, 1) if delay is not None else None
+        }
@@ -0,0 +1,194 @@
+"""
+Çalışan sunucu için profil araçları
+Yeniden başlatma gerektirmeden tüm thread'lerin Python stack'lerini
+örnekleyen sampling profiler ve tek bir çağrı için deterministik cProfile
+"""
+
+import contextvars
+import cProfile
+import functools
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Örneklenen stack'lerin azami derinliği (sonsuz özyinelemeye karşı)
+MAX_STACK_DEPTH = 128
+
+
+class _CallProfile:
+    """profile_call() süresince diğer thread'lerde toplanan profiller"""
+
+    def __init__(self):
+        self.thread_id = threading.get_ident()
+        self.branches: List[cProfile.Profile] = []
+        self.unprofiled = 0
+        self._lock = threading.Lock()
+
+    def add(self, profiler: Optional[cProfile.Profile]):
+        with self._lock:
+            if profiler is None:
+                self.unprofiled += 1
+            else:
+                self.branches.append(profiler)
+
+
+# Etkin profile_call(); contextvars ile LangGraph'in executor thread'lerine taşınır
+_active_call: contextvars.ContextVar[Optional[_CallProfile]] = contextvars.ContextVar(
+    "active_profile_call", default=None
+)
+
+
+def profile_branch(func: Callable) -> Callable:
+    """
+    Başka bir thread'de çalışan işi etkin profile_call() raporuna dahil eden decorator
+
+    cProfile thread bazlıdır; paralel graph dalları (ör. consult_fatura /
+    consult_tarife) executor thread'lerinde çalıştığı için çağıranın
+    profilinde görünmez. Profil etkin değilse fonksiyon doğrudan çağrılır.
+    """
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        call = _active_call.get()
+        if call is None or threading.get_ident() == call.thread_id:
+            return func(*args, **kwargs)
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Başka bir profil aracı etkin (ör. Python 3.12+ sys.monitoring); dal ölçülmez
+            call.add(None)
+            return func(*args, **kwargs)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            profiler.disable()
+            call.add(profiler)
+    return wrapper
+
+
+def _frame_label(code) -> str:
+    """Frame'i flame graph etiketi olarak biçimlendirir: fonksiyon (dosya:satır)"""
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class StackSampler:
+    """
+    sys._current_frames() ile periyodik stack örnekleyici
+
+    Örnekleme ayrı bir thread'de yapılır; hedef thread'ler durdurulmaz.
+    Event loop thread'i ayrıca etiketlenir; loop boştayken örnekler
+    selector beklemesinde görünür.
+    """
+
+    def __init__(self, interval_seconds: float = 0.005, loop_thread_id: Optional[int] = None):
+        """
+        Örnekleyiciyi başlatır
+
+        Args:
+            interval_seconds: Örnekleme aralığı
+            loop_thread_id: Event loop'u çalıştıran thread'in kimliği (etiket için)
+        """
+        self.interval = interval_seconds
+        self.loop_thread_id = loop_thread_id
+        self.samples = 0
+        self._stacks: Counter = Counter()
+
+    def run(self, seconds: float) -> Counter:
+        """
+        Verilen süre boyunca örnek toplar (çağıran thread'i bloklar)
+
+        Args:
+            seconds: Örnekleme süresi
+
+        Returns:
+            Collapsed stack -> örnek sayısı
+        """
+        own_id = threading.get_ident()
+        deadline = time.monotonic() + seconds
+        next_sample = time.monotonic()
+
+        while True:
+            now = time.monotonic()
+            if now >= deadline:
+                break
+            if now < next_sample:
+                time.sleep(next_sample - now)
+            next_sample += self.interval
+
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                self._stacks[self._collapse(thread_id, frame, names)] += 1
+            self.samples += 1
+
+        return self._stacks
+
+    def _collapse(self, thread_id: int, frame, names: Dict[int, str]) -> str:
+        """Stack'i kökten yaprağa ';' ile birleştirir"""
+        labels: List[str] = []
+        while frame is not None and len(labels) < MAX_STACK_DEPTH:
+            labels.append(_frame_label(frame.f_code))
+            frame = frame.f_back
+        if thread_id == self.loop_thread_id:
+            root = "event-loop"
+        else:
+            root = names.get(thread_id, f"thread-{thread_id}")
+        labels.append(root)
+        return ";".join(reversed(labels))
+
+
+def format_collapsed(stacks: Counter) -> str:
+    """Stack sayaçlarını flamegraph.pl / speedscope formatına dönüştürür"""
+    return "".join(f"{stack} {count}\n" for stack, count in stacks.most_common())
+
+
+def profile_call(func: Callable[[], Any], top_n: int = 25) -> Tuple[Any, Dict[str, Any]]:
+    """
+    Fonksiyonu cProfile altında çalıştırır
+
+    cProfile sadece çağıran thread'i ölçer; bu yüzden fonksiyon, profili
+    istenen işi yapan thread içinde (ör. executor) çağrılmalıdır. Diğer
+    thread'lerde çalışan ve profile_branch() ile sarılan işler rapora
+    eklenir; sarılmayan thread'ler (ör. HTTP istemci havuzları) görünmez.
+
+    Args:
+        func: Profili çıkarılacak argümansız fonksiyon
+        top_n: Rapordaki fonksiyon sayısı
+
+    Returns:
+        (Fonksiyonun sonucu, kümülatif süreye göre en pahalı fonksiyonlar)
+    """
+    profiler = cProfile.Profile()
+    call = _CallProfile()
+    token = _active_call.set(call)
+    started = time.perf_counter()
+    try:
+        result = profiler.runcall(func)
+    finally:
+        wall_ms = (time.perf_counter() - started) * 1000
+        _active_call.reset(token)
+
+    stats = pstats.Stats(profiler)
+    for branch in call.branches:
+        stats.add(branch)
+    rows = sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)[:top_n]
+    functions = [
+        {
+            "function": f"{name} ({os.path.basename(filename)}:{line})",
+            "calls": calls,
+            "total_ms": round(total * 1000, 3),
+            "cumulative_ms": round(cumulative * 1000, 3)
+        }
+        for (filename, line, name), (_, calls, total, cumulative, _) in rows
+    ]
+    return result, {
+        "wall_ms": round(wall_ms, 3),
+        "threads": 1 + len(call.branches),
+        "unprofiled_branches": call.unprofiled,
+        "top_functions": functions
+    }
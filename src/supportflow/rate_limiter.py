@@ -0,0 +1,200 @@
+"""
+Token bucket rate limiting
+Session, müşteri ve global seviyede /chat isteklerini sınırlayarak
+Ollama kapasitesini tek bir istemcinin tüketmesini engeller
+"""
+
+import math
+import re
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from .config import RATE_LIMIT_CONFIG
+
+
+class TokenBucket:
+    """
+    Anahtar bazlı token bucket kümesi
+
+    Her bucket sadece [token, son_güncelleme] çifti olarak saklanır. Tam
+    dolu hale gelecek kadar uzun süre kullanılmayan bucket'lar yeni bir
+    bucket'tan farksız olduğu için periyodik olarak silinir.
+    """
+
+    def __init__(self, rate: float, burst: float, clock=time.monotonic):
+        """
+        Token bucket'ı başlatır
+
+        Args:
+            rate: Saniyede eklenen token sayısı
+            burst: Bucket kapasitesi
+            clock: Saniye döndüren monoton saat (test için)
+        """
+        self._clock = clock
+        self._buckets: Dict[str, List[float]] = {}
+        self.configure(rate, burst)
+
+    def configure(self, rate: float, burst: float):
+        """Hızı ve kapasiteyi değiştirir; mevcut bucket'lar yeni kapasiteye göre dolar"""
+        self.rate = rate
+        self.burst = burst
+        # Boş bir bucket'ın tamamen dolması için gereken süre
+        self.idle_ttl = burst / rate if rate > 0 else float("inf")
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    def peek(self, key: str, now: float, cost: float = 1) -> float:
+        """
+        Token harcamadan bekleme süresini hesaplar
+
+        Returns:
+            0 ise istek geçebilir, aksi halde saniye cinsinden bekleme süresi
+        """
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            return 0.0 if cost <= self.burst else float("inf")
+        tokens = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+        if tokens >= cost:
+            return 0.0
+        return (cost - tokens) / self.rate if self.rate > 0 else float("inf")
+
+    def consume(self, key: str, now: float, cost: float = 1):
+        """Bucket'tan token harcar (peek ile kontrol edildikten sonra)"""
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            self._buckets[key] = [self.burst - cost, now]
+            return
+        bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate) - cost
+        bucket[1] = now
+
+    def evict_idle(self, now: float) -> int:
+        """Tamamen dolmuş sayılan bucket'ları siler"""
+        idle = [key for key, (_, updated) in self._buckets.items() if now - updated >= self.idle_ttl]
+        for key in idle:
+            del self._buckets[key]
+        return len(idle)
+
+
+class ChatRateLimiter:
+    """Session, müşteri ve global token bucket'larını birlikte uygular"""
+
+    def __init__(
+        self,
+        limits: Dict[str, Dict[str, float]],
+        sweep_interval_seconds: float = 60,
+        clock=time.monotonic
+    ):
+        """
+        Rate limiter'ı başlatır
+
+        Args:
+            limits: Kapsam adı -> {"rate": saniyede token, "burst": kapasite}
+            sweep_interval_seconds: Idle bucket temizliği aralığı
+            clock: Saniye döndüren monoton saat (test için)
+        """
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._buckets = {
+            scope: TokenBucket(limit["rate"], limit["burst"], clock)
+            for scope, limit in limits.items()
+        }
+        self._sweep_interval = sweep_interval_seconds
+        self._next_sweep = clock() + sweep_interval_seconds
+        self.rejections: Dict[str, int] = {scope: 0 for scope in limits}
+
+    @classmethod
+    def from_config(cls) -> "ChatRateLimiter":
+        """config.py ayarlarından rate limiter oluşturur"""
+        return cls(
+            limits=RATE_LIMIT_CONFIG["limits"],
+            sweep_interval_seconds=RATE_LIMIT_CONFIG["sweep_interval_seconds"]
+        )
+
+    def configure(self, limits: Dict[str, Dict[str, float]]):
+        """
+        Kapsam limitlerini çalışırken günceller (bucket durumları korunur)
+
+        Args:
+            limits: Kapsam adı -> {"rate": saniyede token, "burst": kapasite}
+        """
+        with self._lock:
+            for scope, limit in limits.items():
+                bucket = self._buckets.get(scope)
+                if bucket is not None:
+                    bucket.configure(limit["rate"], limit["burst"])
+
+    def check(
+        self,
+        session_id: Optional[str],
+        customer_info: Optional[Dict[str, Any]]
+    ) -> Optional[Tuple[str, float]]:
+        """
+        İsteğin geçip geçemeyeceğini kontrol eder, geçerse token harcar
+
+        Reddedilen istek hiçbir bucket'tan token harcamaz.
+
+        Args:
+            session_id: Session ID (yeni session için None)
+            customer_info: Müşteri bilgileri
+
+        Returns:
+            None ise istek geçer; aksi halde (kapsam, bekleme süresi)
+        """
+        keys = [("global", "*")]
+        customer_key = customer_identity(customer_info)
+        if customer_key:
+            keys.append(("customer", customer_key))
+        if session_id:
+            keys.append(("session", session_id))
+
+        with self._lock:
+            now = self._clock()
+            if now >= self._next_sweep:
+                for bucket in self._buckets.values():
+                    bucket.evict_idle(now)
+                self._next_sweep = now + self._sweep_interval
+
+            for scope, key in keys:
+                wait = self._buckets[scope].peek(key, now)
+                if wait > 0:
+                    self.rejections[scope] += 1
+                    return scope, wait
+
+            for scope, key in keys:
+                self._buckets[scope].consume(key, now)
+        return None
+
+    def get_status(self) -> Dict[str, Any]:
+        """Bucket sayıları ve red istatistiklerini döndürür"""
+        with self._lock:
+            return {
+                "buckets": {scope: len(bucket) for scope, bucket in self._buckets.items()},
+                "rejections": dict(self.rejections)
+            }
+
+
+def customer_identity(customer_info: Optional[Dict[str, Any]]) -> Optional[str]:
+    """
+    customer_info içinden müşteriyi tanımlayan anahtarı çıkarır
+
+    Öncelik sırası: customer_id, phone (sadece rakamlar), email
+    """
+    if not customer_info:
+        return None
+    if customer_info.get("customer_id"):
+        return f"id:{customer_info['customer_id']}"
+    phone = re.sub(r"\D", "", str(customer_info.get("phone") or ""))
+    if phone:
+        return f"phone:{phone[-10:]}"
+    if customer_info.get("email"):
+        return f"email:{str(customer_info['email']).strip().lower()}"
+    return None
+
+
+def retry_after_header(wait_seconds: float) -> str:
+    """Bekleme süresini Retry-After başlığı için tam saniyeye yuvarlar"""
+    if math.isinf(wait_seconds):
+        return "3600"
+    return str(max(1, math.ceil(wait_seconds)))
@@ -0,0 +1,131 @@
+"""
+Session bazlı sıralı mesaj kutusu (mailbox)
+Aynı session'a gelen mesajlar geliş sırasıyla tek tek işlenir,
+farklı session'lar birbirini beklemeden paralel çalışır
+"""
+
+import asyncio
+import contextvars
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+Job = Tuple[Callable[[], Awaitable[Any]], asyncio.Future, contextvars.Context]
+
+
+class _Mailbox:
+    """Tek bir session'ın iş kuyruğu ve onu tüketen worker task"""
+
+    __slots__ = ("queue", "worker", "busy")
+
+    def __init__(self):
+        self.queue: "asyncio.Queue[Job]" = asyncio.Queue()
+        self.worker: Optional[asyncio.Task] = None
+        self.busy = False
+
+
+class SessionMailboxes:
+    """
+    Session başına actor benzeri iş kuyrukları
+
+    Her session için ilk mesajda bir worker task başlatılır. Worker
+    kuyruktaki işleri sırayla çalıştırır ve idle_seconds boyunca yeni
+    iş gelmezse kendini kaldırır. Sadece event loop içinden kullanılır.
+    """
+
+    def __init__(self, idle_seconds: float = 120):
+        """
+        Mailbox yöneticisini başlatır
+
+        Args:
+            idle_seconds: Boş mailbox'ın kaldırılmadan önce bekleyeceği süre
+        """
+        self.idle_seconds = idle_seconds
+        self._mailboxes: Dict[str, _Mailbox] = {}
+
+    def __len__(self) -> int:
+        return len(self._mailboxes)
+
+    async def submit(self, session_id: str, factory: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        İşi session'ın kuyruğuna ekler ve sırası gelip tamamlanınca sonucunu döndürür
+
+        Çağıran iptal edilse bile iş sırası geldiğinde çalıştırılır; böylece
+        session'a eklenen turn'lerin sırası bozulmaz. İş, worker'ın değil
+        çağıranın context'inde çalışır (ör. isteğin trace span'i).
+
+        Args:
+            session_id: Session ID
+            factory: İşi yapan coroutine'i üreten fonksiyon
+
+        Returns:
+            İşin sonucu
+        """
+        mailbox = self._mailboxes.get(session_id)
+        if mailbox is None:
+            mailbox = self._mailboxes[session_id] = _Mailbox()
+            mailbox.worker = asyncio.create_task(self._run(session_id, mailbox))
+
+        future = asyncio.get_running_loop().create_future()
+        mailbox.queue.put_nowait((factory, future, contextvars.copy_context()))
+        return await asyncio.shield(future)
+
+    def pending(self, session_id: str) -> int:
+        """Session kuyruğunda bekleyen iş sayısı"""
+        mailbox = self._mailboxes.get(session_id)
+        return mailbox.queue.qsize() if mailbox else 0
+
+    async def _run(self, session_id: str, mailbox: _Mailbox):
+        """Session kuyruğundaki işleri sırayla çalıştırır"""
+        while True:
+            try:
+                factory, future, context = await asyncio.wait_for(mailbox.queue.get(), self.idle_seconds)
+            except asyncio.TimeoutError:
+                # Kontrol ile silme arasında await yok; submit ile yarış oluşmaz
+                if mailbox.queue.empty():
+                    if self._mailboxes.get(session_id) is mailbox:
+                        del self._mailboxes[session_id]
+                    return
+                continue
+
+            mailbox.busy = True
+            try:
+                # Worker task'ı iptal edilirse beklenen iç task da iptal edilir
+                result = await context.run(lambda: asyncio.ensure_future(factory()))
+            except Exception as e:
+                if not future.done():
+                    # Worker frame'ini traceback'ten çıkar; çağıranın traceback
+                    # temizliği (frame.clear) çalışan worker'ı sonlandırmasın
+                    future.set_exception(e.with_traceback(e.__traceback__.tb_next))
+            else:
+                if not future.done():
+                    future.set_result(result)
+            finally:
+                mailbox.busy = False
+
+    def in_flight(self) -> int:
+        """Çalışan ve kuyrukta bekleyen toplam iş sayısı"""
+        return sum(mailbox.busy + mailbox.queue.qsize() for mailbox in self._mailboxes.values())
+
+    async def drain(self, timeout: float) -> bool:
+        """
+        Çalışan ve kuyrukta bekleyen işlerin bitmesini bekler
+
+        Args:
+            timeout: Azami bekleme süresi (saniye)
+
+        Returns:
+            Tüm işler süre dolmadan bittiyse True
+        """
+        deadline = asyncio.get_running_loop().time() + timeout
+        while self.in_flight():
+            if asyncio.get_running_loop().time() >= deadline:
+                return False
+            await asyncio.sleep(0.05)
+        return True
+
+    async def close(self):
+        """Tüm worker'ları durdurur"""
+        workers = [mailbox.worker for mailbox in self._mailboxes.values() if mailbox.worker]
+        for worker in workers:
+            worker.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+        self._mailboxes.clear()
@@ -3,13 +3,27 @@ Session Management for Human-in-the-Loop Chat System
 Maintains conversation state and enables human intervention capabilities
 """
 
+import asyncio
 import uuid
+import base64
+import heapq
+import os
+import sys
+import zlib
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any
-from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Any, Tuple
+from dataclasses import asdict, dataclass, field
 import threading
 import json
 
+from .config import ESCALATION_CONFIG, SESSION_CONFIG
+from .event_bus import EventBus
+from .session_stats import SessionStats
+from .text_utils import turkish_lower
+from .tracing import traced
+from .transcript_index import TranscriptIndex
+
 
 @dataclass
 class ConversationTurn:
@@ -41,30 +55,128 @@ class ConversationSession:
     escalation_reason: Optional[str] = None
 
 
+# Bellek tahmininde nesne, dict ve datetime yükü için sabit paylar (byte)
+SESSION_OVERHEAD_BYTES = 1000
+TURN_OVERHEAD_BYTES = 640
+
+SPILL_SUFFIX = ".session.z"
+
+
+def estimate_turn_size(turn: ConversationTurn) -> int:
+    """Bir turn'ün bellekte kapladığı yaklaşık byte sayısı"""
+    size = TURN_OVERHEAD_BYTES + sys.getsizeof(turn.user_message) + sys.getsizeof(turn.agent_response)
+    if turn.human_notes:
+        size += sys.getsizeof(turn.human_notes)
+    return size
+
+
+def estimate_session_size(session: ConversationSession) -> int:
+    """Session'ın turn'leriyle birlikte bellekte kapladığı yaklaşık byte sayısı"""
+    size = SESSION_OVERHEAD_BYTES + sum(estimate_turn_size(turn) for turn in session.turns)
+    for extra in (session.customer_info, session.session_metadata):
+        if extra:
+            size += 2 * len(json.dumps(extra, ensure_ascii=False, default=str))
+    return size
+
+
+def session_to_bytes(session: ConversationSession) -> bytes:
+    """Session'ı diske yazılacak sıkıştırılmış JSON'a çevirir"""
+    data = json.dumps(asdict(session), ensure_ascii=False, separators=(",", ":"), default=_json_default)
+    return zlib.compress(data.encode("utf-8"), 6)
+
+
+def session_from_bytes(payload: bytes) -> ConversationSession:
+    """session_to_bytes() çıktısından session'ı yeniden oluşturur"""
+    data = json.loads(zlib.decompress(payload).decode("utf-8"))
+    data["created_at"] = datetime.fromisoformat(data["created_at"])
+    data["last_activity"] = datetime.fromisoformat(data["last_activity"])
+    turns = []
+    for turn in data["turns"]:
+        turn["timestamp"] = datetime.fromisoformat(turn["timestamp"])
+        turns.append(ConversationTurn(**turn))
+    data["turns"] = turns
+    return ConversationSession(**data)
+
+
+def _json_default(value: Any) -> str:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+@dataclass
+class SpilledSession:
+    """Diske yazılmış session için bellekte kalan özet"""
+    created_at: datetime
+    last_activity: datetime
+    turn_count: int
+    disk_bytes: int
+
+
 class SessionManager:
     """Session yönetimi ve human-in-the-loop fonksiyonları"""
     
-    def __init__(self, session_timeout_minutes: int = 30):
+    def __init__(
+        self,
+        session_timeout_minutes: float = 30,
+        event_bus: EventBus = None,
+        max_resident_bytes: int = 0,
+        spill_dir: str = None,
+        spill_target_ratio: float = 0.9,
+        archiver: Any = None,
+        cleanup_interval_seconds: float = 0
+    ):
         """
         Session Manager'ı başlatır
         
         Args:
             session_timeout_minutes: Session timeout süresi (dakika)
+            event_bus: Session event'lerinin yayınlanacağı bus
+            max_resident_bytes: Bellekteki session'lar için yaklaşık üst sınır (0: sınırsız)
+            spill_dir: Sınır aşılınca session'ların yazılacağı dizin (process başına alt dizin açılır)
+            spill_target_ratio: Yazma sonrası hedeflenen doluluk oranı
+            archiver: Sona eren session'ların gönderileceği TranscriptArchiver
+            cleanup_interval_seconds: start() ile başlayan arka plan temizliğinin
+                aralığı (0: sadece cleanup_expired_sessions() ile)
         """
-        self.sessions: Dict[str, ConversationSession] = {}
+        # Bellekteki session'lar; en uzun süredir işlem görmeyen başta
+        self.sessions: "OrderedDict[str, ConversationSession]" = OrderedDict()
+        # Diske yazılmış session'ların özetleri
+        self._spilled: Dict[str, SpilledSession] = {}
+        self._session_bytes: Dict[str, int] = {}
+        self.resident_bytes = 0
+        self.max_resident_bytes = max_resident_bytes
+        self.spill_target_ratio = spill_target_ratio
+        # Aynı dizini paylaşan worker process'ler birbirinin dosyalarına dokunmaz
+        self.spill_dir = os.path.join(spill_dir, str(os.getpid())) if spill_dir else None
+        self.spills = 0
+        self.rehydrations = 0
+        self.spill_errors = 0
+        if spill_dir:
+            self._remove_stale_spill_dirs(spill_dir)
+        # Human intervention gerektiren aktif session'ların indeksi
+        self._requiring_human: Dict[str, ConversationSession] = {}
+        self.event_bus = event_bus or EventBus()
+        self.archiver = archiver
+        self.cleanup_interval = cleanup_interval_seconds
+        self._cleanup_task: Optional[asyncio.Task] = None
+        self._cleanup_loop_ref: Optional[asyncio.AbstractEventLoop] = None
+        self._cleanup_wakeup: Optional[asyncio.Event] = None
+        self.stats = SessionStats()
+        self.search_index = TranscriptIndex(turn_loader=self._turns_for_search)
         self.session_timeout = timedelta(minutes=session_timeout_minutes)
         self._lock = threading.RLock()
         
-        # Human intervention triggers
-        self.escalation_keywords = [
-            "şikayet", "çok kötü", "müdür", "hukuki", "mahkeme", 
-            "iptal", "kapatmak istiyorum", "berbat", "rezalet",
-            "memnun değilim", "insan", "temsilci", "operatör"
-        ]
+        # Session bazlı event dinleyicileri (ör. WebSocket bağlantıları)
+        self._listeners: Dict[str, List[Callable[[Dict[str, Any]], None]]] = {}
+        
+        # Human intervention triggers (RouterAgent ile ortak liste)
+        self.escalation_keywords = list(ESCALATION_CONFIG["keywords"])
         
         # Low confidence threshold for human intervention
-        self.low_confidence_threshold = 0.3
+        self.low_confidence_threshold = SESSION_CONFIG["low_confidence_threshold"]
     
+    @traced("session_manager.create_session")
     def create_session(self, customer_info: Dict[str, Any] = None) -> str:
         """
         Yeni bir session oluşturur
@@ -78,20 +190,66 @@ class SessionManager:
         session_id = str(uuid.uuid4())
         now = datetime.now()
         
+        session = ConversationSession(
+            session_id=session_id,
+            created_at=now,
+            last_activity=now,
+            customer_info=customer_info or {}
+        )
         with self._lock:
-            self.sessions[session_id] = ConversationSession(
-                session_id=session_id,
-                created_at=now,
-                last_activity=now,
-                customer_info=customer_info or {}
-            )
+            self.sessions[session_id] = session
+            self._account(session_id, estimate_session_size(session))
+            self.enforce_memory_limit(keep=session_id)
+        self.stats.record_session_created()
         
         print(f"🆕 Yeni session oluşturuldu: {session_id}")
         return session_id
     
+    @traced("session_manager.resolve_sessions")
+    def resolve_sessions(
+        self, requests: List[Tuple[Optional[str], Optional[Dict[str, Any]]]]
+    ) -> List[Tuple[Optional[str], bool]]:
+        """
+        Toplu istekler için session'ları tek lock alımında çözer veya oluşturur
+        
+        Args:
+            requests: (session_id veya None, müşteri bilgileri) listesi;
+                session_id verilmeyen her istek için yeni session açılır
+            
+        Returns:
+            İstek sırasıyla (session_id veya bulunamadıysa None, yeni oluşturuldu mu) listesi
+        """
+        resolved = []
+        created = 0
+        now = datetime.now()
+        
+        with self._lock:
+            for session_id, customer_info in requests:
+                if session_id:
+                    resolved.append((session_id if self.get_session(session_id) else None, False))
+                    continue
+                session = ConversationSession(
+                    session_id=str(uuid.uuid4()),
+                    created_at=now,
+                    last_activity=now,
+                    customer_info=customer_info or {}
+                )
+                self.sessions[session.session_id] = session
+                self._account(session.session_id, estimate_session_size(session))
+                resolved.append((session.session_id, True))
+                created += 1
+            self.enforce_memory_limit()
+        
+        for _ in range(created):
+            self.stats.record_session_created()
+        if created:
+            print(f"🆕 {created} yeni session toplu olarak oluşturuldu")
+        return resolved
+    
+    @traced("session_manager.get_session")
     def get_session(self, session_id: str) -> Optional[ConversationSession]:
         """
-        Session'ı getirir
+        Session'ı getirir; diske yazılmışsa belleğe geri yükler
         
         Args:
             session_id: Session ID
@@ -100,12 +258,18 @@ class SessionManager:
             ConversationSession veya None
         """
         with self._lock:
-            session = self.sessions.get(session_id)
-            if session and self._is_session_expired(session):
-                self._cleanup_session(session_id)
-                return None
-            return session
+            spilled = self._spilled.get(session_id)
+            if spilled and self._is_expired_at(spilled.last_activity):
+                ended = self._detach_session(session_id)
+            else:
+                session = self._resident_session(session_id)
+                if not session or not self._is_session_expired(session):
+                    return session
+                ended = self._detach_session(session_id)
+        self._finish_session(session_id, *ended)
+        return None
     
+    @traced("session_manager.add_conversation_turn")
     def add_conversation_turn(
         self, 
         session_id: str, 
@@ -113,7 +277,8 @@ class SessionManager:
         agent_response: str,
         category: str = None,
         agent_type: str = None,
-        confidence: float = None
+        confidence: float = None,
+        latency_ms: float = None
     ) -> str:
         """
         Session'a yeni bir konuşma turu ekler
@@ -125,6 +290,7 @@ class SessionManager:
             category: Tespit edilen kategori
             agent_type: Kullanılan agent türü
             confidence: Yanıt güven skoru
+            latency_ms: Yanıt üretim süresi (ms)
             
         Returns:
             Turn ID
@@ -149,20 +315,38 @@ class SessionManager:
             category=category,
             agent_type=agent_type,
             confidence=confidence,
-            requires_human=requires_human
+            requires_human=requires_human,
+            metadata={"latency_ms": latency_ms} if latency_ms is not None else {}
         )
         
         with self._lock:
+            # get_session() sonrası bellek sınırı nedeniyle diske yazılmış olabilir
+            session = self._resident_session(session_id) or session
             session.turns.append(turn)
+            turn_index = len(session.turns) - 1
             session.last_activity = now
+            self.sessions.move_to_end(session_id)
+            self._account(session_id, estimate_turn_size(turn))
+            newly_escalated = requires_human and not session.requires_human_intervention
             
             # Session seviyesinde human intervention işaretle
             if requires_human:
                 session.requires_human_intervention = True
+                self._requiring_human[session_id] = session
                 if confidence and confidence < self.low_confidence_threshold:
                     session.escalation_reason = "Düşük güven skoru"
                 elif self._contains_escalation_keywords(user_message):
-                    session.escalation_reason = "Müşteri escalation talep etti"
+                    session.escalation_reason = ESCALATION_CONFIG["reason"]
+            self.enforce_memory_limit(keep=session_id)
+        
+        self.stats.record_turn(category, latency_ms)
+        self.search_index.add_turn(session_id, turn, turn_index)
+        if newly_escalated:
+            self.stats.record_escalation()
+            self._notify_session(session_id, {
+                "event": "escalation",
+                "reason": session.escalation_reason
+            })
         
         print(f"🔄 Turn eklendi - Session: {session_id}, Turn: {turn_id}, Human: {requires_human}")
         return turn_id
@@ -183,12 +367,13 @@ class SessionManager:
             return []
         
         history = []
-        for turn in session.turns[-last_n_turns:]:
+        for turn in (session.turns[-last_n_turns:] if last_n_turns > 0 else []):
             history.append(f"Müşteri: {turn.user_message}")
             history.append(f"Sistem: {turn.agent_response}")
         
         return history
     
+    @traced("session_manager.get_context_for_agent")
     def get_context_for_agent(self, session_id: str) -> Dict[str, Any]:
         """
         Agent için context bilgilerini hazırlar
@@ -205,7 +390,7 @@ class SessionManager:
         
         return {
             "session_id": session_id,
-            "conversation_history": self.get_conversation_history(session_id, 5),
+            "conversation_history": self.get_conversation_history(session_id, SESSION_CONFIG["context_turns"]),
             "customer_info": session.customer_info,
             "session_duration": (datetime.now() - session.created_at).total_seconds() / 60,
             "turn_count": len(session.turns),
@@ -214,6 +399,7 @@ class SessionManager:
             "last_category": session.turns[-1].category if session.turns else None
         }
     
+    @traced("session_manager.mark_for_human_intervention")
     def mark_for_human_intervention(
         self, 
         session_id: str, 
@@ -226,7 +412,7 @@ class SessionManager:
         Args:
             session_id: Session ID
             reason: Escalation sebebi
-            human_agent_id: Human agent ID
+            human_agent_id: Human agent ID (None ise mevcut atama korunur)
             
         Returns:
             İşlem başarılı mı
@@ -236,13 +422,70 @@ class SessionManager:
             return False
         
         with self._lock:
+            session = self._resident_session(session_id) or session
+            newly_escalated = not session.requires_human_intervention
+            agent_joined = human_agent_id and human_agent_id != session.human_agent_id
             session.requires_human_intervention = True
             session.escalation_reason = reason
-            session.human_agent_id = human_agent_id
+            if human_agent_id is not None:
+                session.human_agent_id = human_agent_id
+            self._requiring_human[session_id] = session
+        
+        if newly_escalated:
+            self.stats.record_escalation()
+            self._notify_session(session_id, {"event": "escalation", "reason": reason})
+        if agent_joined:
+            self._notify_session(session_id, {
+                "event": "human_joined",
+                "human_agent_id": human_agent_id
+            })
         
         print(f"🚨 Human intervention - Session: {session_id}, Reason: {reason}")
         return True
     
+    def add_session_listener(self, session_id: str, callback: Callable[[Dict[str, Any]], None]):
+        """
+        Session'a ait server-side event'ler için dinleyici ekler
+        
+        Args:
+            session_id: Session ID
+            callback: Event sözlüğü ile çağrılacak fonksiyon
+        """
+        with self._lock:
+            self._listeners.setdefault(session_id, []).append(callback)
+    
+    def remove_session_listener(self, session_id: str, callback: Callable[[Dict[str, Any]], None]):
+        """Session dinleyicisini kaldırır"""
+        with self._lock:
+            listeners = self._listeners.get(session_id, [])
+            if callback in listeners:
+                listeners.remove(callback)
+            if not listeners:
+                self._listeners.pop(session_id, None)
+    
+    def _notify_session(self, session_id: str, event: Dict[str, Any]):
+        """Event'i bus'a yayınlar ve session dinleyicilerine gönderir"""
+        with self._lock:
+            listeners = list(self._listeners.get(session_id, []))
+            session = self.sessions.get(session_id)
+            category = session.turns[-1].category if session and session.turns else None
+        
+        payload = {key: value for key, value in event.items() if key != "event"}
+        offset = self.event_bus.publish(event["event"], {
+            "session_id": session_id, "category": category, **payload
+        })
+        event = {
+            "session_id": session_id,
+            "timestamp": datetime.now().isoformat(),
+            "offset": offset,
+            **event
+        }
+        for callback in listeners:
+            try:
+                callback(event)
+            except Exception as e:
+                print(f"⚠️ Session listener hatası - Session: {session_id}, Hata: {e}")
+    
     def get_sessions_requiring_human(self) -> List[ConversationSession]:
         """
         Human intervention gerektiren session'ları getirir
@@ -252,10 +495,85 @@ class SessionManager:
         """
         with self._lock:
             return [
-                session for session in self.sessions.values()
-                if session.requires_human_intervention and session.is_active
+                session for session in self._requiring_human.values()
+                if session.is_active
             ]
     
+    def list_sessions_requiring_human(
+        self,
+        limit: int = 50,
+        cursor: str = None,
+        category: str = None,
+        min_age_minutes: float = None,
+        max_age_minutes: float = None,
+        human_agent_id: str = None
+    ) -> Tuple[List[ConversationSession], Optional[str]]:
+        """
+        Human intervention gerektiren session'ları sayfalı olarak getirir
+        
+        Session'lar (created_at, session_id) sırasıyla döner. Tüm liste
+        kopyalanmaz, sadece istenen sayfa kadar session bellekte tutulur.
+        
+        Args:
+            limit: Sayfa boyutu
+            cursor: Önceki sayfanın döndürdüğü cursor
+            category: Son turn kategorisine göre filtre
+            min_age_minutes: Minimum session yaşı (dakika)
+            max_age_minutes: Maksimum session yaşı (dakika)
+            human_agent_id: Atanmış human agent'a göre filtre
+            
+        Returns:
+            (Session listesi, sonraki sayfa cursor'ı veya None)
+        """
+        after = self._decode_cursor(cursor) if cursor else None
+        now = datetime.now()
+        
+        def matches(session: ConversationSession) -> bool:
+            if not (session.requires_human_intervention and session.is_active):
+                return False
+            if after and (session.created_at, session.session_id) <= after:
+                return False
+            if category and (not session.turns or session.turns[-1].category != category):
+                return False
+            if human_agent_id and session.human_agent_id != human_agent_id:
+                return False
+            age_minutes = (now - session.created_at).total_seconds() / 60
+            if min_age_minutes is not None and age_minutes < min_age_minutes:
+                return False
+            if max_age_minutes is not None and age_minutes > max_age_minutes:
+                return False
+            return True
+        
+        with self._lock:
+            page = heapq.nsmallest(
+                limit + 1,
+                (session for session in self._requiring_human.values() if matches(session)),
+                key=lambda session: (session.created_at, session.session_id)
+            )
+        
+        next_cursor = None
+        if len(page) > limit:
+            page = page[:limit]
+            next_cursor = self._encode_cursor(page[-1])
+        
+        return page, next_cursor
+    
+    @staticmethod
+    def _encode_cursor(session: ConversationSession) -> str:
+        """Session sıralama anahtarını opak bir cursor'a çevirir"""
+        raw = f"{session.created_at.isoformat()}|{session.session_id}"
+        return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+    
+    @staticmethod
+    def _decode_cursor(cursor: str) -> Tuple[datetime, str]:
+        """Cursor'ı sıralama anahtarına çevirir"""
+        try:
+            raw = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8")
+            created_at, session_id = raw.split("|", 1)
+            return datetime.fromisoformat(created_at), session_id
+        except Exception:
+            raise ValueError(f"Geçersiz cursor: {cursor}")
+    
     def cleanup_expired_sessions(self) -> int:
         """
         Süresi dolmuş session'ları temizler
@@ -265,19 +583,68 @@ class SessionManager:
         """
         expired_sessions = []
         
+        # Lock altında sadece bellek durumu güncellenir; diskten okuma ve
+        # arşive gönderme lock dışında yapılır
         with self._lock:
             for session_id, session in self.sessions.items():
                 if self._is_session_expired(session):
                     expired_sessions.append(session_id)
+            for session_id, spilled in self._spilled.items():
+                if self._is_expired_at(spilled.last_activity):
+                    expired_sessions.append(session_id)
             
-            for session_id in expired_sessions:
-                self._cleanup_session(session_id)
+            ended = [self._detach_session(session_id) for session_id in expired_sessions]
+        
+        for session_id, (session, spilled) in zip(expired_sessions, ended):
+            self._finish_session(session_id, session, spilled)
         
         if expired_sessions:
             print(f"🧹 {len(expired_sessions)} expired session temizlendi")
         
         return len(expired_sessions)
     
+    def start(self):
+        """Süresi dolan session'ların periyodik temizliğini arka planda başlatır"""
+        self._cleanup_loop_ref = asyncio.get_running_loop()
+        self._cleanup_wakeup = asyncio.Event()
+        self._cleanup_task = asyncio.create_task(self._cleanup_loop())
+    
+    def set_cleanup_interval(self, seconds: float):
+        """
+        Temizlik aralığını çalışırken günceller; bekleyen tur yeni aralıkla yeniden başlar
+        
+        Args:
+            seconds: Yeni aralık (0: periyodik temizlik kapalı)
+        """
+        self.cleanup_interval = seconds
+        if self._cleanup_loop_ref is not None and self._cleanup_wakeup is not None:
+            self._cleanup_loop_ref.call_soon_threadsafe(self._cleanup_wakeup.set)
+    
+    async def stop(self):
+        """Arka plan temizliğini durdurur"""
+        if self._cleanup_task is not None:
+            self._cleanup_task.cancel()
+            await asyncio.gather(self._cleanup_task, return_exceptions=True)
+            self._cleanup_task = None
+            self._cleanup_loop_ref = None
+            self._cleanup_wakeup = None
+    
+    async def _cleanup_loop(self):
+        wakeup = self._cleanup_wakeup
+        while True:
+            try:
+                # Aralık 0 ise ayar değişene kadar beklenir
+                await asyncio.wait_for(wakeup.wait(), self.cleanup_interval or None)
+                wakeup.clear()
+                continue
+            except asyncio.TimeoutError:
+                pass
+            try:
+                # Diskteki session'ların okunması event loop'u bloklamasın
+                await asyncio.get_running_loop().run_in_executor(None, self.cleanup_expired_sessions)
+            except Exception as e:
+                print(f"❌ Session temizliği başarısız: {e}")
+    
     def _should_escalate_to_human(
         self, 
         user_message: str, 
@@ -299,20 +666,259 @@ class SessionManager:
     
     def _contains_escalation_keywords(self, message: str) -> bool:
         """Escalation keyword'leri kontrol eder"""
-        message_lower = message.lower()
+        message_lower = turkish_lower(message)
         return any(keyword in message_lower for keyword in self.escalation_keywords)
     
     def _is_session_expired(self, session: ConversationSession) -> bool:
         """Session'ın süresi dolmuş mu kontrol eder"""
-        return datetime.now() - session.last_activity > self.session_timeout
+        return self._is_expired_at(session.last_activity)
+    
+    def _is_expired_at(self, last_activity: datetime) -> bool:
+        return datetime.now() - last_activity > self.session_timeout
+    
+    def _detach_session(
+        self, session_id: str
+    ) -> Tuple[Optional[ConversationSession], Optional[SpilledSession]]:
+        """Session'ı bellekteki yapılardan ve arama indeksinden çıkarır (lock altında çağrılır)"""
+        session = self.sessions.pop(session_id, None)
+        spilled = self._spilled.pop(session_id, None)
+        self._account(session_id, -self._session_bytes.pop(session_id, 0))
+        self._requiring_human.pop(session_id, None)
+        self.search_index.remove_session(session_id)
+        if session:
+            session.is_active = False
+        return session, spilled
+    
+    def _finish_session(
+        self,
+        session_id: str,
+        session: Optional[ConversationSession],
+        spilled: Optional[SpilledSession]
+    ):
+        """Çıkarılan session'ın istatistiklerini kaydeder, dosyasını siler ve arşive gönderir (lock dışında)"""
+        if session:
+            self.stats.record_session_ended(
+                (session.last_activity - session.created_at).total_seconds(),
+                len(session.turns)
+            )
+        elif spilled:
+            if self.archiver:
+                session = self._load_spilled(session_id)
+            self._remove_spill_file(session_id)
+            self.stats.record_session_ended(
+                (spilled.last_activity - spilled.created_at).total_seconds(),
+                spilled.turn_count
+            )
+        if session and self.archiver:
+            self.archiver.submit(session, "expired")
+    
+    def get_memory_status(self) -> Dict[str, Any]:
+        """
+        Bellekteki ve diske yazılmış session sayılarını ve boyutlarını döndürür
+        
+        Returns:
+            Session bellek durumu sözlüğü
+        """
+        with self._lock:
+            return {
+                "max_resident_bytes": self.max_resident_bytes,
+                "resident_sessions": len(self.sessions),
+                "resident_bytes": self.resident_bytes,
+                "pinned_sessions": sum(1 for session_id in self.sessions if self._is_pinned(session_id)),
+                "spilled_sessions": len(self._spilled),
+                "spilled_bytes": sum(spilled.disk_bytes for spilled in self._spilled.values()),
+                "spills": self.spills,
+                "rehydrations": self.rehydrations,
+                "spill_errors": self.spill_errors
+            }
+    
+    def enforce_memory_limit(self, keep: str = None) -> int:
+        """
+        Bellek sınırı aşıldıysa en uzun süredir işlem görmeyen session'ları diske yazar
+        
+        Human intervention bekleyen ve dinleyicisi (WebSocket) olan session'lar
+        bellekte tutulur. Sınır aşıldığında boyut, sınırın spill_target_ratio
+        oranına inene kadar yazma yapılır.
+        
+        Args:
+            keep: Diske yazılmayacak session (o an işlem gören)
+            
+        Returns:
+            Diske yazılan session sayısı
+        """
+        with self._lock:
+            if not self.max_resident_bytes or not self.spill_dir or self.resident_bytes <= self.max_resident_bytes:
+                return 0
+            target = self.max_resident_bytes * self.spill_target_ratio
+            victims = []
+            freed = 0
+            for session_id in self.sessions:
+                if self.resident_bytes - freed <= target:
+                    break
+                if session_id == keep or self._is_pinned(session_id):
+                    continue
+                victims.append(session_id)
+                freed += self._session_bytes.get(session_id, 0)
+            
+            spilled = sum(1 for session_id in victims if self._spill(session_id))
+        if spilled:
+            print(f"💾 {spilled} session diske yazıldı - Bellekte: {self.resident_bytes} byte")
+        return spilled
+    
+    def _is_pinned(self, session_id: str) -> bool:
+        """Diske yazılmaması gereken session mı (lock altında çağrılır)"""
+        return session_id in self._requiring_human or session_id in self._listeners
     
-    def _cleanup_session(self, session_id: str):
-        """Session'ı temizler"""
+    def _account(self, session_id: str, delta: int):
+        """Session'ın bellek tahminini günceller (lock altında çağrılır)"""
         if session_id in self.sessions:
-            self.sessions[session_id].is_active = False
-            # İsteğe bağlı: Session'ı tamamen sil veya archive et
-            # del self.sessions[session_id]
+            self._session_bytes[session_id] = self._session_bytes.get(session_id, 0) + delta
+        self.resident_bytes += delta
+    
+    def _spill_path(self, session_id: str) -> str:
+        return os.path.join(self.spill_dir, session_id + SPILL_SUFFIX)
+    
+    def _spill(self, session_id: str) -> bool:
+        """Session'ı diske yazıp bellekten çıkarır (lock altında çağrılır)"""
+        session = self.sessions[session_id]
+        try:
+            payload = session_to_bytes(session)
+            os.makedirs(self.spill_dir, exist_ok=True)
+            with open(self._spill_path(session_id), "wb") as spill_file:
+                spill_file.write(payload)
+        except (OSError, TypeError, ValueError) as e:
+            self.spill_errors += 1
+            print(f"⚠️ Session diske yazılamadı - Session: {session_id}, Hata: {e}")
+            return False
+        
+        del self.sessions[session_id]
+        self.resident_bytes -= self._session_bytes.pop(session_id, 0)
+        self._spilled[session_id] = SpilledSession(
+            created_at=session.created_at,
+            last_activity=session.last_activity,
+            turn_count=len(session.turns),
+            disk_bytes=len(payload)
+        )
+        self.spills += 1
+        return True
+    
+    def _resident_session(self, session_id: str) -> Optional[ConversationSession]:
+        """Bellekteki session'ı döndürür; diske yazılmışsa geri yükler (lock altında çağrılır)"""
+        session = self.sessions.get(session_id)
+        if session is not None or session_id not in self._spilled:
+            return session
+        
+        spilled = self._spilled.pop(session_id)
+        session = self._load_spilled(session_id)
+        if session is None:
+            self.stats.record_session_ended(
+                (spilled.last_activity - spilled.created_at).total_seconds(), spilled.turn_count
+            )
+            return None
+        self._remove_spill_file(session_id)
+        
+        self.sessions[session_id] = session
+        self._account(session_id, estimate_session_size(session))
+        self.rehydrations += 1
+        self.enforce_memory_limit(keep=session_id)
+        return session
+    
+    def _load_spilled(self, session_id: str) -> Optional[ConversationSession]:
+        """Diske yazılmış session'ı okur; okunamazsa None"""
+        try:
+            with open(self._spill_path(session_id), "rb") as spill_file:
+                return session_from_bytes(spill_file.read())
+        except (OSError, ValueError, TypeError, KeyError, zlib.error) as e:
+            self.spill_errors += 1
+            print(f"❌ Session diskten yüklenemedi - Session: {session_id}, Hata: {e}")
+            return None
+    
+    def _turns_for_search(self, session_id: str) -> Optional[List[ConversationTurn]]:
+        """
+        Arama sonuçları için session'ın turn'lerini döndürür
+
+        Diske yazılmış session geri yüklenmez; dosya lock dışında sadece okunur
+        """
+        with self._lock:
+            session = self.sessions.get(session_id)
+            if session is not None:
+                return list(session.turns)
+            if session_id not in self._spilled:
+                return None
+            path = self._spill_path(session_id)
+        try:
+            with open(path, "rb") as spill_file:
+                return session_from_bytes(spill_file.read()).turns
+        except (OSError, ValueError, TypeError, KeyError, zlib.error):
+            # Bu arada geri yüklenmiş veya silinmiş olabilir
+            with self._lock:
+                session = self.sessions.get(session_id)
+                return list(session.turns) if session is not None else None
+    
+    def _remove_spill_file(self, session_id: str):
+        try:
+            os.remove(self._spill_path(session_id))
+        except OSError:
+            pass
+    
+    def close(self):
+        """
+        Session'lar process ile birlikte sonlanır: arşivleyici tanımlıysa bellekteki
+        ve diskteki tüm session'lar arşive gönderilir, diske yazılmış dosyalar silinir
+        """
+        with self._lock:
+            if self.archiver:
+                for session in self.sessions.values():
+                    self.archiver.submit(session, "shutdown", block=True)
+                for session_id in self._spilled:
+                    session = self._load_spilled(session_id)
+                    if session:
+                        self.archiver.submit(session, "shutdown", block=True)
+            if self.spill_dir:
+                _remove_spill_dir(self.spill_dir)
+            for session in self.sessions.values():
+                session.is_active = False
+            self.sessions.clear()
+            self._spilled.clear()
+            self._session_bytes.clear()
+            self._requiring_human.clear()
+            self.resident_bytes = 0
+    
+    def _remove_stale_spill_dirs(self, root: str):
+        """Sonlanmış process'lerden kalan session dizinlerini siler"""
+        if not os.path.isdir(root):
+            return
+        for name in os.listdir(root):
+            if name.isdigit() and (int(name) == os.getpid() or not _process_alive(int(name))):
+                _remove_spill_dir(os.path.join(root, name))
+
+
+def _process_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        return True
+    return True
+
+
+def _remove_spill_dir(path: str):
+    """Dizindeki session dosyalarını ve boşalan dizini siler"""
+    try:
+        for name in os.listdir(path):
+            if name.endswith(SPILL_SUFFIX):
+                os.remove(os.path.join(path, name))
+        os.rmdir(path)
+    except OSError:
+        pass
 
 
 # Global session manager instance
-session_manager = SessionManager()
+session_manager = SessionManager(
+    session_timeout_minutes=SESSION_CONFIG["timeout_minutes"],
+    max_resident_bytes=SESSION_CONFIG["max_resident_bytes"],
+    spill_dir=SESSION_CONFIG["spill_dir"],
+    spill_target_ratio=SESSION_CONFIG["spill_target_ratio"],
+    cleanup_interval_seconds=SESSION_CONFIG["cleanup_interval_seconds"]
+)
@@ -0,0 +1,200 @@
+"""
+Operasyonel istatistikler
+SessionManager olaylarından artımlı olarak güncellenen sayaçlar,
+zaman pencereli toplamlar ve LLM gecikme histogramı
+"""
+
+import math
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+# Zaman pencereleri (dakika)
+WINDOWS = {"5m": 5, "1h": 60, "24h": 1440}
+
+# Gecikme histogramı: 1 ms'den ~10 dakikaya logaritmik bucket'lar
+LATENCY_MIN_MS = 1.0
+LATENCY_GROWTH = 1.2
+LATENCY_BUCKETS = 75
+
+
+def _latency_bucket(latency_ms: float) -> int:
+    """Gecikme değerinin düştüğü bucket indeksini hesaplar"""
+    if latency_ms <= LATENCY_MIN_MS:
+        return 0
+    index = int(math.log(latency_ms / LATENCY_MIN_MS, LATENCY_GROWTH)) + 1
+    return min(index, LATENCY_BUCKETS - 1)
+
+
+def _bucket_upper_bound(index: int) -> float:
+    """Bucket'ın üst sınırını (ms) döndürür"""
+    return LATENCY_MIN_MS * (LATENCY_GROWTH ** index)
+
+
+class _Aggregate:
+    """Toplanıp çıkarılabilen sayaç kümesi"""
+
+    __slots__ = (
+        "sessions_created", "sessions_ended", "turns", "escalations",
+        "duration_seconds", "ended_turns", "categories", "latency"
+    )
+
+    def __init__(self):
+        self.sessions_created = 0
+        self.sessions_ended = 0
+        self.turns = 0
+        self.escalations = 0
+        self.duration_seconds = 0.0
+        self.ended_turns = 0
+        self.categories: Dict[str, int] = {}
+        self.latency: List[int] = [0] * LATENCY_BUCKETS
+
+    def add(self, other: "_Aggregate", sign: int = 1):
+        """Başka bir aggregate'i ekler (sign=-1 ile çıkarır)"""
+        self.sessions_created += sign * other.sessions_created
+        self.sessions_ended += sign * other.sessions_ended
+        self.turns += sign * other.turns
+        self.escalations += sign * other.escalations
+        self.duration_seconds += sign * other.duration_seconds
+        self.ended_turns += sign * other.ended_turns
+        for category, count in other.categories.items():
+            self.categories[category] = self.categories.get(category, 0) + sign * count
+            if not self.categories[category]:
+                del self.categories[category]
+        if any(other.latency):
+            self.latency = [a + sign * b for a, b in zip(self.latency, other.latency)]
+
+    def percentile(self, p: float) -> Optional[float]:
+        """Histogramdan yaklaşık yüzdelik değeri (ms) hesaplar"""
+        total = sum(self.latency)
+        if not total:
+            return None
+        threshold = total * p
+        cumulative = 0
+        for index, count in enumerate(self.latency):
+            cumulative += count
+            if cumulative >= threshold:
+                return round(_bucket_upper_bound(index), 1)
+        return round(_bucket_upper_bound(LATENCY_BUCKETS - 1), 1)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Aggregate'i API yanıtına çevirir"""
+        return {
+            "sessions_created": self.sessions_created,
+            "sessions_ended": self.sessions_ended,
+            "turns": self.turns,
+            "turns_by_category": dict(self.categories),
+            "escalations": self.escalations,
+            "escalation_rate": round(self.escalations / self.sessions_created, 4)
+            if self.sessions_created else 0.0,
+            "avg_turns_per_session": round(self.ended_turns / self.sessions_ended, 2)
+            if self.sessions_ended else None,
+            "avg_session_duration_minutes": round(self.duration_seconds / self.sessions_ended / 60, 2)
+            if self.sessions_ended else None,
+            "llm_latency_ms": {
+                "p50": self.percentile(0.50),
+                "p95": self.percentile(0.95),
+                "p99": self.percentile(0.99)
+            }
+        }
+
+
+class SessionStats:
+    """
+    Artımlı olarak güncellenen operasyonel istatistikler
+
+    Her dakika için bir bucket tutulur (24 saatlik halka). Her pencere için
+    ayrıca çalışan toplam saklanır; dakika ilerledikçe pencereden çıkan
+    bucket toplamdan düşülür. Böylece okuma maliyeti session veya turn
+    sayısından bağımsızdır.
+    """
+
+    def __init__(self, clock=time.time):
+        """
+        İstatistikleri başlatır
+
+        Args:
+            clock: Saniye cinsinden zaman döndüren fonksiyon (test için)
+        """
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._slots_count = max(WINDOWS.values())
+        self._slots = [_Aggregate() for _ in range(self._slots_count)]
+        self._windows = {name: _Aggregate() for name in WINDOWS}
+        self._totals = _Aggregate()
+        self._current_minute = int(self._clock() // 60)
+        self.active_sessions = 0
+
+    def record_session_created(self):
+        """Yeni session oluşturulduğunu kaydeder"""
+        with self._lock:
+            self.active_sessions += 1
+            self._apply(lambda agg: setattr(agg, "sessions_created", agg.sessions_created + 1))
+
+    def record_turn(self, category: Optional[str], latency_ms: Optional[float] = None):
+        """Eklenen konuşma turunu kaydeder"""
+        category = category or "bilinmiyor"
+        bucket = _latency_bucket(latency_ms) if latency_ms is not None else None
+
+        def update(agg: _Aggregate):
+            agg.turns += 1
+            agg.categories[category] = agg.categories.get(category, 0) + 1
+            if bucket is not None:
+                agg.latency[bucket] += 1
+
+        with self._lock:
+            self._apply(update)
+
+    def record_escalation(self):
+        """Session'ın human intervention için işaretlendiğini kaydeder"""
+        with self._lock:
+            self._apply(lambda agg: setattr(agg, "escalations", agg.escalations + 1))
+
+    def record_session_ended(self, duration_seconds: float, turn_count: int):
+        """Süresi dolan session'ı kaydeder"""
+        def update(agg: _Aggregate):
+            agg.sessions_ended += 1
+            agg.duration_seconds += duration_seconds
+            agg.ended_turns += turn_count
+
+        with self._lock:
+            self.active_sessions = max(0, self.active_sessions - 1)
+            self._apply(update)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Toplam ve pencereli istatistikleri döndürür"""
+        with self._lock:
+            self._advance()
+            return {
+                "active_sessions": self.active_sessions,
+                "totals": self._totals.to_dict(),
+                "windows": {name: agg.to_dict() for name, agg in self._windows.items()}
+            }
+
+    def _apply(self, update):
+        """Güncellemeyi geçerli dakika bucket'ına, pencerelere ve toplama uygular"""
+        self._advance()
+        update(self._slots[self._current_minute % self._slots_count])
+        update(self._totals)
+        for agg in self._windows.values():
+            update(agg)
+
+    def _advance(self):
+        """Geçen dakikalar için pencerelerden çıkan bucket'ları düşer"""
+        now_minute = int(self._clock() // 60)
+        elapsed = now_minute - self._current_minute
+        if elapsed <= 0:
+            return
+
+        if elapsed >= self._slots_count:
+            self._slots = [_Aggregate() for _ in range(self._slots_count)]
+            self._windows = {name: _Aggregate() for name in WINDOWS}
+            self._current_minute = now_minute
+            return
+
+        for _ in range(elapsed):
+            self._current_minute += 1
+            for name, minutes in WINDOWS.items():
+                expired = self._slots[(self._current_minute - minutes) % self._slots_count]
+                self._windows[name].add(expired, sign=-1)
+            self._slots[self._current_minute % self._slots_count] = _Aggregate()
@@ -0,0 +1,387 @@
+"""
+Tipli çalışma zamanı ayarları
+config.py'deki ayar bölümleri bu modüldeki SettingsSection dataclass'ları
+olarak tanımlanır. Değerler dosya ve ortam değişkenleriyle ezilebilir,
+tiplerine göre doğrulanır; güvenli ayarlar çalışırken yeniden yüklenebilir.
+"""
+
+import dataclasses
+import json
+import os
+import threading
+import typing
+from typing import Any, Callable, ClassVar, Dict, List, Mapping, Optional, Tuple
+
+# Ortam değişkeni adları: SUPPORTFLOW_<BÖLÜM>_<AYAR> (ör. SUPPORTFLOW_OLLAMA_BASE_URL)
+ENV_PREFIX = "SUPPORTFLOW_"
+# JSON ayar dosyasının yolunu veren ortam değişkeni ({"bölüm": {"ayar": değer}})
+SETTINGS_FILE_ENV = "SUPPORTFLOW_SETTINGS_FILE"
+
+_TRUE_VALUES = {"1", "true", "yes", "on", "evet"}
+_FALSE_VALUES = {"0", "false", "no", "off", "hayır"}
+
+
+class SettingsError(ValueError):
+    """Geçersiz ayar değeri veya yeniden yüklenemeyen ayar değişikliği"""
+
+
+def setting(
+    default: Any = dataclasses.MISSING,
+    *,
+    default_factory: Callable[[], Any] = dataclasses.MISSING,
+    minimum: Optional[float] = None,
+    maximum: Optional[float] = None,
+    reloadable: bool = False,
+    env: Optional[str] = None,
+    secret: bool = False,
+    check: Optional[Callable[[Any], None]] = None
+) -> Any:
+    """
+    Ayar alanı tanımlar
+
+    Args:
+        default: Varsayılan değer
+        default_factory: Değiştirilebilir varsayılanlar (liste, dict) için üretici
+        minimum: Sayısal değerlerin alt sınırı
+        maximum: Sayısal değerlerin üst sınırı
+        reloadable: Çalışırken güvenle değiştirilebilir mi
+        env: Standart adın yanında kabul edilen ortam değişkeni adı
+        secret: Değer /admin/settings çıktısında gizlenir
+        check: Tip dönüşümünden sonra çağrılan ek doğrulama (SettingsError fırlatır)
+    """
+    metadata = {
+        "minimum": minimum, "maximum": maximum, "reloadable": reloadable,
+        "env": env, "secret": secret, "check": check
+    }
+    return dataclasses.field(default=default, default_factory=default_factory, metadata=metadata)
+
+
+def _parse_bool(value: Any) -> bool:
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, str) and value.strip().lower() in _TRUE_VALUES | _FALSE_VALUES:
+        return value.strip().lower() in _TRUE_VALUES
+    raise SettingsError(f"bool bekleniyordu: {value!r}")
+
+
+def _coerce(value: Any, annotation: Any) -> Any:
+    """Değeri tip açıklamasına dönüştürür; ortam değişkeni metinleri de ayrıştırılır"""
+    origin = typing.get_origin(annotation)
+    args = typing.get_args(annotation)
+
+    if origin is typing.Union:
+        # Optional[X]
+        if value is None or (isinstance(value, str) and value.strip().lower() in ("", "none", "null")):
+            return None
+        inner = [arg for arg in args if arg is not type(None)]
+        return _coerce(value, inner[0])
+
+    if annotation is Any:
+        return value
+    if annotation is bool:
+        return _parse_bool(value)
+    if annotation is str:
+        if not isinstance(value, str):
+            raise SettingsError(f"metin bekleniyordu: {value!r}")
+        return value
+    if annotation in (int, float):
+        if isinstance(value, bool):
+            raise SettingsError(f"sayı bekleniyordu: {value!r}")
+        if isinstance(value, str):
+            try:
+                value = annotation(value.strip()) if annotation is float else int(value.strip())
+            except ValueError:
+                raise SettingsError(f"sayı bekleniyordu: {value!r}")
+        if annotation is int and (not isinstance(value, int) and not (isinstance(value, float) and value.is_integer())):
+            raise SettingsError(f"tam sayı bekleniyordu: {value!r}")
+        if not isinstance(value, (int, float)):
+            raise SettingsError(f"sayı bekleniyordu: {value!r}")
+        return annotation(value)
+
+    # Koleksiyonlar ortam değişkeninde JSON olarak verilir
+    if isinstance(value, str) and origin in (list, tuple, dict):
+        try:
+            value = json.loads(value)
+        except json.JSONDecodeError:
+            raise SettingsError(f"JSON bekleniyordu: {value!r}")
+    if origin is list:
+        if not isinstance(value, (list, tuple)):
+            raise SettingsError(f"liste bekleniyordu: {value!r}")
+        return [_coerce(item, args[0]) for item in value]
+    if origin is tuple:
+        if not isinstance(value, (list, tuple)) or len(value) != len(args):
+            raise SettingsError(f"{len(args)} elemanlı liste bekleniyordu: {value!r}")
+        return tuple(_coerce(item, arg) for item, arg in zip(value, args))
+    if origin is dict:
+        if not isinstance(value, dict):
+            raise SettingsError(f"nesne bekleniyordu: {value!r}")
+        return {_coerce(k, args[0]): _coerce(v, args[1]) for k, v in value.items()}
+    raise SettingsError(f"desteklenmeyen ayar tipi: {annotation}")
+
+
+def _check_bounds(value: Any, minimum: Optional[float], maximum: Optional[float]):
+    """Sayıların (dict/tuple içindekiler dahil) sınırlar içinde olduğunu doğrular"""
+    if isinstance(value, dict):
+        for item in value.values():
+            _check_bounds(item, minimum, maximum)
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            _check_bounds(item, minimum, maximum)
+    elif isinstance(value, (int, float)) and not isinstance(value, bool):
+        if minimum is not None and value < minimum:
+            raise SettingsError(f"en az {minimum} olmalı: {value}")
+        if maximum is not None and value > maximum:
+            raise SettingsError(f"en fazla {maximum} olabilir: {value}")
+
+
+class SettingsSection:
+    """
+    Ayar bölümü tabanı (alt sınıflar dataclass olarak tanımlanır)
+
+    Mevcut kod ayarlara dict gibi eriştiği için (OLLAMA_CONFIG["base_url"])
+    bölümler okuma/yazma için dict arayüzü de sağlar; yazılan değerler
+    doğrulanır.
+    """
+
+    # Ortam değişkeni ve ayar dosyasında kullanılan bölüm adı
+    section_name: ClassVar[str] = ""
+
+    def __post_init__(self):
+        for name in self.keys():
+            object.__setattr__(self, name, self.validate(name, getattr(self, name)))
+
+    @classmethod
+    def fields(cls) -> Dict[str, dataclasses.Field]:
+        return {field.name: field for field in dataclasses.fields(cls)}
+
+    @classmethod
+    def validate(cls, key: str, value: Any) -> Any:
+        """
+        Değeri alanın tipine dönüştürür ve sınırlarını kontrol eder
+
+        Raises:
+            SettingsError: Ayar yoksa veya değer geçersizse
+        """
+        field = cls.fields().get(key)
+        if field is None:
+            raise SettingsError(f"Bilinmeyen ayar: {cls.section_name}.{key}")
+        annotation = typing.get_type_hints(cls)[key]
+        try:
+            value = _coerce(value, annotation)
+            _check_bounds(value, field.metadata.get("minimum"), field.metadata.get("maximum"))
+            if field.metadata.get("check"):
+                field.metadata["check"](value)
+        except SettingsError as e:
+            raise SettingsError(f"{cls.section_name}.{key}: {e}")
+        return value
+
+    @classmethod
+    def env_names(cls, key: str) -> List[str]:
+        """Ayarı ezen ortam değişkenleri (öncelik sırasıyla)"""
+        names = [f"{ENV_PREFIX}{cls.section_name}_{key}".upper()]
+        alias = cls.fields()[key].metadata.get("env")
+        if alias:
+            names.append(alias)
+        return names
+
+    @classmethod
+    def is_reloadable(cls, key: str) -> bool:
+        return bool(cls.fields()[key].metadata.get("reloadable"))
+
+    def keys(self) -> List[str]:
+        return list(self.fields())
+
+    def items(self) -> List[Tuple[str, Any]]:
+        return [(key, getattr(self, key)) for key in self.keys()]
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return getattr(self, key) if key in self.fields() else default
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.fields()
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in self.fields():
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __setitem__(self, key: str, value: Any):
+        setattr(self, key, self.validate(key, value))
+
+
+class Settings:
+    """
+    Tüm ayar bölümlerinin kaydı
+
+    Öncelik: varsayılan < ayar dosyası < ortam değişkeni < çalışırken
+    yapılan değişiklik. Değişiklikler bölüm nesnelerine yerinde uygulanır;
+    ayarı her kullanımda okuyan kod yeni değeri hemen görür. Değeri
+    oluşturulurken kopyalayan nesneler bind()/subscribe() ile güncellenir.
+    """
+
+    def __init__(self, sections: Mapping[str, SettingsSection]):
+        """
+        Kaydı başlatır
+
+        Args:
+            sections: Bölüm adı -> bölüm nesnesi
+        """
+        self.sections: Dict[str, SettingsSection] = dict(sections)
+        self._defaults = {name: dict(section.items()) for name, section in self.sections.items()}
+        self._listeners: Dict[str, Tuple[str, Callable[[Dict[str, Any]], None]]] = {}
+        self._lock = threading.Lock()
+        self.reloads = 0
+
+    def load_overrides(self, environ: Mapping[str, str] = os.environ):
+        """
+        Başlangıçta ayar dosyası ve ortam değişkeni değerlerini uygular
+
+        Raises:
+            SettingsError: Dosya okunamazsa veya bir değer geçersizse
+        """
+        for name, values in self._resolve(environ).items():
+            for key, value in values.items():
+                setattr(self.sections[name], key, value)
+
+    def update(self, changes: Mapping[str, Mapping[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """
+        Çalışırken ayar değiştirir; önce tüm değerler doğrulanır, hata varsa hiçbiri uygulanmaz
+
+        Args:
+            changes: Bölüm adı -> {ayar: yeni değer}
+
+        Returns:
+            Gerçekten değişen ayarlar
+
+        Raises:
+            SettingsError: Bilinmeyen bölüm/ayar, geçersiz değer veya yeniden başlatma gerektiren ayar
+        """
+        validated: Dict[str, Dict[str, Any]] = {}
+        for name, values in changes.items():
+            section = self.sections.get(name)
+            if section is None:
+                raise SettingsError(f"Bilinmeyen ayar bölümü: {name}")
+            if not isinstance(values, Mapping):
+                raise SettingsError(f"{name}: ayarlar nesne olarak verilmeli")
+            for key, value in values.items():
+                value = section.validate(key, value)
+                if value == getattr(section, key):
+                    continue
+                if not section.is_reloadable(key):
+                    raise SettingsError(f"{name}.{key} çalışırken değiştirilemez, yeniden başlatma gerekir")
+                validated.setdefault(name, {})[key] = value
+
+        with self._lock:
+            for name, values in validated.items():
+                for key, value in values.items():
+                    setattr(self.sections[name], key, value)
+            listeners = [
+                (name, callback) for name, callback in self._listeners.values() if name in validated
+            ]
+        for name, callback in listeners:
+            try:
+                callback(validated[name])
+            except Exception as e:
+                print(f"⚠️ Ayar değişikliği uygulanamadı ({name}): {e}")
+        return validated
+
+    def reload(self, environ: Mapping[str, str] = os.environ) -> Dict[str, Any]:
+        """
+        Ayar dosyasını ve ortam değişkenlerini yeniden okuyup güvenli ayarları uygular
+
+        Returns:
+            {"changed": değişen ayarlar, "requires_restart": sadece yeniden başlatmayla geçerli olacaklar}
+        """
+        resolved = self._resolve(environ)
+        reloadable: Dict[str, Dict[str, Any]] = {}
+        requires_restart: List[str] = []
+        for name, section in self.sections.items():
+            for key in section.keys():
+                value = resolved.get(name, {}).get(key, self._defaults[name][key])
+                if value == getattr(section, key):
+                    continue
+                if section.is_reloadable(key):
+                    reloadable.setdefault(name, {})[key] = value
+                else:
+                    requires_restart.append(f"{name}.{key}")
+
+        changed = self.update(reloadable)
+        self.reloads += 1
+        return {"changed": changed, "requires_restart": requires_restart}
+
+    def subscribe(self, listener_id: str, section: str, callback: Callable[[Dict[str, Any]], None]):
+        """
+        Bölümdeki ayarlar değiştiğinde çağrılacak fonksiyonu kaydeder
+
+        Aynı listener_id ile tekrar kayıt öncekinin yerine geçer.
+
+        Args:
+            listener_id: Dinleyici adı
+            section: Bölüm adı
+            callback: Değişen {ayar: değer} ile çağrılır
+        """
+        if section not in self.sections:
+            raise SettingsError(f"Bilinmeyen ayar bölümü: {section}")
+        with self._lock:
+            self._listeners[listener_id] = (section, callback)
+
+    def bind(self, listener_id: str, section: str, target: Any, attributes: Mapping[str, str]):
+        """
+        Ayar değiştiğinde nesnenin ilgili özelliğini günceller
+
+        Args:
+            listener_id: Dinleyici adı
+            section: Bölüm adı
+            target: Güncellenecek nesne
+            attributes: Ayar adı -> nesne özelliği adı
+        """
+        def apply(changed: Dict[str, Any]):
+            for key, attribute in attributes.items():
+                if key in changed:
+                    setattr(target, attribute, changed[key])
+        self.subscribe(listener_id, section, apply)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Tüm ayarların güncel değerleri ve yeniden yüklenebilirlikleri (gizli değerler maskeli)"""
+        result: Dict[str, Dict[str, Any]] = {}
+        for name, section in self.sections.items():
+            result[name] = {}
+            for key, field in section.fields().items():
+                value = getattr(section, key)
+                if field.metadata.get("secret") and value is not None:
+                    value = "***"
+                result[name][key] = {"value": value, "reloadable": section.is_reloadable(key)}
+        return result
+
+    def _resolve(self, environ: Mapping[str, str]) -> Dict[str, Dict[str, Any]]:
+        """Dosya ve ortam değişkenlerinden gelen, doğrulanmış değerler"""
+        resolved: Dict[str, Dict[str, Any]] = {}
+
+        path = environ.get(SETTINGS_FILE_ENV)
+        if path:
+            try:
+                with open(path, encoding="utf-8") as f:
+                    data = json.load(f)
+            except (OSError, json.JSONDecodeError) as e:
+                raise SettingsError(f"Ayar dosyası okunamadı ({path}): {e}")
+            if not isinstance(data, dict):
+                raise SettingsError(f"Ayar dosyası bölüm nesnesi içermeli: {path}")
+            for name, values in data.items():
+                section = self.sections.get(name)
+                if section is None:
+                    raise SettingsError(f"Bilinmeyen ayar bölümü: {name}")
+                if not isinstance(values, dict):
+                    raise SettingsError(f"{name}: ayarlar nesne olarak verilmeli")
+                for key, value in values.items():
+                    resolved.setdefault(name, {})[key] = section.validate(key, value)
+
+        for name, section in self.sections.items():
+            for key in section.keys():
+                for env_name in section.env_names(key):
+                    if env_name in environ:
+                        resolved.setdefault(name, {})[key] = section.validate(key, environ[env_name])
+                        break
+        return resolved
@@ -0,0 +1,265 @@
+"""
+Agent paneli statik dosyalarının bellekten servis edilmesi
+Dosyalar başlangıçta bir kez okunur; gzip (ve kuruluysa brotli) varyantları
+önceden hazırlanır, güçlü ETag'lerle koşullu isteklere 304 döner
+"""
+
+import gzip
+import hashlib
+import os
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from starlette.requests import Request
+from starlette.responses import Response
+
+from .config import STATIC_ASSETS_CONFIG
+
+try:
+    import brotli
+except ImportError:  # brotli opsiyoneldir, yoksa sadece gzip hazırlanır
+    brotli = None
+
+# Servis edilen uzantılar ve içerik tipleri
+_CONTENT_TYPES = {
+    ".html": "text/html; charset=utf-8",
+    ".css": "text/css; charset=utf-8",
+    ".js": "application/javascript; charset=utf-8",
+    ".json": "application/json",
+    ".svg": "image/svg+xml",
+    ".png": "image/png",
+    ".ico": "image/x-icon",
+}
+# Sıkıştırmanın fayda sağladığı uzantılar
+_COMPRESSIBLE = {".html", ".css", ".js", ".json", ".svg"}
+# Tercih sırası: en küçük çıktıdan sıkıştırmasıza
+_ENCODING_PREFERENCE = ("br", "gzip", "identity")
+
+
+class _Asset:
+    """Tek bir dosyanın bellekteki varyantları"""
+
+    __slots__ = ("name", "hashed_name", "content_type", "variants", "etags")
+
+    def __init__(self, name: str, hashed_name: Optional[str], content_type: str, body: bytes, min_compress_bytes: int):
+        self.name = name
+        self.hashed_name = hashed_name
+        self.content_type = content_type
+        digest = hashlib.sha256(body).hexdigest()[:20]
+        self.variants: Dict[str, bytes] = {"identity": body}
+        self.etags: Dict[str, str] = {"identity": f'"{digest}"'}
+
+        if os.path.splitext(name)[1] in _COMPRESSIBLE and len(body) >= min_compress_bytes:
+            compressed = {"gzip": gzip.compress(body, compresslevel=9, mtime=0)}
+            if brotli is not None:
+                compressed["br"] = brotli.compress(body, quality=11)
+            for encoding, data in compressed.items():
+                # Sadece gerçekten küçülen varyantlar saklanır
+                if len(data) < len(body):
+                    self.variants[encoding] = data
+                    self.etags[encoding] = f'"{digest}-{encoding}"'
+
+
+def _hashed_name(name: str, body: bytes) -> str:
+    """styles.css -> styles.<içerik hash'i>.css"""
+    stem, ext = os.path.splitext(name)
+    return f"{stem}.{hashlib.sha256(body).hexdigest()[:10]}{ext}"
+
+
+def _accepted_encodings(header: Optional[str]) -> Dict[str, float]:
+    """Accept-Encoding başlığını encoding -> q değerine çevirir"""
+    accepted: Dict[str, float] = {}
+    for part in (header or "").split(","):
+        coding, _, params = part.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[coding] = q
+    return accepted
+
+
+def _etag_matches(header: Optional[str], etags) -> bool:
+    """If-None-Match başlığındaki (weak karşılaştırmalı) etiketlerden biri eşleşiyor mu"""
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    candidates = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    return any(etag in candidates for etag in etags)
+
+
+class StaticAssetCache:
+    """
+    Bellekte tutulan, önceden sıkıştırılmış statik dosya önbelleği
+
+    HTML dışındaki dosyalar ayrıca içerik hash'li adla da servis edilir
+    ve HTML içindeki referanslar bu adlara çevrilir. Hash'li adlar hiç
+    değişmeyeceği için uzun süreli (immutable) önbelleğe alınabilir;
+    sabit adlar her seferinde ETag ile doğrulanır.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        hashed_url_prefix: str = "/static/",
+        reload_check_seconds: float = 0,
+        min_compress_bytes: int = 512,
+        immutable_max_age: int = 31536000
+    ):
+        """
+        Önbelleği başlatır ve dizindeki dosyaları yükler
+
+        Args:
+            directory: Statik dosya dizini
+            hashed_url_prefix: Hash'li dosyaların servis edildiği URL öneki
+            reload_check_seconds: Dosya değişikliği kontrol aralığı (0 = kapalı, geliştirme için)
+            min_compress_bytes: Bu boyutun altındaki dosyalar sıkıştırılmaz
+            immutable_max_age: Hash'li adlar için Cache-Control max-age (saniye)
+        """
+        self.directory = directory
+        self.hashed_url_prefix = hashed_url_prefix
+        self.reload_check_seconds = reload_check_seconds
+        self.min_compress_bytes = min_compress_bytes
+        self.immutable_max_age = immutable_max_age
+        self._next_check = time.monotonic() + reload_check_seconds
+        self._reload_lock = threading.Lock()
+        self.reloads = 0
+        self._assets, self._signature = self._load()
+
+    @classmethod
+    def from_config(cls) -> "StaticAssetCache":
+        """config.py ayarlarından önbellek oluşturur"""
+        return cls(
+            STATIC_ASSETS_CONFIG["directory"],
+            reload_check_seconds=STATIC_ASSETS_CONFIG["reload_check_seconds"],
+            min_compress_bytes=STATIC_ASSETS_CONFIG["min_compress_bytes"],
+            immutable_max_age=STATIC_ASSETS_CONFIG["immutable_max_age"]
+        )
+
+    def __len__(self) -> int:
+        return len({asset.name for asset in self._assets.values()})
+
+    def response(self, name: str, request: Request) -> Optional[Response]:
+        """
+        Dosya için yanıt oluşturur (encoding seçimi, ETag, 304)
+
+        Args:
+            name: Dosya adı (sabit veya hash'li)
+            request: Gelen istek (Accept-Encoding, If-None-Match)
+
+        Returns:
+            Yanıt veya dosya yoksa None
+        """
+        self.maybe_reload()
+        asset = self._assets.get(name)
+        if asset is None:
+            return None
+
+        accepted = _accepted_encodings(request.headers.get("accept-encoding"))
+        encoding = "identity"
+        for candidate in _ENCODING_PREFERENCE:
+            if candidate in asset.variants and accepted.get(candidate, accepted.get("*", 0)) > 0:
+                encoding = candidate
+                break
+
+        if name == asset.hashed_name:
+            cache_control = f"public, max-age={self.immutable_max_age}, immutable"
+        else:
+            cache_control = "no-cache"
+        headers = {"ETag": asset.etags[encoding], "Cache-Control": cache_control}
+        if len(asset.variants) > 1:
+            headers["Vary"] = "Accept-Encoding"
+
+        if _etag_matches(request.headers.get("if-none-match"), asset.etags.values()):
+            return Response(status_code=304, headers=headers)
+
+        if encoding != "identity":
+            headers["Content-Encoding"] = encoding
+        return Response(asset.variants[encoding], media_type=asset.content_type, headers=headers)
+
+    def maybe_reload(self) -> bool:
+        """
+        Kontrol aralığı dolduysa ve dosyalar değiştiyse önbelleği yeniden yükler
+
+        Returns:
+            Yeniden yükleme yapıldıysa True
+        """
+        if self.reload_check_seconds <= 0:
+            return False
+        now = time.monotonic()
+        if now < self._next_check:
+            return False
+        self._next_check = now + self.reload_check_seconds
+
+        try:
+            if self._scan() == self._signature:
+                return False
+            with self._reload_lock:
+                self._assets, self._signature = self._load()
+                self.reloads += 1
+        except OSError as e:
+            print(f"⚠️ Statik dosyalar yeniden yüklenemedi: {e}")
+            return False
+        print(f"🎨 Statik dosyalar yeniden yüklendi: {len(self)} dosya")
+        return True
+
+    def get_status(self) -> Dict[str, Any]:
+        """Dosya sayısı ve varyant boyutlarını döndürür"""
+        assets = {asset.name: asset for asset in self._assets.values()}
+        return {
+            "files": len(assets),
+            "reloads": self.reloads,
+            "brotli": brotli is not None,
+            "bytes": {
+                encoding: sum(len(asset.variants.get(encoding, asset.variants["identity"])) for asset in assets.values())
+                for encoding in reversed(_ENCODING_PREFERENCE)
+                if encoding != "br" or brotli is not None
+            }
+        }
+
+    def _scan(self) -> Tuple[Tuple[str, float, int], ...]:
+        """Servis edilecek dosyaların (ad, mtime, boyut) imzası"""
+        signature = []
+        for name in sorted(os.listdir(self.directory)):
+            path = os.path.join(self.directory, name)
+            if os.path.splitext(name)[1] in _CONTENT_TYPES and os.path.isfile(path):
+                stat = os.stat(path)
+                signature.append((name, stat.st_mtime, stat.st_size))
+        return tuple(signature)
+
+    def _load(self) -> Tuple[Dict[str, _Asset], Tuple[Tuple[str, float, int], ...]]:
+        """Dosyaları okuyup varyantları hazırlar; HTML'ler en son, referanslar çevrilerek işlenir"""
+        signature = self._scan()
+        bodies: Dict[str, bytes] = {}
+        for name, _, _ in signature:
+            with open(os.path.join(self.directory, name), "rb") as f:
+                bodies[name] = f.read()
+
+        assets: Dict[str, _Asset] = {}
+        hashed_urls: Dict[str, str] = {}
+        for name, body in bodies.items():
+            ext = os.path.splitext(name)[1]
+            if ext == ".html":
+                continue
+            hashed = _hashed_name(name, body)
+            asset = _Asset(name, hashed, _CONTENT_TYPES[ext], body, self.min_compress_bytes)
+            assets[name] = assets[hashed] = asset
+            hashed_urls[name] = self.hashed_url_prefix + hashed
+
+        for name, body in bodies.items():
+            if not name.endswith(".html"):
+                continue
+            html = body.decode("utf-8")
+            for original, url in hashed_urls.items():
+                html = html.replace(f'"{original}"', f'"{url}"')
+            assets[name] = _Asset(name, None, _CONTENT_TYPES[".html"], html.encode("utf-8"), self.min_compress_bytes)
+
+        return assets, signature
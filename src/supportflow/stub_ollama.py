@@ -0,0 +1,185 @@
+"""
+Yük testleri için sahte (stub) Ollama HTTP sunucusu
+GPU olmadan kapasite ölçümü yapabilmek için /api/generate davranışını
+ayarlanabilir prompt-eval gecikmesi, token hızı ve hata enjeksiyonuyla taklit eder
+"""
+
+import asyncio
+import json
+import random
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+
+# Üretilen yanıtlarda döngüsel olarak kullanılan kelimeler
+_FILLER_WORDS = (
+    "Merhaba, talebinizle ilgili size yardımcı olmaktan memnuniyet duyarım. "
+    "Hesabınızı kontrol ettim ve size en uygun seçenekleri aşağıda özetliyorum. "
+    "Başka bir sorunuz olursa lütfen çekinmeden yazın."
+).split()
+
+
+@dataclass
+class StubOllamaSettings:
+    """Stub sunucunun gecikme ve hata davranışı"""
+
+    # İlk token'dan önceki sabit gecikme (model yükleme + prompt işleme)
+    prompt_eval_ms: float = 150.0
+    # Prompt uzunluğuna bağlı ek gecikme (1000 karakter başına)
+    prompt_eval_ms_per_1k_chars: float = 40.0
+    # Saniyede üretilen token sayısı
+    tokens_per_second: float = 30.0
+    # Modelin kendiliğinden ürettiği yanıt uzunluğu (num_predict daha küçükse kesilir)
+    response_tokens: int = 60
+    # Aynı anda işlenen istek sayısı (OLLAMA_NUM_PARALLEL); fazlası kuyrukta bekler
+    parallel: int = 4
+    # İsteklerin 500 hatası ile reddedilme olasılığı
+    failure_rate: float = 0.0
+    # Yanıt akışının ortasında bağlantının kesilme olasılığı
+    stream_abort_rate: float = 0.0
+    # Rastgelelik için tohum (tekrarlanabilir testler için)
+    seed: Optional[int] = None
+    models: List[str] = field(default_factory=lambda: ["gemma3:latest"])
+
+
+class StubOllamaStats:
+    """Stub sunucu sayaçları"""
+
+    def __init__(self):
+        self.requests = 0
+        self.failures = 0
+        self.aborts = 0
+        self.in_flight = 0
+        self.queued = 0
+        self.max_queued = 0
+        self.tokens = 0
+
+    def to_dict(self) -> Dict[str, int]:
+        return dict(vars(self))
+
+
+def create_stub_app(settings: StubOllamaSettings = None) -> FastAPI:
+    """
+    Ollama API'sinin yük testi için gereken kısmını taklit eden uygulama oluşturur
+
+    Args:
+        settings: Gecikme ve hata ayarları
+
+    Returns:
+        FastAPI uygulaması (app.state.stats ile sayaçlara erişilir)
+    """
+    settings = settings or StubOllamaSettings()
+    rng = random.Random(settings.seed)
+    slots = asyncio.Semaphore(settings.parallel)
+    stats = StubOllamaStats()
+
+    app = FastAPI(title="Stub Ollama")
+    app.state.settings = settings
+    app.state.stats = stats
+
+    def timestamp() -> str:
+        return datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
+
+    async def acquire_slot():
+        stats.queued += 1
+        stats.max_queued = max(stats.max_queued, stats.queued)
+        try:
+            await slots.acquire()
+        finally:
+            stats.queued -= 1
+        stats.in_flight += 1
+
+    def release_slot():
+        stats.in_flight -= 1
+        slots.release()
+
+    async def generate_tokens(prompt: str, num_predict: int) -> AsyncIterator[str]:
+        """Prompt-eval gecikmesinden sonra token hızında kelime üretir"""
+        prompt_eval = settings.prompt_eval_ms + settings.prompt_eval_ms_per_1k_chars * len(prompt) / 1000
+        await asyncio.sleep(prompt_eval / 1000)
+        delay = 1 / settings.tokens_per_second if settings.tokens_per_second > 0 else 0
+        for i in range(num_predict):
+            if delay:
+                await asyncio.sleep(delay)
+            stats.tokens += 1
+            yield (" " if i else "") + _FILLER_WORDS[i % len(_FILLER_WORDS)]
+
+    def final_chunk(model: str, eval_count: int, prompt: str, truncated: bool) -> Dict[str, Any]:
+        return {
+            "model": model,
+            "created_at": timestamp(),
+            "response": "",
+            "done": True,
+            "done_reason": "length" if truncated else "stop",
+            "prompt_eval_count": len(prompt.split()),
+            "eval_count": eval_count,
+        }
+
+    @app.get("/")
+    async def root():
+        return PlainTextResponse("Ollama is running")
+
+    @app.get("/api/version")
+    async def version():
+        return {"version": "0.0.0-stub"}
+
+    @app.get("/api/tags")
+    async def tags():
+        return {"models": [{"name": model, "model": model} for model in settings.models]}
+
+    @app.get("/api/ps")
+    async def running_models():
+        return {"models": [{"name": model, "model": model} for model in settings.models]}
+
+    @app.get("/stub/stats")
+    async def stub_stats():
+        return stats.to_dict()
+
+    @app.post("/api/generate")
+    async def generate(request: Request):
+        body = await request.json()
+        stats.requests += 1
+        model = body.get("model", settings.models[0])
+        prompt = body.get("prompt", "")
+        options = body.get("options") or {}
+        limit = options.get("num_predict")
+        num_predict = min(limit, settings.response_tokens) if limit and limit > 0 else settings.response_tokens
+        truncated = num_predict < settings.response_tokens
+
+        if rng.random() < settings.failure_rate:
+            stats.failures += 1
+            return JSONResponse({"error": "stub: enjekte edilmiş hata"}, status_code=500)
+
+        if not body.get("stream", True):
+            await acquire_slot()
+            try:
+                chunks = [token async for token in generate_tokens(prompt, num_predict)]
+            finally:
+                release_slot()
+            result = final_chunk(model, len(chunks), prompt, truncated)
+            result["response"] = "".join(chunks)
+            return result
+
+        abort_at = rng.randrange(num_predict) if num_predict and rng.random() < settings.stream_abort_rate else None
+
+        async def stream() -> AsyncIterator[bytes]:
+            await acquire_slot()
+            try:
+                count = 0
+                async for token in generate_tokens(prompt, num_predict):
+                    if count == abort_at:
+                        stats.aborts += 1
+                        raise ConnectionResetError("stub: enjekte edilmiş akış kesintisi")
+                    count += 1
+                    chunk = {"model": model, "created_at": timestamp(), "response": token, "done": False}
+                    yield (json.dumps(chunk, ensure_ascii=False) + "\n").encode("utf-8")
+                yield (json.dumps(final_chunk(model, count, prompt, truncated)) + "\n").encode("utf-8")
+            finally:
+                release_slot()
+
+        return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+    return app
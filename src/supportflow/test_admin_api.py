@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Admin endpoint'lerinin yetki kontrolü için test dosyası
+"""
+
+import asyncio
+import contextlib
+import io
+import json
+import logging
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+import httpx
+
+# src dizinini Python path'ine ekle
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from supportflow import api
+from supportflow.session_manager import SessionManager
+from supportflow.tracing import RotatingFileExporter, tracer
+
+
+class TestAdminAuth(unittest.TestCase):
+    """Admin endpoint'leri için X-Admin-Token test cases"""
+
+    def setUp(self):
+        """Her test öncesi çalışır"""
+        logging.getLogger("supportflow.api").setLevel(logging.CRITICAL)
+        self.manager = SessionManager()
+        self.quiet = contextlib.redirect_stdout(io.StringIO())
+        self.quiet.__enter__()
+        # Trace'ler kaynak ağacı yerine geçici dizine yazılır
+        self.tmp = tempfile.TemporaryDirectory()
+        self.patches = [
+            mock.patch.object(tracer, "exporter", RotatingFileExporter(os.path.join(self.tmp.name, "traces.jsonl"))),
+            mock.patch.object(api, "session_manager", self.manager)
+        ]
+        for patch in self.patches:
+            patch.start()
+        self.session_id = self.manager.create_session({"name": "Ahmet Yılmaz", "phone": "0555 123 4567"})
+        self.manager.mark_for_human_intervention(self.session_id, "Müşteri şikayeti")
+
+    def tearDown(self):
+        for patch in reversed(self.patches):
+            patch.stop()
+        self.quiet.__exit__(None, None, None)
+        self.tmp.cleanup()
+
+    def request(self, method, path, admin_token=None, token=None):
+        async def send():
+            transport = httpx.ASGITransport(app=api.app)
+            headers = {"X-Admin-Token": token} if token is not None else {}
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                return await client.request(method, path, headers=headers)
+
+        with mock.patch.object(api.SERVER_CONFIG, "admin_token", admin_token):
+            return asyncio.run(send())
+
+    def test_requiring_human_list_checks_configured_token(self):
+        """Sayfalı listenin tanımlı admin token'ı kontrol ettiğini test eder"""
+        path = "/admin/sessions/requiring-human"
+        self.assertEqual(self.request("GET", path, admin_token="gizli").status_code, 403)
+        self.assertEqual(self.request("GET", path, admin_token="gizli", token="yanlis").status_code, 403)
+
+        response = self.request("GET", path, admin_token="gizli", token="gizli")
+        self.assertEqual(response.json()["sessions"][0]["session_id"], self.session_id)
+        # Token tanımlı değilse liste açık kalır
+        self.assertEqual(self.request("GET", path).status_code, 200)
+
+    def test_requiring_human_export_requires_token(self):
+        """Müşteri bilgisi döndüren export'un admin token olmadan kapalı olduğunu test eder"""
+        path = "/admin/sessions/requiring-human/export?fields=session_id,customer_info"
+        self.assertEqual(self.request("GET", path).status_code, 403)
+        self.assertEqual(self.request("GET", path, admin_token="gizli").status_code, 403)
+
+        response = self.request("GET", path, admin_token="gizli", token="gizli")
+        rows = [json.loads(line) for line in response.text.splitlines()]
+        self.assertEqual(rows, [{"session_id": self.session_id,
+                                 "customer_info": {"name": "Ahmet Yılmaz", "phone": "0555 123 4567"}}])
+
+    def test_knowledge_base_reload_checks_configured_token(self):
+        """Bilgi tabanı yeniden yüklemenin tanımlı admin token'ı kontrol ettiğini test eder"""
+        knowledge_base = mock.Mock()
+        knowledge_base.reload.return_value = 12
+        with mock.patch.object(api, "agent", mock.Mock(knowledge_base=knowledge_base)):
+            forbidden = self.request("POST", "/admin/knowledge-base/reload", admin_token="gizli", token="yanlis")
+            knowledge_base.reload.assert_not_called()
+            response = self.request("POST", "/admin/knowledge-base/reload", admin_token="gizli", token="gizli")
+
+        self.assertEqual(forbidden.status_code, 403)
+        self.assertEqual(response.json()["entries"], 12)
+
+    def test_stats_checks_configured_token(self):
+        """İstatistik endpoint'inin tanımlı admin token'ı kontrol ettiğini test eder"""
+        self.assertEqual(self.request("GET", "/admin/stats", admin_token="gizli").status_code, 403)
+
+        response = self.request("GET", "/admin/stats", admin_token="gizli", token="gizli")
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("session_memory", response.json())
+
+
+if __name__ == "__main__":
+    unittest.main()
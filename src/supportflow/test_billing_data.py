@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Fatura veri katmanı (BillingRepository / BillingDataService) için test dosyası
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+# src dizinini Python path'ine ekle
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from supportflow.agents import FaturaAgent
+from supportflow.billing_data import BillingDataService, BillingRepository
+from supportflow.tracing import RotatingFileExporter, tracer
+
+
+# Trace'ler kaynak ağacı yerine geçici dizine yazılır
+TRACE_DIR = tempfile.TemporaryDirectory()
+TRACE_PATCH = mock.patch.object(tracer, "exporter", RotatingFileExporter(os.path.join(TRACE_DIR.name, "traces.jsonl")))
+
+
+def setUpModule():
+    TRACE_PATCH.start()
+
+
+def tearDownModule():
+    TRACE_PATCH.stop()
+    TRACE_DIR.cleanup()
+
+
+class FakeClock:
+    """Elle ilerletilebilen saat"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class CountingRepository(BillingRepository):
+    """Veritabanı sorgularını sayan depo"""
+
+    queries = 0
+
+    def fetch_account_summary(self, identity):
+        self.queries += 1
+        return super().fetch_account_summary(identity)
+
+
+class FakeLLM:
+    """Son prompt'u saklayan sahte LLM"""
+
+    def __init__(self):
+        self.prompt = None
+
+    def invoke(self, prompt):
+        self.prompt = prompt
+        return "LLM yanıtı"
+
+
+class TestBillingData(unittest.TestCase):
+    """Fatura veri katmanı için test cases"""
+
+    def setUp(self):
+        """Her test öncesi çalışır"""
+        self.directory = tempfile.mkdtemp()
+        self.repository = CountingRepository(os.path.join(self.directory, "billing.db"))
+        self.clock = FakeClock()
+        self.service = BillingDataService(self.repository, ttl_seconds=60, max_entries=2, clock=self.clock)
+
+    def tearDown(self):
+        """Her test sonrası çalışır"""
+        self.service.close()
+        shutil.rmtree(self.directory)
+
+    def test_repository_lookup_by_identity(self):
+        """Müşterinin id, telefon ve e-posta ile bulunduğunu test eder"""
+        by_phone = self.repository.fetch_account_summary("phone:5321234567")
+        self.assertEqual(by_phone["customer_id"], "C1001")
+        self.assertEqual(len(by_phone["invoices"]), 3)
+        self.assertEqual(by_phone["invoices"][0]["period"], "2026-09")
+
+        self.assertEqual(self.repository.fetch_account_summary("email:ayse@example.com")["name"], "Ayşe Demir")
+        self.assertIsNone(self.repository.fetch_account_summary("id:YOK"))
+
+    def test_prefetch_fills_cache(self):
+        """Ön yüklemeden sonra özetin veritabanına gitmeden döndüğünü test eder"""
+        self.service.prefetch({"phone": "+90 532 123 45 67"}).result(timeout=5)
+        queries = self.repository.queries
+
+        summary = self.service.get_account_summary({"phone": "0532 123 45 67"})
+        self.assertEqual(summary["customer_id"], "C1001")
+        self.assertEqual(self.repository.queries, queries)
+        self.assertEqual(self.service.get_status()["hits"], 1)
+
+    def test_ttl_and_lru_eviction(self):
+        """Süresi dolan ve LRU sınırını aşan kayıtların silindiğini test eder"""
+        self.service.get_account_summary({"customer_id": "C1001"})
+        self.service.get_account_summary({"customer_id": "C1002"})
+        self.service.get_account_summary({"customer_id": "C1001"})  # C1001 en son kullanılan
+        self.service.get_account_summary({"customer_id": "C1003"})  # C1002 düşer
+        self.assertEqual(len(self.service), 2)
+
+        queries = self.repository.queries
+        self.service.get_account_summary({"customer_id": "C1002"})
+        self.assertEqual(self.repository.queries, queries + 1)
+
+        self.clock.now += 61
+        self.service.get_account_summary({"customer_id": "C1002"})
+        self.assertEqual(self.repository.queries, queries + 2)
+
+    def test_unknown_customer_is_cached(self):
+        """Bulunamayan müşterinin de önbelleğe alındığını test eder"""
+        self.assertIsNone(self.service.get_account_summary({"customer_id": "YOK"}))
+        self.assertIsNone(self.service.get_account_summary({"customer_id": "YOK"}))
+        self.assertEqual(self.repository.queries, 1)
+        self.assertIsNone(self.service.get_account_summary({"name": "Sadece isim"}))
+
+    def test_fatura_agent_prompt_includes_account(self):
+        """FaturaAgent prompt'una hesap özetinin eklendiğini test eder"""
+        fatura_agent = FaturaAgent("gemma3", billing_data=self.service)
+        fatura_agent.llm = FakeLLM()
+
+        fatura_agent.handle_billing_request("Borcum ne kadar?", customer_info={"customer_id": "C1002"})
+        self.assertIn("Güncel borç: 858.00 TL", fatura_agent.llm.prompt)
+        self.assertIn("durum: gecikmiş", fatura_agent.llm.prompt)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Toplu chat endpoint'i (/chat/batch) için test dosyası
+Agent yerine bekleme süresi ayarlanabilen sahte bir agent kullanılır
+"""
+
+import asyncio
+import contextlib
+import io
+import json
+import logging
+import os
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+import httpx
+
+# src dizinini Python path'ine ekle
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from supportflow import api
+from supportflow.idempotency import IdempotencyStore
+from supportflow.rate_limiter import ChatRateLimiter
+from supportflow.session_mailbox import SessionMailboxes
+from supportflow.session_manager import SessionManager
+from supportflow.tracing import RotatingFileExporter, tracer
+
+
+class SleepyAgent:
+    """Her mesajda bekleyip mesajı geri döndüren sahte agent"""
+
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.active = 0
+        self.max_active = 0
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def run(self, message, history=None, customer_info=None):
+        with self._lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+            self.calls.append((message, len(history or [])))
+        time.sleep(self.delay)
+        with self._lock:
+            self.active -= 1
+        if message == "patla":
+            raise RuntimeError("agent hatası")
+        return {"response": f"Yanıt: {message}", "category": "genel_bilgi", "agent_type": "router"}
+
+
+class TestChatBatch(unittest.TestCase):
+    """/chat/batch için test cases"""
+
+    def setUp(self):
+        """Her test öncesi çalışır"""
+        logging.getLogger("supportflow.api").setLevel(logging.CRITICAL)
+        self.agent = SleepyAgent(0.2)
+        self.manager = SessionManager()
+        self.quiet = contextlib.redirect_stdout(io.StringIO())
+        self.quiet.__enter__()
+        # Trace'ler kaynak ağacı yerine geçici dizine yazılır
+        self.tmp = tempfile.TemporaryDirectory()
+        self.patches = [
+            mock.patch.object(tracer, "exporter", RotatingFileExporter(os.path.join(self.tmp.name, "traces.jsonl"))),
+            mock.patch.object(api, "agent", self.agent),
+            mock.patch.object(api, "session_manager", self.manager),
+            mock.patch.object(api, "session_mailboxes", SessionMailboxes()),
+            mock.patch.object(api, "idempotency_store", IdempotencyStore()),
+            mock.patch.object(api, "rate_limiter", None),
+            mock.patch.object(api, "billing_data", None)
+        ]
+        for patch in self.patches:
+            patch.start()
+
+    def tearDown(self):
+        for patch in reversed(self.patches):
+            patch.stop()
+        self.quiet.__exit__(None, None, None)
+        self.tmp.cleanup()
+
+    def post_batch(self, items):
+        async def send():
+            transport = httpx.ASGITransport(app=api.app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                return await client.post("/chat/batch", json={"items": items})
+
+        started = time.perf_counter()
+        response = asyncio.run(send())
+        elapsed = time.perf_counter() - started
+        lines = [json.loads(line) for line in response.text.splitlines() if line]
+        return response, lines, elapsed
+
+    def test_batch_runs_sessions_concurrently_with_per_item_errors(self):
+        """Farklı session'ların paralel işlendiğini ve hatalı mesajların batch'i durdurmadığını test eder"""
+        existing = self.manager.create_session({"name": "Ayşe"})
+        items = [
+            {"message": "Merhaba", "customer_info": {"name": "Ali"}},
+            {"message": "Faturam?", "session_id": existing},
+            {"message": "Tarifem?"},
+            {"message": "Selam", "session_id": "olmayan-session"},
+            {"message": "   "},
+            {"message": "patla"}
+        ]
+        response, lines, elapsed = self.post_batch(items)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers["content-type"], "application/x-ndjson")
+        self.assertEqual(sorted(line["index"] for line in lines), list(range(6)))
+        by_index = {line["index"]: line for line in lines}
+        self.assertEqual([by_index[i]["status"] for i in range(6)],
+                         ["success", "success", "success", "error", "error", "error"])
+        self.assertEqual([by_index[i].get("status_code") for i in (3, 4, 5)], [404, 400, 500])
+        self.assertEqual(by_index[1]["session_id"], existing)
+        self.assertEqual(by_index[0]["result"]["response"], "Yanıt: Merhaba")
+        self.assertEqual(self.manager.get_session(by_index[0]["session_id"]).customer_info, {"name": "Ali"})
+        self.assertEqual(len(self.manager.get_session(existing).turns), 1)
+
+        # 4 agent çağrısı sırayla 0.8 sn sürerdi
+        self.assertGreater(self.agent.max_active, 1)
+        self.assertLess(elapsed, 0.6)
+
+    def test_same_session_messages_keep_order_and_concurrency_limit(self):
+        """Aynı session'ın mesajlarının sırayla işlendiğini ve eşzamanlılık sınırına uyulduğunu test eder"""
+        session_id = self.manager.create_session()
+        self.agent.delay = 0.05
+        items = [{"message": f"mesaj {i}", "session_id": session_id} for i in range(3)]
+        items += [{"message": f"yeni {i}"} for i in range(4)]
+
+        with mock.patch.object(api.MAILBOX_CONFIG, "batch_concurrency", 2):
+            _, lines, _ = self.post_batch(items)
+
+        self.assertTrue(all(line["status"] == "success" for line in lines))
+        self.assertLessEqual(self.agent.max_active, 2)
+        ordered = [call for call in self.agent.calls if call[0].startswith("mesaj")]
+        # Her mesaj bir öncekinin turn'ünü içeren geçmişi görür
+        self.assertEqual(ordered, [("mesaj 0", 0), ("mesaj 1", 2), ("mesaj 2", 4)])
+
+    def test_batch_size_limit(self):
+        """Boş ve azami boyutu aşan batch'lerin reddedildiğini test eder"""
+        response, _, _ = self.post_batch([])
+        self.assertEqual(response.status_code, 400)
+        with mock.patch.object(api.MAILBOX_CONFIG, "batch_max_items", 2):
+            response, _, _ = self.post_batch([{"message": "a"}] * 3)
+        self.assertEqual(response.status_code, 413)
+        self.assertEqual(len(self.manager.sessions), 0)
+
+    def test_retried_items_do_not_create_sessions(self):
+        """Tekrar gönderilen yeni session mesajlarının yeni session açmadığını ve müşteriye göre ayrıldığını test eder"""
+        self.agent.delay = 0
+        items = [
+            {"message": "Merhaba", "customer_info": {"customer_id": "C001"}, "client_message_id": "ivr-1"},
+            {"message": "Merhaba", "customer_info": {"customer_id": "C002"}, "client_message_id": "ivr-1"}
+        ]
+        _, first, _ = self.post_batch(items)
+        _, retry, _ = self.post_batch(items)
+
+        sessions = lambda lines: [line["session_id"] for line in sorted(lines, key=lambda line: line["index"])]
+        self.assertEqual(sessions(retry), sessions(first))
+        self.assertEqual(len(set(sessions(first))), 2)
+        self.assertEqual(len(self.manager.sessions), 2)
+        self.assertEqual(len(self.agent.calls), 2)
+
+    def test_rejected_messages_are_not_queued(self):
+        """Rate limit ve bulunamayan session reddinin mailbox'a eklemeden önce yapıldığını test eder"""
+        session_id = self.manager.create_session()
+        limiter = ChatRateLimiter(limits={
+            "session": {"rate": 0.001, "burst": 1},
+            "customer": {"rate": 100, "burst": 100},
+            "global": {"rate": 100, "burst": 100}
+        })
+        submit = mock.AsyncMock(return_value="yanıt")
+
+        async def send(target):
+            try:
+                return await api.dispatch_chat(api.ChatRequest(message="Merhaba", session_id=target))
+            except api.HTTPException as e:
+                return e.status_code
+
+        with mock.patch.object(api, "rate_limiter", limiter), \
+                mock.patch.object(api.session_mailboxes, "submit", submit):
+            results = [asyncio.run(send(target)) for target in (session_id, session_id, "olmayan-session")]
+
+        self.assertEqual(results, ["yanıt", 429, 404])
+        self.assertEqual(submit.await_count, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
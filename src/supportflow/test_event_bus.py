@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+EventBus için test dosyası
+"""
+
+import asyncio
+import unittest
+import sys
+import tempfile
+import os
+from unittest import mock
+
+# src dizinini Python path'ine ekle
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from supportflow.event_bus import EventBus
+from supportflow.session_manager import SessionManager
+from supportflow.tracing import RotatingFileExporter, tracer
+
+
+# Trace'ler kaynak ağacı yerine geçici dizine yazılır
+TRACE_DIR = tempfile.TemporaryDirectory()
+TRACE_PATCH = mock.patch.object(tracer, "exporter", RotatingFileExporter(os.path.join(TRACE_DIR.name, "traces.jsonl")))
+
+
+def setUpModule():
+    TRACE_PATCH.start()
+
+
+def tearDownModule():
+    TRACE_PATCH.stop()
+    TRACE_DIR.cleanup()
+
+
+class TestEventBus(unittest.TestCase):
+    """EventBus sınıfı için test cases"""
+
+    def test_read_since_offset(self):
+        """Offset'ten sonraki event'lerin okunduğunu test eder"""
+        bus = EventBus()
+        for i in range(5):
+            bus.publish("escalation", {"session_id": str(i)})
+
+        events, gap = bus.read_since(3)
+        self.assertFalse(gap)
+        self.assertEqual([e["offset"] for e in events], [4, 5])
+
+    def test_gap_when_buffer_overflows(self):
+        """Tampondan düşen event'ler için boşluk bildirildiğini test eder"""
+        bus = EventBus(max_events=3)
+        for i in range(6):
+            bus.publish("escalation", {"session_id": str(i)})
+
+        events, gap = bus.read_since(1)
+        self.assertTrue(gap)
+        self.assertEqual([e["offset"] for e in events], [4, 5, 6])
+
+    def test_subscribe_resumes_and_waits(self):
+        """Aboneliğin offset'ten devam edip yeni event'i beklediğini test eder"""
+        bus = EventBus()
+        bus.publish("escalation", {"session_id": "a"})
+        bus.publish("escalation", {"session_id": "b"})
+
+        async def scenario():
+            received = []
+            stream = bus.subscribe(offset=1)
+            received.append(await stream.__anext__())
+            asyncio.get_running_loop().call_later(0.01, bus.publish, "human_joined", {"session_id": "b"})
+            received.append(await asyncio.wait_for(stream.__anext__(), timeout=1))
+            await stream.aclose()
+            return received
+
+        received = asyncio.run(scenario())
+        self.assertEqual([e["type"] for e in received], ["escalation", "human_joined"])
+        self.assertEqual(received[1]["offset"], 3)
+
+    def test_session_manager_publishes_escalations(self):
+        """SessionManager'ın escalation event'i yayınladığını test eder"""
+        manager = SessionManager()
+        session_id = manager.create_session()
+        manager.add_conversation_turn(session_id, "Müdürle görüşmek istiyorum", "Yanıt", category="faturalama")
+
+        events, _ = manager.event_bus.read_since(0)
+        self.assertEqual(len(events), 1)
+        self.assertEqual(events[0]["type"], "escalation")
+        self.assertEqual(events[0]["category"], "faturalama")
+        self.assertEqual(len(manager.get_sessions_requiring_human()), 1)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Yanıt uzunluğu bütçeleri (GenerationBudgets) için test dosyası
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+# src dizinini Python path'ine ekle
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from supportflow.agents import generation
+from supportflow.agents.generation_budget import GenerationBudgets
+from supportflow.ollama_pool import Completion
+from supportflow.tracing import RotatingFileExporter, tracer
+
+
+# Trace'ler kaynak ağacı yerine geçici dizine yazılır
+TRACE_DIR = tempfile.TemporaryDirectory()
+TRACE_PATCH = mock.patch.object(tracer, "exporter", RotatingFileExporter(os.path.join(TRACE_DIR.name, "traces.jsonl")))
+
+
+def setUpModule():
+    TRACE_PATCH.start()
+
+
+def tearDownModule():
+    TRACE_PATCH.stop()
+    TRACE_DIR.cleanup()
+
+
+def make_budgets(**overrides) -> GenerationBudgets:
+    values = dict(
+        agent_budgets={"fatura": 300, "router": 200, "default": 100},
+        category_budgets={"genel_bilgi": 120},
+        stop_sequences={"default": ["\nMüşteri:"], "fatura": ["\nFaturalama Uzmanı:"]},
+        slo_ms=1000,
+        min_budget_ratio=0.5,
+        adjust_step=0.25,
+        headroom_ratio=0.5,
+        adjust_every=4
+    )
+    values.update(overrides)
+    return GenerationBudgets(**values)
+
+
+class CompletingLLM:
+    """Bütçe parametrelerini kaydeden sahte LLM"""
+
+    model = "sahte"
+
+    def __init__(self, done_reason="stop"):
+        self.done_reason = done_reason
+        self.calls = []
+
+    def complete(self, prompt, on_token=None, num_predict=None, stop=None):
+        self.calls.append((num_predict, stop))
+        if on_token:
+            on_token("Merhaba")
+        return Completion("Merhaba", self.done_reason, num_predict)
+
+
+class TestGenerationBudgets(unittest.TestCase):
+    """GenerationBudgets için test cases"""
+
+    def test_category_budget_overrides_agent_budget(self):
+        """Kategori bütçesinin agent bütçesinin yerine geçtiğini ve stop dizilerinin birleştiğini test eder"""
+        budgets = make_budgets()
+        self.assertEqual(budgets.budget_for("fatura", "faturalama"), (300, ["\nMüşteri:", "\nFaturalama Uzmanı:"]))
+        self.assertEqual(budgets.budget_for("router", "genel_bilgi")[0], 120)
+        self.assertEqual(budgets.budget_for("router", "teknik_destek")[0], 200)
+        self.assertEqual(budgets.budget_for("tarife"), (100, ["\nMüşteri:"]))
+
+    def test_budget_tightens_over_slo_and_relaxes_with_headroom(self):
+        """p95 SLO'yu aşınca bütçenin alt sınıra kadar daraldığını, pay olunca gevşediğini test eder"""
+        budgets = make_budgets()
+        for _ in range(8):
+            budgets.record("fatura", "faturalama", 1.5, truncated=False)
+        self.assertEqual(budgets.budget_for("fatura")[0], 150)
+        status = budgets.get_status()["budgets"]["fatura"]
+        self.assertEqual((status["scale"], status["tightened"]), (0.5, 2))
+
+        # Diğer anahtarlar etkilenmez
+        self.assertEqual(budgets.budget_for("router")[0], 200)
+
+        for _ in range(4):
+            budgets.record("fatura", "faturalama", 0.2, truncated=False)
+        self.assertEqual(budgets.budget_for("fatura")[0], 225)
+
+        # p95 hedef ile pay arasında: değişiklik yok
+        for _ in range(4):
+            budgets.record("fatura", "faturalama", 0.8, truncated=False)
+        self.assertEqual(budgets.budget_for("fatura")[0], 225)
+
+    def test_non_adaptive_budgets_stay_fixed(self):
+        """adaptive kapalıyken bütçenin değişmediğini test eder"""
+        budgets = make_budgets(adaptive=False)
+        for _ in range(8):
+            budgets.record("router", None, 5, truncated=False)
+        self.assertEqual(budgets.budget_for("router")[0], 200)
+
+    def test_generate_applies_budget_and_reports_truncation(self):
+        """generate()'in bütçeyi LLM'e ilettiğini ve kesilmeleri kaydettiğini test eder"""
+        budgets = make_budgets()
+        llm = CompletingLLM(done_reason="length")
+        tokens = []
+        with mock.patch.object(generation, "generation_budgets", budgets):
+            response = generation.generate(llm, "prompt", tokens.append, agent_type="router", category="genel_bilgi")
+
+        self.assertEqual(response, "Merhaba")
+        self.assertEqual(tokens, ["Merhaba"])
+        self.assertEqual(llm.calls, [(120, ["\nMüşteri:"])])
+        status = budgets.get_status()["budgets"]["genel_bilgi"]
+        self.assertEqual((status["generations"], status["truncated"], status["truncation_rate"]), (1, 1, 1.0))
+
+
+if __name__ == "__main__":
+    unittest.main()
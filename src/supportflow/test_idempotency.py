@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+IdempotencyStore için test dosyası
+"""
+
+import asyncio
+import contextlib
+import io
+import unittest
+import sys
+import tempfile
+import os
+from unittest import mock
+
+import httpx
+
+# src dizinini Python path'ine ekle
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from supportflow import api
+from supportflow.idempotency import IdempotencyConflict, IdempotencyStore
+from supportflow.session_manager import SessionManager
+from supportflow.tracing import RotatingFileExporter, tracer
+
+
+class FakeClock:
+    """Elle ilerletilebilen saat"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestIdempotencyStore(unittest.TestCase):
+    """IdempotencyStore sınıfı için test cases"""
+
+    def setUp(self):
+        """Her test öncesi çalışır"""
+        self.clock = FakeClock()
+        self.store = IdempotencyStore(ttl_seconds=60, max_entries=2, clock=self.clock)
+        self.calls = 0
+
+    async def compute(self, value="yanıt"):
+        self.calls += 1
+        await asyncio.sleep(0.01)
+        return value
+
+    def test_retry_joins_in_flight_computation(self):
+        """Eşzamanlı tekrar isteğin aynı hesaplamaya katıldığını test eder"""
+        async def scenario():
+            return await asyncio.gather(
+                self.store.run("k", "f", self.compute),
+                self.store.run("k", "f", self.compute),
+            )
+
+        first, second = asyncio.run(scenario())
+        self.assertEqual(first, ("yanıt", False))
+        self.assertEqual(second, ("yanıt", True))
+        self.assertEqual(self.calls, 1)
+
+    def test_stored_result_expires(self):
+        """Saklanan sonucun TTL sonunda silindiğini test eder"""
+        async def scenario():
+            await self.store.run("k", "f", self.compute)
+            replay = await self.store.run("k", "f", self.compute)
+            self.clock.now += 61
+            fresh = await self.store.run("k", "f", self.compute)
+            return replay, fresh
+
+        replay, fresh = asyncio.run(scenario())
+        self.assertTrue(replay[1])
+        self.assertFalse(fresh[1])
+        self.assertEqual(self.calls, 2)
+
+    def test_failures_are_not_stored(self):
+        """Hata ile biten hesaplamanın tekrar denenebildiğini test eder"""
+        async def failing():
+            raise RuntimeError("Ollama hatası")
+
+        async def scenario():
+            with self.assertRaises(RuntimeError):
+                await self.store.run("k", "f", failing)
+            return await self.store.run("k", "f", self.compute)
+
+        self.assertEqual(asyncio.run(scenario()), ("yanıt", False))
+
+    def test_conflict_and_size_limit(self):
+        """Farklı içerikli anahtar ve boyut sınırını test eder"""
+        async def scenario():
+            await self.store.run("k1", "f", self.compute)
+            with self.assertRaises(IdempotencyConflict):
+                await self.store.run("k1", "başka", self.compute)
+            await self.store.run("k2", "f", self.compute)
+            await self.store.run("k3", "f", self.compute)
+            await self.store.run("k4", "f", self.compute)
+
+        asyncio.run(scenario())
+        self.assertLessEqual(len(self.store), 3)
+
+
+class EchoAgent:
+    """Mesajı geri döndüren sahte agent"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def run(self, message, history=None, customer_info=None):
+        self.calls += 1
+        return {"response": f"Yanıt: {message}", "category": "genel_bilgi", "agent_type": "router"}
+
+
+class TestChatIdempotency(unittest.TestCase):
+    """/chat idempotency kapsamı için test cases"""
+
+    def setUp(self):
+        """Her test öncesi çalışır"""
+        self.agent = EchoAgent()
+        self.manager = SessionManager()
+        self.quiet = contextlib.redirect_stdout(io.StringIO())
+        self.quiet.__enter__()
+        # Trace'ler kaynak ağacı yerine geçici dizine yazılır
+        self.tmp = tempfile.TemporaryDirectory()
+        self.patches = [
+            mock.patch.object(tracer, "exporter", RotatingFileExporter(os.path.join(self.tmp.name, "traces.jsonl"))),
+            mock.patch.object(api, "agent", self.agent),
+            mock.patch.object(api, "session_manager", self.manager),
+            mock.patch.object(api, "idempotency_store", IdempotencyStore(ttl_seconds=60, max_entries=10)),
+            mock.patch.object(api, "rate_limiter", None),
+            mock.patch.object(api, "billing_data", None)
+        ]
+        for patch in self.patches:
+            patch.start()
+
+    def tearDown(self):
+        for patch in reversed(self.patches):
+            patch.stop()
+        self.quiet.__exit__(None, None, None)
+        self.tmp.cleanup()
+
+    def post_chats(self, *bodies):
+        async def send():
+            transport = httpx.ASGITransport(app=api.app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                return [
+                    await client.post("/chat", json=body, headers={"Idempotency-Key": "k1"})
+                    for body in bodies
+                ]
+
+        return asyncio.run(send())
+
+    def test_new_session_keys_are_scoped_by_customer(self):
+        """Aynı anahtar ve ilk mesajla gelen farklı müşterilerin ayrı session aldığını test eder"""
+        first, second, retry = self.post_chats(
+            {"message": "Merhaba", "customer_info": {"customer_id": "C001"}},
+            {"message": "Merhaba", "customer_info": {"customer_id": "C002"}},
+            {"message": "Merhaba", "customer_info": {"customer_id": "C001"}}
+        )
+        self.assertNotEqual(first.json()["session_id"], second.json()["session_id"])
+        self.assertEqual(retry.json()["session_id"], first.json()["session_id"])
+        self.assertEqual(retry.headers.get("Idempotent-Replayed"), "true")
+        self.assertEqual(self.agent.calls, 2)
+
+    def test_scope_falls_back_to_client_address(self):
+        """customer_info yoksa kapsamın istemci adresi olduğunu test eder"""
+        self.assertEqual(api.idempotency_scope(None, {"name": "Ali"}, "10.0.0.1"), "new:client:10.0.0.1")
+        self.assertEqual(api.idempotency_scope("s1", None, None), "session:s1")
+        with self.assertRaises(api.HTTPException):
+            api.idempotency_scope(None, None, None)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+KnowledgeBase için test dosyası
+"""
+
+import json
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+# src dizinini Python path'ine ekle
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from supportflow.agents.knowledge_base import KnowledgeBase
+from supportflow.tracing import RotatingFileExporter, tracer
+
+
+# Trace'ler kaynak ağacı yerine geçici dizine yazılır
+TRACE_DIR = tempfile.TemporaryDirectory()
+TRACE_PATCH = mock.patch.object(tracer, "exporter", RotatingFileExporter(os.path.join(TRACE_DIR.name, "traces.jsonl")))
+
+
+def setUpModule():
+    TRACE_PATCH.start()
+
+
+def tearDownModule():
+    TRACE_PATCH.stop()
+    TRACE_DIR.cleanup()
+
+
+SAMPLE_DATA = {
+    "company": {"name": "ABCX", "call_center": "444 0 229"},
+    "entries": [
+        {
+            "id": "calisma_saatleri",
+            "keywords": ["çalışma saatleri", "kaçta açılıyor"],
+            "answer": "{name} mağazaları {hours} arası açıktır.",
+            "data": {"hours": "09:00-20:00"}
+        },
+        {
+            "id": "iletisim",
+            "keywords": ["çağrı merkezi", "iletişim"],
+            "answer": "Çağrı merkezimiz: {call_center}"
+        }
+    ]
+}
+
+
+class TestKnowledgeBase(unittest.TestCase):
+    """KnowledgeBase sınıfı için test cases"""
+
+    def setUp(self):
+        """Her test öncesi çalışır"""
+        handle, self.path = tempfile.mkstemp(suffix=".json")
+        os.close(handle)
+        self._write(SAMPLE_DATA)
+        self.kb = KnowledgeBase(self.path, min_score=2, reload_check_seconds=0)
+
+    def tearDown(self):
+        """Her test sonrası çalışır"""
+        os.remove(self.path)
+
+    def _write(self, data):
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+
+    def test_lookup_renders_template(self):
+        """Ekli ve aksansız sorguların şablon yanıtla eşleştiğini test eder"""
+        self.assertEqual(
+            self.kb.lookup("Calisma saatleriniz nedir?"),
+            "ABCX mağazaları 09:00-20:00 arası açıktır."
+        )
+        self.assertEqual(self.kb.lookup("Çağrı merkezinizin numarası"), "Çağrı merkezimiz: 444 0 229")
+
+    def test_weak_or_ambiguous_match_falls_through(self):
+        """Zayıf ve belirsiz eşleşmelerde None döndüğünü test eder"""
+        self.assertIsNone(self.kb.lookup("İletişim"))  # skor 1 < min_score
+        self.assertIsNone(self.kb.lookup("Merhaba, bir sorum var"))
+
+        status = self.kb.get_status()
+        self.assertEqual(status["hits"], 0)
+        self.assertEqual(status["misses"], 2)
+
+    def test_hit_rate(self):
+        """İsabet oranının hesaplandığını test eder"""
+        self.kb.lookup("çalışma saatleri")
+        self.kb.lookup("bilinmeyen soru")
+
+        status = self.kb.get_status()
+        self.assertEqual(status["hit_rate"], 0.5)
+        self.assertEqual(status["entry_hits"], {"calisma_saatleri": 1})
+
+    def test_reload(self):
+        """Dosya değişikliğinin yeniden yüklendiğini, hatalı dosyanın reddedildiğini test eder"""
+        data = json.loads(json.dumps(SAMPLE_DATA))
+        data["entries"][0]["data"]["hours"] = "10:00-22:00"
+        self._write(data)
+        self.assertEqual(self.kb.reload(), 2)
+        self.assertIn("10:00-22:00", self.kb.lookup("çalışma saatleri"))
+
+        data["entries"][0]["answer"] = "{bilinmeyen_alan}"
+        self._write(data)
+        with self.assertRaises(ValueError):
+            self.kb.reload()
+        # Eski indeks kullanılmaya devam eder
+        self.assertIn("10:00-22:00", self.kb.lookup("çalışma saatleri"))
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
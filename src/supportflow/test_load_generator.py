@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Yük testi aracı ve stub Ollama sunucusu için test dosyası
+"""
+
+import asyncio
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+# src dizinini Python path'ine ekle
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from supportflow.config import ARCHIVE_CONFIG, OLLAMA_CONFIG
+from supportflow.load_generator import (
+    LoadResult, RequestRecord, build_report, load_scenarios, parse_args, percentile, run_load_test
+)
+from supportflow.tracing import RotatingFileExporter, tracer
+
+POSTMAN_COLLECTION = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    "postman_collection.json"
+)
+
+
+class TestLoadGenerator(unittest.TestCase):
+    """Yük testi aracı için test cases"""
+
+    def test_percentile(self):
+        """Nearest-rank yüzdelik hesabını test eder"""
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 50), 50)
+        self.assertEqual(percentile(values, 99), 99)
+        self.assertEqual(percentile([7.0], 95), 7.0)
+        self.assertEqual(percentile([], 50), 0.0)
+
+    def test_report_separates_errors(self):
+        """Hataların gecikme yüzdeliklerine katılmadığını test eder"""
+        result = LoadResult(mode="test", duration_s=2.0)
+        result.records = [
+            RequestRecord("s", "chat", 100.0, 200),
+            RequestRecord("s", "chat", 300.0, 200),
+            RequestRecord("s", "chat", 5.0, 500, "HTTP 500"),
+            RequestRecord("s", "status", 2.0, None, "ConnectError"),
+        ]
+
+        report = build_report(result)
+        self.assertEqual(report["throughput_rps"], 1.0)
+        self.assertEqual(report["latency_ms"]["p50"], 100.0)
+        self.assertEqual(report["latency_ms"]["max"], 300.0)
+        self.assertEqual(report["errors"]["rate"], 0.5)
+        self.assertEqual(report["errors"]["by_kind"], {"HTTP 500": 1, "ConnectError": 1})
+
+    def test_postman_collection_is_replayable(self):
+        """Postman collection'ın tek bir çok turlu senaryoya çevrildiğini test eder"""
+        scenario, = load_scenarios(POSTMAN_COLLECTION)
+
+        chat_steps = [step for step in scenario.steps if not step.status]
+        self.assertEqual(len(chat_steps), 3)
+        self.assertTrue(scenario.steps[-1].status)
+        self.assertEqual(scenario.customer_info["name"], "Ahmet Yılmaz")
+
+    def test_end_to_end_against_stub_ollama(self):
+        """api.app ve stub Ollama ile process içi kısa bir yük testini test eder"""
+        args = parse_args([
+            "--concurrency", "2", "--iterations", "4", "--duration", "30",
+            "--prompt-eval-ms", "0", "--tokens-per-second", "0", "--response-tokens", "5",
+            "--seed", "3", "--stub-count", "2"
+        ])
+        # Arşiv ve trace dosyaları kaynak ağacı yerine geçici dizine yazılır
+        with tempfile.TemporaryDirectory() as tmp, \
+                mock.patch.object(OLLAMA_CONFIG, "backends", OLLAMA_CONFIG["backends"]), \
+                mock.patch.object(ARCHIVE_CONFIG, "directory", os.path.join(tmp, "archive")), \
+                mock.patch.object(tracer, "exporter", RotatingFileExporter(os.path.join(tmp, "traces.jsonl"))), \
+                contextlib.redirect_stdout(io.StringIO()):
+            report = asyncio.run(run_load_test(args))
+
+        self.assertEqual(report["scenarios_completed"], 4)
+        self.assertEqual(report["errors"]["total"], 0)
+        self.assertGreater(report["stub"]["requests"], 0)
+        self.assertEqual(report["stub"]["failures"], 0)
+        # İstekler havuzdaki iki stub'a dağıtılmış olmalı
+        self.assertTrue(all(stub["requests"] > 0 for stub in report["stub_backends"]))
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
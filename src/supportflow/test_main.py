@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+main.py sunucu ayarları (server_options) için test dosyası
+"""
+
+import contextlib
+import io
+import os
+import sys
+import unittest
+from unittest import mock
+
+# src dizinini Python path'ine ekle
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from supportflow import main
+from supportflow.config import SERVER_CONFIG
+
+
+class TestServerOptions(unittest.TestCase):
+    """server_options() için test cases"""
+
+    def test_development_mode_keeps_reload_and_honours_port(self):
+        """Geliştirme modunda reload ayarının korunduğunu ve --port değerinin kullanıldığını test eder"""
+        options = main.server_options(port=9001)
+        self.assertEqual(options["port"], 9001)
+        self.assertEqual(options["reload"], SERVER_CONFIG["reload"])
+        self.assertNotIn("workers", options)
+        self.assertEqual(main.server_options()["port"], SERVER_CONFIG["port"])
+
+    def test_production_mode(self):
+        """Üretim modunda reload'un kapalı, worker ve bağlantı ayarlarının config'den geldiğini test eder"""
+        with contextlib.redirect_stdout(io.StringIO()):
+            options = main.server_options(port=9002, production=True, workers=3)
+        self.assertFalse(options["reload"])
+        self.assertEqual(options["workers"], 3)
+        self.assertEqual(options["timeout_keep_alive"], SERVER_CONFIG["timeout_keep_alive"])
+        self.assertEqual(options["backlog"], SERVER_CONFIG["backlog"])
+        self.assertEqual(options["timeout_graceful_shutdown"], SERVER_CONFIG["graceful_shutdown_seconds"])
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.assertEqual(main.server_options(production=True)["workers"], SERVER_CONFIG["workers"])
+
+    def test_missing_uvloop_and_httptools_fall_back(self):
+        """uvloop / httptools kurulu değilse asyncio / h11'e düşüldüğünü test eder"""
+        output = io.StringIO()
+        with mock.patch.object(main.importlib.util, "find_spec", return_value=None), \
+                contextlib.redirect_stdout(output):
+            options = main.server_options(production=True)
+        self.assertEqual((options["loop"], options["http"]), ("asyncio", "h11"))
+        self.assertIn("uvloop kurulu değil", output.getvalue())
+
+        with mock.patch.object(main.importlib.util, "find_spec", return_value=object()):
+            options = main.server_options(production=True)
+        self.assertEqual((options["loop"], options["http"]), ("uvloop", "httptools"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+ModelWarmer için test dosyası
+Ollama yerine httpx.MockTransport ile sahte yanıtlar kullanılır
+"""
+
+import asyncio
+import json
+import logging
+import os
+import sys
+import unittest
+from datetime import datetime
+from unittest import mock
+
+import httpx
+
+# src dizinini Python path'ine ekle
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from supportflow.config import OLLAMA_CONFIG, WARMUP_CONFIG
+from supportflow.model_warmup import ModelWarmer
+
+
+class TestModelWarmer(unittest.TestCase):
+    """ModelWarmer sınıfı için test cases"""
+
+    def setUp(self):
+        """Her test öncesi çalışır"""
+        logging.getLogger("supportflow.model_warmup").setLevel(logging.CRITICAL)
+        self.requests = []
+        self.failing_models = set()
+        self.failing_hosts = set()
+        self.warmer = ModelWarmer(["gemma3", "llama3", "gemma3"], base_urls=["http://ollama:11434/"],
+                                  keep_alive="45m", business_hours=(8, 22))
+
+    def handle(self, request: httpx.Request) -> httpx.Response:
+        body = json.loads(request.content)
+        self.requests.append((request.url.path, body))
+        if body["model"] in self.failing_models or request.url.host in self.failing_hosts:
+            return httpx.Response(500, json={"error": "model yüklenemedi"})
+        return httpx.Response(200, json={"model": body["model"], "response": "Merhaba", "done": True})
+
+    def run_with_mock(self, coroutine_factory):
+        transport = httpx.MockTransport(self.handle)
+        real_client = httpx.AsyncClient
+        with mock.patch("supportflow.model_warmup.httpx.AsyncClient",
+                        lambda **kwargs: real_client(transport=transport, **kwargs)):
+            return asyncio.run(coroutine_factory())
+
+    def test_is_business_hours(self):
+        """Mesai saati sınırlarının başlangıç dahil, bitiş hariç olduğunu test eder"""
+        day = datetime(2025, 1, 31)
+        self.assertFalse(self.warmer.is_business_hours(day.replace(hour=7, minute=59)))
+        self.assertTrue(self.warmer.is_business_hours(day.replace(hour=8)))
+        self.assertTrue(self.warmer.is_business_hours(day.replace(hour=21, minute=59)))
+        self.assertFalse(self.warmer.is_business_hours(day.replace(hour=22)))
+
+    def test_warm_up_marks_models_ready(self):
+        """Başarılı ısındırmada tüm modellerin hazır olduğunu ve isteklerin doğru gövdeyle gittiğini test eder"""
+        self.assertEqual(self.warmer.models, ["gemma3", "llama3"])
+        self.assertTrue(self.run_with_mock(self.warmer.warm_up))
+
+        status = self.warmer.get_status()
+        self.assertTrue(status["ready"])
+        self.assertEqual({model: info["state"] for model, info in status["models"].items()},
+                         {"gemma3": "ready", "llama3": "ready"})
+        self.assertIn("warmup_seconds", status["models"]["gemma3"])
+        path, body = self.requests[0]
+        self.assertEqual(path, "/api/generate")
+        self.assertEqual((body["keep_alive"], body["stream"], body["options"]), ("45m", False, {"num_predict": 1}))
+
+    def test_warm_up_reports_errors_per_model(self):
+        """Yüklenemeyen modelin hata durumuna düştüğünü ve warmer'ın hazır sayılmadığını test eder"""
+        self.failing_models = {"llama3"}
+        self.assertFalse(self.run_with_mock(self.warmer.warm_up))
+
+        models = self.warmer.get_status()["models"]
+        self.assertFalse(self.warmer.ready)
+        self.assertEqual(models["gemma3"]["state"], "ready")
+        self.assertEqual(models["llama3"]["state"], "error")
+        self.assertIn("500", models["llama3"]["error"])
+
+        # Model düzelince tekrar ısındırma warmer'ı hazır hale getirir
+        self.failing_models = set()
+        self.assertTrue(self.run_with_mock(self.warmer.warm_up))
+        self.assertEqual(self.warmer.get_status()["models"]["llama3"]["state"], "ready")
+
+    def test_ready_when_one_healthy_backend_is_warm(self):
+        """Havuzda en az bir sağlıklı backend ısınınca warmer'ın hazır sayıldığını test eder"""
+        healthy = {"http://ollama-a:11434": True, "http://ollama-b:11434": True}
+        warmer = ModelWarmer(["gemma3"], base_urls=list(healthy), is_healthy=lambda url: healthy[url])
+        self.failing_hosts = {"ollama-b"}
+        self.assertTrue(self.run_with_mock(warmer.warm_up))
+
+        status = warmer.get_status()
+        self.assertEqual(status["backends"]["http://ollama-a:11434"]["gemma3"]["state"], "ready")
+        self.assertEqual(status["backends"]["http://ollama-b:11434"]["gemma3"]["state"], "error")
+        self.assertEqual(status["models"]["gemma3"]["state"], "ready")
+
+        # Isınmış tek backend havuzdan çıkarılırsa warmer hazır sayılmaz
+        healthy["http://ollama-a:11434"] = False
+        self.assertFalse(warmer.ready)
+
+        # Tekrar ısındırma sadece hazır olmayan backend'e istek atar
+        self.requests.clear()
+        self.failing_hosts = set()
+        self.assertTrue(self.run_with_mock(warmer.warm_up))
+        self.assertEqual(len(self.requests), 1)
+
+    def test_failed_ping_marks_backend_for_rewarm(self):
+        """Ping'e yanıt vermeyen backend'deki modelin tekrar ısındırılmak üzere hataya düştüğünü test eder"""
+        self.assertTrue(self.run_with_mock(self.warmer.warm_up))
+        self.failing_models = {"llama3"}
+        self.run_with_mock(self.warmer.ping)
+
+        models = self.warmer.get_status()["models"]
+        self.assertIn("last_ping", models["gemma3"])
+        self.assertEqual(models["llama3"]["state"], "error")
+        self.assertFalse(self.warmer.ready)
+
+    def test_keeper_retries_with_backoff_outside_business_hours(self):
+        """Başarısız ısındırmanın mesai dışında da artan aralıklarla tekrar denendiğini test eder"""
+        warmer = ModelWarmer(["gemma3"], base_urls=["http://ollama:11434"], keeper_interval_seconds=30,
+                             retry_backoff_seconds=5, business_hours=(0, 0))
+        self.failing_models = {"gemma3"}
+        delays = []
+
+        async def fake_sleep(delay):
+            delays.append(delay)
+            if len(delays) == 4:
+                self.failing_models = set()
+            if len(delays) == 6:
+                raise asyncio.CancelledError()
+
+        with mock.patch("supportflow.model_warmup.asyncio.sleep", fake_sleep):
+            with self.assertRaises(asyncio.CancelledError):
+                self.run_with_mock(warmer._keeper_loop)
+
+        self.assertEqual(delays, [5, 10, 20, 30, 30, 30])
+        self.assertTrue(warmer.ready)
+        # Mesai dışında ping atılmaz, sadece ısındırma istekleri gider
+        self.assertTrue(all("prompt" in body for _, body in self.requests))
+
+    def test_from_config_defaults_to_main_model(self):
+        """WARMUP_CONFIG modelleri boşken ana modelin ısındırıldığını test eder"""
+        with mock.patch.object(WARMUP_CONFIG, "models", []), \
+                mock.patch.object(OLLAMA_CONFIG, "model_name", "qwen2:7b"):
+            self.assertEqual(ModelWarmer.from_config().models, ["qwen2:7b"])
+
+
+if __name__ == "__main__":
+    unittest.main()
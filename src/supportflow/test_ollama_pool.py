@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+Ollama backend havuzu (OllamaPool) için test dosyası
+Backend'ler process içinde çalışan stub Ollama sunucularıdır
+"""
+
+import asyncio
+import logging
+import os
+import socket
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+import httpx
+
+# src dizinini Python path'ine ekle
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from supportflow.load_generator import serve_in_background, stop_server
+from supportflow.ollama_pool import OllamaPool, _parse_ps_response
+from supportflow.stub_ollama import StubOllamaSettings, create_stub_app
+from supportflow.tracing import RotatingFileExporter, tracer
+
+
+# Trace'ler kaynak ağacı yerine geçici dizine yazılır
+TRACE_DIR = tempfile.TemporaryDirectory()
+TRACE_PATCH = mock.patch.object(tracer, "exporter", RotatingFileExporter(os.path.join(TRACE_DIR.name, "traces.jsonl")))
+
+
+def setUpModule():
+    TRACE_PATCH.start()
+
+
+def tearDownModule():
+    TRACE_PATCH.stop()
+    TRACE_DIR.cleanup()
+
+
+MODEL = "gemma3:latest"
+
+
+def stub_settings(**overrides) -> StubOllamaSettings:
+    """Hızlı yanıt veren stub ayarları"""
+    values = dict(prompt_eval_ms=0, tokens_per_second=0, response_tokens=5, seed=1, models=[MODEL])
+    values.update(overrides)
+    return StubOllamaSettings(**values)
+
+
+def unused_url() -> str:
+    """Dinlenmeyen bir portun adresi (kapalı backend)"""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    return f"http://127.0.0.1:{port}"
+
+
+class TestOllamaPool(unittest.TestCase):
+    """OllamaPool için test cases"""
+
+    @classmethod
+    def setUpClass(cls):
+        logging.getLogger("supportflow.ollama_pool").setLevel(logging.ERROR)
+        # Stub sunucular ayrı bir thread'deki event loop'ta çalışır; havuz senkron çağrılır
+        cls.loop = asyncio.new_event_loop()
+        cls.thread = threading.Thread(target=cls.loop.run_forever, daemon=True)
+        cls.thread.start()
+        cls.servers = []
+        cls.fast_url, cls.fast = cls.start_stub(stub_settings())
+        cls.other_url, cls.other = cls.start_stub(stub_settings())
+        cls.slow_url, cls.slow = cls.start_stub(stub_settings(prompt_eval_ms=400))
+        cls.broken_url, cls.broken = cls.start_stub(stub_settings(failure_rate=1.0))
+
+    @classmethod
+    def tearDownClass(cls):
+        for server, task in cls.servers:
+            asyncio.run_coroutine_threadsafe(stop_server(server, task), cls.loop).result(10)
+        cls.loop.call_soon_threadsafe(cls.loop.stop)
+        cls.thread.join(5)
+        cls.loop.close()
+
+    @classmethod
+    def start_stub(cls, settings: StubOllamaSettings):
+        app = create_stub_app(settings)
+        server, task, url = asyncio.run_coroutine_threadsafe(
+            serve_in_background(app, log_level="critical"), cls.loop
+        ).result(10)
+        cls.servers.append((server, task))
+        return url, app.state.stats
+
+    def test_select_prefers_loaded_model_then_fewest_outstanding(self):
+        """Modeli yüklü backend'in, sonra en az bekleyen isteği olanın seçildiğini test eder"""
+        pool = OllamaPool(["http://a:1", "http://b:1", "http://c:1"])
+        a, b, c = pool.backends
+        c.loaded_models.add(MODEL)
+        c.outstanding = 2
+
+        self.assertIs(pool.select(MODEL), c)
+        self.assertEqual(c.outstanding, 3)
+        self.assertIs(pool.select("baska-model"), a)
+        self.assertIs(pool.select("baska-model"), b)
+        self.assertIs(pool.select("baska-model", exclude=(a, b)), c)
+        self.assertIsNone(pool.select(MODEL, exclude=(a, b, c)))
+
+    def test_failures_eject_and_requests_fail_over(self):
+        """Hata veren backend'den diğerine geçildiğini ve backend'in devreden çıkarıldığını test eder"""
+        pool = OllamaPool([self.broken_url, self.fast_url], max_consecutive_failures=2, eject_seconds=60)
+        broken, fast = pool.backends
+        broken.loaded_models.add(MODEL)
+
+        self.assertTrue(pool.invoke(MODEL, "Merhaba"))
+        self.assertTrue(pool.invoke(MODEL, "Merhaba"))
+        self.assertEqual(pool.failovers, 2)
+        status = pool.get_status()["backends"][0]
+        self.assertFalse(status["available"])
+        self.assertTrue(status["eject_reason"].startswith("failures"))
+
+        # Devre dışı backend artık seçilmez
+        requests_before = self.broken.requests
+        pool.invoke(MODEL, "Merhaba")
+        self.assertEqual(self.broken.requests, requests_before)
+        self.assertEqual((broken.outstanding, fast.outstanding), (0, 0))
+
+    def test_stream_fails_over_before_first_token(self):
+        """İlk token gelmeden oluşan stream hatasında diğer backend'e geçildiğini test eder"""
+        pool = OllamaPool([self.broken_url, self.fast_url])
+        pool.backends[0].loaded_models.add(MODEL)
+        chunks = []
+        completion = pool.complete(MODEL, "Merhaba", on_token=chunks.append)
+        self.assertEqual("".join(chunks), completion.text)
+        self.assertFalse(completion.truncated)
+        self.assertEqual(pool.failovers, 1)
+        self.assertEqual([backend.outstanding for backend in pool.backends], [0, 0])
+
+    def test_num_predict_limits_output_and_reports_truncation(self):
+        """num_predict sınırına takılan yanıtın kesildi olarak işaretlendiğini test eder"""
+        pool = OllamaPool([self.fast_url])
+        completion = pool.complete(MODEL, "Merhaba", num_predict=2, stop=["\nMüşteri:"])
+        self.assertTrue(completion.truncated)
+        self.assertEqual(completion.eval_count, 2)
+        self.assertFalse(pool.complete(MODEL, "Merhaba", num_predict=50).truncated)
+
+    def test_health_check_ejects_unreachable_and_reads_loaded_models(self):
+        """Erişilemeyen backend'in çıkarıldığını ve yüklü modellerin /api/ps'ten okunduğunu test eder"""
+        pool = OllamaPool([unused_url(), self.fast_url], health_check_timeout=1)
+        health = asyncio.run(pool.check_health())
+
+        dead, fast = pool.backends
+        self.assertEqual(list(health.values()), [False, True])
+        self.assertEqual(fast.loaded_models, {MODEL})
+        self.assertFalse(dead.available(time.monotonic()))
+        self.assertTrue(dead.eject_reason.startswith("health"))
+
+        # Sağlık kontrolüyle çıkarılan backend yanıt verince hemen geri alınır
+        dead.base_url = self.other_url
+        asyncio.run(pool.check_health())
+        self.assertTrue(dead.available(time.monotonic()))
+
+    def test_unparsable_health_response_marks_only_that_backend(self):
+        """Geçersiz /api/ps yanıtının sadece o backend'i sağlıksız saydığını test eder"""
+        bodies = {
+            "http://bozuk": httpx.Response(200, text="<html>proxy</html>"),
+            "http://liste": httpx.Response(200, json=["beklenmeyen"]),
+            "http://saglam": httpx.Response(200, json={"models": [{"name": MODEL}]})
+        }
+        self.assertEqual(_parse_ps_response(bodies["http://saglam"]), ({MODEL}, None))
+        self.assertEqual(_parse_ps_response(httpx.Response(503))[1], "503")
+
+        transport = httpx.MockTransport(lambda request: bodies[f"{request.url.scheme}://{request.url.host}"])
+        real_client = httpx.AsyncClient
+        pool = OllamaPool(list(bodies), health_check_timeout=1)
+        with mock.patch("supportflow.ollama_pool.httpx.AsyncClient",
+                        lambda **kwargs: real_client(transport=transport, **kwargs)):
+            health = asyncio.run(pool.check_health())
+
+        self.assertEqual(list(health.values()), [False, False, True])
+        self.assertEqual(pool.backends[0].eject_reason, "health: geçersiz /api/ps yanıtı")
+        self.assertEqual(pool.backends[2].loaded_models, {MODEL})
+
+    def test_health_loop_survives_failed_rounds(self):
+        """Sağlık kontrolündeki bir hatanın periyodik görevi durdurmadığını test eder"""
+        pool = OllamaPool([self.fast_url], health_check_interval_seconds=0.01)
+        calls = []
+
+        async def flaky_check():
+            calls.append(1)
+            if len(calls) == 1:
+                raise RuntimeError("beklenmeyen hata")
+            return {}
+
+        async def scenario():
+            with mock.patch.object(pool, "check_health", flaky_check):
+                pool.start()
+                await asyncio.sleep(0.1)
+                await pool.stop()
+
+        asyncio.run(scenario())
+        self.assertGreater(len(calls), 1)
+
+    def test_slow_backend_is_ejected_by_latency(self):
+        """Medyan süresi eşiği aşan backend'in devreden çıkarıldığını test eder"""
+        pool = OllamaPool(["http://a:1", "http://b:1"], latency_eject_ms=100)
+        a = pool.backends[0]
+        for _ in range(5):
+            pool.select(MODEL, exclude=(pool.backends[1],))
+            pool.record_success(a, MODEL, 0.5)
+        self.assertFalse(a.available(time.monotonic()))
+        self.assertEqual(a.eject_reason, "latency")
+        self.assertIs(pool.select(MODEL), pool.backends[1])
+
+    def test_hedged_request_wins_on_faster_backend(self):
+        """Gecikme yüzdeliğini aşan isteğin ikinci backend'e de gönderilip oradan yanıtlandığını test eder"""
+        pool = OllamaPool(
+            [self.slow_url, self.other_url], hedge_enabled=True, hedge_percentile=95, hedge_min_samples=5
+        )
+        pool.backends[0].loaded_models.add(MODEL)
+        self.assertIsNone(pool.hedge_delay())
+        pool._latencies.extend([0.02] * 5)
+
+        started = time.perf_counter()
+        self.assertTrue(pool.invoke(MODEL, "Merhaba"))
+        elapsed = time.perf_counter() - started
+        asyncio.run(pool.stop())
+
+        self.assertEqual((pool.hedges, pool.hedge_wins), (1, 1))
+        self.assertLess(elapsed, 0.4)
+
+
+if __name__ == "__main__":
+    unittest.main()
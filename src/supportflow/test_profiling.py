@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Profil araçları (StackSampler / profile_call) için test dosyası
+"""
+
+import os
+import sys
+import contextvars
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+# src dizinini Python path'ine ekle
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from supportflow import api
+from supportflow.profiling import StackSampler, format_collapsed, profile_branch, profile_call
+
+
+def busy_worker(stop: threading.Event):
+    """Durdurulana kadar CPU harcayan fonksiyon"""
+    total = 0
+    while not stop.is_set():
+        total += sum(range(1000))
+    return total
+
+
+def expensive_function():
+    return sum(i * i for i in range(20000))
+
+
+def cheap_function():
+    return expensive_function() + 1
+
+
+@profile_branch
+def branch_function():
+    return sum(i * i for i in range(20000))
+
+
+def fan_out():
+    """İşi context'i taşıyan executor thread'lerine dağıtır (LangGraph gibi)"""
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        futures = [executor.submit(contextvars.copy_context().run, branch_function) for _ in range(2)]
+        return [future.result() for future in futures]
+
+
+class TestProfiling(unittest.TestCase):
+    """Profil araçları için test cases"""
+
+    def test_sampler_collects_collapsed_stacks(self):
+        """Diğer thread'lerin stack'lerinin thread adıyla örneklendiğini test eder"""
+        stop = threading.Event()
+        worker = threading.Thread(target=busy_worker, args=(stop,), name="busy-worker")
+        worker.start()
+        try:
+            sampler = StackSampler(interval_seconds=0.002)
+            stacks = sampler.run(0.2)
+        finally:
+            stop.set()
+            worker.join()
+
+        self.assertGreater(sampler.samples, 10)
+        worker_stacks = [stack for stack in stacks if stack.startswith("busy-worker;")]
+        self.assertTrue(any("busy_worker (test_profiling.py:" in stack for stack in worker_stacks))
+        # Örnekleyici kendi stack'ini saymaz
+        self.assertFalse(any("StackSampler" in stack or "run (profiling.py" in stack for stack in stacks))
+
+        line = format_collapsed(stacks).splitlines()[0]
+        stack, count = line.rsplit(" ", 1)
+        self.assertEqual(stacks[stack], int(count))
+
+    def test_profile_call_reports_top_functions(self):
+        """Tek çağrı profilinin sonucu ve pahalı fonksiyonları döndürdüğünü test eder"""
+        result, report = profile_call(cheap_function, top_n=5)
+
+        self.assertEqual(result, expensive_function() + 1)
+        self.assertLessEqual(len(report["top_functions"]), 5)
+        names = [row["function"] for row in report["top_functions"]]
+        self.assertTrue(any(name.startswith("expensive_function (test_profiling.py:") for name in names))
+        cumulative = [row["cumulative_ms"] for row in report["top_functions"]]
+        self.assertEqual(cumulative, sorted(cumulative, reverse=True))
+
+    def test_profile_call_merges_branch_threads(self):
+        """Executor thread'lerinde çalışan dalların rapora eklendiğini test eder"""
+        result, report = profile_call(fan_out, top_n=50)
+
+        self.assertEqual(len(result), 2)
+        self.assertEqual(report["threads"] + report["unprofiled_branches"], 3)
+        if report["threads"] == 3:
+            rows = {row["function"].split(" ")[0]: row for row in report["top_functions"]}
+            self.assertEqual(rows["branch_function"]["calls"], 2)
+        # Profil dışında dekoratör fonksiyonu doğrudan çağırır
+        self.assertEqual(branch_function(), result[0])
+
+    def test_profiling_requires_admin_token(self):
+        """Admin token tanımlı değilken profil isteklerinin reddedildiğini test eder"""
+        with mock.patch.object(api.SERVER_CONFIG, "admin_token", None):
+            with self.assertRaises(api.HTTPException) as raised:
+                api.require_profiling_access(None)
+        self.assertEqual(raised.exception.status_code, 403)
+        with mock.patch.object(api.SERVER_CONFIG, "admin_token", "gizli"):
+            api.require_profiling_access("gizli")
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
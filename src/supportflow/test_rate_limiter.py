@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Rate limiter için test dosyası
+"""
+
+import unittest
+import sys
+import os
+
+# src dizinini Python path'ine ekle
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from supportflow.rate_limiter import ChatRateLimiter, customer_identity, retry_after_header
+
+
+class FakeClock:
+    """Elle ilerletilebilen saat"""
+
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestChatRateLimiter(unittest.TestCase):
+    """ChatRateLimiter sınıfı için test cases"""
+
+    def setUp(self):
+        """Her test öncesi çalışır"""
+        self.clock = FakeClock()
+        self.limiter = ChatRateLimiter(
+            limits={
+                "session": {"rate": 0.5, "burst": 2},
+                "customer": {"rate": 1.0, "burst": 3},
+                "global": {"rate": 100.0, "burst": 100},
+            },
+            sweep_interval_seconds=30,
+            clock=self.clock
+        )
+
+    def test_session_burst_and_refill(self):
+        """Session bucket'ının burst sonrası reddettiğini ve dolduğunu test eder"""
+        self.assertIsNone(self.limiter.check("s1", None))
+        self.assertIsNone(self.limiter.check("s1", None))
+        scope, wait = self.limiter.check("s1", None)
+        self.assertEqual(scope, "session")
+        self.assertAlmostEqual(wait, 2.0)
+        self.assertEqual(retry_after_header(wait), "2")
+
+        self.clock.now += 2
+        self.assertIsNone(self.limiter.check("s1", None))
+
+    def test_customer_limit_spans_sessions(self):
+        """Müşteri limitinin farklı session'lar arasında ortak olduğunu test eder"""
+        customer = {"name": "Ahmet", "phone": "0555 123 4567"}
+        for session_id in ("a", "b", "c"):
+            self.assertIsNone(self.limiter.check(session_id, customer))
+        scope, _ = self.limiter.check("d", {"phone": "+90 555 123 45 67"})
+        self.assertEqual(scope, "customer")
+        # Reddedilen istek session bucket'ından token harcamamalı
+        self.assertIsNone(self.limiter.check("d", None))
+
+    def test_idle_buckets_are_evicted(self):
+        """Kullanılmayan bucket'ların temizlendiğini test eder"""
+        self.limiter.check("s1", {"customer_id": 42})
+        self.clock.now += 60
+        self.limiter.check(None, None)
+        self.assertEqual(self.limiter.get_status()["buckets"]["session"], 0)
+        self.assertEqual(self.limiter.get_status()["buckets"]["customer"], 0)
+
+    def test_customer_identity(self):
+        """Müşteri anahtarının çıkarılmasını test eder"""
+        self.assertEqual(customer_identity({"customer_id": 7, "phone": "1"}), "id:7")
+        self.assertEqual(customer_identity({"email": " A@B.com "}), "email:a@b.com")
+        self.assertIsNone(customer_identity({"name": "Ahmet"}))
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+RouterAgent graph'i için test dosyası
+"""
+
+import unittest
+import sys
+import tempfile
+import os
+import time
+from unittest import mock
+
+# src dizinini Python path'ine ekle
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from supportflow.agents import RouterAgent
+from supportflow.config import AGENT_CONFIG
+from supportflow.tracing import RotatingFileExporter, tracer
+
+
+# Trace'ler kaynak ağacı yerine geçici dizine yazılır
+TRACE_DIR = tempfile.TemporaryDirectory()
+TRACE_PATCH = mock.patch.object(tracer, "exporter", RotatingFileExporter(os.path.join(TRACE_DIR.name, "traces.jsonl")))
+
+
+def setUpModule():
+    TRACE_PATCH.start()
+
+
+def tearDownModule():
+    TRACE_PATCH.stop()
+    TRACE_DIR.cleanup()
+
+
+class FakeLLM:
+    """Çağrıları sayan sahte LLM"""
+
+    def __init__(self, response="LLM yanıtı"):
+        self.response = response
+        self.calls = 0
+
+    def invoke(self, prompt):
+        self.calls += 1
+        return self.response
+
+    def stream(self, prompt):
+        self.calls += 1
+        yield self.response
+
+
+class SlowLLM(FakeLLM):
+    """Her çağrıda bekleyen sahte LLM (paralel çalışmayı ölçmek için)"""
+
+    def __init__(self, response, delay=0.3):
+        super().__init__(response)
+        self.delay = delay
+
+    def invoke(self, prompt):
+        time.sleep(self.delay)
+        return super().invoke(prompt)
+
+    def stream(self, prompt):
+        time.sleep(self.delay)
+        yield from super().stream(prompt)
+
+
+class TestRouterAgent(unittest.TestCase):
+    """RouterAgent sınıfı için test cases"""
+
+    def setUp(self):
+        """Her test öncesi çalışır"""
+        self.llm = FakeLLM()
+        self.agent = RouterAgent("gemma3")
+        self.agent.llm = self.agent.fatura_agent.llm = self.agent.tarife_agent.llm = self.llm
+
+    def test_escalation_skips_generation(self):
+        """Escalation mesajlarında LLM çağrılmadığını test eder"""
+        tokens = []
+        result = self.agent.run("Müdürle görüşmek istiyorum, ŞİKAYET edeceğim", on_token=tokens.append)
+
+        self.assertTrue(result["requires_human"])
+        self.assertEqual(result["agent_type"], "human_handoff")
+        self.assertEqual(result["category"], "genel_bilgi")
+        self.assertEqual(tokens, [result["response"]])
+        self.assertEqual(self.llm.calls, 0)
+
+        # Escalation kategori yerine ayrı bayrak olarak döner; mesajın kategorisi korunur
+        result = self.agent.run("Faturam yanlış, şikayet edeceğim")
+        self.assertTrue(result["requires_human"])
+        self.assertEqual(result["category"], "faturalama")
+
+    def test_regular_message_is_routed(self):
+        """Normal mesajların ilgili agent'a yönlendirildiğini test eder"""
+        result = self.agent.run("Fatura bakiyemi öğrenebilir miyim?")
+
+        self.assertFalse(result["requires_human"])
+        self.assertEqual(result["category"], "faturalama")
+        self.assertEqual(result["response"], "LLM yanıtı")
+        self.assertEqual(self.llm.calls, 1)
+        self.assertEqual(result["agent_type"], "fatura")
+
+    def test_general_question_answered_from_knowledge_base(self):
+        """Bilgi tabanında eşleşen genel soruların LLM'e gitmediğini test eder"""
+        tokens = []
+        result = self.agent.run("Çalışma saatleriniz nedir?", on_token=tokens.append)
+
+        self.assertEqual(result["category"], "genel_bilgi")
+        self.assertEqual(result["agent_type"], "knowledge_base")
+        self.assertEqual(tokens, [result["response"]])
+        self.assertEqual(self.llm.calls, 0)
+
+    def test_number_porting_question_is_not_escalated(self):
+        """"operatör değiştirmek" sorusunun escalation yerine bilgi tabanından yanıtlandığını test eder"""
+        result = self.agent.run("Operatör değiştirmek istiyorum, ne yapmalıyım?")
+
+        self.assertFalse(result["requires_human"])
+        self.assertEqual(result["agent_type"], "knowledge_base")
+        self.assertIn("numara-tasima", result["response"])
+        self.assertTrue(self.agent.run("Operatöre bağlanmak istiyorum")["requires_human"])
+
+    def test_unmatched_general_question_falls_through_to_llm(self):
+        """Bilgi tabanında eşleşmeyen genel soruların LLM'e gittiğini test eder"""
+        result = self.agent.run("Merhaba, bir sorum olacaktı")
+
+        self.assertEqual(result["category"], "genel_bilgi")
+        self.assertEqual(result["agent_type"], "router")
+        self.assertEqual(self.llm.calls, 1)
+
+
+    def test_multi_topic_message_fans_out_to_both_specialists(self):
+        """Fatura ve tarife içeren mesajda iki uzmanın paralel çalışıp yanıtların birleştiğini test eder"""
+        self.agent.fatura_agent.llm = SlowLLM("Fatura yanıtı")
+        self.agent.tarife_agent.llm = SlowLLM("Tarife yanıtı")
+        tokens = []
+
+        started = time.perf_counter()
+        result = self.agent.run("Faturam yüksek geldi, paketimi de değiştirmek istiyorum", on_token=tokens.append)
+        elapsed = time.perf_counter() - started
+
+        self.assertEqual(result["agent_type"], "fatura+tarife")
+        self.assertEqual(result["category"], "faturalama")
+        self.assertEqual(result["response"], "Fatura yanıtı\n\nTarife yanıtı")
+        # Fatura yanıtı canlı, tarife yanıtı birleştirmede gönderilir
+        self.assertEqual(tokens, ["Fatura yanıtı", "\n\nTarife yanıtı"])
+        self.assertLess(elapsed, 0.55)
+
+    def test_fan_out_can_be_disabled(self):
+        """parallel_specialists kapalıyken sadece birincil kategorinin uzmanının çağrıldığını test eder"""
+        AGENT_CONFIG["parallel_specialists"] = False
+        try:
+            result = self.agent.run("Faturam yüksek geldi, paketimi de değiştirmek istiyorum")
+        finally:
+            AGENT_CONFIG["parallel_specialists"] = True
+        self.assertEqual(result["agent_type"], "fatura")
+        self.assertEqual(self.llm.calls, 1)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
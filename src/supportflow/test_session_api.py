@@ -6,6 +6,7 @@ Human-in-the-loop özelliklerini test eder
 
 import requests
 import json
+import os
 import time
 
 
@@ -98,7 +99,8 @@ def test_session_based_chat():
     
     # 6. Human intervention gerektiren session'ları listele
     print("\n6️⃣  Human Intervention Gerektiren Session'lar")
-    response = requests.get(f"{base_url}/admin/sessions/requiring-human")
+    admin_headers = {"X-Admin-Token": os.environ.get("SUPPORTFLOW_ADMIN_TOKEN", "")}
+    response = requests.get(f"{base_url}/admin/sessions/requiring-human", headers=admin_headers)
     if response.status_code == 200:
         sessions_data = response.json()
         print(f"📋 Count: {sessions_data['count']}")
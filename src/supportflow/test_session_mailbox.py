@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+SessionMailboxes için test dosyası
+"""
+
+import asyncio
+import unittest
+import sys
+import os
+
+# src dizinini Python path'ine ekle
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from supportflow.session_mailbox import SessionMailboxes
+
+
+class TestSessionMailboxes(unittest.TestCase):
+    """SessionMailboxes sınıfı için test cases"""
+
+    def test_same_session_runs_in_order(self):
+        """Aynı session işlerinin sırayla ve tek tek çalıştığını test eder"""
+        mailboxes = SessionMailboxes(idle_seconds=1)
+        log = []
+
+        def job(name, delay):
+            async def run():
+                log.append(f"{name}-başla")
+                await asyncio.sleep(delay)
+                log.append(f"{name}-bitir")
+                return name
+            return run
+
+        async def scenario():
+            return await asyncio.gather(
+                mailboxes.submit("s1", job("a", 0.03)),
+                mailboxes.submit("s1", job("b", 0.0)),
+            )
+
+        self.assertEqual(asyncio.run(scenario()), ["a", "b"])
+        self.assertEqual(log, ["a-başla", "a-bitir", "b-başla", "b-bitir"])
+
+    def test_different_sessions_run_in_parallel(self):
+        """Farklı session'ların birbirini beklemediğini test eder"""
+        mailboxes = SessionMailboxes(idle_seconds=1)
+
+        async def slow():
+            await asyncio.sleep(0.05)
+
+        async def scenario():
+            loop = asyncio.get_running_loop()
+            started = loop.time()
+            await asyncio.gather(*(mailboxes.submit(f"s{i}", slow) for i in range(5)))
+            return loop.time() - started
+
+        self.assertLess(asyncio.run(scenario()), 0.2)
+
+    def test_errors_and_idle_cleanup(self):
+        """Hataların çağırana iletildiğini ve boş mailbox'ın silindiğini test eder"""
+        mailboxes = SessionMailboxes(idle_seconds=0.02)
+
+        async def failing():
+            raise ValueError("hata")
+
+        async def ok():
+            return "tamam"
+
+        async def scenario():
+            with self.assertRaises(ValueError):
+                await mailboxes.submit("s1", failing)
+            self.assertEqual(await mailboxes.submit("s1", ok), "tamam")
+            self.assertEqual(len(mailboxes), 1)
+            await asyncio.sleep(0.08)
+            return len(mailboxes)
+
+        self.assertEqual(asyncio.run(scenario()), 0)
+
+    def test_drain_waits_for_abandoned_jobs(self):
+        """Çağıranı iptal edilmiş işlerin de drain ile tamamlanmasının beklendiğini test eder"""
+        mailboxes = SessionMailboxes(idle_seconds=1)
+        done = []
+
+        async def job():
+            await asyncio.sleep(0.05)
+            done.append(True)
+
+        async def scenario():
+            callers = [asyncio.ensure_future(mailboxes.submit("s1", job)) for _ in range(2)]
+            await asyncio.sleep(0.01)
+            for caller in callers:
+                caller.cancel()
+            self.assertEqual(mailboxes.in_flight(), 2)
+            self.assertFalse(await mailboxes.drain(0.02))
+            self.assertTrue(await mailboxes.drain(1))
+            await mailboxes.close()
+
+        asyncio.run(scenario())
+        self.assertEqual(done, [True, True])
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
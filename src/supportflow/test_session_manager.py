@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+SessionManager için test dosyası
+"""
+
+import asyncio
+import contextlib
+import io
+import unittest
+import sys
+import tempfile
+import os
+from datetime import datetime, timedelta
+from unittest import mock
+
+# src dizinini Python path'ine ekle
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from supportflow.session_manager import SessionManager
+from supportflow.tracing import RotatingFileExporter, tracer
+
+
+# Trace'ler kaynak ağacı yerine geçici dizine yazılır
+TRACE_DIR = tempfile.TemporaryDirectory()
+TRACE_PATCH = mock.patch.object(tracer, "exporter", RotatingFileExporter(os.path.join(TRACE_DIR.name, "traces.jsonl")))
+
+
+def setUpModule():
+    TRACE_PATCH.start()
+
+
+def tearDownModule():
+    TRACE_PATCH.stop()
+    TRACE_DIR.cleanup()
+
+
+class TestRequiringHumanPagination(unittest.TestCase):
+    """Human intervention listesinin sayfalanması için test cases"""
+
+    def setUp(self):
+        """Her test öncesi çalışır"""
+        self.manager = SessionManager()
+        self.session_ids = []
+        base = datetime.now() - timedelta(minutes=20)
+        for i in range(7):
+            session_id = self.manager.create_session({"name": f"Müşteri {i}"})
+            session = self.manager.sessions[session_id]
+            session.created_at = base + timedelta(minutes=i)
+            self.manager.add_conversation_turn(
+                session_id, "Müdürle görüşmek istiyorum", "Yanıt",
+                category="faturalama" if i % 2 == 0 else "paket_tarife"
+            )
+            self.session_ids.append(session_id)
+        # Escalation olmayan bir session
+        self.manager.create_session()
+
+    def test_cursor_walks_all_pages_in_order(self):
+        """Cursor ile tüm sayfaların sırayla gezildiğini test eder"""
+        collected = []
+        cursor = None
+        while True:
+            page, cursor = self.manager.list_sessions_requiring_human(limit=3, cursor=cursor)
+            collected.extend(session.session_id for session in page)
+            if not cursor:
+                break
+        self.assertEqual(collected, self.session_ids)
+
+    def test_filters(self):
+        """Kategori, yaş ve human agent filtrelerini test eder"""
+        page, _ = self.manager.list_sessions_requiring_human(category="faturalama")
+        self.assertEqual(len(page), 4)
+
+        page, _ = self.manager.list_sessions_requiring_human(min_age_minutes=16.5)
+        self.assertEqual(len(page), 4)
+
+        self.manager.mark_for_human_intervention(self.session_ids[1], "test", "agent_001")
+        page, _ = self.manager.list_sessions_requiring_human(human_agent_id="agent_001")
+        self.assertEqual([s.session_id for s in page], [self.session_ids[1]])
+
+    def test_invalid_cursor(self):
+        """Geçersiz cursor'ın ValueError fırlattığını test eder"""
+        with self.assertRaises(ValueError):
+            self.manager.list_sessions_requiring_human(cursor="bozuk-cursor")
+
+
+class TestSessionListeners(unittest.TestCase):
+    """Session event dinleyicileri için test cases"""
+
+    def test_escalation_and_human_joined_events(self):
+        """Escalation ve human agent katılımı event'lerini test eder"""
+        manager = SessionManager()
+        session_id = manager.create_session()
+        events = []
+        manager.add_session_listener(session_id, events.append)
+
+        manager.add_conversation_turn(session_id, "Merhaba", "Yanıt")
+        manager.add_conversation_turn(session_id, "Operatöre bağlanmak istiyorum, şikayet edeceğim", "Yanıt")
+        manager.mark_for_human_intervention(session_id, "Manuel", "agent_001")
+
+        self.assertEqual([e["event"] for e in events], ["escalation", "human_joined"])
+        self.assertEqual(events[1]["human_agent_id"], "agent_001")
+
+        manager.remove_session_listener(session_id, events.append)
+        manager.mark_for_human_intervention(session_id, "Manuel", "agent_002")
+        self.assertEqual(len(events), 2)
+
+    def test_automatic_escalation_keeps_assigned_agent(self):
+        """Agent ID'siz (otomatik) escalation'ın mevcut human agent atamasını silmediğini test eder"""
+        manager = SessionManager()
+        session_id = manager.create_session()
+        manager.mark_for_human_intervention(session_id, "Manuel", "agent_001")
+        manager.mark_for_human_intervention(session_id, "Müşteri escalation talep etti")
+
+        session = manager.get_session(session_id)
+        self.assertEqual(session.human_agent_id, "agent_001")
+        self.assertEqual(session.escalation_reason, "Müşteri escalation talep etti")
+
+
+
+class TestBackgroundCleanup(unittest.TestCase):
+    """Arka plan session temizliği için test cases"""
+
+    def test_expired_sessions_are_swept_off_the_request_path(self):
+        """Süresi dolan session'ların yeni session açılırken değil arka plan görevinde temizlendiğini test eder"""
+        manager = SessionManager(cleanup_interval_seconds=0.02)
+        with contextlib.redirect_stdout(io.StringIO()):
+            expired = manager.create_session()
+            manager.sessions[expired].last_activity = datetime.now() - timedelta(hours=2)
+            manager.create_session()
+            self.assertIn(expired, manager.sessions)
+
+            async def scenario():
+                manager.start()
+                await asyncio.sleep(0.2)
+                await manager.stop()
+
+            asyncio.run(scenario())
+
+        self.assertNotIn(expired, manager.sessions)
+        self.assertEqual(len(manager.sessions), 1)
+        self.assertIsNone(manager._cleanup_task)
+
+    def test_cleanup_interval_can_be_changed_at_runtime(self):
+        """Kapalı temizliğin aralık ayarlanınca beklemeden devreye girdiğini test eder"""
+        manager = SessionManager(cleanup_interval_seconds=0)
+        with contextlib.redirect_stdout(io.StringIO()):
+            expired = manager.create_session()
+            manager.sessions[expired].last_activity = datetime.now() - timedelta(hours=2)
+
+            async def scenario():
+                manager.start()
+                await asyncio.sleep(0.05)
+                self.assertIn(expired, manager.sessions)
+                manager.set_cleanup_interval(0.02)
+                await asyncio.sleep(0.2)
+                await manager.stop()
+
+            asyncio.run(scenario())
+
+        self.assertNotIn(expired, manager.sessions)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
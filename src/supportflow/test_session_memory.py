@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+SessionManager bellek sınırı ve session'ların diske yazılması için test dosyası
+"""
+
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from unittest import mock
+
+# src dizinini Python path'ine ekle
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from supportflow.session_manager import SessionManager, estimate_session_size
+from supportflow.tracing import RotatingFileExporter, tracer
+
+
+# Trace'ler kaynak ağacı yerine geçici dizine yazılır
+TRACE_DIR = tempfile.TemporaryDirectory()
+TRACE_PATCH = mock.patch.object(tracer, "exporter", RotatingFileExporter(os.path.join(TRACE_DIR.name, "traces.jsonl")))
+
+
+def setUpModule():
+    TRACE_PATCH.start()
+
+
+def tearDownModule():
+    TRACE_PATCH.stop()
+    TRACE_DIR.cleanup()
+
+
+class TestSessionMemory(unittest.TestCase):
+    """SessionManager bellek muhasebesi için test cases"""
+
+    def setUp(self):
+        """Her test öncesi çalışır"""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.manager = SessionManager(max_resident_bytes=0, spill_dir=self.tmp.name)
+        self.quiet = contextlib.redirect_stdout(io.StringIO())
+        self.quiet.__enter__()
+
+    def tearDown(self):
+        self.quiet.__exit__(None, None, None)
+        self.manager.close()
+        self.tmp.cleanup()
+
+    def create_sessions(self, count: int):
+        session_ids = []
+        for i in range(count):
+            session_id = self.manager.create_session({"name": f"Müşteri {i}"})
+            self.manager.add_conversation_turn(session_id, "Faturam neden yüksek?", "İnceliyorum " * 20,
+                                               category="faturalama", agent_type="fatura", confidence=0.9)
+            session_ids.append(session_id)
+        return session_ids
+
+    def spill_files(self):
+        return os.listdir(self.manager.spill_dir) if os.path.isdir(self.manager.spill_dir) else []
+
+    def test_resident_bytes_track_session_estimates(self):
+        """Bellek tahmininin session ve turn eklendikçe güncellendiğini test eder"""
+        session_ids = self.create_sessions(3)
+        expected = sum(estimate_session_size(self.manager.sessions[session_id]) for session_id in session_ids)
+        status = self.manager.get_memory_status()
+        self.assertEqual(status["resident_bytes"], expected)
+        self.assertEqual((status["resident_sessions"], status["spilled_sessions"]), (3, 0))
+
+    def test_least_recent_sessions_spill_and_rehydrate(self):
+        """Sınır aşılınca en eski session'ların diske yazıldığını ve sonraki mesajda geri yüklendiğini test eder"""
+        session_ids = self.create_sessions(5)
+        size = self.manager.resident_bytes // 5
+        # İlk session'a yeni mesaj geldi: en son işlem gören o olur
+        self.manager.add_conversation_turn(session_ids[0], "Teşekkürler", "Rica ederim")
+        self.manager.max_resident_bytes = size * 3
+
+        self.assertEqual(self.manager.enforce_memory_limit(), 3)
+        self.assertEqual(list(self.manager.sessions), [session_ids[4], session_ids[0]])
+        status = self.manager.get_memory_status()
+        self.assertEqual((status["resident_sessions"], status["spilled_sessions"]), (2, 3))
+        self.assertLessEqual(status["resident_bytes"], size * 3 * self.manager.spill_target_ratio)
+        self.assertGreater(status["spilled_bytes"], 0)
+        self.assertEqual(len(self.spill_files()), 3)
+
+        # Geri yükleme şeffaftır: geçmiş ve müşteri bilgisi korunur
+        context = self.manager.get_context_for_agent(session_ids[1])
+        self.assertEqual(context["customer_info"], {"name": "Müşteri 1"})
+        self.assertEqual(context["last_category"], "faturalama")
+        self.manager.add_conversation_turn(session_ids[1], "Peki", "Tamam")
+        session = self.manager.sessions[session_ids[1]]
+        self.assertEqual([turn.user_message for turn in session.turns], ["Faturam neden yüksek?", "Peki"])
+        self.assertIsInstance(session.turns[0].timestamp, datetime)
+        self.assertEqual(self.manager.rehydrations, 1)
+        self.assertNotIn(session_ids[1], self.manager._spilled)
+
+    def test_search_reads_spilled_sessions_without_rehydrating(self):
+        """Arama sonuçlarının diske yazılmış session'ı belleğe almadan okuduğunu test eder"""
+        spilled, active = self.create_sessions(2)
+        self.manager.max_resident_bytes = 1
+        self.manager.enforce_memory_limit(keep=active)
+
+        hits = self.manager.search_index.search("faturam")["results"]
+        self.assertEqual({hit["session_id"] for hit in hits}, {spilled, active})
+        self.assertTrue(all(hit["user_message"] == "Faturam neden yüksek?" for hit in hits))
+        self.assertIn(spilled, self.manager._spilled)
+        self.assertEqual(self.manager.rehydrations, 0)
+
+    def test_pinned_sessions_stay_resident(self):
+        """Human intervention bekleyen ve dinleyicisi olan session'ların diske yazılmadığını test eder"""
+        escalated, listened, idle = self.create_sessions(3)
+        self.manager.mark_for_human_intervention(escalated, "Test")
+        self.manager.add_session_listener(listened, lambda event: None)
+        self.manager.max_resident_bytes = 1
+
+        self.manager.enforce_memory_limit()
+        self.assertEqual(set(self.manager.sessions), {escalated, listened})
+        self.assertEqual(self.manager.get_memory_status()["pinned_sessions"], 2)
+        self.assertEqual([s.session_id for s in self.manager.get_sessions_requiring_human()], [escalated])
+        self.assertIsNotNone(self.manager.get_session(idle))
+
+    def test_expired_spilled_sessions_are_removed(self):
+        """Süresi dolan diske yazılmış session'ların dosyalarıyla birlikte silindiğini test eder"""
+        old, recent = self.create_sessions(2)
+        self.manager.max_resident_bytes = 1
+        self.manager.enforce_memory_limit(keep=recent)
+        self.manager._spilled[old].last_activity = datetime.now() - timedelta(hours=2)
+
+        self.assertEqual(self.manager.cleanup_expired_sessions(), 1)
+        self.assertIsNone(self.manager.get_session(old))
+        self.assertEqual(self.spill_files(), [])
+        self.assertEqual(self.manager.stats.snapshot()["active_sessions"], 1)
+        self.assertEqual({hit["session_id"] for hit in self.manager.search_index.search("faturam")["results"]},
+                         {recent})
+
+
+if __name__ == "__main__":
+    unittest.main()
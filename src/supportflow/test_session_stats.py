@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+SessionStats için test dosyası
+"""
+
+import unittest
+import sys
+import os
+
+# src dizinini Python path'ine ekle
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from supportflow.session_stats import SessionStats
+
+
+class FakeClock:
+    """Elle ilerletilebilen saat"""
+
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestSessionStats(unittest.TestCase):
+    """SessionStats sınıfı için test cases"""
+
+    def setUp(self):
+        """Her test öncesi çalışır"""
+        self.clock = FakeClock()
+        self.stats = SessionStats(clock=self.clock)
+
+    def test_totals_and_rates(self):
+        """Toplam sayaçların ve oranların hesaplandığını test eder"""
+        for _ in range(4):
+            self.stats.record_session_created()
+        self.stats.record_turn("faturalama", 100)
+        self.stats.record_turn("faturalama", 200)
+        self.stats.record_turn("paket_tarife", 5000)
+        self.stats.record_escalation()
+        self.stats.record_session_ended(600, 3)
+
+        totals = self.stats.snapshot()["totals"]
+        self.assertEqual(totals["turns_by_category"], {"faturalama": 2, "paket_tarife": 1})
+        self.assertEqual(totals["escalation_rate"], 0.25)
+        self.assertEqual(totals["avg_turns_per_session"], 3)
+        self.assertEqual(totals["avg_session_duration_minutes"], 10)
+        self.assertLess(totals["llm_latency_ms"]["p50"], 300)
+        self.assertGreater(totals["llm_latency_ms"]["p99"], 4000)
+        self.assertEqual(self.stats.snapshot()["active_sessions"], 3)
+
+    def test_windows_expire(self):
+        """Eski olayların pencerelerden düştüğünü test eder"""
+        self.stats.record_turn("faturalama", 100)
+        self.clock.now += 10 * 60
+        self.stats.record_turn("paket_tarife", 100)
+
+        windows = self.stats.snapshot()["windows"]
+        self.assertEqual(windows["5m"]["turns"], 1)
+        self.assertEqual(windows["1h"]["turns"], 2)
+
+        self.clock.now += 2 * 3600
+        snapshot = self.stats.snapshot()
+        self.assertEqual(snapshot["windows"]["1h"]["turns"], 0)
+        self.assertEqual(snapshot["windows"]["24h"]["turns"], 2)
+        self.assertEqual(snapshot["windows"]["24h"]["llm_latency_ms"]["p50"],
+                         snapshot["totals"]["llm_latency_ms"]["p50"])
+
+        self.clock.now += 2 * 86400
+        snapshot = self.stats.snapshot()
+        self.assertEqual(snapshot["windows"]["24h"]["turns"], 0)
+        self.assertEqual(snapshot["totals"]["turns"], 2)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Tipli ayar katmanı (SettingsSection / Settings) için test dosyası
+"""
+
+import json
+import os
+import sys
+import tempfile
+import unittest
+from types import SimpleNamespace
+
+# src dizinini Python path'ine ekle
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from supportflow.config import (
+    BillingDataSettings, OllamaSettings, RateLimitSettings, ServerSettings, SessionSettings
+)
+from supportflow.rate_limiter import ChatRateLimiter
+from supportflow.settings import Settings, SettingsError
+
+
+def make_settings() -> Settings:
+    """Global config'i etkilemeyen, yeni bölümlerden oluşan ayar kaydı"""
+    return Settings({
+        section.section_name: section
+        for section in (
+            OllamaSettings(), SessionSettings(), ServerSettings(),
+            RateLimitSettings(), BillingDataSettings()
+        )
+    })
+
+
+class TestSettings(unittest.TestCase):
+    """Ayar katmanı için test cases"""
+
+    def test_sections_behave_like_validated_dicts(self):
+        """Bölümlerin dict arayüzünü koruduğunu ve yazılan değerleri doğruladığını test eder"""
+        ollama = OllamaSettings()
+        self.assertEqual(ollama["model_name"], ollama.model_name)
+        self.assertIn("base_url", ollama)
+        self.assertEqual(dict(ollama.items())["keep_alive"], "30m")
+
+        ollama["timeout"] = "45"
+        self.assertEqual(ollama.timeout, 45.0)
+        with self.assertRaises(SettingsError):
+            ollama["timeout"] = 0
+        with self.assertRaises(SettingsError):
+            ollama["bilinmeyen"] = 1
+        with self.assertRaises(KeyError):
+            ollama["bilinmeyen"]
+
+    def test_env_and_file_overrides_are_typed(self):
+        """Dosya < ortam değişkeni önceliğini ve metin değerlerin tipe dönüştürülmesini test eder"""
+        settings = make_settings()
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "settings.json")
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump({"ollama": {"model_name": "dosya-model"}, "session": {"context_turns": 3}}, f)
+
+            settings.load_overrides({
+                "SUPPORTFLOW_SETTINGS_FILE": path,
+                "SUPPORTFLOW_SESSION_CONTEXT_TURNS": "8",
+                "SUPPORTFLOW_SERVER_RELOAD": "false",
+                "SUPPORTFLOW_ADMIN_TOKEN": "gizli",
+                "SUPPORTFLOW_RATE_LIMIT_LIMITS": json.dumps({
+                    "session": {"rate": 1, "burst": 2},
+                    "customer": {"rate": 1, "burst": 2},
+                    "global": {"rate": 5, "burst": 10}
+                })
+            })
+
+        sections = settings.sections
+        self.assertEqual(sections["ollama"]["model_name"], "dosya-model")
+        self.assertEqual(sections["session"]["context_turns"], 8)
+        self.assertIs(sections["server"]["reload"], False)
+        self.assertEqual(sections["server"]["admin_token"], "gizli")
+        self.assertEqual(sections["rate_limit"]["limits"]["global"], {"rate": 5.0, "burst": 10.0})
+        self.assertEqual(settings.snapshot()["server"]["admin_token"]["value"], "***")
+
+    def test_invalid_overrides_fail_fast(self):
+        """Geçersiz ortam değişkeni ve eksik rate limit kapsamının reddedildiğini test eder"""
+        with self.assertRaisesRegex(SettingsError, "session.low_confidence_threshold"):
+            make_settings().load_overrides({"SUPPORTFLOW_SESSION_LOW_CONFIDENCE_THRESHOLD": "1.5"})
+        with self.assertRaises(SettingsError):
+            make_settings().load_overrides({"SUPPORTFLOW_SERVER_PORT": "sekiz bin"})
+        with self.assertRaisesRegex(SettingsError, "customer"):
+            make_settings().load_overrides({
+                "SUPPORTFLOW_RATE_LIMIT_LIMITS": '{"session": {"rate": 1, "burst": 1}}'
+            })
+
+    def test_update_is_atomic_and_rejects_restart_only_settings(self):
+        """Hatalı değişiklikte hiçbir ayarın uygulanmadığını test eder"""
+        settings = make_settings()
+        billing = settings.sections["billing_data"]
+
+        with self.assertRaisesRegex(SettingsError, "yeniden başlatma"):
+            settings.update({"billing_data": {"cache_ttl_seconds": 60, "db_path": "/tmp/x.db"}})
+        self.assertEqual(billing["cache_ttl_seconds"], 300)
+
+        with self.assertRaises(SettingsError):
+            settings.update({"billing_data": {"cache_ttl_seconds": 60}, "session": {"context_turns": -1}})
+        self.assertEqual(billing["cache_ttl_seconds"], 300)
+
+        changed = settings.update({"billing_data": {"cache_ttl_seconds": 60, "db_path": billing["db_path"]}})
+        self.assertEqual(changed, {"billing_data": {"cache_ttl_seconds": 60.0}})
+        self.assertEqual(billing["cache_ttl_seconds"], 60)
+
+    def test_bound_objects_follow_changes(self):
+        """bind/subscribe ile bağlanan nesnelerin değişiklikleri aldığını test eder"""
+        settings = make_settings()
+        cache = SimpleNamespace(ttl=300, max_entries=10000)
+        settings.bind("cache", "billing_data", cache, {"cache_ttl_seconds": "ttl", "cache_max_entries": "max_entries"})
+
+        limiter = ChatRateLimiter(settings.sections["rate_limit"]["limits"])
+        settings.subscribe("limiter", "rate_limit", lambda changed: limiter.configure(changed["limits"]))
+
+        limits = dict(settings.sections["rate_limit"]["limits"], session={"rate": 2, "burst": 1})
+        settings.update({"billing_data": {"cache_max_entries": 50}, "rate_limit": {"limits": limits}})
+
+        self.assertEqual((cache.ttl, cache.max_entries), (300, 50))
+        self.assertIsNone(limiter.check("s1", None))
+        self.assertEqual(limiter.check("s1", None)[0], "session")
+
+    def test_reload_applies_only_reloadable_differences(self):
+        """Yeniden yüklemede güvenli ayarların uygulanıp diğerlerinin raporlandığını test eder"""
+        settings = make_settings()
+        result = settings.reload({
+            "SUPPORTFLOW_SESSION_TIMEOUT_MINUTES": "10",
+            "SUPPORTFLOW_OLLAMA_BASE_URL": "http://gpu-1:11434"
+        })
+        self.assertEqual(result["changed"], {"session": {"timeout_minutes": 10.0}})
+        self.assertEqual(result["requires_restart"], ["ollama.base_url"])
+        self.assertEqual(settings.sections["ollama"]["base_url"], "http://localhost:11434")
+
+        # Ortam değişkeni kalkınca varsayılana dönülür
+        result = settings.reload({})
+        self.assertEqual(result["changed"], {"session": {"timeout_minutes": 30.0}})
+
+
+if __name__ == "__main__":
+    unittest.main()
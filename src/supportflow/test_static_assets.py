@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Bellekten statik dosya servisi (StaticAssetCache) için test dosyası
+"""
+
+import gzip
+import os
+import sys
+import tempfile
+import time
+import unittest
+
+from starlette.requests import Request
+
+# src dizinini Python path'ine ekle
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from supportflow.static_assets import StaticAssetCache
+
+INDEX_HTML = '<html><head><link rel="stylesheet" href="styles.css"></head><body><script src="script.js"></script></body></html>'
+STYLES_CSS = "body { color: #333; }\n" * 100
+SCRIPT_JS = "console.log('panel');\n"
+
+
+def make_request(**headers) -> Request:
+    """Verilen başlıklarla sahte GET isteği oluşturur"""
+    raw = [(key.replace("_", "-").encode(), value.encode()) for key, value in headers.items()]
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": raw})
+
+
+class TestStaticAssets(unittest.TestCase):
+    """StaticAssetCache için test cases"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        for name, content in (("index.html", INDEX_HTML), ("styles.css", STYLES_CSS), ("script.js", SCRIPT_JS)):
+            self.write(name, content)
+        self.write("README.md", "servis edilmez")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, name: str, content: str):
+        with open(os.path.join(self.tmp.name, name), "w", encoding="utf-8") as f:
+            f.write(content)
+
+    def test_html_references_hashed_names_with_immutable_caching(self):
+        """index.html'deki referansların hash'li adlara çevrildiğini ve bunların uzun süre önbelleğe alındığını test eder"""
+        cache = StaticAssetCache(self.tmp.name, min_compress_bytes=512)
+        html = cache.response("index.html", make_request()).body.decode()
+        self.assertNotIn('"styles.css"', html)
+        hashed_url = html.split('href="')[1].split('"')[0]
+        self.assertRegex(hashed_url, r"^/static/styles\.[0-9a-f]{10}\.css$")
+
+        hashed = cache.response(hashed_url.rsplit("/", 1)[1], make_request())
+        self.assertIn("immutable", hashed.headers["cache-control"])
+        self.assertEqual(hashed.body.decode(), STYLES_CSS)
+        self.assertEqual(cache.response("styles.css", make_request()).headers["cache-control"], "no-cache")
+        self.assertIsNone(cache.response("README.md", make_request()))
+        self.assertEqual(len(cache), 3)
+
+    def test_gzip_variant_and_conditional_requests(self):
+        """gzip varyantının seçildiğini ve eşleşen ETag'e 304 döndüğünü test eder"""
+        cache = StaticAssetCache(self.tmp.name, min_compress_bytes=512)
+        response = cache.response("styles.css", make_request(accept_encoding="gzip, deflate"))
+        self.assertEqual(response.headers["content-encoding"], "gzip")
+        self.assertEqual(response.headers["vary"], "Accept-Encoding")
+        self.assertEqual(gzip.decompress(response.body).decode(), STYLES_CSS)
+
+        plain = cache.response("styles.css", make_request(accept_encoding="gzip;q=0"))
+        self.assertNotIn("content-encoding", plain.headers)
+        self.assertNotEqual(plain.headers["etag"], response.headers["etag"])
+
+        not_modified = cache.response(
+            "styles.css",
+            make_request(accept_encoding="gzip", if_none_match=f'W/{plain.headers["etag"]}')
+        )
+        self.assertEqual(not_modified.status_code, 304)
+        self.assertEqual(not_modified.body, b"")
+        self.assertEqual(
+            cache.response("styles.css", make_request(if_none_match='"eski"')).status_code, 200
+        )
+
+    def test_small_files_are_not_compressed(self):
+        """min_compress_bytes altındaki dosyaların sıkıştırılmadığını test eder"""
+        cache = StaticAssetCache(self.tmp.name, min_compress_bytes=512)
+        response = cache.response("script.js", make_request(accept_encoding="gzip"))
+        self.assertNotIn("content-encoding", response.headers)
+        self.assertNotIn("vary", response.headers)
+
+    def test_reload_picks_up_changed_files(self):
+        """Geliştirme modunda değişen dosyanın yeni hash'le yüklendiğini test eder"""
+        cache = StaticAssetCache(self.tmp.name, reload_check_seconds=0.01)
+        old_etag = cache.response("script.js", make_request()).headers["etag"]
+
+        self.write("script.js", "console.log('yeni');\n")
+        time.sleep(0.02)
+        response = cache.response("script.js", make_request())
+        self.assertEqual(response.body.decode(), "console.log('yeni');\n")
+        self.assertNotEqual(response.headers["etag"], old_etag)
+        self.assertEqual(cache.reloads, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
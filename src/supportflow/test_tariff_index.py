@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+TariffCatalogIndex için test dosyası
+"""
+
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+
+# src dizinini Python path'ine ekle
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from supportflow.agents.tariff_index import TariffCatalogIndex, embed
+from supportflow.tracing import RotatingFileExporter, tracer
+
+
+# Trace'ler kaynak ağacı yerine geçici dizine yazılır
+TRACE_DIR = tempfile.TemporaryDirectory()
+TRACE_PATCH = mock.patch.object(tracer, "exporter", RotatingFileExporter(os.path.join(TRACE_DIR.name, "traces.jsonl")))
+
+
+def setUpModule():
+    TRACE_PATCH.start()
+
+
+def tearDownModule():
+    TRACE_PATCH.stop()
+    TRACE_DIR.cleanup()
+
+
+SAMPLE_CATALOG = {
+    "currency": "TL",
+    "packages": [
+        {"id": "fiber_100", "name": "Fiber 100", "type": "fiber", "price": 429,
+         "features": ["100 Mbps hız", "Limitsiz internet"], "description": "Ev fiber internet"},
+        {"id": "ek_gb_5", "name": "Ek 5 GB", "type": "ek paket", "price": 79,
+         "features": ["5 GB internet"], "description": "Kotası biten mobil hatlar için ek internet paketi"},
+        {"id": "yurtdisi", "name": "Yurt Dışı Günlük", "type": "roaming", "price": 149,
+         "features": ["Günlük 1 GB"], "description": "Yurt dışı seyahatleri için roaming paketi"}
+    ]
+}
+
+
+class TestTariffCatalogIndex(unittest.TestCase):
+    """TariffCatalogIndex sınıfı için test cases"""
+
+    def setUp(self):
+        """Her test öncesi çalışır"""
+        self.directory = tempfile.mkdtemp()
+        self.catalog_path = os.path.join(self.directory, "catalog.json")
+        self.index_path = os.path.join(self.directory, "index.npy")
+        self._write(SAMPLE_CATALOG)
+
+    def tearDown(self):
+        """Her test sonrası çalışır"""
+        shutil.rmtree(self.directory)
+
+    def _write(self, catalog):
+        with open(self.catalog_path, "w", encoding="utf-8") as f:
+            json.dump(catalog, f, ensure_ascii=False)
+
+    def _index(self, **kwargs):
+        return TariffCatalogIndex(self.catalog_path, self.index_path, dim=256, **kwargs)
+
+    def test_embedding_is_normalized_and_deterministic(self):
+        """Embedding'in birim uzunlukta ve tekrarlanabilir olduğunu test eder"""
+        vector = embed("Fiber internet paketleri", 256)
+        self.assertAlmostEqual(float(np.linalg.norm(vector)), 1.0, places=5)
+        np.testing.assert_array_equal(vector, embed("fiber INTERNET paketleri", 256))
+
+    def test_search_returns_most_similar_packages(self):
+        """En benzer paketin ilk sırada döndüğünü ve matrisin memory-map olduğunu test eder"""
+        index = self._index(top_k=2, min_similarity=0.0)
+
+        self.assertIsInstance(index.matrix, np.memmap)
+        results = index.search("Evime hızlı fiber internet istiyorum")
+        self.assertEqual(len(results), 2)
+        self.assertEqual(results[0][0]["id"], "fiber_100")
+        self.assertGreaterEqual(results[0][1], results[1][1])
+
+        self.assertIn("Yurt Dışı Günlük (roaming) - 149 TL/ay", index.context_for("yurt dışına gidiyorum", k=1))
+
+    def test_min_similarity_filters_unrelated_queries(self):
+        """Alakasız sorgularda boş sonuç döndüğünü test eder"""
+        index = self._index(min_similarity=0.3)
+        self.assertEqual(index.context_for("merhaba"), "")
+
+    def test_index_is_rebuilt_when_catalog_changes(self):
+        """Katalog değiştiğinde indeksin yeniden oluşturulduğunu test eder"""
+        self.assertEqual(len(self._index()), 3)
+
+        catalog = json.loads(json.dumps(SAMPLE_CATALOG))
+        catalog["packages"].pop()
+        self._write(catalog)
+
+        index = self._index()
+        self.assertEqual(len(index), 2)
+        self.assertEqual(index.matrix.shape, (2, 256))
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
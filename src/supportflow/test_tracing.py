@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+İstek bazlı tracing (Tracer / RotatingFileExporter) için test dosyası
+"""
+
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+# src dizinini Python path'ine ekle
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from supportflow.session_mailbox import SessionMailboxes
+from supportflow.tracing import STATUS_ERROR, RotatingFileExporter, Tracer, bind_context
+
+
+class TestTracing(unittest.TestCase):
+    """Tracer için test cases"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "traces.jsonl")
+        self.exporter = RotatingFileExporter(self.path, max_bytes=1_000_000, backup_count=1)
+
+    def tearDown(self):
+        if self.exporter._handler:
+            self.exporter._handler.close()
+        self.tmp.cleanup()
+
+    def read_lines(self):
+        if not os.path.exists(self.path):
+            return []
+        with open(self.path, encoding="utf-8") as f:
+            return [json.loads(line) for line in f]
+
+    def test_sampled_trace_is_exported_with_parent_links(self):
+        """Örneklenen trace'in span'lerinin tek satırda ve doğru ebeveynle yazıldığını test eder"""
+        tracer = Tracer(self.exporter, sample_rate=1.0)
+        with tracer.span("root", route="/chat") as root:
+            with tracer.span("child") as child:
+                self.assertIs(tracer.current_span(), child)
+            self.assertIs(tracer.current_span(), root)
+        self.assertIsNone(tracer.current_span())
+
+        lines = self.read_lines()
+        self.assertEqual(len(lines), 1)
+        spans = lines[0]["resourceSpans"][0]["scopeSpans"][0]["spans"]
+        by_name = {span["name"]: span for span in spans}
+        self.assertEqual(by_name["child"]["parentSpanId"], root.span_id)
+        self.assertEqual(by_name["root"]["parentSpanId"], "")
+        self.assertEqual({span["traceId"] for span in spans}, {root.trace_id})
+        self.assertIn({"key": "route", "value": {"stringValue": "/chat"}}, by_name["root"]["attributes"])
+
+    def test_unsampled_fast_trace_is_dropped_but_slow_one_is_kept(self):
+        """Örneklenmeyen trace'in sadece yavaşsa yazıldığını test eder"""
+        tracer = Tracer(self.exporter, sample_rate=0.0, slow_trace_ms=20)
+        with tracer.span("fast"):
+            pass
+        self.assertEqual(self.read_lines(), [])
+
+        with tracer.span("slow") as slow:
+            with tracer.span("llm.generate"):
+                time.sleep(0.03)
+        spans = tracer.find_trace(slow.trace_id)
+        self.assertEqual([span["name"] for span in spans], ["slow", "llm.generate"])
+        self.assertEqual(tracer.exported_traces, 1)
+
+    def test_incoming_traceparent_is_continued(self):
+        """Gelen traceparent'ın trace ID, ebeveyn ve sampling bayrağının korunduğunu test eder"""
+        tracer = Tracer(self.exporter, sample_rate=0.0)
+        incoming = "00-0af7651916cd43dd8448eb211c80319c-b7ad6b7169203331-01"
+        with tracer.span("server", traceparent=incoming) as span:
+            pass
+        self.assertEqual(span.trace_id, "0af7651916cd43dd8448eb211c80319c")
+        self.assertEqual(span.parent_span_id, "b7ad6b7169203331")
+        self.assertTrue(span.traceparent().endswith("-01"))
+        self.assertEqual(len(tracer.find_trace(span.trace_id)), 1)
+
+        with tracer.span("server", traceparent="bozuk-deger") as fresh:
+            pass
+        self.assertNotEqual(fresh.trace_id, span.trace_id)
+
+    def test_errors_are_recorded(self):
+        """Span içinde oluşan hatanın span durumuna yazıldığını test eder"""
+        tracer = Tracer(self.exporter, sample_rate=1.0)
+        with self.assertRaises(ValueError):
+            with tracer.span("root") as root:
+                raise ValueError("bozuk")
+        self.assertEqual(root.status, STATUS_ERROR)
+        self.assertIn("bozuk", root.status_message)
+
+    def test_bind_context_links_executor_spans(self):
+        """bind_context ile thread pool'da açılan span'lerin isteğin trace'ine bağlandığını test eder"""
+        tracer = Tracer(self.exporter, sample_rate=1.0)
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            with tracer.span("root") as root:
+                def work():
+                    with tracer.span("worker") as span:
+                        return span
+                bound = executor.submit(bind_context(work)).result()
+                unbound = executor.submit(work).result()
+
+        self.assertEqual(bound.trace_id, root.trace_id)
+        self.assertEqual(bound.parent_span_id, root.span_id)
+        self.assertNotEqual(unbound.trace_id, root.trace_id)
+
+    def test_mailbox_jobs_run_in_submitter_context(self):
+        """Mailbox işlerinin worker'ı başlatanın değil gönderenin span'ini gördüğünü test eder"""
+        tracer = Tracer(self.exporter, sample_rate=1.0)
+        mailboxes = SessionMailboxes(idle_seconds=1)
+
+        async def request(name):
+            with tracer.span(name) as span:
+                async def job():
+                    await asyncio.sleep(0.01)
+                    return tracer.current_span()
+                return span, await mailboxes.submit("s1", job)
+
+        async def scenario():
+            results = await asyncio.gather(request("first"), request("second"))
+            await mailboxes.close()
+            return results
+
+        for span, seen in asyncio.run(scenario()):
+            self.assertIs(seen, span)
+
+    def test_disabled_tracer_yields_none(self):
+        """Kapalı tracer'ın span oluşturmadığını ve dosya yazmadığını test eder"""
+        tracer = Tracer(self.exporter, sample_rate=1.0, enabled=False)
+        with tracer.span("root") as span:
+            self.assertIsNone(span)
+        self.assertFalse(os.path.exists(self.path))
+
+
+if __name__ == "__main__":
+    unittest.main()
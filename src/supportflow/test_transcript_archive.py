@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Transkript arşivi (TranscriptArchiver) için test dosyası
+"""
+
+import asyncio
+import contextlib
+import gzip
+import io
+import json
+import os
+import sys
+import tempfile
+import unittest
+from datetime import datetime, timedelta, timezone
+from unittest import mock
+
+import httpx
+
+# src dizinini Python path'ine ekle
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from supportflow import api
+from supportflow.session_manager import ConversationSession, ConversationTurn, SessionManager
+from supportflow.tracing import RotatingFileExporter, tracer
+from supportflow.transcript_archive import TranscriptArchiver
+
+BASE = datetime(2025, 1, 31, 13, 30)
+
+
+def make_session(session_id: str, ended_at: datetime, categories) -> ConversationSession:
+    turns = [
+        ConversationTurn(
+            id=f"{session_id}-{i}", timestamp=ended_at, user_message=f"Soru {i}",
+            agent_response=f"Yanıt {i}", category=category, confidence=0.9
+        )
+        for i, category in enumerate(categories)
+    ]
+    return ConversationSession(
+        session_id=session_id, created_at=ended_at - timedelta(minutes=5), last_activity=ended_at,
+        turns=turns, customer_info={"customer_id": "C001"}
+    )
+
+
+class TestTranscriptArchiver(unittest.TestCase):
+    """TranscriptArchiver için test cases"""
+
+    def setUp(self):
+        """Her test öncesi çalışır"""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.archiver = TranscriptArchiver(self.tmp.name, flush_interval_seconds=0.05)
+        # Trace'ler kaynak ağacı yerine geçici dizine yazılır
+        self.trace_patch = mock.patch.object(
+            tracer, "exporter", RotatingFileExporter(os.path.join(self.tmp.name, "traces.jsonl"))
+        )
+        self.trace_patch.start()
+
+    def tearDown(self):
+        self.trace_patch.stop()
+        self.archiver.close()
+        self.tmp.cleanup()
+
+    def archive(self, *sessions):
+        self.archiver.start()
+        for session in sessions:
+            self.assertTrue(self.archiver.submit(session))
+        self.archiver.close()
+
+    def test_sessions_are_appended_to_hourly_partitions(self):
+        """Session'ların saat bölümlerine eklendiğini ve zaman aralığıyla okunduğunu test eder"""
+        self.archive(
+            make_session("s1", BASE, ["faturalama"]),
+            make_session("s2", BASE + timedelta(minutes=20), ["paket_tarife", "faturalama"])
+        )
+        # Aynı bölüme ikinci yazma yeni bir gzip member'ı olarak eklenir
+        self.archive(make_session("s3", BASE + timedelta(hours=2), ["genel_bilgi"]))
+
+        partition = os.path.join(self.tmp.name, "dt=2025-01-31", "hour=13")
+        files = os.listdir(partition)
+        self.assertEqual(len(files), 1)
+        with gzip.open(os.path.join(partition, files[0]), "rt", encoding="utf-8") as archive_file:
+            self.assertEqual([json.loads(line)["session_id"] for line in archive_file], ["s1", "s2"])
+
+        records = list(self.archiver.iter_records())
+        self.assertEqual([record["session_id"] for record in records], ["s1", "s2", "s3"])
+        self.assertEqual(records[0]["ended_at"], BASE.isoformat())
+        self.assertEqual(records[0]["end_reason"], "expired")
+        self.assertEqual(records[1]["turns"][1]["category"], "faturalama")
+
+        window = self.archiver.iter_records(BASE + timedelta(minutes=10), BASE + timedelta(hours=2))
+        self.assertEqual([record["session_id"] for record in window], ["s2"])
+        self.assertEqual(len(self.archiver.partition_files(BASE + timedelta(hours=1))), 1)
+        # Saat dilimli sorgular yerel saate çevrilir
+        aware = (BASE + timedelta(hours=1)).astimezone(timezone.utc)
+        self.assertEqual([record["session_id"] for record in self.archiver.iter_records(aware)], ["s3"])
+
+        rows = list(self.archiver.iter_records(category="faturalama", unit="turn"))
+        self.assertEqual([(row["session_id"], row["turn_index"]) for row in rows], [("s1", 0), ("s2", 1)])
+        self.assertEqual(rows[0]["customer_info"], {"customer_id": "C001"})
+
+        status = self.archiver.get_status()
+        self.assertEqual((status["archived_sessions"], status["archived_turns"], status["dropped"]), (3, 4, 0))
+
+    def test_corrupt_lines_and_truncated_members_are_skipped(self):
+        """Bozuk satırların ve yarım kalmış gzip member'larının atlanıp sayıldığını test eder"""
+        self.archive(
+            make_session("s1", BASE, ["faturalama"]),
+            make_session("s2", BASE + timedelta(hours=2), ["genel_bilgi"])
+        )
+        first, second = self.archiver.partition_files()
+        # Yazma sırasında çökmüş gibi sonuna yarım bir member eklenir
+        member = gzip.compress(json.dumps({"session_id": "yarım", "ended_at": BASE.isoformat(), "turns": []}).encode())
+        with open(first, "ab") as archive_file:
+            archive_file.write(member[:len(member) // 2])
+        with open(second, "ab") as archive_file:
+            archive_file.write(gzip.compress(b'{"session_id": "bozuk"\n{"session_id": "eksik"}\n'))
+        self.archive(make_session("s3", BASE + timedelta(hours=2, minutes=5), []))
+
+        with self.assertLogs("supportflow.transcript_archive", level="ERROR"):
+            records = list(self.archiver.iter_records())
+        self.assertEqual([record["session_id"] for record in records], ["s1", "s2", "s3"])
+        self.assertEqual(self.archiver.get_status()["errors"], 3)
+
+    def test_full_queue_drops_instead_of_blocking(self):
+        """Kuyruk dolunca submit()'in beklemeden kaydı düşürdüğünü test eder"""
+        archiver = TranscriptArchiver(self.tmp.name, queue_size=2)
+        results = [archiver.submit(make_session(f"s{i}", BASE, [])) for i in range(3)]
+        self.assertEqual(results, [True, True, False])
+        self.assertEqual(archiver.get_status()["dropped"], 1)
+
+    def test_session_manager_archives_expired_and_remaining_sessions(self):
+        """Süresi dolan (diske yazılmış olanlar dahil) ve kapanışta kalan session'ların arşivlendiğini test eder"""
+        with contextlib.redirect_stdout(io.StringIO()):
+            manager = SessionManager(spill_dir=os.path.join(self.tmp.name, "spill"), archiver=self.archiver)
+            self.archiver.start()
+            expired, spilled, active = (manager.create_session() for _ in range(3))
+            for session_id in (expired, spilled, active):
+                manager.add_conversation_turn(session_id, "Merhaba", "Merhaba, nasıl yardımcı olabilirim?")
+            manager.max_resident_bytes = 1
+            manager.enforce_memory_limit(keep=active)
+            manager.max_resident_bytes = 0
+            manager.get_session(expired)
+            old = datetime.now() - timedelta(hours=2)
+            manager.sessions[expired].last_activity = old
+            manager._spilled[spilled].last_activity = old
+            self.assertEqual(manager.cleanup_expired_sessions(), 2)
+            manager.close()
+            self.archiver.close()
+
+        records = {
+            record["session_id"]: record
+            for record in TranscriptArchiver(self.tmp.name).iter_records()
+        }
+        self.assertEqual(
+            {session_id: record["end_reason"] for session_id, record in records.items()},
+            {expired: "expired", spilled: "expired", active: "shutdown"}
+        )
+        self.assertEqual(records[spilled]["turns"][0]["user_message"], "Merhaba")
+        self.assertEqual(len(manager.sessions), 0)
+
+    def test_export_endpoint_streams_ndjson(self):
+        """Export endpoint'inin filtrelenmiş kayıtları NDJSON olarak döndürdüğünü test eder"""
+        self.archive(make_session("s1", BASE, ["faturalama"]), make_session("s2", BASE, ["genel_bilgi"]))
+
+        async def fetch(params, token="gizli"):
+            transport = httpx.ASGITransport(app=api.app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                return await client.get("/admin/transcripts/export", params=params, headers={"X-Admin-Token": token})
+
+        with mock.patch.object(api, "transcript_archiver", self.archiver), \
+                mock.patch.object(api.SERVER_CONFIG, "admin_token", "gizli"):
+            response = asyncio.run(fetch({"start": BASE.isoformat(), "category": "genel_bilgi", "unit": "turn"}))
+            invalid = asyncio.run(fetch({"unit": "tablo"}))
+            forbidden = asyncio.run(fetch({}, token="yanlis"))
+        with mock.patch.object(api, "transcript_archiver", self.archiver), \
+                mock.patch.object(api.SERVER_CONFIG, "admin_token", None):
+            # Admin token tanımlı değilse export kapalıdır
+            unconfigured = asyncio.run(fetch({}))
+
+        self.assertEqual(response.headers["content-type"], "application/x-ndjson")
+        rows = [json.loads(line) for line in response.text.splitlines()]
+        self.assertEqual([(row["session_id"], row["user_message"]) for row in rows], [("s2", "Soru 0")])
+        self.assertEqual(invalid.status_code, 422)
+        self.assertEqual((forbidden.status_code, unconfigured.status_code), (403, 403))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+TranscriptIndex için test dosyası
+"""
+
+import unittest
+import sys
+import os
+from datetime import datetime, timedelta
+
+# src dizinini Python path'ine ekle
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from supportflow.session_manager import ConversationTurn
+from supportflow.transcript_index import TranscriptIndex
+
+
+class TestTranscriptIndex(unittest.TestCase):
+    """TranscriptIndex sınıfı için test cases"""
+
+    def setUp(self):
+        """Her test öncesi çalışır"""
+        self.turns = {}
+        self.index = TranscriptIndex(turn_loader=self.turns.get)
+        self.base = datetime(2025, 1, 1, 12, 0)
+        messages = [
+            ("s1", "Faturamı ödeyemedim, mahkemeye vereceğim", "faturalama"),
+            ("s2", "SÜPER PAKET tarifesine geçmek istiyorum", "paket_tarife"),
+            ("s3", "FTR-2024-001 numaralı fatura itirazı", "faturalama"),
+            ("s4", "İnternet paketim bitti", "paket_tarife"),
+        ]
+        for i, (session_id, message, category) in enumerate(messages):
+            turn = ConversationTurn(
+                id=f"t{i}",
+                timestamp=self.base + timedelta(hours=i),
+                user_message=message,
+                agent_response="Yardımcı olayım.",
+                category=category
+            )
+            self.turns[session_id] = [turn]
+            self.index.add_turn(session_id, turn, 0)
+
+    def sessions(self, query, **filters):
+        return [hit["session_id"] for hit in self.index.search(query, **filters)["results"]]
+
+    def test_turkish_folding(self):
+        """Türkçe karakter ve büyük/küçük harf katlamasını test eder"""
+        self.assertEqual(self.sessions("super"), ["s2"])
+        self.assertEqual(self.sessions("internet"), ["s4"])
+        self.assertEqual(self.sessions("mahkeme*"), ["s1"])
+
+    def test_phrase_and_boolean(self):
+        """İfade ve boolean sorgularını test eder"""
+        self.assertEqual(self.sessions('"fatura itirazı"'), ["s3"])
+        self.assertEqual(self.sessions('"itirazı fatura"'), [])
+        self.assertEqual(self.sessions("FTR-2024-001"), ["s3"])
+        self.assertEqual(self.sessions("paket* OR mahkeme*"), ["s4", "s2", "s1"])
+        self.assertEqual(self.sessions("paket* -internet"), ["s2"])
+        self.assertEqual(self.sessions("(fatura* OR tarife*) NOT itirazı"), ["s2", "s1"])
+
+    def test_filters_and_paging(self):
+        """Kategori, zaman filtreleri ve sayfalamayı test eder"""
+        self.assertEqual(self.sessions("yardımcı", category="faturalama"), ["s3", "s1"])
+        self.assertEqual(self.sessions("yardımcı", start=self.base + timedelta(hours=1),
+                                       end=self.base + timedelta(hours=2)), ["s3", "s2"])
+        page = self.index.search("yardımcı", offset=1, limit=2)
+        self.assertEqual(page["total"], 4)
+        self.assertEqual([hit["session_id"] for hit in page["results"]], ["s3", "s2"])
+
+    def test_hits_load_text_from_loader(self):
+        """İndeksin turn tutmadığını ve metnin arama sırasında yüklendiğini test eder"""
+        hit = self.index.search("mahkeme*")["results"][0]
+        self.assertEqual((hit["turn_id"], hit["category"]), ("t0", "faturalama"))
+        self.assertEqual(hit["user_message"], "Faturamı ödeyemedim, mahkemeye vereceğim")
+        self.assertFalse(any(hasattr(doc, "turn") for doc in self.index._docs))
+
+        # Session artık yüklenemiyorsa sonuç metinsiz döner
+        del self.turns["s1"]
+        hit = self.index.search("mahkeme*")["results"][0]
+        self.assertEqual((hit["turn_id"], hit["user_message"]), ("t0", None))
+
+    def test_remove_session_and_compact(self):
+        """Çıkarılan session'ların aranamadığını ve sıkıştırmanın sonuçları korumasını test eder"""
+        self.assertEqual(self.index.remove_session("s2"), 1)
+        self.assertEqual(self.index.remove_session("s2"), 0)
+        self.assertEqual(len(self.index), 3)
+        self.assertEqual(self.sessions("paket*"), ["s4"])
+        self.assertEqual(self.sessions("NOT mahkeme*"), ["s4", "s3"])
+
+        self.index.compact()
+        self.assertEqual(len(self.index._docs), 3)
+        self.assertNotIn("super", self.index._postings)
+        self.assertEqual(self.sessions("yardımcı", start=self.base + timedelta(hours=1)), ["s4", "s3"])
+        self.assertEqual(self.sessions('"fatura itirazı"'), ["s3"])
+        self.assertEqual(self.index.search("mahkeme*")["results"][0]["turn_id"], "t0")
+
+    def test_invalid_query(self):
+        """Hatalı sorguların ValueError fırlattığını test eder"""
+        with self.assertRaises(ValueError):
+            self.index.search("(fatura")
+        with self.assertRaises(ValueError):
+            self.index.search("   ")
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Session WebSocket kanalı (/ws/session/{session_id}) için test dosyası
+Agent yerine mesajı geri döndüren sahte bir agent kullanılır
+"""
+
+import contextlib
+import io
+import logging
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+from fastapi.testclient import TestClient
+
+# src dizinini Python path'ine ekle
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from supportflow import api
+from supportflow.session_mailbox import SessionMailboxes
+from supportflow.session_manager import SessionManager
+from supportflow.tracing import RotatingFileExporter, tracer
+
+
+class EchoAgent:
+    """Mesajı geri döndüren sahte agent"""
+
+    def run(self, message, history=None, on_token=None, customer_info=None):
+        return {"response": f"Yanıt: {message}", "category": "genel_bilgi", "agent_type": "router"}
+
+
+class TestSessionWebSocket(unittest.TestCase):
+    """/ws/session/{session_id} için test cases"""
+
+    def setUp(self):
+        """Her test öncesi çalışır"""
+        logging.getLogger("supportflow.api").setLevel(logging.CRITICAL)
+        self.manager = SessionManager()
+        self.quiet = contextlib.redirect_stdout(io.StringIO())
+        self.quiet.__enter__()
+        # Trace'ler kaynak ağacı yerine geçici dizine yazılır
+        self.tmp = tempfile.TemporaryDirectory()
+        self.patches = [
+            mock.patch.object(tracer, "exporter", RotatingFileExporter(os.path.join(self.tmp.name, "traces.jsonl"))),
+            mock.patch.object(api, "agent", EchoAgent()),
+            mock.patch.object(api, "session_manager", self.manager),
+            mock.patch.object(api, "session_mailboxes", SessionMailboxes()),
+            mock.patch.object(api, "rate_limiter", None)
+        ]
+        for patch in self.patches:
+            patch.start()
+        self.session_id = self.manager.create_session({"name": "Ahmet Yılmaz"})
+
+    def tearDown(self):
+        for patch in reversed(self.patches):
+            patch.stop()
+        self.quiet.__exit__(None, None, None)
+        self.tmp.cleanup()
+
+    def test_non_string_message_returns_error_and_keeps_connection(self):
+        """Metin olmayan 'message' alanının hata mesajı döndürdüğünü ve bağlantının açık kaldığını test eder"""
+        client = TestClient(api.app)
+        with client.websocket_connect(f"/ws/session/{self.session_id}") as websocket:
+            for raw in ('{"message": 5}', '{"message": null}', '{"message": ["merhaba"]}'):
+                websocket.send_text(raw)
+                reply = websocket.receive_json()
+                self.assertEqual(reply["type"], "error")
+                self.assertIn("message", reply["detail"])
+
+            websocket.send_text('{"message": "Faturamı öğrenebilir miyim?"}')
+            reply = websocket.receive_json()
+            self.assertEqual(reply["type"], "response")
+            self.assertEqual(reply["response"], "Yanıt: Faturamı öğrenebilir miyim?")
+
+    def test_plain_text_and_empty_messages(self):
+        """Düz metin mesajların işlendiğini ve boş mesajların reddedildiğini test eder"""
+        client = TestClient(api.app)
+        with client.websocket_connect(f"/ws/session/{self.session_id}") as websocket:
+            websocket.send_text('{"message": "   "}')
+            self.assertEqual(websocket.receive_json()["detail"], "Mesaj boş olamaz.")
+
+            websocket.send_text("Merhaba")
+            reply = websocket.receive_json()
+            self.assertEqual((reply["type"], reply["turn_count"]), ("response", 1))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,41 @@
+"""
+Türkçe metin normalizasyonu ve tokenization yardımcıları
+"""
+
+import re
+from typing import List
+
+# Türkçe büyük harflerin doğru küçültülmesi (Python'un lower() I -> i yapar)
+_TURKISH_LOWER = str.maketrans({"I": "ı", "İ": "i"})
+
+# Aksan katlama: kullanıcıların Türkçe karakter kullanmadan yazdığı
+# sorguların ("sikayet", "odeme") da eşleşmesi için
+_FOLD = str.maketrans({
+    "ç": "c", "ğ": "g", "ı": "i", "ö": "o", "ş": "s", "ü": "u",
+    "â": "a", "î": "i", "û": "u"
+})
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def turkish_lower(text: str) -> str:
+    """Metni Türkçe kurallarına göre küçük harfe çevirir"""
+    return text.translate(_TURKISH_LOWER).lower()
+
+
+def fold(text: str) -> str:
+    """Metni küçültür ve Türkçe karakterleri ASCII karşılıklarına katlar"""
+    return turkish_lower(text).translate(_FOLD)
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Metni katlanmış token'lara ayırır
+
+    Args:
+        text: Ham metin
+
+    Returns:
+        Token listesi (sayılar dahil, ör. fatura numaraları)
+    """
+    return _TOKEN_RE.findall(fold(text))
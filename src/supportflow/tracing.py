@@ -0,0 +1,339 @@
+"""
+İstek bazlı hafif span tracing
+Trace ID contextvars ile API, session manager, graph node'ları, LLM
+çağrıları ve arka plan işleri boyunca taşınır. Trace'ler OTLP/JSON
+formatında (OpenTelemetry collector'ın otlpjsonfile alıcısının okuduğu
+format) dönen bir dosyaya yazılır.
+"""
+
+import contextvars
+import functools
+import glob
+import json
+import logging
+import os
+import random
+import re
+import threading
+import time
+from contextlib import contextmanager
+from logging.handlers import RotatingFileHandler
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from .config import TRACING_CONFIG
+
+# OTLP span türleri ve durum kodları
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_SERVER = 2
+STATUS_OK = 1
+STATUS_ERROR = 2
+
+# Tek trace'te tutulacak azami span sayısı (bellek sınırı)
+MAX_SPANS_PER_TRACE = 512
+
+# W3C traceparent: sürüm-trace_id-parent_id-bayraklar
+_TRACEPARENT_RE = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+
+
+class _Trace:
+    """Bir trace'in paylaşılan durumu ve biten span'leri"""
+
+    __slots__ = ("trace_id", "sampled", "spans", "exported", "lock")
+
+    def __init__(self, trace_id: str, sampled: bool):
+        self.trace_id = trace_id
+        self.sampled = sampled
+        self.spans: List["Span"] = []
+        self.exported = False
+        self.lock = threading.Lock()
+
+
+class Span:
+    """Zaman aralığı ve nitelikleri olan tek bir işlem adımı"""
+
+    __slots__ = (
+        "trace", "span_id", "parent_span_id", "name", "kind", "attributes",
+        "start_unix_ns", "end_unix_ns", "_start_perf_ns", "status", "status_message"
+    )
+
+    def __init__(self, trace: _Trace, name: str, parent_span_id: str = "", kind: int = SPAN_KIND_INTERNAL):
+        self.trace = trace
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.parent_span_id = parent_span_id
+        self.name = name
+        self.kind = kind
+        self.attributes: Dict[str, Any] = {}
+        self.start_unix_ns = time.time_ns()
+        self._start_perf_ns = time.perf_counter_ns()
+        self.end_unix_ns: Optional[int] = None
+        self.status = STATUS_OK
+        self.status_message = ""
+
+    @property
+    def trace_id(self) -> str:
+        return self.trace.trace_id
+
+    @property
+    def duration_ms(self) -> float:
+        end = self.end_unix_ns if self.end_unix_ns is not None else \
+            self.start_unix_ns + time.perf_counter_ns() - self._start_perf_ns
+        return (end - self.start_unix_ns) / 1e6
+
+    def set_attribute(self, key: str, value: Any):
+        self.attributes[key] = value
+
+    def record_error(self, error: BaseException):
+        self.status = STATUS_ERROR
+        self.status_message = f"{type(error).__name__}: {error}"
+
+    def traceparent(self) -> str:
+        """Alt servislere/istemciye iletilecek W3C traceparent değeri"""
+        return f"00-{self.trace_id}-{self.span_id}-{'01' if self.trace.sampled else '00'}"
+
+    def _finish(self):
+        self.end_unix_ns = self.start_unix_ns + time.perf_counter_ns() - self._start_perf_ns
+
+    def to_otlp(self) -> Dict[str, Any]:
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "parentSpanId": self.parent_span_id,
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": str(self.start_unix_ns),
+            "endTimeUnixNano": str(self.end_unix_ns),
+            "attributes": [_otlp_attribute(k, v) for k, v in self.attributes.items()],
+            "status": {"code": self.status},
+        }
+        if self.status_message:
+            span["status"]["message"] = self.status_message
+        return span
+
+
+def _otlp_attribute(key: str, value: Any) -> Dict[str, Any]:
+    """Niteliği OTLP AnyValue biçimine dönüştürür"""
+    if isinstance(value, bool):
+        typed = {"boolValue": value}
+    elif isinstance(value, int):
+        typed = {"intValue": str(value)}
+    elif isinstance(value, float):
+        typed = {"doubleValue": value}
+    else:
+        typed = {"stringValue": str(value)}
+    return {"key": key, "value": typed}
+
+
+class RotatingFileExporter:
+    """
+    Trace'leri satır başına bir OTLP ExportTraceServiceRequest olarak yazar
+
+    Dosya ilk export'ta oluşturulur; boyut sınırına gelince döner.
+    """
+
+    def __init__(self, path: str, max_bytes: int = 10_000_000, backup_count: int = 5, service_name: str = "supportflow"):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.service_name = service_name
+        self._handler: Optional[RotatingFileHandler] = None
+        self._lock = threading.Lock()
+
+    def export(self, spans: List[Span]):
+        line = json.dumps({
+            "resourceSpans": [{
+                "resource": {"attributes": [_otlp_attribute("service.name", self.service_name)]},
+                "scopeSpans": [{
+                    "scope": {"name": "supportflow.tracing"},
+                    "spans": [span.to_otlp() for span in spans]
+                }]
+            }]
+        }, ensure_ascii=False)
+
+        with self._lock:
+            if self._handler is None:
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                self._handler = RotatingFileHandler(
+                    self.path, maxBytes=self.max_bytes, backupCount=self.backup_count, encoding="utf-8"
+                )
+                self._handler.setFormatter(logging.Formatter("%(message)s"))
+        # RotatingFileHandler kendi kilidiyle thread-safe yazar ve döndürür
+        self._handler.handle(logging.makeLogRecord({"msg": line, "levelno": logging.INFO}))
+
+    def find(self, trace_id: str) -> List[Dict[str, Any]]:
+        """Dönen dosyalarda trace'e ait span'leri arar"""
+        spans: List[Dict[str, Any]] = []
+        for path in sorted(glob.glob(self.path + "*")):
+            try:
+                with open(path, encoding="utf-8") as f:
+                    for line in f:
+                        if trace_id not in line:
+                            continue
+                        for resource in json.loads(line)["resourceSpans"]:
+                            for scope in resource["scopeSpans"]:
+                                spans.extend(s for s in scope["spans"] if s["traceId"] == trace_id)
+            except OSError:
+                continue
+        return sorted(spans, key=lambda s: int(s["startTimeUnixNano"]))
+
+
+class Tracer:
+    """
+    Head sampling yapan span üretici
+
+    Sampling kararı trace başında verilir (gelen traceparent bayrağı veya
+    sample_rate). Örneklenmeyen trace'lerin span'leri de ucuzca ölçülür;
+    kök span slow_trace_ms'i aşarsa trace yine de yazılır, böylece uç
+    gecikmeler örneklemeye takılmaz.
+    """
+
+    def __init__(
+        self,
+        exporter: Optional[RotatingFileExporter] = None,
+        sample_rate: float = 0.1,
+        slow_trace_ms: Optional[float] = None,
+        enabled: bool = True
+    ):
+        """
+        Tracer'ı başlatır
+
+        Args:
+            exporter: Trace'lerin yazılacağı exporter
+            sample_rate: Yeni trace'lerin örneklenme olasılığı (0-1)
+            slow_trace_ms: Bu süreyi aşan kök span'li trace'ler her zaman yazılır
+            enabled: False ise span'ler hiç oluşturulmaz
+        """
+        self.exporter = exporter
+        self.sample_rate = sample_rate
+        self.slow_trace_ms = slow_trace_ms
+        self.enabled = enabled and exporter is not None
+        self._current: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar("current_span", default=None)
+        self.exported_traces = 0
+
+    @classmethod
+    def from_config(cls) -> "Tracer":
+        """config.py ayarlarından tracer oluşturur"""
+        exporter = RotatingFileExporter(
+            TRACING_CONFIG["path"],
+            max_bytes=TRACING_CONFIG["max_bytes"],
+            backup_count=TRACING_CONFIG["backup_count"],
+            service_name=TRACING_CONFIG["service_name"]
+        )
+        return cls(
+            exporter,
+            sample_rate=TRACING_CONFIG["sample_rate"],
+            slow_trace_ms=TRACING_CONFIG["slow_trace_ms"],
+            enabled=TRACING_CONFIG["enabled"]
+        )
+
+    def current_span(self) -> Optional[Span]:
+        return self._current.get()
+
+    @contextmanager
+    def span(
+        self,
+        name: str,
+        traceparent: Optional[str] = None,
+        kind: int = SPAN_KIND_INTERNAL,
+        **attributes: Any
+    ) -> Iterator[Optional[Span]]:
+        """
+        Span açar; context'te span varsa onun çocuğu, yoksa yeni trace'in kökü olur
+
+        Args:
+            name: Span adı
+            traceparent: Kök span için gelen W3C traceparent başlığı
+            kind: OTLP span türü
+            **attributes: Span nitelikleri
+
+        Yields:
+            Span (tracing kapalıysa None)
+        """
+        if not self.enabled:
+            yield None
+            return
+
+        parent = self._current.get()
+        if parent is not None:
+            span = Span(parent.trace, name, parent.span_id, kind)
+        else:
+            span = self._root_span(name, traceparent, kind)
+        span.attributes.update(attributes)
+
+        token = self._current.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.record_error(e)
+            raise
+        finally:
+            self._current.reset(token)
+            span._finish()
+            self._on_end(span, is_root=parent is None)
+
+    def _root_span(self, name: str, traceparent: Optional[str], kind: int) -> Span:
+        match = _TRACEPARENT_RE.match((traceparent or "").strip().lower())
+        if match:
+            trace_id, parent_span_id, flags = match.groups()
+            trace = _Trace(trace_id, sampled=bool(int(flags, 16) & 1))
+            return Span(trace, name, parent_span_id, kind)
+        trace = _Trace(f"{random.getrandbits(128):032x}", sampled=random.random() < self.sample_rate)
+        return Span(trace, name, "", kind)
+
+    def _on_end(self, span: Span, is_root: bool):
+        """Biten span'i trace'e ekler; kök bittiğinde trace'in yazılıp yazılmayacağına karar verir"""
+        trace = span.trace
+        with trace.lock:
+            if trace.exported:
+                # Kökten sonra biten arka plan span'i (ör. prefetch) ayrıca yazılır
+                batch = [span]
+            else:
+                if len(trace.spans) < MAX_SPANS_PER_TRACE:
+                    trace.spans.append(span)
+                if not is_root:
+                    return
+                slow = self.slow_trace_ms is not None and span.duration_ms >= self.slow_trace_ms
+                if not (trace.sampled or slow):
+                    trace.spans = []
+                    return
+                trace.exported = True
+                span.set_attribute("trace.sampled", trace.sampled)
+                batch, trace.spans = trace.spans, []
+
+        try:
+            self.exporter.export(batch)
+            if is_root:
+                self.exported_traces += 1
+        except Exception as e:
+            print(f"⚠️ Trace yazılamadı: {e}")
+
+    def find_trace(self, trace_id: str) -> List[Dict[str, Any]]:
+        """Yazılmış trace'in span'lerini döndürür"""
+        if self.exporter is None:
+            return []
+        return self.exporter.find(trace_id.lower())
+
+
+# Uygulama genelinde kullanılan tracer
+tracer = Tracer.from_config()
+
+
+def traced(name: str) -> Callable:
+    """Fonksiyon çağrısını span ile saran decorator"""
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with tracer.span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def bind_context(func: Callable[[], Any]) -> Callable[[], Any]:
+    """
+    Fonksiyonu çağıran tarafın context'ine bağlar
+
+    run_in_executor ve ThreadPoolExecutor.submit contextvars'ı taşımaz;
+    thread'de açılan span'lerin isteğin trace'ine bağlanması için kullanılır.
+    """
+    context = contextvars.copy_context()
+    return lambda: context.run(func)
@@ -0,0 +1,335 @@
+"""
+Konuşma transkript arşivi
+Sona eren session'ları turn'leriyle birlikte saat / gün bölümlü dizinlerdeki
+gzip sıkıştırılmış JSONL dosyalarına ekler; analitik için zaman aralığına göre
+akış halinde okunur
+"""
+
+import dataclasses
+import gzip
+import json
+import logging
+import os
+import queue
+import socket
+import threading
+import time
+import zlib
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from .config import ARCHIVE_CONFIG
+
+logger = logging.getLogger(__name__)
+
+# Hive tarzı bölüm dizinleri (dt=2025-01-31/hour=14); analitik araçları doğrudan okuyabilir
+PARTITION_FORMATS = {
+    "hour": ("dt=%Y-%m-%d/hour=%H", timedelta(hours=1)),
+    "day": ("dt=%Y-%m-%d", timedelta(days=1))
+}
+PARTITION_SUFFIX = ".jsonl.gz"
+# Kapanışta kuyruk doluysa bir kaydın yer açılması için beklenen azami süre (saniye)
+SUBMIT_BLOCK_TIMEOUT = 10
+
+# Turn satırlarına kopyalanan session alanları (unit="turn")
+TURN_ROW_SESSION_FIELDS = ("session_id", "end_reason", "customer_info", "escalation_reason", "human_agent_id")
+
+
+def _json_default(value: Any) -> str:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+def _local_naive(moment: Optional[datetime]) -> Optional[datetime]:
+    """Saat dilimli zamanı arşivin kullandığı yerel saate çevirir"""
+    if moment is None or moment.tzinfo is None:
+        return moment
+    return moment.astimezone().replace(tzinfo=None)
+
+
+def session_record(session: Any, end_reason: str) -> Dict[str, Any]:
+    """
+    ConversationSession'ı arşiv kaydına çevirir
+
+    Args:
+        session: Sona eren session
+        end_reason: Sona erme sebebi (expired, shutdown)
+
+    Returns:
+        JSON'a yazılabilir session kaydı
+    """
+    data = dataclasses.asdict(session)
+    data.pop("is_active", None)
+    return {
+        "session_id": data.pop("session_id"),
+        "created_at": data.pop("created_at").isoformat(),
+        "ended_at": data.pop("last_activity").isoformat(),
+        "archived_at": datetime.now().isoformat(),
+        "end_reason": end_reason,
+        "turn_count": len(data["turns"]),
+        **data
+    }
+
+
+def turn_rows(record: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    """Session kaydını session alanları kopyalanmış düz turn satırlarına açar"""
+    session_fields = {key: record.get(key) for key in TURN_ROW_SESSION_FIELDS}
+    for index, turn in enumerate(record.get("turns", [])):
+        yield {**session_fields, "turn_index": index, **turn}
+
+
+class TranscriptArchiver:
+    """
+    Sona eren session'lar için arka plan arşivleyicisi
+
+    submit() çağrıları sadece sınırlı bir kuyruğa ekleme yapar; kuyruk
+    doluysa kayıt düşürülür ve sayılır, istek yolu asla beklemez. Worker
+    thread kayıtları toplu halde serileştirip bölüm dosyalarına yeni bir
+    gzip member'ı olarak ekler (birleştirilmiş member'lar geçerli gzip'tir).
+    Her process bölüm dizininde kendi dosyasına yazar; aynı dizini paylaşan
+    worker ve pod'ların yazmaları birbirine karışmaz.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        partition: str = "hour",
+        queue_size: int = 10000,
+        batch_size: int = 500,
+        flush_interval_seconds: float = 5,
+        compress_level: int = 6
+    ):
+        """
+        Arşivleyiciyi başlatır
+
+        Args:
+            directory: Arşiv kök dizini
+            partition: Dosya bölümleme birimi ("hour" veya "day")
+            queue_size: Yazılmayı bekleyen azami session sayısı
+            batch_size: Bir yazma turunda işlenen azami session sayısı
+            flush_interval_seconds: Kuyruk dolmasa da yazma aralığı
+            compress_level: gzip sıkıştırma seviyesi
+        """
+        if partition not in PARTITION_FORMATS:
+            raise ValueError(f"Geçersiz arşiv bölümleme birimi: {partition}")
+        self.directory = directory
+        self.partition = partition
+        self.batch_size = batch_size
+        self.flush_interval_seconds = flush_interval_seconds
+        self.compress_level = compress_level
+        self.file_name = f"part-{socket.gethostname()}-{os.getpid()}{PARTITION_SUFFIX}"
+        self._queue: "queue.Queue[Optional[Tuple[Any, str]]]" = queue.Queue(maxsize=queue_size)
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.archived_sessions = 0
+        self.archived_turns = 0
+        self.dropped = 0
+        self.errors = 0
+        self.bytes_written = 0
+
+    @classmethod
+    def from_config(cls) -> "TranscriptArchiver":
+        """config.py ayarlarından arşivleyici oluşturur"""
+        return cls(
+            directory=ARCHIVE_CONFIG["directory"],
+            partition=ARCHIVE_CONFIG["partition"],
+            queue_size=ARCHIVE_CONFIG["queue_size"],
+            batch_size=ARCHIVE_CONFIG["batch_size"],
+            flush_interval_seconds=ARCHIVE_CONFIG["flush_interval_seconds"],
+            compress_level=ARCHIVE_CONFIG["compress_level"]
+        )
+
+    def start(self):
+        """Yazma thread'ini başlatır"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="transcript-archiver", daemon=True)
+            self._thread.start()
+
+    def close(self, timeout: float = 30):
+        """Kuyruktaki kayıtları yazar ve thread'i durdurur"""
+        if self._thread is None:
+            return
+        self._queue.put(None)
+        self._thread.join(timeout)
+        self._thread = None
+
+    def submit(self, session: Any, end_reason: str = "expired", block: bool = False) -> bool:
+        """
+        Sona eren session'ı arşiv kuyruğuna ekler
+
+        Args:
+            session: ConversationSession
+            end_reason: Sona erme sebebi
+            block: Kuyruk doluysa beklensin mi (sadece kapanışta)
+
+        Returns:
+            Kayıt kuyruğa eklendiyse True, kuyruk dolu olduğu için düşürüldüyse False
+        """
+        try:
+            self._queue.put((session, end_reason), block=block, timeout=SUBMIT_BLOCK_TIMEOUT if block else None)
+            return True
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+            return False
+
+    def partition_path(self, moment: datetime) -> str:
+        """Zamanın düştüğü bölümde bu process'in dosyasının yolu"""
+        pattern, _ = PARTITION_FORMATS[self.partition]
+        return os.path.join(self.directory, moment.strftime(pattern), self.file_name)
+
+    def _run(self):
+        """Kuyruktan kayıtları toplayıp bölüm dosyalarına yazar"""
+        stopping = False
+        while not stopping:
+            batch = []
+            deadline = time.monotonic() + self.flush_interval_seconds
+            while len(batch) < self.batch_size:
+                try:
+                    item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+            if batch:
+                self._write(batch)
+
+    def _write(self, batch: List[Tuple[Any, str]]):
+        """Kayıtları bölüme göre gruplayıp her dosyaya tek gzip member'ı olarak ekler"""
+        partitions: Dict[str, List[str]] = {}
+        turns: Dict[str, int] = {}
+        for session, end_reason in batch:
+            try:
+                record = session_record(session, end_reason)
+                line = json.dumps(record, ensure_ascii=False, default=_json_default)
+            except Exception as e:
+                with self._lock:
+                    self.errors += 1
+                logger.error(f"❌ Session arşiv kaydına çevrilemedi: {e}")
+                continue
+            path = self.partition_path(session.last_activity)
+            partitions.setdefault(path, []).append(line)
+            turns[path] = turns.get(path, 0) + record["turn_count"]
+
+        for path, lines in partitions.items():
+            payload = gzip.compress(("\n".join(lines) + "\n").encode("utf-8"), self.compress_level)
+            try:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                with open(path, "ab") as archive_file:
+                    archive_file.write(payload)
+            except OSError as e:
+                with self._lock:
+                    self.errors += 1
+                logger.error(f"❌ Arşiv dosyasına yazılamadı ({path}): {e}")
+                continue
+            with self._lock:
+                self.bytes_written += len(payload)
+                self.archived_sessions += len(lines)
+                self.archived_turns += turns[path]
+
+    def iter_records(
+        self,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        category: Optional[str] = None,
+        unit: str = "session"
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Arşivdeki kayıtları zaman aralığına göre akış halinde okur
+
+        Sadece aralığa düşen bölüm dosyaları açılır ve satır satır açılır;
+        bellek kullanımı tek bir kayıtla sınırlıdır. Kayıtlar bölüm sırasıyla
+        döner, bölüm içinde yazılma sırası korunur. Bozuk satırlar ve yarım
+        kalmış gzip member'ları loglanıp errors sayacına eklenerek atlanır.
+
+        Args:
+            start: Bu andan (dahil) sonra sona eren session'lar (saat dilimsizse yerel saat)
+            end: Bu andan (hariç) önce sona eren session'lar
+            category: En az bir turn'ü bu kategoride olan session'lar
+            unit: "session" (iç içe turn'ler) veya "turn" (turn başına düz satır)
+
+        Yields:
+            Session kaydı veya turn satırı
+        """
+        if unit not in ("session", "turn"):
+            raise ValueError(f"Geçersiz unit: {unit}")
+        start, end = _local_naive(start), _local_naive(end)
+        for path in self.partition_files(start, end):
+            for record, ended_at in self._read_partition(path):
+                if (start and ended_at < start) or (end and ended_at >= end):
+                    continue
+                if category and not any(turn.get("category") == category for turn in record["turns"]):
+                    continue
+                if unit == "session":
+                    yield record
+                else:
+                    for row in turn_rows(record):
+                        if not category or row.get("category") == category:
+                            yield row
+
+    def _read_partition(self, path: str) -> Iterator[Tuple[Dict[str, Any], datetime]]:
+        """
+        Bölüm dosyasındaki kayıtları bitiş zamanlarıyla birlikte okur
+
+        Çözülemeyen satır atlanır; dosya bozuk veya son member'ı yarım kalmışsa
+        (ör. yazma sırasında çökme) o ana kadar okunan kayıtlardan sonra
+        sonraki bölüme geçilir.
+        """
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as archive_file:
+                for number, line in enumerate(archive_file, 1):
+                    if not line.strip():
+                        continue
+                    try:
+                        record = json.loads(line)
+                        ended_at = datetime.fromisoformat(record["ended_at"])
+                        if not isinstance(record.get("turns"), list):
+                            raise ValueError("turns alanı eksik")
+                    except (ValueError, KeyError, TypeError) as e:
+                        with self._lock:
+                            self.errors += 1
+                        logger.error(f"❌ Bozuk arşiv satırı atlandı ({path}:{number}): {e}")
+                        continue
+                    yield record, ended_at
+        except (EOFError, OSError, zlib.error, UnicodeDecodeError) as e:
+            with self._lock:
+                self.errors += 1
+            logger.error(f"❌ Arşiv dosyası okunamadı, sonraki bölüme geçiliyor ({path}): {e}")
+
+    def partition_files(self, start: Optional[datetime] = None, end: Optional[datetime] = None) -> List[str]:
+        """Aralıkla kesişen bölüm dosyalarını zaman sırasıyla döndürür"""
+        pattern, step = PARTITION_FORMATS[self.partition]
+        files = []
+        for root, _, names in os.walk(self.directory):
+            for name in names:
+                if not name.endswith(PARTITION_SUFFIX):
+                    continue
+                path = os.path.join(root, name)
+                relative = os.path.relpath(root, self.directory)
+                try:
+                    partition_start = datetime.strptime(relative.replace(os.sep, "/"), pattern)
+                except ValueError:
+                    continue
+                if start and partition_start + step <= start:
+                    continue
+                if end and partition_start >= end:
+                    continue
+                files.append((partition_start, path))
+        return [path for _, path in sorted(files)]
+
+    def get_status(self) -> Dict[str, Any]:
+        """Kuyruk ve yazma sayaçlarını döndürür"""
+        with self._lock:
+            return {
+                "directory": self.directory,
+                "partition": self.partition,
+                "queued": self._queue.qsize(),
+                "archived_sessions": self.archived_sessions,
+                "archived_turns": self.archived_turns,
+                "dropped": self.dropped,
+                "errors": self.errors,
+                "bytes_written": self.bytes_written
+            }
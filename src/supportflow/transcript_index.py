@@ -0,0 +1,373 @@
+"""
+Konuşma transkriptleri için artımlı ters indeks (inverted index)
+Supervisor'ların turn'ler içinde kelime, ifade ve boolean sorgu ile
+arama yapmasını sağlar
+"""
+
+import bisect
+import heapq
+import re
+import threading
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from .text_utils import tokenize
+
+# Turn içinde kullanıcı mesajı ile agent yanıtı arasına konan pozisyon boşluğu;
+# ifade (phrase) eşleşmesinin iki alan arasında taşmasını engeller
+FIELD_GAP = 1000
+
+# Silinen doküman sayısı bu değeri ve canlı doküman sayısını aşınca indeks sıkıştırılır
+COMPACT_MIN_REMOVED = 256
+
+# Sorgu dilinin sözcükleri: "ifade", (, ), -, AND/OR/NOT, terim ve önek*
+_QUERY_TOKEN_RE = re.compile(r'"([^"]*)"|(\()|(\))|((?<!\S)-)|([^\s()"]+)')
+
+
+class _Doc:
+    """
+    İndekslenen turn'ün hafif kaydı
+
+    Turn nesnesi ve metni tutulmaz; session diske yazıldığında turn'lerin
+    belleği de serbest kalır. Metin arama sonucu oluşturulurken yüklenir.
+    """
+
+    __slots__ = ("session_id", "turn_id", "turn_index", "timestamp", "category")
+
+    def __init__(self, session_id: str, turn, turn_index: int):
+        self.session_id = session_id
+        self.turn_id = turn.id
+        self.turn_index = turn_index
+        self.timestamp = turn.timestamp
+        self.category = turn.category
+
+
+class TranscriptIndex:
+    """
+    Turn'ler üzerinde pozisyonlu ters indeks
+
+    Sorgu dili:
+    - kelime: mahkeme
+    - ifade: "fatura itirazı"
+    - önek: tarif*
+    - boolean: AND (varsayılan), OR, NOT veya -kelime, parantez
+
+    Sona eren session'lar remove_session() ile çıkarılır: dokümanları hemen
+    aranamaz olur, posting'ler ise silinenler canlıları geçince toplu
+    sıkıştırmayla temizlenir.
+    """
+
+    def __init__(self, turn_loader: Optional[Callable[[str], Optional[List[Any]]]] = None):
+        """
+        İndeksi başlatır
+
+        Args:
+            turn_loader: Session ID için turn listesini döndüren fonksiyon; arama
+                sonuçlarındaki mesaj metinleri buradan okunur (yoksa sonuçlar metinsiz döner)
+        """
+        self.turn_loader = turn_loader
+        self._postings: Dict[str, Dict[int, Tuple[int, ...]]] = {}
+        self._docs: List[Optional[_Doc]] = []
+        self._timestamps: List[float] = []
+        self._session_docs: Dict[str, List[int]] = {}
+        self._removed = 0
+        self._vocabulary: List[str] = []
+        self._vocabulary_dirty = False
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._docs) - self._removed
+
+    def add_turn(self, session_id: str, turn, turn_index: int) -> int:
+        """
+        Turn'ü indekse ekler
+
+        Args:
+            session_id: Session ID
+            turn: ConversationTurn
+            turn_index: Turn'ün session.turns içindeki sırası
+
+        Returns:
+            Doküman ID
+        """
+        user_tokens = tokenize(turn.user_message)
+        agent_tokens = tokenize(turn.agent_response)
+
+        positions: Dict[str, List[int]] = {}
+        for position, token in enumerate(user_tokens):
+            positions.setdefault(token, []).append(position)
+        offset = len(user_tokens) + FIELD_GAP
+        for position, token in enumerate(agent_tokens):
+            positions.setdefault(token, []).append(offset + position)
+
+        with self._lock:
+            doc_id = len(self._docs)
+            self._docs.append(_Doc(session_id, turn, turn_index))
+            self._session_docs.setdefault(session_id, []).append(doc_id)
+            # Turn'ler zaman sırasıyla eklenir; zaman filtresi için bisect kullanılır
+            timestamp = turn.timestamp.timestamp()
+            if self._timestamps and timestamp < self._timestamps[-1]:
+                timestamp = self._timestamps[-1]
+            self._timestamps.append(timestamp)
+
+            for token, token_positions in positions.items():
+                postings = self._postings.get(token)
+                if postings is None:
+                    postings = self._postings[token] = {}
+                    self._vocabulary_dirty = True
+                postings[doc_id] = tuple(token_positions)
+
+        return doc_id
+
+    def remove_session(self, session_id: str) -> int:
+        """
+        Session'ın turn'lerini indeksten çıkarır
+
+        Args:
+            session_id: Session ID
+
+        Returns:
+            Çıkarılan doküman sayısı
+        """
+        with self._lock:
+            doc_ids = self._session_docs.pop(session_id, [])
+            for doc_id in doc_ids:
+                self._docs[doc_id] = None
+            self._removed += len(doc_ids)
+            if self._removed >= COMPACT_MIN_REMOVED and self._removed * 2 > len(self._docs):
+                self.compact()
+        return len(doc_ids)
+
+    def compact(self):
+        """Silinen dokümanları posting'lerden atar ve doküman ID'lerini yeniden numaralar"""
+        with self._lock:
+            remap: Dict[int, int] = {}
+            docs: List[Optional[_Doc]] = []
+            timestamps: List[float] = []
+            for doc_id, doc in enumerate(self._docs):
+                if doc is not None:
+                    remap[doc_id] = len(docs)
+                    docs.append(doc)
+                    timestamps.append(self._timestamps[doc_id])
+
+            postings: Dict[str, Dict[int, Tuple[int, ...]]] = {}
+            for token, token_postings in self._postings.items():
+                kept = {remap[doc_id]: positions for doc_id, positions in token_postings.items() if doc_id in remap}
+                if kept:
+                    postings[token] = kept
+
+            session_docs: Dict[str, List[int]] = {}
+            for doc_id, doc in enumerate(docs):
+                session_docs.setdefault(doc.session_id, []).append(doc_id)
+
+            self._docs, self._timestamps, self._postings = docs, timestamps, postings
+            self._session_docs = session_docs
+            self._removed = 0
+            self._vocabulary_dirty = True
+
+    def search(
+        self,
+        query: str,
+        category: str = None,
+        start: datetime = None,
+        end: datetime = None,
+        offset: int = 0,
+        limit: int = 20
+    ) -> Dict[str, Any]:
+        """
+        İndekste arama yapar, sonuçları en yeniden eskiye sıralar
+
+        Args:
+            query: Sorgu metni
+            category: Kategori filtresi
+            start: Başlangıç zamanı filtresi
+            end: Bitiş zamanı filtresi
+            offset: Atlanacak sonuç sayısı
+            limit: Döndürülecek sonuç sayısı
+
+        Returns:
+            Toplam sonuç sayısı ve sayfa
+        """
+        tokens = self._lex(query)
+        if not tokens:
+            raise ValueError("Sorgu boş olamaz")
+
+        with self._lock:
+            parser = _QueryParser(tokens, self)
+            matches = parser.parse()
+
+            low = bisect.bisect_left(self._timestamps, start.timestamp()) if start else 0
+            high = bisect.bisect_right(self._timestamps, end.timestamp()) if end else len(self._docs)
+
+            doc_ids = [
+                doc_id for doc_id in matches
+                if low <= doc_id < high
+                and self._docs[doc_id] is not None
+                and (category is None or self._docs[doc_id].category == category)
+            ]
+            page_docs = [self._docs[doc_id] for doc_id in heapq.nlargest(offset + limit, doc_ids)[offset:]]
+
+        # Metinler lock dışında, her session için bir kez yüklenir
+        turns_by_session: Dict[str, Optional[List[Any]]] = {}
+        if self.turn_loader:
+            for doc in page_docs:
+                if doc.session_id not in turns_by_session:
+                    turns_by_session[doc.session_id] = self.turn_loader(doc.session_id)
+        page = [self._hit(doc, turns_by_session.get(doc.session_id)) for doc in page_docs]
+
+        return {"total": len(doc_ids), "offset": offset, "limit": limit, "results": page}
+
+    @staticmethod
+    def _hit(doc: _Doc, turns: Optional[List[Any]]) -> Dict[str, Any]:
+        """Doküman için arama sonucu kaydı oluşturur"""
+        turn = turns[doc.turn_index] if turns and doc.turn_index < len(turns) else None
+        if turn is not None and turn.id != doc.turn_id:
+            turn = None
+        return {
+            "session_id": doc.session_id,
+            "turn_id": doc.turn_id,
+            "timestamp": doc.timestamp.isoformat(),
+            "category": doc.category,
+            "user_message": turn.user_message if turn else None,
+            "agent_response": turn.agent_response[:200] if turn else None
+        }
+
+    # --- Sorgu değerlendirme yardımcıları (parser tarafından kullanılır) ---
+
+    def _all_docs(self) -> Set[int]:
+        return {doc_id for doc_id, doc in enumerate(self._docs) if doc is not None}
+
+    def _term_docs(self, term: str) -> Set[int]:
+        if term.endswith("*") and len(term) > 1:
+            return self._prefix_docs(term[:-1])
+        return set(self._postings.get(term, ()))
+
+    def _prefix_docs(self, prefix: str) -> Set[int]:
+        if self._vocabulary_dirty:
+            self._vocabulary = sorted(self._postings)
+            self._vocabulary_dirty = False
+        result: Set[int] = set()
+        index = bisect.bisect_left(self._vocabulary, prefix)
+        while index < len(self._vocabulary) and self._vocabulary[index].startswith(prefix):
+            result.update(self._postings[self._vocabulary[index]])
+            index += 1
+        return result
+
+    def _phrase_docs(self, terms: List[str]) -> Set[int]:
+        if not terms:
+            return set()
+        if len(terms) == 1:
+            return self._term_docs(terms[0])
+
+        postings = [self._postings.get(term) for term in terms]
+        if any(p is None for p in postings):
+            return set()
+
+        # En seçici terimden başlayarak aday dokümanları daralt
+        candidates = set(min(postings, key=len))
+        for p in postings:
+            candidates.intersection_update(p)
+
+        result = set()
+        for doc_id in candidates:
+            starts = set(postings[0][doc_id])
+            for shift, p in enumerate(postings[1:], start=1):
+                starts &= {pos - shift for pos in p[doc_id]}
+                if not starts:
+                    break
+            if starts:
+                result.add(doc_id)
+        return result
+
+    @staticmethod
+    def _lex(query: str) -> List[Tuple[str, Any]]:
+        """Sorguyu token'lara ayırır"""
+        tokens: List[Tuple[str, Any]] = []
+        for phrase, lparen, rparen, minus, word in _QUERY_TOKEN_RE.findall(query):
+            if lparen:
+                tokens.append(("LPAREN", None))
+            elif rparen:
+                tokens.append(("RPAREN", None))
+            elif minus:
+                tokens.append(("NOT", None))
+            elif word in ("AND", "OR", "NOT"):
+                tokens.append((word, None))
+            elif word:
+                is_prefix = word.endswith("*")
+                terms = tokenize(word)
+                if is_prefix and len(terms) == 1:
+                    tokens.append(("TERM", terms[0] + "*"))
+                elif len(terms) == 1:
+                    tokens.append(("TERM", terms[0]))
+                elif terms:
+                    tokens.append(("PHRASE", terms))
+            else:
+                tokens.append(("PHRASE", tokenize(phrase)))
+        return tokens
+
+
+class _QueryParser:
+    """
+    Recursive-descent sorgu ayrıştırıcı
+
+    Öncelik sırası: OR < AND (örtük) < NOT
+    """
+
+    def __init__(self, tokens: List[Tuple[str, Any]], index: TranscriptIndex):
+        self.tokens = tokens
+        self.position = 0
+        self.index = index
+
+    def parse(self) -> Set[int]:
+        result = self._or()
+        if self.position != len(self.tokens):
+            raise ValueError("Sorgu ayrıştırılamadı: beklenmeyen ')'")
+        return result
+
+    def _peek(self) -> Optional[str]:
+        return self.tokens[self.position][0] if self.position < len(self.tokens) else None
+
+    def _or(self) -> Set[int]:
+        result = self._and()
+        while self._peek() == "OR":
+            self.position += 1
+            result = result | self._and()
+        return result
+
+    def _and(self) -> Set[int]:
+        result = self._not()
+        while self._peek() not in (None, "OR", "RPAREN"):
+            if self._peek() == "AND":
+                self.position += 1
+            if self._peek() == "NOT":
+                # "a NOT b" tüm doküman kümesini oluşturmadan fark olarak hesaplanır
+                self.position += 1
+                result = result - self._not()
+            else:
+                result = result & self._not()
+        return result
+
+    def _not(self) -> Set[int]:
+        if self._peek() == "NOT":
+            self.position += 1
+            return self.index._all_docs() - self._not()
+        return self._atom()
+
+    def _atom(self) -> Set[int]:
+        kind = self._peek()
+        if kind is None:
+            raise ValueError("Sorgu beklenmedik şekilde bitti")
+        value = self.tokens[self.position][1]
+        self.position += 1
+
+        if kind == "TERM":
+            return self.index._term_docs(value)
+        if kind == "PHRASE":
+            return self.index._phrase_docs(value)
+        if kind == "LPAREN":
+            result = self._or()
+            if self._peek() != "RPAREN":
+                raise ValueError("Sorguda kapanmamış parantez")
+            self.position += 1
+            return result
+        raise ValueError(f"Beklenmeyen sorgu öğesi: {kind}")